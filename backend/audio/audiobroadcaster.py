@@ -35,6 +35,15 @@ import traceback
 from copy import deepcopy
 from typing import Any, Dict, Optional, Union
 
+from pipeline.streaming.backpressure import (
+    POLICY_BLOCK,
+    POLICY_DROP_NEWEST,
+    deliver,
+    message_duration_ms,
+    queue_lag_ms,
+    validate_policy,
+)
+
 # Configure logging
 logger = logging.getLogger("audio-broadcaster")
 
@@ -79,7 +88,11 @@ class AudioBroadcaster(threading.Thread):
         }
 
     def subscribe(
-        self, name: str, maxsize: int = 10, for_process: bool = False
+        self,
+        name: str,
+        maxsize: int = 10,
+        for_process: bool = False,
+        policy: str = POLICY_DROP_NEWEST,
     ) -> Union[queue.Queue[Any], multiprocessing.Queue[Any]]:
         """
         Subscribe to audio stream.
@@ -90,10 +103,18 @@ class AudioBroadcaster(threading.Thread):
             for_process: If True, creates multiprocessing.Queue for Process subscribers.
                         Use this when subscriber is a multiprocessing.Process rather than
                         a threading.Thread. Default: False (threading queue)
+            policy: Backpressure policy when the queue is full (see backpressure.py).
+                    Live playback should use drop_oldest to stay current. The block
+                    policy is not supported: all subscribers are served from one thread.
 
         Returns:
             Queue that will receive audio messages (threading or multiprocessing)
+
+        Raises:
+            ValueError: If the policy is unknown or block
         """
+        self._validate_policy(policy)
+
         # Create appropriate queue type based on subscriber needs
         subscriber_queue: Union[queue.Queue[Any], multiprocessing.Queue[Any]]
         if for_process:
@@ -108,18 +129,22 @@ class AudioBroadcaster(threading.Thread):
                 "queue": subscriber_queue,
                 "maxsize": maxsize,
                 "is_process_queue": for_process,
+                "policy": policy,
                 "delivered": 0,
                 "dropped": 0,
                 "errors": 0,
+                "message_ms": 0.0,
             }
 
         logger.info(
-            f"New subscriber: '{name}' (queue: {queue_type}, size: {maxsize}, "
+            f"New subscriber: '{name}' (queue: {queue_type}, size: {maxsize}, policy: {policy}, "
             f"total subscribers: {len(self.subscribers)})"
         )
         return subscriber_queue
 
-    def subscribe_existing_queue(self, name: str, existing_queue: queue.Queue) -> None:
+    def subscribe_existing_queue(
+        self, name: str, existing_queue: queue.Queue, policy: str = POLICY_DROP_NEWEST
+    ) -> None:
         """
         Subscribe an existing queue to audio stream.
 
@@ -129,14 +154,22 @@ class AudioBroadcaster(threading.Thread):
         Args:
             name: Subscriber name (e.g., "ui:session123")
             existing_queue: Pre-existing queue to receive audio messages
+            policy: Backpressure policy when the queue is full (see backpressure.py);
+                    block is not supported
+
+        Raises:
+            ValueError: If the policy is unknown or block
         """
+        self._validate_policy(policy)
         with self.subscribers_lock:
             self.subscribers[name] = {
                 "queue": existing_queue,
                 "maxsize": existing_queue._maxsize if hasattr(existing_queue, "_maxsize") else 0,
+                "policy": policy,
                 "delivered": 0,
                 "dropped": 0,
                 "errors": 0,
+                "message_ms": 0.0,
             }
 
         logger.info(
@@ -144,6 +177,12 @@ class AudioBroadcaster(threading.Thread):
             f"(total subscribers: {len(self.subscribers)})"
         )
 
+    @staticmethod
+    def _validate_policy(policy: str):
+        # A waiting subscriber would hold up every other one (and subscribers_lock)
+        if validate_policy(policy) == POLICY_BLOCK:
+            raise ValueError("Audio subscribers cannot use the block policy")
+
     def unsubscribe(self, name: str):
         """
         Unsubscribe from audio stream.
@@ -171,46 +210,45 @@ class AudioBroadcaster(threading.Thread):
                 self.stats["messages_received"] += 1
                 self.stats["last_activity"] = time.time()
 
+                message_ms = message_duration_ms(audio_message)
+
                 # Broadcast to all subscribers
                 with self.subscribers_lock:
                     for name, subscriber in self.subscribers.items():
+                        subscriber["message_ms"] = message_ms
                         try:
                             # Create a copy for each subscriber to avoid shared state issues
                             message_copy = deepcopy(audio_message)
 
-                            # Handle both threading and multiprocessing queues
-                            subscriber_queue = subscriber["queue"]
-                            is_process_queue = subscriber.get("is_process_queue", False)
-
-                            if is_process_queue:
-                                # Multiprocessing queue - use block=False
-                                subscriber_queue.put(message_copy, block=False)
-                            else:
-                                # Threading queue - use put_nowait()
-                                subscriber_queue.put_nowait(message_copy)
-
+                            # Handles both threading and multiprocessing queues
+                            delivered, evicted = deliver(
+                                subscriber["queue"],
+                                message_copy,
+                                subscriber.get("policy", POLICY_DROP_NEWEST),
+                            )
+                        except Exception as e:
+                            # Other error
+                            subscriber["errors"] += 1
+                            self.stats["errors"] += 1
+                            logger.error(f"Error broadcasting to '{name}': {e}")
+                            continue
+
+                        if delivered:
                             subscriber["delivered"] += 1
                             self.stats["messages_broadcast"] += 1
 
-                        except (queue.Full, Exception) as e:
-                            # Handle full queue for both types
-                            if isinstance(e, queue.Full) or (
-                                is_process_queue and "full" in str(e).lower()
-                            ):
-                                # Subscriber queue is full - drop message
-                                subscriber["dropped"] += 1
-
-                                # Log warning periodically
-                                if subscriber["dropped"] % 100 == 0:
-                                    logger.warning(
-                                        f"Subscriber '{name}' queue full - "
-                                        f"dropped {subscriber['dropped']} messages total"
-                                    )
-                            else:
-                                # Other error
-                                subscriber["errors"] += 1
-                                self.stats["errors"] += 1
-                                logger.error(f"Error broadcasting to '{name}': {e}")
+                        lost = len(evicted) + (0 if delivered else 1)
+                        if lost:
+                            # Subscriber queue is full - the policy chose what to drop
+                            previous = subscriber["dropped"]
+                            subscriber["dropped"] += lost
+
+                            # Log warning periodically
+                            if previous // 100 != subscriber["dropped"] // 100:
+                                logger.warning(
+                                    f"Subscriber '{name}' queue full - "
+                                    f"dropped {subscriber['dropped']} messages total"
+                                )
 
                 # Note: task_done() only exists on queue.Queue (threading), not multiprocessing.Queue
                 # If input_queue is a threading queue, mark task as done for join() support
@@ -262,6 +300,8 @@ class AudioBroadcaster(threading.Thread):
                     "dropped": sub["dropped"],
                     "errors": sub["errors"],
                     "maxsize": sub["maxsize"],
+                    "policy": sub.get("policy", POLICY_DROP_NEWEST),
+                    "lag_ms": queue_lag_ms(sub["queue"], sub.get("message_ms", 0.0)),
                 }
                 for name, sub in self.subscribers.items()
             }
@@ -38,7 +38,8 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, TextIO
 
 import numpy as np
-from scipy import signal
+
+from pipeline.streaming.resampler import RationalResampler
 
 # Configure logging
 logger = logging.getLogger("transcription")
@@ -111,6 +112,7 @@ class TranscriptionWorker(ABC, threading.Thread):
         self.input_sample_rate = 44100  # Input from demodulators
         self.target_sample_rate = 16000  # Most APIs prefer 16kHz
         self.silence_threshold = 0.001  # RMS threshold for silence detection
+        self._resamplers: Dict[int, RationalResampler] = {}
 
         # Connection state
         self.connected: bool = False
@@ -530,8 +532,12 @@ class TranscriptionWorker(ABC, threading.Thread):
         if self.input_sample_rate == target_rate:
             return audio_array
 
-        num_samples = int(len(audio_array) * target_rate / self.input_sample_rate)
-        return signal.resample(audio_array, num_samples).astype(np.float32)
+        # One streaming resampler per target rate keeps filter history across chunks
+        resampler = self._resamplers.get(target_rate)
+        if resampler is None:
+            resampler = RationalResampler(self.input_sample_rate, target_rate)
+            self._resamplers[target_rate] = resampler
+        return resampler.process(audio_array).astype(np.float32)
 
     def _normalize_audio(self, audio_array: np.ndarray, target_level: float = 0.7) -> np.ndarray:
         """
@@ -50,6 +50,14 @@ parser.add_argument(
     default=True,
     help="Run the SoapySDR server discovery once on startup",
 )
+parser.add_argument(
+    "--demodulator-isolation",
+    type=str,
+    default="thread",
+    choices=["thread", "process", "batched"],
+    help="Run audio demodulators as threads in the server process, in worker processes, "
+    "or batched per session (FM/AM VFOs share one multi-VFO demodulator thread)",
+)
 
 # Only parse arguments if we're not in an alembic context
 if os.environ.get("ALEMBIC_CONTEXT"):
@@ -64,6 +72,7 @@ if os.environ.get("ALEMBIC_CONTEXT"):
         track_interval=2,
         enable_soapy_discovery=False,
         runonce_soapy_discovery=True,
+        demodulator_isolation="thread",
     )
 else:
     arguments = parser.parse_args()
@@ -36,6 +36,8 @@ class SocketEvents:
     SDR_CONFIG_ERROR = "sdr-config-error"
     SDR_ERROR = "sdr-error"
     SDR_FFT_DATA = "sdr-fft-data"
+    SDR_FFT_HISTORY = "sdr-fft-history"
+    SDR_SIGNAL_DETECTION = "sdr-signal-detection"
 
     # Audio
     AUDIO_DATA = "audio-data"
@@ -69,6 +71,7 @@ class QueueMessageTypes:
     FFT_DATA = "fft_data"
     AUDIO_DATA = "audio-data"  # Note: uses hyphen to match Socket.IO event name
     CONFIG_ERROR = "config_error"
+    SIGNAL_DETECTION = "signal_detection"
 
     # Main → Worker
     GET_CENTER_FREQ = "get_center_freq"
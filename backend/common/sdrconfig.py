@@ -45,6 +45,7 @@ class SDRConfig:
     antenna: Optional[str] = None
     ppm_error: Optional[Number] = None
     loop_playback: Optional[bool] = None
+    fft_averaging_mode: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
@@ -63,6 +64,8 @@ class SDRConfig:
             payload["fft_window"] = self.fft_window
         if self.fft_averaging is not None:
             payload["fft_averaging"] = self.fft_averaging
+        if self.fft_averaging_mode is not None:
+            payload["fft_averaging_mode"] = self.fft_averaging_mode
         if self.recording_path is not None:
             payload["recording_path"] = self.recording_path
         if self.serial_number is not None:
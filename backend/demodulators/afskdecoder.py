@@ -36,6 +36,7 @@
 #    - FSK demodulation (quadrature demod)
 #    - Clock recovery
 #    - Binary slicer, NRZI decode, G3RUH descrambler, HDLC deframing
+#    - Built once and fed through a ring-buffer source (see streamingflowgraph.py)
 #
 # 3. COMMON PARAMETERS:
 #    - Baudrate: 1200 bps (Bell 202 APRS), 9600 bps (G3RUH)
@@ -49,9 +50,7 @@
 #    - Amateur radio satellites with FM transponders
 
 import argparse
-import gc
 import logging
-import multiprocessing
 import os
 import queue
 import time
@@ -73,11 +72,12 @@ except ImportError:
 # This prevents shared memory segment exhaustion
 os.environ.setdefault("GR_BUFFER_TYPE", "vmcirc_mmap_tmpfile")
 
-from gnuradio import blocks, gr  # noqa: E402
+from gnuradio import gr  # noqa: E402
 from satellites.components.deframers.ax25_deframer import ax25_deframer  # noqa: E402
 from satellites.components.demodulators.afsk_demodulator import afsk_demodulator  # noqa: E402
 
 from demodulators.basedecoderprocess import BaseDecoderProcess  # noqa: E402
+from demodulators.streamingflowgraph import StreamingFlowgraph  # noqa: E402
 from telemetry.parser import TelemetryParser  # noqa: E402
 from vfos.state import VFOManager  # noqa: E402
 
@@ -158,13 +158,17 @@ class AFSKMessageHandler(gr.basic_block):
             traceback.print_exc()
 
 
-class AFSKFlowgraph(gr.top_block):
+class AFSKFlowgraph(StreamingFlowgraph):
     """
     AFSK flowgraph using gr-satellites AFSK demodulator components
 
     Based on gr-satellites afsk_demodulator and ax25_deframer.
+    Built once and fed continuously from the FM audio stream.
     """
 
+    stream_dtype = np.float32
+    decoding_status = DecoderStatus.DECODING
+
     def __init__(
         self,
         sample_rate,
@@ -194,193 +198,65 @@ class AFSKFlowgraph(gr.top_block):
             dc_block: Use DC blocker
             clk_bw: Clock recovery bandwidth (relative to baudrate)
             clk_limit: Clock recovery limit (relative to baudrate)
-            batch_interval: Batch processing interval in seconds (default: 5.0)
+            batch_interval: Seconds between stream log lines and status updates (default: 5.0)
             framing: Framing protocol - 'ax25' (G3RUH, default for AFSK)
         """
-        super().__init__("AFSK Decoder")
+        super().__init__(
+            "AFSK Decoder",
+            sample_rate,
+            status_callback=status_callback,
+            batch_interval=batch_interval,
+            logger=logger,
+        )
 
-        self.sample_rate = sample_rate
         self.baudrate = baudrate
         self.af_carrier = af_carrier
         self.callback = callback
-        self.status_callback = status_callback
         self.deviation = deviation
-        self.batch_interval = batch_interval
         self.use_agc = use_agc
         self.dc_block = dc_block
         self.clk_bw = clk_bw
         self.clk_limit = clk_limit
         self.framing = framing
 
-        # Accumulate samples in a buffer
-        self.sample_buffer = np.array([], dtype=np.float32)
-        self.sample_lock = multiprocessing.Lock()
-        self.current_mode = "decoding"  # Track current mode
-
-    def process_samples(self, samples):
-        """
-        Process audio samples through the flowgraph
-
-        Accumulates samples in a buffer and processes them periodically.
-
-        Args:
-            samples: numpy array of float32 audio samples
-        """
-        should_process = False
-        buffer_size = 0
-        with self.sample_lock:
-            self.sample_buffer = np.concatenate([self.sample_buffer, samples])
-            buffer_size = len(self.sample_buffer)
-
-            # Process when we have enough samples (batch_interval seconds worth)
-            min_process_samples = int(self.sample_rate * self.batch_interval)
-
-            if buffer_size >= min_process_samples:
-                should_process = True
-            elif self.current_mode != "decoding":
-                # Transition back to decoding mode (accumulating samples)
-                self.current_mode = "decoding"
-                if self.status_callback:
-                    self.status_callback(DecoderStatus.DECODING, {"buffer_samples": buffer_size})
-
-        # Process outside the lock so incoming samples don't block
-        if should_process:
-            # Transition to decoding mode (processing batch)
-            with self.sample_lock:
-                self.current_mode = "decoding"
-            if self.status_callback:
-                self.status_callback(DecoderStatus.DECODING, {"buffer_samples": buffer_size})
-
-            self._process_buffer()
-
-    def _process_buffer(self):
-        """Process accumulated samples through the flowgraph"""
-        # Copy buffer outside the lock to allow incoming samples to continue
-        with self.sample_lock:
-            if len(self.sample_buffer) == 0:
-                return
-            samples_to_process = self.sample_buffer.copy()
-            # Clear the buffer completely - no tail overlap to avoid duplicate decodes
-            self.sample_buffer = np.array([], dtype=np.float32)
-
-        tb = None
-        try:
-            # Create a NEW flowgraph for each batch to avoid connection conflicts
-            # This is necessary because hierarchical blocks can't be easily disconnected
-
-            # Create a temporary top_block
-            tb = gr.top_block("AFSK Batch Processor")
-
-            # Create vector source with accumulated samples (float, not complex)
-            source = blocks.vector_source_f(samples_to_process.tolist(), repeat=False)
-
-            # Create options namespace for gr-satellites components
-            # Note: gr-satellites expects fm_deviation (with underscore), not fm-deviation
-            options = argparse.Namespace(
-                clk_bw=self.clk_bw,
-                clk_limit=self.clk_limit,
-                deviation=self.deviation,
-                use_agc=self.use_agc,
-                disable_dc_block=not self.dc_block,
-                fm_deviation=3000,  # Default FM deviation in Hz (only used for IQ input with iq=True)
-            )
-
-            # Create AFSK demodulator
-            # iq=False because we're feeding real audio samples (already FM demodulated)
-            demod = afsk_demodulator(
-                baudrate=self.baudrate,
-                samp_rate=self.sample_rate,
-                iq=False,  # Audio input (real), not IQ
-                af_carrier=self.af_carrier,
-                deviation=self.deviation,
-                dump_path=None,
-                options=options,
-            )
-
-            # Create AX.25 deframer (AFSK typically uses AX.25)
-            deframer = ax25_deframer(g3ruh_scrambler=True, options=options)
-
-            logger.info(
-                f"Batch: {len(samples_to_process)} samp ({self.batch_interval}s) | "
-                f"AFSK: {self.baudrate}bd, {self.sample_rate:.0f}sps, af_carrier={self.af_carrier}, dev={self.deviation} | "
-                f"Frame: AX25(G3RUH)"
-            )
-
-            # Create message handler for this batch
-            msg_handler = AFSKMessageHandler(self.callback)
-
-            # Build flowgraph
-            tb.connect(source, demod, deframer)
-            tb.msg_connect((deframer, "out"), (msg_handler, "in"))
-
-            # Run the flowgraph
-            tb.start()
-            tb.wait()
+    def _build(self):
+        """Create the demodulator, deframer and message handler after the source"""
+        # Create options namespace for gr-satellites components
+        # Note: gr-satellites expects fm_deviation (with underscore), not fm-deviation
+        options = argparse.Namespace(
+            clk_bw=self.clk_bw,
+            clk_limit=self.clk_limit,
+            deviation=self.deviation,
+            use_agc=self.use_agc,
+            disable_dc_block=not self.dc_block,
+            fm_deviation=3000,  # Default FM deviation in Hz (only used for IQ input with iq=True)
+        )
 
-            # Explicitly stop
-            try:
-                tb.stop()
-            except Exception:
-                pass
+        # Create AFSK demodulator
+        # iq=False because we're feeding real audio samples (already FM demodulated)
+        self.demod = afsk_demodulator(
+            baudrate=self.baudrate,
+            samp_rate=self.sample_rate,
+            iq=False,  # Audio input (real), not IQ
+            af_carrier=self.af_carrier,
+            deviation=self.deviation,
+            dump_path=None,
+            options=options,
+        )
 
-        except Exception as e:
-            logger.error(f"Error processing buffer: {e}")
-            import traceback
+        # Create AX.25 deframer (AFSK typically uses AX.25)
+        self.deframer = ax25_deframer(g3ruh_scrambler=True, options=options)
 
-            traceback.print_exc()
-            # Clear buffer on error to avoid repeated failures
-            with self.sample_lock:
-                self.sample_buffer = np.array([], dtype=np.float32)
-        finally:
-            # Explicit cleanup to prevent shared memory leaks
-            if "tb" in locals() and tb is not None:
-                try:
-                    # Ensure flowgraph is stopped
-                    tb.stop()
-                    tb.wait()
-                except Exception:
-                    pass
+        self.msg_handler = AFSKMessageHandler(self.callback)
 
-                # Disconnect all blocks
-                try:
-                    tb.disconnect_all()
-                except Exception:
-                    pass
+        # Build flowgraph
+        self.connect(self.source, self.demod, self.deframer)
+        self.msg_connect((self.deframer, "out"), (self.msg_handler, "in"))
 
-                # Delete references to allow garbage collection
-                try:
-                    del msg_handler
-                    del deframer
-                    del demod
-                    del source
-                except Exception:
-                    pass
-
-                # Delete the top_block to release resources
-                del tb
-
-            # Force garbage collection to clean up GNU Radio objects
-            # and release shared memory segments
-            gc.collect()
-
-            # Longer delay to allow system to clean up shared memory
-            # GNU Radio 3.10+ has issues with rapid flowgraph creation/destruction
-            time.sleep(0.1)
-
-    def flush_buffer(self):
-        """Process any remaining samples in the buffer"""
-        should_process = False
-        buffer_size = 0
-        with self.sample_lock:
-            if len(self.sample_buffer) > 0:
-                buffer_size = len(self.sample_buffer)
-                should_process = True
-        # CRITICAL: Call _process_buffer() OUTSIDE the lock to avoid blocking the entire app.
-        # _process_buffer() runs GNU Radio flowgraph synchronously (tb.wait()) and sleeps 100ms,
-        # which would freeze all threads trying to acquire sample_lock if called inside the lock.
-        if should_process:
-            logger.info(f"Flushing {buffer_size} remaining samples from AFSK flowgraph")
-            self._process_buffer()
+        return (
+            f"AFSK: {self.baudrate}bd, {self.sample_rate:.0f}sps, af_carrier={self.af_carrier}, "
+            f"dev={self.deviation} | Frame: AX25(G3RUH)"
+        )
 
 
 class AFSKDecoder(BaseDecoderProcess):
@@ -394,7 +270,7 @@ class AFSKDecoder(BaseDecoderProcess):
         config,  # Pre-resolved DecoderConfig from DecoderConfigService (contains all params + metadata)
         output_dir="data/decoded",
         vfo=None,
-        batch_interval=5.0,  # Batch processing interval in seconds
+        batch_interval=5.0,  # Log/status interval in seconds
         shm_monitor_interval=10,  # Check SHM every 60 seconds
         shm_restart_threshold=1000,  # Restart when segments exceed this
     ):
@@ -760,12 +636,12 @@ class AFSKDecoder(BaseDecoderProcess):
         except KeyboardInterrupt:
             pass
         finally:
-            # Flush any remaining samples
+            # Decode any buffered samples, then stop the flowgraph
             if flowgraph_started and self.flowgraph:
                 try:
-                    self.flowgraph.flush_buffer()
+                    self.flowgraph.close()
                 except Exception as e:
-                    logger.error(f"Error flushing buffer: {e}")
+                    logger.error(f"Error closing flowgraph: {e}")
 
         logger.info(
             f"AFSK decoder process stopped for {self.session_id}. "
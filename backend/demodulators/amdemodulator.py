@@ -24,6 +24,13 @@ from typing import Any, Dict, Optional, Tuple
 import numpy as np
 from scipy import signal
 
+from pipeline.streaming.backpressure import POLICY_DROP_OLDEST
+from pipeline.streaming.decimator import DecimatorChain
+from pipeline.streaming.iqformat import get_iq_samples
+from pipeline.streaming.nco import NCO
+from pipeline.streaming.resampler import RationalResampler
+from pipeline.streaming.sampleindex import SampleGapDetector
+from pipeline.streaming.squelch import SquelchGate
 from vfos.state import VFOManager
 
 logger = logging.getLogger("am-demodulator")
@@ -48,6 +55,16 @@ class AMDemodulator(threading.Thread):
     process the same IQ samples without gaps.
     """
 
+    # Accepts narrowband streams from the shared channelizer (see IQBroadcaster.subscribe_channel)
+    accepts_channelized_iq = True
+    channel_min_sample_rate = 48e3
+
+    # Live audio: stay current under load by dropping the oldest queued IQ
+    iq_backpressure_policy = POLICY_DROP_OLDEST
+
+    # Can be demodulated as one row of the session's MultiVFODemodulator
+    batched_modulation = "am"
+
     def __init__(self, iq_queue, audio_queue, session_id, vfo_number=None):
         super().__init__(daemon=True, name=f"AMDemodulator-{session_id}-VFO{vfo_number or ''}")
         self.iq_queue = iq_queue
@@ -56,6 +73,8 @@ class AMDemodulator(threading.Thread):
         self.vfo_number = vfo_number  # VFO number for multi-VFO mode
         self.running = True
         self.vfo_manager = VFOManager()
+        # Detects dropped IQ blocks so filter state is not carried across a gap
+        self.gap_detector = SampleGapDetector()
 
         # Audio output parameters
         self.audio_sample_rate = 44100  # 44.1 kHz audio output
@@ -64,7 +83,8 @@ class AMDemodulator(threading.Thread):
         # Audio buffer to accumulate samples
         self.audio_buffer = np.array([], dtype=np.float32)
 
-        # Squelch state (for hysteresis)
+        # Squelch state (hysteresis and hold time), decided right after decimation
+        self.squelch = SquelchGate()
         self.squelch_open = False  # Track if squelch is open (signal present)
 
         # Power measurement settings
@@ -77,9 +97,13 @@ class AMDemodulator(threading.Thread):
         self.current_center_freq = None
         self.current_bandwidth = None
 
+        # Phase-continuous frequency translation to baseband
+        self.nco = NCO()
+
         # Filters (will be initialized when we know sample rates)
-        self.decimation_filter: Optional[Tuple[np.ndarray, int]] = None
+        self.decimation_filter: Optional[DecimatorChain] = None
         self.audio_filter: Optional[np.ndarray] = None
+        self.audio_resampler: Optional[RationalResampler] = None
         self.dc_blocker: Optional[Tuple[np.ndarray, np.ndarray]] = None
 
         # Performance monitoring stats
@@ -96,6 +120,8 @@ class AMDemodulator(threading.Thread):
             "ingest_chunks_per_sec": 0.0,
             # Out-of-band accounting
             "samples_dropped_out_of_band": 0,
+            "sample_gaps": 0,
+            "samples_missing": 0,
             # Sleeping state (VFO out of SDR bandwidth)
             "is_sleeping": False,
         }
@@ -164,7 +190,7 @@ class AMDemodulator(threading.Thread):
     def _design_decimation_filter(self, sdr_rate, bandwidth):
         """Design a decimation filter to reduce sample rate to appropriate level for AM processing.
 
-        Uses IIR Butterworth filter for ~100-250x better performance than FIR at high sample rates.
+        Uses a streaming polyphase FIR that only computes the output samples it keeps.
         """
         # For AM, bandwidth can range from 5-10 kHz (broadcast) to 22 kHz (hi-fi)
         # Target intermediate rate: ~48 kHz, but increase if needed for higher bandwidths
@@ -180,17 +206,7 @@ class AMDemodulator(threading.Thread):
         cutoff = min(bandwidth, 22000)
         cutoff = max(cutoff, 2500)  # At least 2.5 kHz for minimum AM fidelity
 
-        nyquist = sdr_rate / 2.0
-        normalized_cutoff = cutoff / nyquist
-
-        # Ensure cutoff is valid
-        normalized_cutoff = min(0.45, max(0.01, normalized_cutoff))
-
-        # Design IIR Butterworth filter
-        # 6th order filter provides good selectivity with minimal computational cost
-        b, a = signal.butter(6, normalized_cutoff, btype="low")
-
-        return (b, a), decimation
+        return DecimatorChain(sdr_rate, decimation, cutoff)
 
     def _design_audio_filter(self, intermediate_rate, vfo_bandwidth):
         """Design audio low-pass filter based on VFO bandwidth.
@@ -236,13 +252,7 @@ class AMDemodulator(threading.Thread):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-
-        # Generate complex exponential for frequency shift
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _am_demodulate(self, samples):
         """
@@ -275,7 +285,6 @@ class AMDemodulator(threading.Thread):
         logger.info(f"AM demodulator started for session {self.session_id}")
 
         # State for filter applications
-        decimation_state = None
         audio_filter_state = None
         dc_blocker_state = None
 
@@ -312,7 +321,7 @@ class AMDemodulator(threading.Thread):
                     continue
 
                 # Extract samples and metadata
-                samples = iq_message.get("samples")
+                samples = get_iq_samples(iq_message)
                 sdr_center_freq = iq_message.get("center_freq")
                 sdr_sample_rate = iq_message.get("sample_rate")
 
@@ -325,6 +334,15 @@ class AMDemodulator(threading.Thread):
                 ingest_samples_accum += len(samples)
                 ingest_chunks_accum += 1
 
+                # Samples missing before this block: restart the filters instead of
+                # running them across the discontinuity
+                missing = self.gap_detector.check(iq_message)
+                if missing:
+                    with self.stats_lock:
+                        self.stats["sample_gaps"] += 1
+                        self.stats["samples_missing"] += missing
+                    self.decimation_filter = None
+
                 # Check if we need to reinitialize filters
                 if (
                     self.sdr_sample_rate != sdr_sample_rate
@@ -335,23 +353,21 @@ class AMDemodulator(threading.Thread):
                     self.current_bandwidth = vfo_state.bandwidth
 
                     # Design filters
-                    iir_coeffs, decimation = self._design_decimation_filter(
+                    self.decimation_filter = self._design_decimation_filter(
                         sdr_sample_rate, vfo_state.bandwidth
                     )
-                    self.decimation_filter = (iir_coeffs, decimation)
+                    decimation = self.decimation_filter.decimation
 
                     intermediate_rate = sdr_sample_rate / decimation
                     self.audio_filter = self._design_audio_filter(
                         intermediate_rate, vfo_state.bandwidth
                     )
+                    self.audio_resampler = RationalResampler(
+                        intermediate_rate, self.audio_sample_rate
+                    )
                     self.dc_blocker = self._design_dc_blocker(intermediate_rate)
 
                     # Smooth filter state transitions
-                    initial_value = samples[0] if len(samples) > 0 else 0
-                    b, a = iir_coeffs
-                    decimation_state = self._resize_filter_state(
-                        decimation_state, b, initial_value, a
-                    )
                     audio_filter_state = self._resize_filter_state(
                         audio_filter_state, self.audio_filter, 0
                     )
@@ -404,19 +420,14 @@ class AMDemodulator(threading.Thread):
                 translated = self._frequency_translate(samples, offset_freq, sdr_sample_rate)
 
                 # Step 2: Decimate and filter to bandwidth
-                iir_coeffs, decimation = self.decimation_filter
-                b, a = iir_coeffs
-
-                if decimation_state is None:
-                    # Initialize filter state on first run
-                    decimation_state = signal.lfilter_zi(b, a) * translated[0]
-
-                filtered, decimation_state = signal.lfilter(b, a, translated, zi=decimation_state)
-                decimated = filtered[::decimation]
+                decimation = self.decimation_filter.decimation
+                decimated = self.decimation_filter.process(translated)
+                if len(decimated) == 0:
+                    continue
 
                 # Measure RF signal power for squelch AFTER filtering
                 # Calculate on every chunk for accurate squelch operation
-                signal_power = np.mean(np.abs(filtered) ** 2)
+                signal_power = np.mean(np.abs(decimated) ** 2)
                 rf_power_db_raw = 10 * np.log10(signal_power + 1e-10)
 
                 # Calibration offset (matches FM demodulator to align with FFT waterfall)
@@ -435,63 +446,58 @@ class AMDemodulator(threading.Thread):
 
                 intermediate_rate = sdr_sample_rate / decimation
 
-                # Step 3: AM demodulation (envelope detection)
-                demodulated = self._am_demodulate(decimated)
+                # Squelch decision from the channel power, before any audio work
+                self.squelch_open = self.squelch.update(
+                    rf_power_db, vfo_state.squelch, len(decimated) / intermediate_rate
+                )
 
-                # Step 4: DC blocking
-                b, a = self.dc_blocker  # type: ignore[misc]
+                if not self.squelch_open:
+                    # Squelched: skip the audio stage and emit silence of the same length.
+                    # The audio filter is left as if it had been fed that silence; the DC
+                    # blocker restarts at steady state for the envelope when the squelch
+                    # opens, so reopening neither clicks nor thumps
+                    dc_blocker_state = None
+                    audio_filter_state = self._resize_filter_state(None, self.audio_filter, 0)
+                    audio = np.zeros(self.audio_resampler.skip(len(decimated)), dtype=np.float32)
+                else:
+                    # Step 3: AM demodulation (envelope detection)
+                    demodulated = self._am_demodulate(decimated)
+
+                    # Step 4: DC blocking
+                    b, a = self.dc_blocker  # type: ignore[misc]
+
+                    if dc_blocker_state is None:
+                        # Initialize filter state on first run (or when the squelch opens)
+                        dc_blocker_state = signal.lfilter_zi(b, a) * demodulated[0]
+
+                    dc_blocked, dc_blocker_state = signal.lfilter(
+                        b, a, demodulated, zi=dc_blocker_state
+                    )
 
-                if dc_blocker_state is None:
-                    # Initialize filter state on first run
-                    dc_blocker_state = signal.lfilter_zi(b, a) * demodulated[0]
+                    # Step 5: Audio filtering
+                    if audio_filter_state is None:
+                        # Initialize filter state on first run
+                        audio_filter_state = signal.lfilter_zi(self.audio_filter, 1) * dc_blocked[0]
 
-                dc_blocked, dc_blocker_state = signal.lfilter(
-                    b, a, demodulated, zi=dc_blocker_state
-                )
+                    audio_filtered, audio_filter_state = signal.lfilter(
+                        self.audio_filter, 1, dc_blocked, zi=audio_filter_state
+                    )
 
-                # Step 5: Audio filtering
-                if audio_filter_state is None:
-                    # Initialize filter state on first run
-                    audio_filter_state = signal.lfilter_zi(self.audio_filter, 1) * dc_blocked[0]
+                    # Step 6: Resample to audio rate (44.1 kHz)
+                    audio = self.audio_resampler.process(audio_filtered)
 
-                audio_filtered, audio_filter_state = signal.lfilter(
-                    self.audio_filter, 1, dc_blocked, zi=audio_filter_state
-                )
+                    if len(audio) > 0:
+                        # Apply amplification to boost low audio levels
+                        # Adjust this gain factor if audio is still too quiet or too loud
+                        audio_gain = 3.0  # 3x amplification (adjustable)
+                        audio = audio * audio_gain
 
-                # Step 6: Resample to audio rate (44.1 kHz)
-                num_output_samples = int(
-                    len(audio_filtered) * self.audio_sample_rate / intermediate_rate
-                )
-                if num_output_samples > 0:
-                    audio = signal.resample(audio_filtered, num_output_samples)
-
-                    # Apply amplification to boost low audio levels
-                    # Adjust this gain factor if audio is still too quiet or too loud
-                    audio_gain = 3.0  # 3x amplification (adjustable)
-                    audio = audio * audio_gain
-
-                    # Normalize and soft clipping
-                    max_val = np.max(np.abs(audio)) + 1e-10
-                    audio = audio / max_val * 0.5  # Scale to 50% to leave headroom
-                    audio = np.clip(audio, -0.95, 0.95)
-
-                    # Apply squelch based on RF signal strength
-                    squelch_threshold_db = vfo_state.squelch
-                    squelch_hysteresis_db = 3  # 3 dB hysteresis
-
-                    # Apply squelch with hysteresis
-                    if self.squelch_open:
-                        # Squelch is open - close if RF power drops below threshold
-                        if rf_power_db < (squelch_threshold_db - squelch_hysteresis_db):
-                            self.squelch_open = False
-                            audio = np.zeros_like(audio)  # Mute
-                    else:
-                        # Squelch is closed - open if RF power rises above threshold
-                        if rf_power_db > (squelch_threshold_db + squelch_hysteresis_db):
-                            self.squelch_open = True
-                            # Let audio through
-                        else:
-                            audio = np.zeros_like(audio)  # Keep muted
+                        # Normalize and soft clipping
+                        max_val = np.max(np.abs(audio)) + 1e-10
+                        audio = audio / max_val * 0.5  # Scale to 50% to leave headroom
+                        audio = np.clip(audio, -0.95, 0.95)
+
+                if len(audio) > 0:
 
                     # Convert to float32
                     audio = audio.astype(np.float32)
@@ -28,6 +28,7 @@ from typing import Any, Dict, Optional
 import numpy as np
 
 from constants import get_modulation_display
+from pipeline.streaming.sampleindex import SampleGapDetector
 
 logger = logging.getLogger("basedecoder")
 
@@ -123,6 +124,9 @@ class BaseDecoder:
     max_power_history: int = 100
     current_power_dbfs: Optional[float] = None
 
+    # IQ gap detection (created on first use, in the decoder's own process)
+    sample_gap_detector: Optional[SampleGapDetector] = None
+
     def _measure_signal_power(self, samples):
         """
         Measure signal power in dBFS (dB relative to full scale).
@@ -193,6 +197,29 @@ class BaseDecoder:
             stats["signal_power_min_dbfs"] = round(np.min(self.power_measurements), 1)
         return stats
 
+    def _check_sample_gap(self, iq_message: Dict[str, Any]) -> int:
+        """
+        Detect IQ samples dropped upstream before this message.
+
+        Gaps are counted in stats so a failed decode can be attributed to missing
+        samples rather than to the signal.
+
+        Args:
+            iq_message: IQ message carrying "sample_index"
+
+        Returns:
+            int: Number of samples missing before this message (0 if contiguous)
+        """
+        if self.sample_gap_detector is None:
+            self.sample_gap_detector = SampleGapDetector()
+        missing = self.sample_gap_detector.check(iq_message)
+        if missing:
+            with self.stats_lock:
+                self.stats["sample_gaps"] = self.stats.get("sample_gaps", 0) + 1
+                self.stats["samples_missing"] = self.stats.get("samples_missing", 0) + missing
+            logger.debug(f"{missing} IQ samples missing before sample {iq_message['sample_index']}")
+        return missing
+
     def _on_packet_decoded(
         self, payload: bytes, callsigns: Optional[Dict[str, str]] = None
     ) -> None:
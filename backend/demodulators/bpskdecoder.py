@@ -30,13 +30,13 @@
 #    - This centers the signal at baseband (0 Hz) regardless of VFO drift
 #    - Allows decoding off-center signals in recordings and multiple simultaneous signals
 #
-# 2. BATCHED PROCESSING WITH FRESH FLOWGRAPHS:
-#    - Processes samples in configurable batches (default 10 seconds via batch_interval parameter)
-#    - Creates a NEW gr.top_block for each batch to avoid GNU Radio 3.10 reconnection issues
-#    - Hierarchical blocks (bpsk_demodulator, ax25_deframer) cannot be reconnected
-#    - Aggressive cleanup in finally block prevents shared memory exhaustion
-#    - Processing happens outside the lock: samples continue accumulating while batch processes
-#    - UI receives "decoding" status for both accumulation and batch processing phases
+# 2. STREAMING FLOWGRAPH (see streamingflowgraph.py):
+#    - The gr.top_block is built once (hierarchical blocks are never reconnected) and runs
+#      for the life of the decoder
+#    - Samples are pushed into a ring-buffer source block; the scheduler consumes them in
+#      its own threads, so demodulation never blocks the decoder loop
+#    - FLL, Costas loop and clock recovery stay locked, so packets spanning chunks decode
+#    - UI receives "decoding" status every batch_interval seconds
 #
 # 3. SIGNAL PROCESSING CHAIN:
 #    - Frequency translation (signal to baseband)
@@ -48,8 +48,7 @@
 #    - Binary slicer, NRZI decode, G3RUH descrambler, HDLC deframing
 #
 # 4. KEY PARAMETERS:
-#    - Batch interval: 10 seconds default (configurable, balance between latency and signal lock time)
-#    - Batch overlap: 5 seconds (50% overlap to capture signals at batch boundaries)
+#    - Log/status interval: 5 seconds default (configurable)
 #    - FLL bandwidth: 75 Hz (handles residual offset after doppler compensation)
 #    - Costas bandwidth: 35 Hz (carrier phase tracking)
 #    - Sample rate: Automatically calculated based on baudrate (10x oversampling)
@@ -61,9 +60,7 @@
 #    - Automatic framing detection from satellite configuration
 
 import argparse
-import gc
 import logging
-import multiprocessing
 import os
 import queue
 import time
@@ -87,20 +84,22 @@ except ImportError:
 # This prevents shared memory segment exhaustion
 os.environ.setdefault("GR_BUFFER_TYPE", "vmcirc_mmap_tmpfile")
 
-from gnuradio import blocks, gr  # noqa: E402
+from gnuradio import gr  # noqa: E402
 from satellites.components.deframers.ax25_deframer import ax25_deframer  # noqa: E402
 from satellites.components.deframers.ccsds_rs_deframer import ccsds_rs_deframer  # noqa: E402
 from satellites.components.demodulators.bpsk_demodulator import bpsk_demodulator  # noqa: E402
 from scipy import signal  # noqa: E402
 
 from demodulators.basedecoderprocess import BaseDecoderProcess  # noqa: E402
+from demodulators.streamingflowgraph import StreamingFlowgraph  # noqa: E402
+from pipeline.streaming.iqformat import get_iq_samples  # noqa: E402
+from pipeline.streaming.nco import NCO  # noqa: E402
 from telemetry.parser import TelemetryParser  # noqa: E402
 
 logger = logging.getLogger("bpskdecoder")
 
-# Global configuration parameters for batch processing
-BATCH_INTERVAL_SECONDS = 5.0  # Batch processing interval
-BATCH_OVERLAP_SECONDS = 0.5  # Overlap between batches (tail retention)
+# Interval between flowgraph log lines and status updates
+BATCH_INTERVAL_SECONDS = 5.0
 
 
 class DecoderStatus(Enum):
@@ -192,7 +191,7 @@ class BPSKMessageHandler(gr.basic_block):
             traceback.print_exc()
 
 
-class BPSKFlowgraph(gr.top_block):
+class BPSKFlowgraph(StreamingFlowgraph):
     """
     Continuous BPSK flowgraph using gr-satellites components
 
@@ -200,6 +199,8 @@ class BPSKFlowgraph(gr.top_block):
     Runs continuously to maintain stateful blocks (FLL, Costas, clock recovery, etc.)
     """
 
+    decoding_status = DecoderStatus.DECODING
+
     def __init__(
         self,
         sample_rate,
@@ -233,244 +234,87 @@ class BPSKFlowgraph(gr.top_block):
             clk_limit: Clock recovery limit (relative to baudrate)
             costas_bw: Costas loop bandwidth (Hz)
             packet_size: Size of packet in bytes (unused, kept for compatibility)
-            batch_interval: Batch processing interval in seconds (default: 3.0)
+            batch_interval: Seconds between stream log lines and status updates
             framing: Framing protocol - 'ax25' (G3RUH) or 'doka' (CCSDS)
         """
-        super().__init__("BPSK Decoder")
+        super().__init__(
+            "BPSK Decoder",
+            sample_rate,
+            status_callback=status_callback,
+            batch_interval=batch_interval,
+            logger=logger,
+        )
 
-        self.sample_rate = sample_rate
         self.baudrate = baudrate
         self.callback = callback
-        self.status_callback = status_callback
         self.differential = differential
-        self.batch_interval = batch_interval
         self.framing = framing  # Store framing protocol
 
-        # Accumulate samples in a buffer
-        self.sample_buffer = np.array([], dtype=np.complex64)
-        self.sample_lock = multiprocessing.Lock()
-        self.current_mode = "decoding"  # Track current mode
-
-        # Flow rate tracking
-        self.last_batch_time = time.time()
-        self.last_batch_samples = 0
-
-        # VFO state tracking for batch logging
-        # Store VFO values that correspond to the buffered samples
-        self.batch_vfo_center = 0
-        self.batch_vfo_bandwidth = 0
-
-    def process_samples(self, samples, vfo_center, vfo_bandwidth):
-        """
-        Process IQ samples through the flowgraph
-
-        Accumulates samples in a buffer and processes them periodically
-        to maintain state continuity while avoiding repeated start/stop cycles.
-
-        Args:
-            samples: numpy array of complex64 samples
-            vfo_center: VFO center frequency used for DSP processing these samples
-            vfo_bandwidth: VFO bandwidth used for DSP processing these samples
-        """
-        should_process = False
-        buffer_size = 0
-        with self.sample_lock:
-            self.sample_buffer = np.concatenate([self.sample_buffer, samples])
-            buffer_size = len(self.sample_buffer)
-            # Store the most recent VFO values (these will be logged in batch)
-            self.batch_vfo_center = vfo_center
-            self.batch_vfo_bandwidth = vfo_bandwidth
-
-            # Process when we have enough samples (batch_interval seconds worth)
-            # Balance between decode latency and signal lock time
-            min_process_samples = int(self.sample_rate * self.batch_interval)
-
-            if buffer_size >= min_process_samples:
-                should_process = True
-            elif self.current_mode != "decoding":
-                # Transition back to decoding mode (accumulating samples)
-                self.current_mode = "decoding"
-                if self.status_callback:
-                    self.status_callback(DecoderStatus.DECODING, {"buffer_samples": buffer_size})
-
-        # Process outside the lock so incoming samples don't block
-        if should_process:
-            # Transition to decoding mode (processing batch)
-            with self.sample_lock:
-                self.current_mode = "decoding"
-            if self.status_callback:
-                self.status_callback(DecoderStatus.DECODING, {"buffer_samples": buffer_size})
-
-            self._process_buffer()
-
-    def _process_buffer(self):
-        """Process accumulated samples through the flowgraph"""
-        # Copy buffer outside the lock to allow incoming samples to continue
-        with self.sample_lock:
-            if len(self.sample_buffer) == 0:
-                return
-            samples_to_process = self.sample_buffer.copy()
-            # Keep a tail for continuity while processing.
-            # Increase overlap to reduce chances of dropping frames that straddle batches.
-            tail_samples = int(self.sample_rate * BATCH_OVERLAP_SECONDS)
-            if len(self.sample_buffer) > tail_samples:
-                self.sample_buffer = self.sample_buffer[-tail_samples:]
-            else:
-                self.sample_buffer = np.array([], dtype=np.complex64)
-
-        # Calculate flow rate (samples per second)
-        current_time = time.time()
-        time_elapsed = current_time - self.last_batch_time
-        samples_count = len(samples_to_process)
-        flow_rate_sps = samples_count / time_elapsed if time_elapsed > 0 else 0
-
-        # Update tracking variables for next batch
-        self.last_batch_time = current_time
-        self.last_batch_samples = samples_count
+    def _build(self):
+        """Create the demodulator, deframer and message handler after the source"""
+        # Optimized for LOW SNR signals (6-7 dB) - balanced bandwidth for lock acquisition
+        # 200/80 Hz settings provided best results in testing
+        options = argparse.Namespace(
+            rrc_alpha=0.35,
+            fll_bw=200,  # Balanced FLL bandwidth for low SNR (best tested setting)
+            clk_bw=0.08,  # Moderate bandwidth for symbol rate tracking
+            clk_limit=0.005,  # Moderate timing deviation tolerance
+            costas_bw=80,  # Balanced Costas bandwidth for low SNR (best tested setting)
+            f_offset=0,
+            disable_fll=False,
+            manchester_block_size=32,
+            syncword_threshold=4,  # Allow 4 bit errors in syncword (CCSDS default)
+        )
 
-        tb = None
-        try:
-            # Create a NEW flowgraph for each batch to avoid connection conflicts
-            # This is necessary because hierarchical blocks can't be easily disconnected
-
-            # Create a temporary top_block
-            tb = gr.top_block("BPSK Batch Processor")
-
-            # Create vector source with accumulated samples
-            source = blocks.vector_source_c(samples_to_process.tolist(), repeat=False)
-
-            # Create fresh instances of demodulator and deframer
-            # Optimized for LOW SNR signals (6-7 dB) - balanced bandwidth for lock acquisition
-            # 200/80 Hz settings provided best results in testing
-            options = argparse.Namespace(
-                rrc_alpha=0.35,
-                fll_bw=200,  # Balanced FLL bandwidth for low SNR (best tested setting)
-                clk_bw=0.08,  # Moderate bandwidth for symbol rate tracking
-                clk_limit=0.005,  # Moderate timing deviation tolerance
-                costas_bw=80,  # Balanced Costas bandwidth for low SNR (best tested setting)
-                f_offset=0,
-                disable_fll=False,
-                manchester_block_size=32,
-                syncword_threshold=4,  # Allow 4 bit errors in syncword (CCSDS default)
-            )
+        # Create BPSK demodulator
+        # The FLL (Frequency Lock Loop) handles any residual frequency offset
+        # after our frequency translation, so we set f_offset=0 and let it auto-track
+        self.demod = bpsk_demodulator(
+            baudrate=self.baudrate,
+            samp_rate=self.sample_rate,
+            iq=True,
+            f_offset=0,  # Let FLL auto-track with 250 Hz bandwidth
+            differential=self.differential,
+            manchester=False,
+            options=options,
+        )
 
-            # Create BPSK demodulator
-            # The FLL (Frequency Lock Loop) handles any residual frequency offset
-            # after our frequency translation, so we set f_offset=0 and let it auto-track
-            demod = bpsk_demodulator(
-                baudrate=self.baudrate,
-                samp_rate=self.sample_rate,
-                iq=True,
-                f_offset=0,  # Let FLL auto-track with 250 Hz bandwidth
-                differential=self.differential,
-                manchester=False,
+        # Select deframer based on detected framing protocol
+        if self.framing == "doka":
+            # DOKA uses CCSDS-style framing with Reed-Solomon FEC
+            # DOKA uses standard CCSDS frame parameters
+            # 223 bytes data + 32 bytes RS parity = 255 byte total frame (standard CCSDS)
+            self.deframer = ccsds_rs_deframer(
+                frame_size=223,  # Standard CCSDS Reed-Solomon frame size
+                precoding=None,
+                rs_en=True,
+                rs_basis="dual",
+                rs_interleaving=1,
+                scrambler="CCSDS",
+                syncword_threshold=None,
                 options=options,
             )
+            frame_info = "CCSDS_RS(sz=223,dual)"
+        else:  # ax25 (default)
+            # Standard AX.25 with G3RUH scrambler
+            self.deframer = ax25_deframer(g3ruh_scrambler=True, options=options)
+            frame_info = "AX25(G3RUH)"
+
+        # Create message handler (pass framing and logger)
+        self.msg_handler = BPSKMessageHandler(
+            self.callback,
+            logger=logging.getLogger("bpskdecoder"),
+            framing=self.framing,
+        )
 
-            # Select deframer based on detected framing protocol
-            if self.framing == "doka":
-                # DOKA uses CCSDS-style framing with Reed-Solomon FEC
-                # DOKA uses standard CCSDS frame parameters
-                # 223 bytes data + 32 bytes RS parity = 255 byte total frame (standard CCSDS)
-                deframer = ccsds_rs_deframer(
-                    frame_size=223,  # Standard CCSDS Reed-Solomon frame size
-                    precoding=None,
-                    rs_en=True,
-                    rs_basis="dual",
-                    rs_interleaving=1,
-                    scrambler="CCSDS",
-                    syncword_threshold=None,
-                    options=options,
-                )
-                frame_info = "CCSDS_RS(sz=223,dual)"
-            else:  # ax25 (default)
-                # Standard AX.25 with G3RUH scrambler
-                deframer = ax25_deframer(g3ruh_scrambler=True, options=options)
-                frame_info = "AX25(G3RUH)"
-
-            logger.info(
-                f"Batch: {len(samples_to_process)} samp ({time_elapsed:.1f}s, {flow_rate_sps/1e3:.1f}kS/s) | "
-                f"BPSK: {self.baudrate}bd, {self.sample_rate:.0f}sps, diff={self.differential} | "
-                f"Frame: {frame_info} | VFO: {self.batch_vfo_center:.0f}Hz, BW={self.batch_vfo_bandwidth:.0f}Hz"
-            )
-
-            # Create message handler for this batch (pass framing and logger)
-            msg_handler = BPSKMessageHandler(
-                self.callback,
-                logger=logging.getLogger("bpskdecoder"),
-                framing=self.framing,
-            )
-
-            # Build flowgraph
-            tb.connect(source, demod, deframer)
-            tb.msg_connect((deframer, "out"), (msg_handler, "in"))
-
-            # Run the flowgraph
-            tb.start()
-            tb.wait()
-
-            # Explicitly stop
-            try:
-                tb.stop()
-            except Exception:
-                pass
-
-        except Exception as e:
-            logger.error(f"Error processing buffer: {e}")
-            traceback.print_exc()
-            # Clear buffer on error to avoid repeated failures
-            with self.sample_lock:
-                self.sample_buffer = np.array([], dtype=np.complex64)
-        finally:
-            # Explicit cleanup to prevent shared memory leaks
-            if "tb" in locals() and tb is not None:
-                try:
-                    # Ensure flowgraph is stopped
-                    tb.stop()
-                    tb.wait()
-                except Exception:
-                    pass
-
-                # Disconnect all blocks
-                try:
-                    tb.disconnect_all()
-                except Exception:
-                    pass
+        # Build flowgraph
+        self.connect(self.source, self.demod, self.deframer)
+        self.msg_connect((self.deframer, "out"), (self.msg_handler, "in"))
 
-                # Delete references to allow garbage collection
-                try:
-                    del msg_handler
-                    del deframer
-                    del demod
-                    del source
-                except Exception:
-                    pass
-
-                # Delete the top_block to release resources
-                del tb
-
-                # Force garbage collection to clean up GNU Radio objects
-                # and release shared memory segments
-                gc.collect()
-
-                # Longer delay to allow system to clean up shared memory
-                # GNU Radio 3.10+ has issues with rapid flowgraph creation/destruction
-                time.sleep(0.1)
-
-    def flush_buffer(self):
-        """Process any remaining samples in the buffer"""
-        should_process = False
-        buffer_size = 0
-        with self.sample_lock:
-            if len(self.sample_buffer) > 0:
-                buffer_size = len(self.sample_buffer)
-                should_process = True
-        # CRITICAL: Call _process_buffer() OUTSIDE the lock to avoid blocking the entire app.
-        # _process_buffer() runs GNU Radio flowgraph synchronously (tb.wait()) and sleeps 100ms,
-        # which would freeze all threads trying to acquire sample_lock if called inside the lock.
-        if should_process:
-            logger.info(f"Flushing {buffer_size} remaining samples from BPSK flowgraph")
-            self._process_buffer()
+        return (
+            f"BPSK: {self.baudrate}bd, {self.sample_rate:.0f}sps, diff={self.differential} | "
+            f"Frame: {frame_info}"
+        )
 
     def _is_doka_signal(self):
         """
@@ -502,7 +346,7 @@ class BPSKDecoder(BaseDecoderProcess):
         config,  # Pre-resolved DecoderConfig from DecoderConfigService (contains all params + metadata)
         output_dir="data/decoded",
         vfo=None,
-        batch_interval=BATCH_INTERVAL_SECONDS,  # Batch processing interval in seconds
+        batch_interval=BATCH_INTERVAL_SECONDS,  # Log/status interval in seconds
         packet_size=256,  # Optional override for packet size
         shm_monitor_interval=10,  # Check SHM every 60 seconds
         shm_restart_threshold=1000,  # Restart when segments exceed this
@@ -524,6 +368,7 @@ class BPSKDecoder(BaseDecoderProcess):
         self.sdr_sample_rate = None  # Full SDR sample rate
         self.sdr_center_freq = None  # SDR center frequency
         self.decimation_filter = None  # Filter for decimation
+        self.nco = NCO()  # Phase-continuous frequency translation
         self.batch_interval = batch_interval
 
         logger.debug(
@@ -636,13 +481,7 @@ class BPSKDecoder(BaseDecoderProcess):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-
-        # Generate complex exponential for frequency shift
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _design_decimation_filter(self, decimation_factor, bandwidth, sample_rate):
         """Design low-pass filter for decimation."""
@@ -947,13 +786,16 @@ class BPSKDecoder(BaseDecoderProcess):
                             self.stats["last_activity"] = time.time()
 
                         # Extract IQ samples and metadata from message
-                        samples = iq_message.get("samples")
+                        samples = get_iq_samples(iq_message)
                         sdr_center = iq_message.get("center_freq")
                         sdr_rate = iq_message.get("sample_rate")
 
                         if samples is None or len(samples) == 0:
                             continue
 
+                        # Count gaps; the streaming flowgraph's loops resync across them
+                        self._check_sample_gap(iq_message)
+
                         # Update sample count
                         with self.stats_lock:
                             self.stats["samples_in"] += len(samples)
@@ -1049,7 +891,7 @@ class BPSKDecoder(BaseDecoderProcess):
                             offset_freq_init = vfo_center - sdr_center
 
                             # Initialize flowgraph (before consolidated log to avoid duplicate messages)
-                            # Note: We don't pass f_offset here since each batch creates new flowgraph
+                            # Note: We don't pass f_offset here; the FLL tracks residual offset
                             self.flowgraph = BPSKFlowgraph(
                                 sample_rate=self.sample_rate,
                                 callback=self._on_packet_decoded,
@@ -1146,13 +988,12 @@ class BPSKDecoder(BaseDecoderProcess):
         except KeyboardInterrupt:
             pass
         finally:
-            # Flush any remaining samples
+            # Decode any buffered samples, then stop the flowgraph
             if flowgraph_started and self.flowgraph:
-                logger.info("Flushing remaining samples from BPSK flowgraph")
                 try:
-                    self.flowgraph.flush_buffer()
+                    self.flowgraph.close()
                 except Exception as e:
-                    logger.error(f"Error flushing buffer: {e}")
+                    logger.error(f"Error closing flowgraph: {e}")
 
         logger.info(
             f"BPSK decoder process stopped for {self.session_id}. "
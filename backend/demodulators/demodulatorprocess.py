@@ -0,0 +1,221 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Worker-process host for the thread-based audio demodulators.
+
+FM, FM stereo, AM and SSB demodulators are threads in the server process, so
+their DSP competes with the asyncio loop, Socket.IO serialisation and the
+broadcaster threads for the GIL. DemodulatorProcess runs an unchanged
+demodulator class in a child process instead:
+
+- IQ arrives through a shared-memory ring (SharedRingQueue); only small
+  descriptors are pickled per block. Demodulators that accept channelized IQ get
+  their VFO's narrowband channel from the channelizer's ring, the others the
+  broadcaster's wideband ring.
+- VFO states come with each block (from the shared VFO channel, or in the
+  channel descriptor itself) and are mirrored
+  into the child's VFOManager, where the demodulator looks them up as usual.
+- Audio goes back over a multiprocessing.Queue feeding the VFO's AudioBroadcaster;
+  44.1 kHz float32 chunks are a few KB, far less than the IQ they came from.
+- Stats snapshots are published to the parent about once per second, so the
+  performance monitor reads them like a thread demodulator's stats.
+"""
+
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+from multiprocessing import resource_tracker
+from typing import Any, Dict, Optional
+
+from vfos.state import VFOManager
+
+logger = logging.getLogger("demodulator-process")
+
+# Where a demodulator runs (see DemodulatorManager.start_demodulator)
+ISOLATION_THREAD = "thread"
+ISOLATION_PROCESS = "process"
+# FM/AM VFOs share the session's MultiVFODemodulator thread
+ISOLATION_BATCHED = "batched"
+ISOLATION_MODES = (ISOLATION_THREAD, ISOLATION_PROCESS, ISOLATION_BATCHED)
+
+# Seconds between stats snapshots sent to the parent
+DEFAULT_STATS_INTERVAL = 1.0
+
+
+class VFOMirrorQueue:
+    """
+    IQ queue wrapper used inside the worker process.
+
+    Copies the VFO states carried by each IQ message into the process's
+    VFOManager whenever their version changes, then hands the message on.
+    """
+
+    def __init__(self, iq_queue, session_id: str):
+        """
+        Args:
+            iq_queue: Hydrating IQ queue (SharedRingQueue)
+            session_id: Session whose VFO states the messages carry
+        """
+        self.iq_queue = iq_queue
+        self.session_id = session_id
+        self.vfo_manager = VFOManager()
+        self._vfo_version: Optional[int] = None
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Dict[str, Any]:
+        message = self.iq_queue.get(block, timeout)
+        version = message.get("vfo_version")
+        if "vfo_states" in message and (version is None or version != self._vfo_version):
+            self.vfo_manager.load_session_states(self.session_id, message["vfo_states"])
+            self._vfo_version = version
+        return message
+
+    def get_nowait(self) -> Dict[str, Any]:
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        return bool(self.iq_queue.empty())
+
+    def qsize(self) -> int:
+        return int(self.iq_queue.qsize())
+
+    def close(self):
+        close = getattr(self.iq_queue, "close", None)
+        if close is not None:
+            close()
+
+
+class DemodulatorProcess(multiprocessing.Process):
+    """
+    Runs one demodulator in a child process.
+
+    Exposes the parts of the demodulator interface the managers and the
+    performance monitor use: stop(), join(), is_alive(), internal_mode,
+    iq_queue, audio_queue, stats and stats_lock.
+    """
+
+    isolation = ISOLATION_PROCESS
+
+    def __init__(
+        self,
+        demodulator_class,
+        iq_queue,
+        audio_queue,
+        session_id,
+        stats_interval: float = DEFAULT_STATS_INTERVAL,
+        **kwargs,
+    ):
+        """
+        Initialize the worker process.
+
+        Args:
+            demodulator_class: Demodulator class to run (e.g. FMDemodulator)
+            iq_queue: Shared-memory IQ subscription (SharedRingQueue)
+            audio_queue: multiprocessing.Queue receiving audio messages
+            session_id: Session identifier
+            stats_interval: Seconds between stats snapshots sent to the parent
+            **kwargs: Arguments for the demodulator constructor
+        """
+        vfo_number = kwargs.get("vfo_number")
+        super().__init__(
+            daemon=True,
+            name=f"{demodulator_class.__name__}Process-{session_id}-VFO{vfo_number or ''}",
+        )
+        self.demodulator_class = demodulator_class
+        self.iq_queue = iq_queue
+        self.audio_queue = audio_queue
+        self.session_id = session_id
+        self.vfo_number = vfo_number
+        self.internal_mode = kwargs.get("internal_mode", False)
+        self.stats_interval = stats_interval
+        self.demodulator_kwargs = kwargs
+
+        # Cross-process flag: 1=running, 0=stop
+        self.running = multiprocessing.Value("i", 1)
+
+        # Latest stats snapshot from the child; only read in the parent
+        self._stats_queue: multiprocessing.Queue = multiprocessing.Queue(maxsize=2)
+        self._stats: Dict[str, Any] = {}
+        self.stats_lock = multiprocessing.Lock()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Most recent stats snapshot published by the demodulator (parent side)."""
+        while True:
+            try:
+                self._stats = self._stats_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+        return self._stats
+
+    def start(self):
+        """Start the worker process."""
+        # The child registers the IQ ring and VFO channel when it attaches. Those
+        # registrations must reach the parent's resource tracker: a tracker started
+        # by the child itself would unlink both segments when the child exits.
+        resource_tracker.ensure_running()
+        super().start()
+
+    def stop(self):
+        """Signal the worker to stop its demodulator and exit."""
+        self.running.value = 0
+
+    def _publish_stats(self, demodulator) -> None:
+        with demodulator.stats_lock:
+            snapshot = demodulator.stats.copy()
+        snapshot["pid"] = self.pid
+        try:
+            self._stats_queue.put_nowait(snapshot)
+        except queue.Full:
+            # Parent has not polled recently; replace the stale snapshot
+            try:
+                self._stats_queue.get_nowait()
+                self._stats_queue.put_nowait(snapshot)
+            except (queue.Empty, queue.Full):
+                pass
+
+    def run(self):
+        """Worker process: run the demodulator thread until stopped."""
+        # Shutdown is driven by the parent through stop()
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        iq_queue = VFOMirrorQueue(self.iq_queue, self.session_id)
+        demodulator = self.demodulator_class(
+            iq_queue, self.audio_queue, self.session_id, **self.demodulator_kwargs
+        )
+        demodulator.start()
+        logger.info(f"{self.name} started (pid={self.pid})")
+
+        last_stats_time = time.time()
+        try:
+            while self.running.value and demodulator.is_alive():
+                time.sleep(0.1)
+                now = time.time()
+                if now - last_stats_time >= self.stats_interval:
+                    self._publish_stats(demodulator)
+                    last_stats_time = now
+        except Exception as e:
+            logger.error(f"Error in {self.name}: {e}")
+            logger.exception(e)
+        finally:
+            demodulator.stop()
+            demodulator.join(timeout=2.0)
+            self._publish_stats(demodulator)
+            iq_queue.close()
+            # Do not hold the exit on audio the parent no longer reads
+            self.audio_queue.cancel_join_thread()
+            logger.info(f"{self.name} stopped")
@@ -24,6 +24,13 @@ from typing import Any, Dict, Optional, Tuple
 import numpy as np
 from scipy import signal
 
+from pipeline.streaming.backpressure import POLICY_DROP_OLDEST
+from pipeline.streaming.decimator import DecimatorChain
+from pipeline.streaming.iqformat import get_iq_samples
+from pipeline.streaming.nco import NCO
+from pipeline.streaming.resampler import RationalResampler
+from pipeline.streaming.sampleindex import SampleGapDetector
+from pipeline.streaming.squelch import SquelchGate
 from vfos.state import VFOManager
 
 logger = logging.getLogger("fm-demodulator")
@@ -47,6 +54,16 @@ class FMDemodulator(threading.Thread):
     process the same IQ samples without gaps.
     """
 
+    # Accepts narrowband streams from the shared channelizer (see IQBroadcaster.subscribe_channel)
+    accepts_channelized_iq = True
+    channel_min_sample_rate = 200e3
+
+    # Live audio: stay current under load by dropping the oldest queued IQ
+    iq_backpressure_policy = POLICY_DROP_OLDEST
+
+    # Can be demodulated as one row of the session's MultiVFODemodulator
+    batched_modulation = "fm"
+
     def __init__(
         self,
         iq_queue,
@@ -64,6 +81,8 @@ class FMDemodulator(threading.Thread):
         self.vfo_number = vfo_number  # VFO number for multi-VFO mode
         self.running = True
         self.vfo_manager = VFOManager()
+        # Detects dropped IQ blocks so filter state is not carried across a gap
+        self.gap_detector = SampleGapDetector()
 
         # Internal mode: bypasses VFO checks and uses provided parameters
         self.internal_mode = internal_mode
@@ -77,7 +96,8 @@ class FMDemodulator(threading.Thread):
         # Audio buffer to accumulate samples
         self.audio_buffer = np.array([], dtype=np.float32)
 
-        # Squelch state (for hysteresis)
+        # Squelch state (hysteresis and hold time), decided right after decimation
+        self.squelch = SquelchGate()
         self.squelch_open = False  # Track if squelch is open (signal present)
 
         # Processing state
@@ -86,9 +106,13 @@ class FMDemodulator(threading.Thread):
         self.current_center_freq = None
         self.current_bandwidth = None
 
+        # Phase-continuous frequency translation to baseband
+        self.nco = NCO()
+
         # Filters (will be initialized when we know sample rates)
-        self.decimation_filter: Optional[Tuple[np.ndarray, int]] = None
+        self.decimation_filter: Optional[DecimatorChain] = None
         self.audio_filter: Optional[np.ndarray] = None
+        self.audio_resampler: Optional[RationalResampler] = None
         self.deemphasis_filter: Optional[Tuple[np.ndarray, np.ndarray]] = None
 
         # De-emphasis time constant (75 microseconds for US, 50 for EU)
@@ -113,6 +137,8 @@ class FMDemodulator(threading.Thread):
             "ingest_chunks_per_sec": 0.0,
             # Out-of-band accounting
             "samples_dropped_out_of_band": 0,
+            "sample_gaps": 0,
+            "samples_missing": 0,
             # Sleeping state (VFO out of SDR bandwidth)
             "is_sleeping": False,
         }
@@ -179,50 +205,16 @@ class FMDemodulator(threading.Thread):
             return old_state[:new_len]
 
     def _design_decimation_filter(self, sdr_rate, bandwidth):
-        """Design cascaded decimation filters for efficient multi-stage decimation.
+        """Design the streaming decimator down to the ~200 kHz intermediate rate.
 
-        Uses cascaded low-order (4th) IIR filters to avoid numerical instability
-        while providing good anti-aliasing at high decimation ratios.
+        Uses a multi-stage polyphase FIR that keeps the VFO bandwidth and only
+        computes the output samples it keeps.
         """
         # Calculate decimation factor to get to ~200 kHz intermediate rate
         target_rate = 200e3
-        total_decimation = int(sdr_rate / target_rate)
-        total_decimation = max(1, total_decimation)
-
-        # For high decimation ratios, use 2-stage cascaded decimation
-        # This avoids numerical instability and provides better anti-aliasing
-        stages = []
-
-        if total_decimation <= 10:
-            # Single stage for low decimation
-            nyquist = sdr_rate / 2.0
-            cutoff = bandwidth / 2.0
-            normalized_cutoff = min(0.4, max(0.01, cutoff / nyquist))
-            b, a = signal.butter(4, normalized_cutoff, btype="low")
-            stages.append(((b, a), total_decimation))
-        else:
-            # Two-stage cascaded decimation for better anti-aliasing
-            # Stage 1: Decimate by 5
-            stage1_decimation = 5
-            nyquist1 = sdr_rate / 2.0
-            # Cutoff at 80% of post-stage1 Nyquist for anti-aliasing
-            cutoff1 = (sdr_rate / stage1_decimation) * 0.4
-            normalized_cutoff1 = min(0.4, max(0.01, cutoff1 / nyquist1))
-            b1, a1 = signal.butter(4, normalized_cutoff1, btype="low")
-            stages.append(((b1, a1), stage1_decimation))
-
-            # Stage 2: Decimate by remaining factor
-            stage2_decimation = total_decimation // stage1_decimation
-            if stage2_decimation > 1:
-                rate_after_stage1 = sdr_rate / stage1_decimation
-                nyquist2 = rate_after_stage1 / 2.0
-                # Final cutoff is bandwidth-limited
-                cutoff2 = min(bandwidth / 2.0, (rate_after_stage1 / stage2_decimation) * 0.4)
-                normalized_cutoff2 = min(0.4, max(0.01, cutoff2 / nyquist2))
-                b2, a2 = signal.butter(4, normalized_cutoff2, btype="low")
-                stages.append(((b2, a2), stage2_decimation))
-
-        return stages, total_decimation
+        total_decimation = max(1, int(sdr_rate / target_rate))
+
+        return DecimatorChain(sdr_rate, total_decimation, bandwidth / 2.0)
 
     def _design_audio_filter(self, intermediate_rate, vfo_bandwidth):
         """Design audio low-pass filter based on VFO bandwidth.
@@ -269,13 +261,7 @@ class FMDemodulator(threading.Thread):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-
-        # Generate complex exponential for frequency shift
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _fm_demodulate(self, samples):
         """
@@ -320,7 +306,6 @@ class FMDemodulator(threading.Thread):
         logger.info(f"FM demodulator started for session {self.session_id}")
 
         # State for filter applications
-        decimation_state = None
         audio_filter_state = None
         deemph_state = None
 
@@ -346,7 +331,7 @@ class FMDemodulator(threading.Thread):
                     self.stats["last_activity"] = time.time()
 
                 # Extract samples and metadata first
-                samples = iq_message.get("samples")
+                samples = get_iq_samples(iq_message)
                 sdr_center_freq = iq_message.get("center_freq")
                 sdr_sample_rate = iq_message.get("sample_rate")
 
@@ -359,6 +344,15 @@ class FMDemodulator(threading.Thread):
                 ingest_samples_accum += len(samples)
                 ingest_chunks_accum += 1
 
+                # Samples missing before this block: restart the filters instead of
+                # running them across the discontinuity
+                missing = self.gap_detector.check(iq_message)
+                if missing:
+                    with self.stats_lock:
+                        self.stats["sample_gaps"] += 1
+                        self.stats["samples_missing"] += missing
+                    self.decimation_filter = None
+
                 # Determine VFO parameters based on mode
                 if self.internal_mode:
                     # Internal mode: use provided parameters but still get VFO state for volume/squelch/bandwidth/frequency
@@ -397,22 +391,18 @@ class FMDemodulator(threading.Thread):
                     self.current_bandwidth = vfo_bandwidth
 
                     # Design filters
-                    stages, total_decimation = self._design_decimation_filter(
+                    self.decimation_filter = self._design_decimation_filter(
                         sdr_sample_rate, vfo_bandwidth
                     )
-                    self.decimation_filter = (stages, total_decimation)
+                    total_decimation = self.decimation_filter.decimation
 
                     intermediate_rate = sdr_sample_rate / total_decimation
                     self.audio_filter = self._design_audio_filter(intermediate_rate, vfo_bandwidth)
+                    self.audio_resampler = RationalResampler(
+                        intermediate_rate, self.audio_sample_rate
+                    )
                     self.deemphasis_filter = self._design_deemphasis_filter(intermediate_rate)
 
-                    # Initialize filter states for each stage
-                    initial_value = samples[0] if len(samples) > 0 else 0
-                    decimation_state = []
-                    for (b, a), _ in stages:
-                        state = signal.lfilter_zi(b, a) * initial_value
-                        decimation_state.append(state)
-
                     # Initialize audio filter states
                     audio_filter_state = self._resize_filter_state(
                         audio_filter_state, self.audio_filter, 0
@@ -422,7 +412,7 @@ class FMDemodulator(threading.Thread):
 
                     logger.info(
                         f"Filters initialized (internal_mode={self.internal_mode}): SDR rate={sdr_sample_rate/1e6:.2f} MHz, "
-                        f"stages={len(stages)}, total_decimation={total_decimation}, "
+                        f"stages={len(self.decimation_filter.stages)}, total_decimation={total_decimation}, "
                         f"intermediate={intermediate_rate/1e3:.1f} kHz"
                     )
 
@@ -468,26 +458,11 @@ class FMDemodulator(threading.Thread):
 
                 translated = self._frequency_translate(samples, offset_freq, sdr_sample_rate)
 
-                # Step 2: Multi-stage cascaded decimation
-                stages, total_decimation = self.decimation_filter
-
-                # Apply each stage sequentially
-                decimated = translated
-                for stage_idx, ((b, a), stage_decimation) in enumerate(stages):
-                    # Initialize state if needed
-                    if decimation_state is None or stage_idx >= len(decimation_state):
-                        # Should not happen if properly initialized, but safety check
-                        if decimation_state is None:
-                            decimation_state = []
-                        decimation_state.append(signal.lfilter_zi(b, a) * decimated[0])
-
-                    # Apply IIR filter
-                    filtered, decimation_state[stage_idx] = signal.lfilter(
-                        b, a, decimated, zi=decimation_state[stage_idx]
-                    )
-
-                    # Decimate
-                    decimated = filtered[::stage_decimation]
+                # Step 2: Multi-stage polyphase decimation
+                total_decimation = self.decimation_filter.decimation
+                decimated = self.decimation_filter.process(translated)
+                if len(decimated) == 0:
+                    continue
 
                 # Measure RF signal power for squelch AFTER filtering (within VFO bandwidth)
                 # Calculate on every chunk for accurate squelch operation
@@ -513,33 +488,53 @@ class FMDemodulator(threading.Thread):
 
                 intermediate_rate = sdr_sample_rate / total_decimation
 
-                # Step 3: FM demodulation
-                demodulated = self._fm_demodulate(decimated)
+                # Squelch decision from the channel power, before any audio work
+                # (in internal mode the VFO state only supplies the threshold if present)
+                if vfo_state:
+                    squelch_threshold_db = vfo_state.squelch  # e.g., -150 dB
+                else:
+                    squelch_threshold_db = -200  # Fallback if no VFO state
+                self.squelch_open = self.squelch.update(
+                    rf_power_db, squelch_threshold_db, len(decimated) / intermediate_rate
+                )
 
-                # Step 4: Audio filtering
-                if audio_filter_state is None:
-                    # Initialize filter state on first run
-                    audio_filter_state = signal.lfilter_zi(self.audio_filter, 1) * demodulated[0]
+                if not self.squelch_open:
+                    # Squelched: skip the audio stage and emit silence of the same length.
+                    # The audio filters are left as if they had been fed that silence, so
+                    # when the squelch opens their output rises from zero without a click
+                    self.last_sample = decimated[-1]
+                    audio_filter_state = self._resize_filter_state(None, self.audio_filter, 0)
+                    b_deemph, a_deemph = self.deemphasis_filter  # type: ignore[misc]
+                    deemph_state = self._resize_filter_state(None, b_deemph, 0, a_deemph)
+                    audio = np.zeros(self.audio_resampler.skip(len(decimated)), dtype=np.float32)
+                else:
+                    # Step 3: FM demodulation
+                    demodulated = self._fm_demodulate(decimated)
+
+                    # Step 4: Audio filtering
+                    if audio_filter_state is None:
+                        # Initialize filter state on first run
+                        audio_filter_state = (
+                            signal.lfilter_zi(self.audio_filter, 1) * demodulated[0]
+                        )
 
-                audio_filtered, audio_filter_state = signal.lfilter(
-                    self.audio_filter, 1, demodulated, zi=audio_filter_state
-                )
+                    audio_filtered, audio_filter_state = signal.lfilter(
+                        self.audio_filter, 1, demodulated, zi=audio_filter_state
+                    )
 
-                # Step 5: De-emphasis
-                b, a = self.deemphasis_filter  # type: ignore[misc]
+                    # Step 5: De-emphasis
+                    b, a = self.deemphasis_filter  # type: ignore[misc]
 
-                if deemph_state is None:
-                    # Initialize filter state on first run
-                    deemph_state = signal.lfilter_zi(b, a) * audio_filtered[0]
+                    if deemph_state is None:
+                        # Initialize filter state on first run
+                        deemph_state = signal.lfilter_zi(b, a) * audio_filtered[0]
 
-                deemphasized, deemph_state = signal.lfilter(b, a, audio_filtered, zi=deemph_state)
+                    deemphasized, deemph_state = signal.lfilter(
+                        b, a, audio_filtered, zi=deemph_state
+                    )
 
-                # Step 6: Resample to audio rate (44.1 kHz)
-                num_output_samples = int(
-                    len(deemphasized) * self.audio_sample_rate / intermediate_rate
-                )
-                if num_output_samples > 0:
-                    audio = signal.resample(deemphasized, num_output_samples)
+                    # Step 6: Resample to audio rate (44.1 kHz)
+                    audio = self.audio_resampler.process(deemphasized)
 
                     # Apply amplification to boost low audio levels
                     # Adjust this gain factor if audio is still too quiet or too loud
@@ -553,33 +548,7 @@ class FMDemodulator(threading.Thread):
                     # NOTE: Volume is applied by WebAudioStreamer, not here
                     # This allows per-session volume control
 
-                    # Apply squelch based on RF signal strength (measured earlier)
-                    # Get squelch threshold from VFO state (works in both normal and internal mode)
-                    if self.internal_mode:
-                        # In internal mode, get VFO state for squelch settings
-                        vfo_state_for_squelch = self._get_active_vfo()
-                        if vfo_state_for_squelch:
-                            squelch_threshold_db = vfo_state_for_squelch.squelch
-                        else:
-                            squelch_threshold_db = -200  # Fallback if no VFO state
-                    else:
-                        squelch_threshold_db = vfo_state.squelch  # e.g., -150 dB
-
-                    squelch_hysteresis_db = 3  # 3 dB hysteresis to prevent flutter
-
-                    # Apply squelch with hysteresis
-                    if self.squelch_open:
-                        # Squelch is open - close if RF power drops below (threshold - hysteresis)
-                        if rf_power_db < (squelch_threshold_db - squelch_hysteresis_db):
-                            self.squelch_open = False
-                            audio = np.zeros_like(audio)  # Mute
-                    else:
-                        # Squelch is closed - open if RF power rises above (threshold + hysteresis)
-                        if rf_power_db > (squelch_threshold_db + squelch_hysteresis_db):
-                            self.squelch_open = True
-                            # Let audio through
-                        else:
-                            audio = np.zeros_like(audio)  # Keep muted
+                if len(audio) > 0:
 
                     # Convert to float32
                     audio = audio.astype(np.float32)
@@ -24,6 +24,9 @@ from typing import Any, Dict, Optional, Tuple
 import numpy as np
 from scipy import signal
 
+from pipeline.streaming.iqformat import get_iq_samples
+from pipeline.streaming.nco import NCO
+from pipeline.streaming.resampler import RationalResampler
 from vfos.state import VFOManager
 
 logger = logging.getLogger("fm-stereo-demodulator")
@@ -76,6 +79,9 @@ class FMStereoDemodulator(threading.Thread):
         self.current_center_freq = None
         self.current_bandwidth = None
 
+        # Phase-continuous frequency translation to baseband
+        self.nco = NCO()
+
         # Filters (will be initialized when we know sample rates)
         self.decimation_filter: Optional[Tuple[np.ndarray, int]] = None
         self.audio_filter_left: Optional[np.ndarray] = None
@@ -83,6 +89,8 @@ class FMStereoDemodulator(threading.Thread):
         self.pilot_filter: Optional[np.ndarray] = None
         self.subcarrier_filter: Optional[np.ndarray] = None
         self.deemphasis_filter: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.audio_resampler_left: Optional[RationalResampler] = None
+        self.audio_resampler_right: Optional[RationalResampler] = None
 
         # Filter states (will be initialized when filters are created)
         self.audio_filter_left_state: Optional[np.ndarray] = None
@@ -298,13 +306,7 @@ class FMStereoDemodulator(threading.Thread):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-
-        # Generate complex exponential for frequency shift
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _fm_demodulate(self, samples):
         """
@@ -476,7 +478,7 @@ class FMStereoDemodulator(threading.Thread):
                     continue
 
                 # Extract samples and metadata
-                samples = iq_message.get("samples")
+                samples = get_iq_samples(iq_message)
                 sdr_center_freq = iq_message.get("center_freq")
                 sdr_sample_rate = iq_message.get("sample_rate")
 
@@ -512,6 +514,12 @@ class FMStereoDemodulator(threading.Thread):
                     self.pilot_filter = self._design_pilot_filter(intermediate_rate)
                     self.subcarrier_filter = self._design_subcarrier_filter(intermediate_rate)
                     self.deemphasis_filter = self._design_deemphasis_filter(intermediate_rate)
+                    self.audio_resampler_left = RationalResampler(
+                        intermediate_rate, self.audio_sample_rate
+                    )
+                    self.audio_resampler_right = RationalResampler(
+                        intermediate_rate, self.audio_sample_rate
+                    )
 
                     # Initialize filter states for each stage
                     initial_value = samples[0] if len(samples) > 0 else 0
@@ -629,12 +637,10 @@ class FMStereoDemodulator(threading.Thread):
                 )
 
                 # Step 6: Resample to audio rate (44.1 kHz)
-                num_output_samples = int(
-                    len(left_deemph) * self.audio_sample_rate / intermediate_rate
-                )
+                left_resampled = self.audio_resampler_left.process(left_deemph)
+                right_resampled = self.audio_resampler_right.process(right_deemph)
+                num_output_samples = len(left_resampled)
                 if num_output_samples > 0:
-                    left_resampled = signal.resample(left_deemph, num_output_samples)
-                    right_resampled = signal.resample(right_deemph, num_output_samples)
 
                     # Apply moderate amplification (much lower than mono version)
                     audio_gain = 1.2  # 1.2x amplification
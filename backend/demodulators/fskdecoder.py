@@ -33,10 +33,11 @@
 #    - offset_freq = signal_frequency - sdr_center_frequency
 #    - This centers the signal at baseband (0 Hz) regardless of VFO drift
 #
-# 2. BATCHED PROCESSING WITH FRESH FLOWGRAPHS (same as BPSK decoder):
-#    - Processes samples in configurable batches (default 5.0 seconds via batch_interval parameter)
-#    - Creates a NEW gr.top_block for each batch to avoid GNU Radio 3.10 reconnection issues
-#    - Aggressive cleanup in finally block prevents shared memory exhaustion
+# 2. STREAMING FLOWGRAPH (same as BPSK decoder, see streamingflowgraph.py):
+#    - The gr.top_block is built once and runs for the life of the decoder
+#    - Samples are pushed into a ring-buffer source block, no per-batch setup or list copies
+#    - AGC and clock recovery keep their state, so packets spanning chunks decode
+#    - batch_interval (default 5.0 seconds) only sets the log/status update interval
 #
 # 3. SIGNAL PROCESSING CHAIN (based on gr-satellites FSK demodulator):
 #    - Frequency translation (signal to baseband)
@@ -50,16 +51,14 @@
 #    - Binary slicer, NRZI decode, G3RUH descrambler, HDLC deframing
 #
 # 4. KEY PARAMETERS:
-#    - Batch interval: 5 seconds default (configurable)
+#    - Log/status interval: 5 seconds default (configurable)
 #    - Clock recovery bandwidth: 0.06 (relative to baudrate)
 #    - Clock recovery limit: 0.004 (relative to baudrate)
 #    - Deviation: 5000 Hz default (negative inverts sidebands)
 #    - Sample rate: Matches VFO bandwidth
 
 import argparse
-import gc
 import logging
-import multiprocessing
 import os
 import queue
 import time
@@ -83,7 +82,7 @@ except ImportError:
 # This prevents shared memory segment exhaustion
 os.environ.setdefault("GR_BUFFER_TYPE", "vmcirc_mmap_tmpfile")
 
-from gnuradio import blocks, gr  # noqa: E402
+from gnuradio import gr  # noqa: E402
 from satellites.components.deframers.ax25_deframer import ax25_deframer  # noqa: E402
 from satellites.components.deframers.ax100_deframer import ax100_deframer  # noqa: E402
 from satellites.components.deframers.ccsds_concatenated_deframer import (  # noqa: E402
@@ -95,6 +94,9 @@ from satellites.components.demodulators.fsk_demodulator import fsk_demodulator
 from scipy import signal  # noqa: E402
 
 from demodulators.basedecoderprocess import BaseDecoderProcess  # noqa: E402
+from demodulators.streamingflowgraph import StreamingFlowgraph  # noqa: E402
+from pipeline.streaming.iqformat import get_iq_samples  # noqa: E402
+from pipeline.streaming.nco import NCO  # noqa: E402
 from telemetry.parser import TelemetryParser  # noqa: E402
 
 
@@ -170,14 +172,17 @@ class FSKMessageHandler(gr.basic_block):
             traceback.print_exc()
 
 
-class FSKFlowgraph(gr.top_block):
+class FSKFlowgraph(StreamingFlowgraph):
     """
     FSK-family flowgraph using gr-satellites FSK demodulator components
 
     Handles FSK, GFSK, and GMSK modulations using the same demodulator.
     Based on gr-satellites fsk_demodulator with support for multiple framing protocols.
+    Built once and fed continuously, so AGC and clock recovery keep their state.
     """
 
+    decoding_status = DecoderStatus.DECODING
+
     def __init__(
         self,
         sample_rate,
@@ -208,254 +213,102 @@ class FSKFlowgraph(gr.top_block):
             dc_block: Use DC blocker
             clk_bw: Clock recovery bandwidth (relative to baudrate)
             clk_limit: Clock recovery limit (relative to baudrate)
-            batch_interval: Batch processing interval in seconds (default: 5.0)
+            batch_interval: Seconds between stream log lines and status updates (default: 5.0)
             framing: Framing protocol - 'ax25' (G3RUH), 'usp' (USP FEC), 'geoscan', 'doka'
             modulation_subtype: 'FSK', 'GFSK', or 'GMSK' (metadata only, for logging)
             logger: Logger instance to use for logging
         """
-        super().__init__("FSK Decoder")
+        super().__init__(
+            "FSK Decoder",
+            sample_rate,
+            status_callback=status_callback,
+            batch_interval=batch_interval,
+            logger=logger or logging.getLogger("fskdecoder"),
+        )
 
-        self.sample_rate = sample_rate
         self.baudrate = baudrate
         self.callback = callback
-        self.status_callback = status_callback
         self.deviation = deviation
-        self.batch_interval = batch_interval
         self.use_agc = use_agc
         self.dc_block = dc_block
         self.clk_bw = clk_bw
         self.clk_limit = clk_limit
         self.framing = framing
         self.modulation_subtype = modulation_subtype
-        self.logger = logger or logging.getLogger("fskdecoder")
         # Framing-specific parameters (e.g., GEOSCAN frame_size); always a dict
         self.framing_params = framing_params or {}
 
-        # Accumulate samples in a buffer
-        self.sample_buffer = np.array([], dtype=np.complex64)
-        self.sample_lock = multiprocessing.Lock()
-        self.current_mode = "decoding"  # Track current mode
-
-        # Flow rate tracking
-        self.last_batch_time = time.time()
-        self.last_batch_samples = 0
-
-        # VFO state tracking for batch logging
-        # Store VFO values that correspond to the buffered samples
-        self.batch_vfo_center = 0
-        self.batch_vfo_bandwidth = 0
-
-    def process_samples(self, samples, vfo_center, vfo_bandwidth):
-        """
-        Process IQ samples through the flowgraph
-
-        Accumulates samples in a buffer and processes them periodically
-        to maintain state continuity while avoiding repeated start/stop cycles.
+    def _build(self):
+        """Create the demodulator, deframer and message handler after the source"""
+        # Create options namespace for gr-satellites components
+        options = argparse.Namespace(
+            clk_bw=self.clk_bw,
+            clk_limit=self.clk_limit,
+            deviation=self.deviation,
+            use_agc=self.use_agc,
+            disable_dc_block=not self.dc_block,
+            syncword_threshold=13,  # For USP deframer
+        )
 
-        Args:
-            samples: numpy array of complex64 samples
-            vfo_center: VFO center frequency used for DSP processing these samples
-            vfo_bandwidth: VFO bandwidth used for DSP processing these samples
-        """
-        should_process = False
-        buffer_size = 0
-        with self.sample_lock:
-            self.sample_buffer = np.concatenate([self.sample_buffer, samples])
-            buffer_size = len(self.sample_buffer)
-            # Store the most recent VFO values (these will be logged in batch)
-            self.batch_vfo_center = vfo_center
-            self.batch_vfo_bandwidth = vfo_bandwidth
-
-            # Process when we have enough samples (batch_interval seconds worth)
-            min_process_samples = int(self.sample_rate * self.batch_interval)
-
-            if buffer_size >= min_process_samples:
-                should_process = True
-            elif self.current_mode != "decoding":
-                # Transition back to decoding mode (accumulating samples)
-                self.current_mode = "decoding"
-                if self.status_callback:
-                    self.status_callback(DecoderStatus.DECODING, {"buffer_samples": buffer_size})
-
-        # Process outside the lock so incoming samples don't block
-        if should_process:
-            # Transition to decoding mode (processing batch)
-            with self.sample_lock:
-                self.current_mode = "decoding"
-            if self.status_callback:
-                self.status_callback(DecoderStatus.DECODING, {"buffer_samples": buffer_size})
-
-            self._process_buffer()
-
-    def _process_buffer(self):
-        """Process accumulated samples through the flowgraph"""
-        # Copy buffer outside the lock to allow incoming samples to continue
-        with self.sample_lock:
-            if len(self.sample_buffer) == 0:
-                return
-            samples_to_process = self.sample_buffer.copy()
-            # Clear the buffer completely - no tail overlap to avoid duplicate decodes
-            self.sample_buffer = np.array([], dtype=np.complex64)
-
-        # Calculate flow rate (samples per second)
-        current_time = time.time()
-        time_elapsed = current_time - self.last_batch_time
-        samples_count = len(samples_to_process)
-        flow_rate_sps = samples_count / time_elapsed if time_elapsed > 0 else 0
-
-        # Update tracking variables for next batch
-        self.last_batch_time = current_time
-        self.last_batch_samples = samples_count
-
-        tb = None
-        try:
-            # Create a NEW flowgraph for each batch to avoid connection conflicts
-            # This is necessary because hierarchical blocks can't be easily disconnected
-
-            # Create a temporary top_block
-            tb = gr.top_block("FSK Batch Processor")
-
-            # Create vector source with accumulated samples
-            source = blocks.vector_source_c(samples_to_process.tolist(), repeat=False)
-
-            # Create options namespace for gr-satellites components
-            options = argparse.Namespace(
-                clk_bw=self.clk_bw,
-                clk_limit=self.clk_limit,
-                deviation=self.deviation,
-                use_agc=self.use_agc,
-                disable_dc_block=not self.dc_block,
-                syncword_threshold=13,  # For USP deframer
-            )
+        # Create FSK demodulator (GMSK is a type of FSK with Gaussian pulse shaping)
+        # iq=True because we're feeding complex IQ samples
+        self.demod = fsk_demodulator(
+            baudrate=self.baudrate,
+            samp_rate=self.sample_rate,
+            iq=True,
+            deviation=self.deviation,
+            subaudio=False,
+            dc_block=self.dc_block,
+            dump_path=None,
+            options=options,
+        )
 
-            # Create FSK demodulator (GMSK is a type of FSK with Gaussian pulse shaping)
-            # iq=True because we're feeding complex IQ samples
-            demod = fsk_demodulator(
-                baudrate=self.baudrate,
-                samp_rate=self.sample_rate,
-                iq=True,
-                deviation=self.deviation,
-                subaudio=False,
-                dc_block=self.dc_block,
-                dump_path=None,
+        # Create appropriate deframer based on framing protocol
+        if self.framing == "geoscan":
+            # GEOSCAN uses fixed-size frames (commonly 66 or 74 bytes depending on satellite)
+            # Use value provided by DecoderConfig.framing_params with a safe default
+            frame_size = int(self.framing_params.get("frame_size", 66))
+            syncword_thresh = int(self.framing_params.get("syncword_threshold", 4))
+            self.deframer = geoscan_deframer(
+                frame_size=frame_size,
+                syncword_threshold=syncword_thresh,  # Standard GEOSCAN default is 4
                 options=options,
             )
+            frame_info = f"GEOSCAN(sz={frame_size},sw_th={syncword_thresh},PN9,CC11xx)"
+        elif self.framing == "usp":
+            # Increase syncword threshold for low SNR (allow more bit errors)
+            # Default is 13, trying 20 for weak signals
+            syncword_thresh = 20
+            self.deframer = usp_deframer(syncword_threshold=syncword_thresh, options=options)
+            frame_info = f"USP(sw_th={syncword_thresh},Vit+RS)"
+        elif self.framing == "doka":
+            # DOKA/CCSDS concatenated frames (used by some Russian satellites)
+            self.deframer = ccsds_concatenated_deframer(options=options)
+            frame_info = "DOKA(CCSDS)"
+        elif self.framing == "ax100_rs":
+            # AX100 Reed-Solomon mode
+            self.deframer = ax100_deframer(mode="RS", options=options)
+            frame_info = "AX100(RS)"
+        elif self.framing == "ax100_asm":
+            # AX100 ASM+Golay mode with CCSDS scrambler
+            self.deframer = ax100_deframer(mode="ASM", scrambler="CCSDS", options=options)
+            frame_info = "AX100(ASM+Golay)"
+        else:  # default to ax25
+            self.deframer = ax25_deframer(g3ruh_scrambler=True, options=options)
+            frame_info = "AX25(G3RUH)"
+
+        self.msg_handler = FSKMessageHandler(
+            self.callback, logger=self.logger, framing=self.framing
+        )
 
-            # Create appropriate deframer based on framing protocol
-            if self.framing == "geoscan":
-                # GEOSCAN uses fixed-size frames (commonly 66 or 74 bytes depending on satellite)
-                # Use value provided by DecoderConfig.framing_params with a safe default
-                frame_size = int(self.framing_params.get("frame_size", 66))
-                syncword_thresh = int(self.framing_params.get("syncword_threshold", 4))
-                deframer = geoscan_deframer(
-                    frame_size=frame_size,
-                    syncword_threshold=syncword_thresh,  # Standard GEOSCAN default is 4
-                    options=options,
-                )
-                frame_info = f"GEOSCAN(sz={frame_size},sw_th={syncword_thresh},PN9,CC11xx)"
-            elif self.framing == "usp":
-                # Increase syncword threshold for low SNR (allow more bit errors)
-                # Default is 13, trying 20 for weak signals
-                syncword_thresh = 20
-                deframer = usp_deframer(syncword_threshold=syncword_thresh, options=options)
-                frame_info = f"USP(sw_th={syncword_thresh},Vit+RS)"
-            elif self.framing == "doka":
-                # DOKA/CCSDS concatenated frames (used by some Russian satellites)
-                deframer = ccsds_concatenated_deframer(options=options)
-                frame_info = "DOKA(CCSDS)"
-            elif self.framing == "ax100_rs":
-                # AX100 Reed-Solomon mode
-                deframer = ax100_deframer(mode="RS", options=options)
-                frame_info = "AX100(RS)"
-            elif self.framing == "ax100_asm":
-                # AX100 ASM+Golay mode with CCSDS scrambler
-                deframer = ax100_deframer(mode="ASM", scrambler="CCSDS", options=options)
-                frame_info = "AX100(ASM+Golay)"
-            else:  # default to ax25
-                deframer = ax25_deframer(g3ruh_scrambler=True, options=options)
-                frame_info = "AX25(G3RUH)"
-
-            self.logger.info(
-                f"Batch: {len(samples_to_process)} samp ({time_elapsed:.1f}s, {flow_rate_sps/1e3:.1f}kS/s) | "
-                f"FSK: {self.baudrate}bd, {self.sample_rate:.0f}sps, dev={self.deviation} | "
-                f"Frame: {frame_info} | VFO: {self.batch_vfo_center:.0f}Hz, BW={self.batch_vfo_bandwidth:.0f}Hz"
-            )
-            # Create message handler for this batch
-            msg_handler = FSKMessageHandler(self.callback, logger=self.logger, framing=self.framing)
-
-            # Build flowgraph
-            tb.connect(source, demod, deframer)
-            tb.msg_connect((deframer, "out"), (msg_handler, "in"))
-
-            # Run the flowgraph
-            tb.start()
-            tb.wait()
-
-            # Explicitly stop
-            try:
-                tb.stop()
-            except Exception:
-                pass
-
-        except Exception as e:
-            self.logger.error(f"Error processing buffer: {e}")
-            traceback.print_exc()
-            # Clear buffer on error to avoid repeated failures
-            with self.sample_lock:
-                self.sample_buffer = np.array([], dtype=np.complex64)
-        finally:
-            # Explicit cleanup to prevent shared memory leaks
-            if "tb" in locals() and tb is not None:
-                try:
-                    # Ensure flowgraph is stopped
-                    tb.stop()
-                    tb.wait()
-                except Exception:
-                    pass
-
-                # Disconnect all blocks
-                try:
-                    tb.disconnect_all()
-                except Exception:
-                    pass
+        # Build flowgraph
+        self.connect(self.source, self.demod, self.deframer)
+        self.msg_connect((self.deframer, "out"), (self.msg_handler, "in"))
 
-                # Delete references to allow garbage collection
-                try:
-                    del msg_handler
-                    del deframer
-                    del demod
-                    del source
-                except Exception:
-                    pass
-
-                # Delete the top_block to release resources
-                del tb
-
-                # Force garbage collection to clean up GNU Radio objects
-                # and release shared memory segments
-                gc.collect()
-
-                # Short delay to allow system to clean up shared memory
-                # GNU Radio 3.10+ has issues with rapid flowgraph creation/destruction
-                # Reduced from 0.1s to 0.02s for better throughput
-                time.sleep(0.02)
-
-    def flush_buffer(self):
-        """Process any remaining samples in the buffer"""
-        should_process = False
-        buffer_size = 0
-        with self.sample_lock:
-            if len(self.sample_buffer) > 0:
-                buffer_size = len(self.sample_buffer)
-                should_process = True
-        # CRITICAL: Call _process_buffer() OUTSIDE the lock to avoid blocking the entire app.
-        # _process_buffer() runs GNU Radio flowgraph synchronously (tb.wait()) and sleeps 100ms,
-        # which would freeze all threads trying to acquire sample_lock if called inside the lock.
-        if should_process:
-            self.logger.info(
-                f"Flushing {buffer_size} remaining samples from FSK flowgraph ({self.modulation_subtype})"
-            )
-            self._process_buffer()
+        return (
+            f"FSK: {self.baudrate}bd, {self.sample_rate:.0f}sps, dev={self.deviation} | "
+            f"Frame: {frame_info}"
+        )
 
 
 class FSKDecoder(BaseDecoderProcess):
@@ -477,7 +330,7 @@ class FSKDecoder(BaseDecoderProcess):
         config,  # Pre-resolved DecoderConfig from DecoderConfigService (contains all params + metadata)
         output_dir="data/decoded",
         vfo=None,
-        batch_interval=5.0,  # Batch processing interval in seconds
+        batch_interval=5.0,  # Log/status interval in seconds
         modulation_subtype="FSK",  # 'FSK', 'GFSK', or 'GMSK' (metadata only)
         shm_monitor_interval=10,  # Check SHM every 10 seconds
         shm_restart_threshold=1000,  # Restart when segments exceed this
@@ -499,6 +352,7 @@ class FSKDecoder(BaseDecoderProcess):
         self.sdr_sample_rate = None  # Full SDR sample rate
         self.sdr_center_freq = None  # SDR center frequency
         self.decimation_filter = None  # Filter for decimation
+        self.nco = NCO()  # Phase-continuous frequency translation
         self.modulation_subtype = modulation_subtype  # FSK, GFSK, or GMSK
         self.batch_interval = batch_interval
 
@@ -657,13 +511,7 @@ class FSKDecoder(BaseDecoderProcess):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-
-        # Generate complex exponential for frequency shift
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _design_decimation_filter(self, decimation_factor, bandwidth, sample_rate):
         """Design low-pass filter for decimation."""
@@ -990,13 +838,16 @@ class FSKDecoder(BaseDecoderProcess):
                             self.stats["last_activity"] = time.time()
 
                         # Extract IQ samples and metadata from message
-                        samples = iq_message.get("samples")
+                        samples = get_iq_samples(iq_message)
                         sdr_center = iq_message.get("center_freq")
                         sdr_rate = iq_message.get("sample_rate")
 
                         if samples is None or len(samples) == 0:
                             continue
 
+                        # Count gaps; the streaming flowgraph's loops resync across them
+                        self._check_sample_gap(iq_message)
+
                         # Update sample count
                         with self.stats_lock:
                             self.stats["samples_in"] += len(samples)
@@ -1208,12 +1059,12 @@ class FSKDecoder(BaseDecoderProcess):
         except KeyboardInterrupt:
             pass
         finally:
-            # Flush any remaining samples
+            # Decode any buffered samples, then stop the flowgraph
             if flowgraph_started and self.flowgraph:
                 try:
-                    self.flowgraph.flush_buffer()
+                    self.flowgraph.close()
                 except Exception as e:
-                    self.logger.error(f"Error flushing buffer: {e}")
+                    self.logger.error(f"Error closing flowgraph: {e}")
 
         self.logger.info(
             f"FSK decoder process ({self.modulation_subtype}) stopped for {self.session_id}. "
@@ -21,10 +21,23 @@ import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import numpy as np
-from scipy.signal import resample_poly
+
+from pipeline.streaming.backpressure import POLICY_BLOCK
+from pipeline.streaming.decimator import DecimatorChain
+from pipeline.streaming.iqformat import (
+    IQ_FORMAT_CF32,
+    PACKED_FORMATS,
+    SIGMF_DATATYPES,
+    get_iq_format,
+    get_iq_samples,
+    num_iq_samples,
+    pack_iq,
+)
+from pipeline.streaming.nco import NCO
+from pipeline.streaming.sampleindex import SampleGapDetector
 
 logger = logging.getLogger("iq-recorder")
 
@@ -37,6 +50,11 @@ class IQRecorder(threading.Thread):
     This allows recording to be managed through the same infrastructure as demodulators.
     """
 
+    # Recordings should be lossless: absorb disk stalls in a deeper queue and make the
+    # broadcaster wait briefly rather than drop blocks
+    iq_queue_maxsize = 50
+    iq_backpressure_policy = POLICY_BLOCK
+
     def __init__(
         self,
         iq_queue,
@@ -48,6 +66,7 @@ class IQRecorder(threading.Thread):
         target_center_freq=None,
         enable_frequency_shift=False,
         decimation_factor=1,
+        keep_native_format=True,
     ):
         super().__init__(daemon=True, name=f"IQRecorder-{session_id}")
         self.iq_queue = iq_queue
@@ -63,9 +82,19 @@ class IQRecorder(threading.Thread):
             logger.warning(f"Invalid decimation factor {decimation_factor}, falling back to 1")
             self.decimation_factor = 1
 
+        # Integer IQ (cu8/ci16) is written as received unless the samples are
+        # processed; the format is fixed by the first block. Native recordings keep
+        # the source's DC offset (iq_offset is not subtracted), so the zero level the
+        # source reported is averaged here and recorded in the metadata
+        self.keep_native_format = keep_native_format
+        self.iq_format = None
+        self.native_offset_sum = np.zeros(2)
+        self.native_offset_blocks = 0
+
         # Frequency shift tracking
         self.shift_hz = 0
-        self.phase = 0.0  # Track phase for continuity across chunks
+        self.nco = NCO()  # Phase-continuous shift across chunks
+        self.decimator: Optional[DecimatorChain] = None  # Streaming FIR decimation
 
         # Metadata tracking
         self.total_samples = 0
@@ -76,6 +105,14 @@ class IQRecorder(threading.Thread):
         self.current_sample_rate = None
         self.start_datetime = None
 
+        # Arrival time of the last written block and the file position it starts at,
+        # used to place annotations that have no sample index
+        self.last_block_time = None
+        self.last_block_position = 0
+
+        # Detects blocks dropped upstream (sample_index jumps)
+        self.gap_detector = SampleGapDetector()
+
         # Store start time to preserve it in final metadata
         # Use timezone-aware datetime and format as ISO string with Z suffix
         self.start_time_iso = (
@@ -89,6 +126,8 @@ class IQRecorder(threading.Thread):
             "samples_written": 0,
             "bytes_written": 0,
             "queue_timeouts": 0,
+            "sample_gaps": 0,
+            "samples_missing": 0,
             "last_activity": None,
             "errors": 0,
         }
@@ -117,17 +156,32 @@ class IQRecorder(threading.Thread):
                     self.stats["iq_chunks_in"] += 1
                     self.stats["last_activity"] = time.time()
 
-                samples = iq_message.get("samples")
+                num_samples = num_iq_samples(iq_message)
                 center_freq = iq_message.get("center_freq")
                 sample_rate = iq_message.get("sample_rate")
                 timestamp = iq_message.get("timestamp")
 
-                if samples is None or len(samples) == 0:
+                if num_samples == 0:
                     continue
 
+                if self.iq_format is None:
+                    self._select_format(get_iq_format(iq_message))
+
                 # Update sample count
                 with self.stats_lock:
-                    self.stats["iq_samples_in"] += len(samples)
+                    self.stats["iq_samples_in"] += num_samples
+
+                # A retune starts a new capture segment below anyway
+                missing = self.gap_detector.check(iq_message)
+                if (
+                    missing
+                    and self.current_center_freq == center_freq
+                    and self.current_input_sample_rate == sample_rate
+                ):
+                    self._record_gap(iq_message, missing)
+                    if self.decimator is not None:
+                        # Do not filter across the discontinuity
+                        self.decimator.reset()
 
                 # Check if parameters changed (new capture segment needed)
                 if (
@@ -150,18 +204,26 @@ class IQRecorder(threading.Thread):
                         output_center_freq = center_freq
 
                     output_sample_rate = sample_rate / self.decimation_factor
+                    if self.decimation_factor > 1:
+                        # Widest passband the output rate allows
+                        self.decimator = DecimatorChain(
+                            sample_rate, self.decimation_factor, output_sample_rate / 2.0
+                        )
 
                     # Add new capture segment with output center frequency
-                    self.captures.append(
-                        {
-                            "core:sample_start": self.total_samples,
-                            "core:frequency": int(output_center_freq),
-                            "core:datetime": datetime.fromtimestamp(timestamp, tz=timezone.utc)
-                            .replace(microsecond=0, tzinfo=None)
-                            .isoformat()
-                            + "Z",
-                        }
-                    )
+                    capture = {
+                        "core:sample_start": self.total_samples,
+                        "core:frequency": int(output_center_freq),
+                        "core:datetime": datetime.fromtimestamp(timestamp, tz=timezone.utc)
+                        .replace(microsecond=0, tzinfo=None)
+                        .isoformat()
+                        + "Z",
+                    }
+                    if iq_message.get("sample_index") is not None:
+                        capture["core:global_index"] = (
+                            iq_message["sample_index"] // self.decimation_factor
+                        )
+                    self.captures.append(capture)
 
                     self.current_center_freq = center_freq
                     self.current_input_sample_rate = sample_rate
@@ -176,28 +238,34 @@ class IQRecorder(threading.Thread):
                         f"rate={output_sample_rate/1e6:.2f} MS/s"
                     )
 
+                self.last_block_time = timestamp
+                self.last_block_position = self.total_samples
+
+                if self.iq_format != IQ_FORMAT_CF32:
+                    # Native integer recording, no processing
+                    if get_iq_format(iq_message) == self.iq_format:
+                        data = iq_message["samples"]
+                        if iq_message.get("iq_offset") is not None:
+                            self.native_offset_sum += iq_message["iq_offset"]
+                            self.native_offset_blocks += 1
+                    else:
+                        data = pack_iq(get_iq_samples(iq_message), self.iq_format)
+                    self._write_samples(data, num_samples)
+                    continue
+
+                samples = get_iq_samples(iq_message)
+
                 # Apply frequency shift if enabled
                 if self.enable_frequency_shift and self.shift_hz != 0:
-                    # Generate time array for this chunk
-                    t = np.arange(len(samples), dtype=np.float64) / sample_rate
-                    # Compute phase incrementally: phase = 2*pi*f*t + phase_offset
-                    # To avoid overflow in the argument to exp, we use cos/sin directly
-                    # since exp(1j*theta) = cos(theta) + 1j*sin(theta)
-                    arg = 2 * np.pi * self.shift_hz * t + self.phase
-                    shift_signal = np.cos(arg) + 1j * np.sin(arg)
-                    # Apply shift (ensure result stays complex64)
-                    samples = (samples * shift_signal).astype(np.complex64)
-                    # Update phase for next chunk (wrap to keep bounded)
-                    self.phase = (
-                        self.phase + 2 * np.pi * self.shift_hz * len(samples) / sample_rate
-                    ) % (2 * np.pi)
+                    # Move the target frequency to the center of the recording
+                    samples = self.nco.mix(samples, -self.shift_hz, sample_rate).astype(
+                        np.complex64, copy=False
+                    )
 
                 # Apply decimation if requested
-                if self.decimation_factor > 1:
+                if self.decimator is not None:
                     try:
-                        samples = resample_poly(samples, up=1, down=self.decimation_factor).astype(
-                            np.complex64
-                        )
+                        samples = self.decimator.process(samples).astype(np.complex64, copy=False)
                     except Exception as e:
                         logger.error(f"Failed to decimate IQ samples: {e}")
                         with self.stats_lock:
@@ -205,13 +273,7 @@ class IQRecorder(threading.Thread):
                         continue
 
                 # Write samples to file
-                samples.tofile(self.data_file)
-                self.total_samples += len(samples)
-
-                # Update stats (cf32_le = 8 bytes per sample)
-                with self.stats_lock:
-                    self.stats["samples_written"] += len(samples)
-                    self.stats["bytes_written"] += len(samples) * 8
+                self._write_samples(samples, len(samples))
 
             except Exception as e:
                 if self.running:
@@ -223,10 +285,85 @@ class IQRecorder(threading.Thread):
 
         logger.info(f"IQ recorder stopped: {self.total_samples} samples written")
 
+    def _select_format(self, input_format):
+        """
+        Choose the recording datatype from the first block.
+
+        Integer input is kept as is when nothing transforms the samples;
+        everything else is recorded as cf32_le. Native samples are not DC
+        corrected; stop() records the source's zero level in the metadata.
+
+        Args:
+            input_format: Sample format of the first IQ message
+        """
+        passthrough = not self.enable_frequency_shift and self.decimation_factor == 1
+        if self.keep_native_format and passthrough and input_format in PACKED_FORMATS:
+            self.iq_format = input_format
+        else:
+            self.iq_format = IQ_FORMAT_CF32
+        if self.iq_format != IQ_FORMAT_CF32:
+            logger.info(f"Recording native {SIGMF_DATATYPES[self.iq_format]} samples")
+            self._write_preliminary_metadata()
+
+    def _write_samples(self, data, num_samples):
+        """
+        Append samples to the data file.
+
+        Args:
+            data: complex64 samples, or interleaved integers for native recordings
+            num_samples: Number of complex samples in data
+        """
+        data.tofile(self.data_file)
+        self.total_samples += num_samples
+
+        with self.stats_lock:
+            self.stats["samples_written"] += num_samples
+            self.stats["bytes_written"] += data.nbytes
+
+    def _record_gap(self, iq_message, missing):
+        """
+        Mark samples missing before this block in the SigMF metadata.
+
+        The data file stays contiguous; a new capture segment re-anchors the
+        global sample index and time after the gap, and an annotation records
+        how many samples are missing at this position.
+
+        Args:
+            iq_message: First IQ message after the gap
+            missing: Number of input samples missing before it
+        """
+        missing_out = missing // self.decimation_factor
+        with self.stats_lock:
+            self.stats["sample_gaps"] += 1
+            self.stats["samples_missing"] += missing_out
+
+        capture = {
+            "core:sample_start": self.total_samples,
+            "core:global_index": iq_message["sample_index"] // self.decimation_factor,
+            "core:frequency": int(self.captures[-1]["core:frequency"]),
+            "core:datetime": datetime.fromtimestamp(iq_message.get("timestamp"), tz=timezone.utc)
+            .replace(microsecond=0, tzinfo=None)
+            .isoformat()
+            + "Z",
+        }
+        self.captures.append(capture)
+        self.annotations.append(
+            {
+                "core:sample_start": self.total_samples,
+                "core:sample_count": 0,
+                "core:comment": f"Gap: {missing_out} samples missing before this point "
+                "(dropped upstream of the recorder).",
+                "gs:samples_missing": missing_out,
+            }
+        )
+        logger.warning(
+            f"IQ recording gap at sample {self.total_samples}: {missing_out} samples missing"
+        )
+
     def _write_preliminary_metadata(self):
         """Write preliminary metadata file to mark recording as in progress."""
         global_metadata: dict = {
-            "core:datatype": "cf32_le",
+            "core:datatype": SIGMF_DATATYPES[self.iq_format or IQ_FORMAT_CF32],
             "core:version": "1.0.0",
             "core:description": "Ground Station IQ Recording",
             "core:recorder": "ground-station",
@@ -254,17 +391,79 @@ class IQRecorder(threading.Thread):
 
         logger.info(f"Preliminary metadata written: {self.recording_path}.sigmf-meta")
 
-    def add_annotation(self, start_sample, sample_count, freq_lower, freq_upper, comment):
-        """Add signal annotation to metadata."""
-        self.annotations.append(
-            {
-                "core:sample_start": start_sample,
-                "core:sample_count": sample_count,
-                "core:freq_lower_edge": int(freq_lower),
-                "core:freq_upper_edge": int(freq_upper),
-                "core:comment": comment,
-            }
+    def add_annotation(
+        self, start_sample, sample_count, freq_lower, freq_upper, comment, extra=None
+    ):
+        """Add signal annotation to metadata (extra: additional namespaced fields)."""
+        annotation = {
+            "core:sample_start": start_sample,
+            "core:sample_count": sample_count,
+            "core:freq_lower_edge": int(freq_lower),
+            "core:freq_upper_edge": int(freq_upper),
+            "core:comment": comment,
+        }
+        annotation.update(extra or {})
+        self.annotations.append(annotation)
+
+    def _recording_position(self, sample_index, timestamp):
+        """
+        Position in the data file of an input sample.
+
+        Uses the global index anchored by the capture segments when the sample
+        index is known, otherwise the arrival time of the last block.
+
+        Returns:
+            Output sample position (may lie outside the file), or None if unknown
+        """
+        if sample_index is not None:
+            index = sample_index // self.decimation_factor
+            for capture in reversed(self.captures):
+                global_index = capture.get("core:global_index")
+                if global_index is not None and global_index <= index:
+                    return capture["core:sample_start"] + index - global_index
+        if timestamp is None or self.last_block_time is None or not self.current_sample_rate:
+            return None
+        offset = (timestamp - self.last_block_time) * self.current_sample_rate
+        return self.last_block_position + int(offset)
+
+    def annotate_detection(self, detection):
+        """
+        Annotate a signal found by the FFT stream detector (see fft.detector).
+
+        Args:
+            detection: Stop event with start/stop sample indices or times and frequency bounds
+
+        Returns:
+            True if the signal overlaps this recording and was annotated
+        """
+        if not self.captures or not self.current_sample_rate:
+            return False
+        start = self._recording_position(
+            detection.get("start_sample_index"), detection.get("start_time")
+        )
+        stop = self._recording_position(
+            detection.get("stop_sample_index"), detection.get("stop_time")
         )
+        if start is None or stop is None:
+            return False
+        start, stop = max(start, 0), min(stop, self.total_samples)
+
+        # Clip to the recorded band (frequencies stay absolute when shifted)
+        center = self.captures[-1]["core:frequency"]
+        freq_lower = max(detection["freq_lower"], center - self.current_sample_rate / 2)
+        freq_upper = min(detection["freq_upper"], center + self.current_sample_rate / 2)
+        if stop <= start or freq_upper <= freq_lower:
+            return False
+
+        self.add_annotation(
+            start,
+            stop - start,
+            freq_lower,
+            freq_upper,
+            f"Detected signal, peak {detection['peak_db']:.1f} dB",
+            {"gs:detection": True, "gs:peak_db": round(float(detection["peak_db"]), 1)},
+        )
+        return True
 
     def stop(self):
         """Stop recording and write metadata."""
@@ -276,7 +475,7 @@ class IQRecorder(threading.Thread):
 
         # Write final SigMF metadata (replaces preliminary metadata, preserves start_time)
         global_metadata: dict = {
-            "core:datatype": "cf32_le",
+            "core:datatype": SIGMF_DATATYPES[self.iq_format or IQ_FORMAT_CF32],
             "core:sample_rate": self.current_sample_rate,
             "core:version": "1.0.0",
             "core:description": "Ground Station IQ Recording",
@@ -339,6 +538,27 @@ class IQRecorder(threading.Thread):
                     }
                 )
 
+        # Native integer samples are written uncorrected
+        if self.iq_format in PACKED_FORMATS:
+            nominal_zero = PACKED_FORMATS[self.iq_format][2]
+            global_metadata["gs:dc_offset_corrected"] = False
+            global_metadata["gs:iq_nominal_zero"] = nominal_zero
+            if self.native_offset_blocks:
+                offset_i, offset_q = self.native_offset_sum / self.native_offset_blocks
+                global_metadata["gs:iq_offset"] = [round(offset_i, 3), round(offset_q, 3)]
+
+                if self.total_samples > 0:
+                    self.annotations.append(
+                        {
+                            "core:sample_start": 0,
+                            "core:sample_count": self.total_samples,
+                            "core:comment": f"Native {SIGMF_DATATYPES[self.iq_format]} samples "
+                            f"recorded without DC offset correction "
+                            f"(mean zero level I={offset_i:.2f}, Q={offset_q:.2f}; "
+                            f"nominal {nominal_zero}).",
+                        }
+                    )
+
         metadata = {
             "global": global_metadata,
             "captures": self.captures,
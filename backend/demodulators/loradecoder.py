@@ -17,13 +17,14 @@
 # LoRa decoder using GNU Radio gr-lora_sdr blocks for proper LoRa PHY decoding.
 # This decoder receives raw IQ samples directly from the SDR process (via iq_queue).
 
+import functools
 import logging
 import os
 import queue
 import threading
 import time
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import numpy as np
 import pmt  # noqa: F401
@@ -38,10 +39,17 @@ from gnuradio import blocks, gr, lora_sdr  # noqa: E402,F401
 from scipy import signal  # noqa: E402
 
 from demodulators.basedecoderprocess import BaseDecoderProcess  # noqa: E402
+from demodulators.packetdedup import PacketDedupIndex  # noqa: E402
+from pipeline.streaming.iqformat import get_iq_samples  # noqa: E402
+from pipeline.streaming.nco import NCO  # noqa: E402
+from pipeline.streaming.ringbuffer import SampleWindow  # noqa: E402
 from telemetry.parser import TelemetryParser  # noqa: E402
 
 logger = logging.getLogger("loradecoder")
 
+# Samples kept from the end of one batch for the next
+BATCH_OVERLAP_SECONDS = 0.5
+
 
 class DecoderStatus(Enum):
     """Decoder status values."""
@@ -167,6 +175,7 @@ class LoRaDecoder(BaseDecoderProcess):
         self.sdr_sample_rate = None  # Full SDR sample rate
         self.sdr_center_freq = None  # SDR center frequency
         self.decimation_filter = None  # Filter for decimation
+        self.nco = NCO()  # Phase-continuous frequency translation
 
         # Signal power measurement (from BaseDecoder)
         self.power_measurements = []
@@ -198,6 +207,9 @@ class LoRaDecoder(BaseDecoderProcess):
         # Track background processing thread
         self.processing_thread = None
 
+        # Packets already decoded from the overlap of the previous batch
+        self.packet_dedup: Optional[PacketDedupIndex] = None
+
         # Authoritative rate computation (parity with FSK/BPSK)
         self._rates_prev_ts = None
         self._rates_prev_counters = {
@@ -278,13 +290,7 @@ class LoRaDecoder(BaseDecoderProcess):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-
-        # Generate complex exponential for frequency shift
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _design_decimation_filter(self, decimation_factor, bandwidth, sample_rate):
         """Design low-pass filter for decimation."""
@@ -349,6 +355,18 @@ class LoRaDecoder(BaseDecoderProcess):
         # Mark that we just completed a decode so we can reset to LISTENING on next churn
         self.just_completed_decode = True
 
+    def _on_batch_packet_decoded(self, batch_start, payload):
+        """
+        Callback for packets decoded from the batch starting at sample batch_start.
+        Drops packets the previous batch already decoded from the shared overlap.
+        """
+        if self.packet_dedup is not None and not self.packet_dedup.check(payload, batch_start):
+            logger.debug(f"Dropping duplicate LoRa packet ({len(payload)} bytes) from overlap")
+            with self.stats_lock:
+                self.stats["duplicates_dropped"] = self.packet_dedup.duplicates
+            return
+        self._on_packet_decoded(payload)
+
     def _send_status_update(self, status, info=None):
         """Send status update to UI"""
         # Build decoder configuration info (like other decoders)
@@ -499,6 +517,7 @@ class LoRaDecoder(BaseDecoderProcess):
             "packets_decoded": 0,
             "last_activity": None,
             "errors": 0,
+            "duplicates_dropped": 0,
             "cpu_percent": 0.0,
             "memory_mb": 0.0,
             "memory_percent": 0.0,
@@ -507,7 +526,8 @@ class LoRaDecoder(BaseDecoderProcess):
         self._send_status_update(DecoderStatus.LISTENING)
 
         chunks_received = 0
-        samples_buffer = np.array([], dtype=np.complex64)
+        # Created once the sample rate is known
+        samples_buffer: Optional[SampleWindow] = None
         last_stats_time = time.time()  # Track time for periodic stats updates
         # Buffer enough samples for gr-lora_sdr processing
         # frame_sync needs at least 8200 samples, plus margin for packet length
@@ -556,13 +576,16 @@ class LoRaDecoder(BaseDecoderProcess):
                         self.just_completed_decode = False
 
                     # Extract IQ samples and metadata from message
-                    samples = iq_message.get("samples")
+                    samples = get_iq_samples(iq_message)
                     sdr_center = iq_message.get("center_freq")
                     sdr_rate = iq_message.get("sample_rate")
 
                     if samples is None or len(samples) == 0:
                         continue
 
+                    # Count samples dropped upstream (reported in stats)
+                    self._check_sample_gap(iq_message)
+
                     # Get VFO parameters from IQ message (added by IQBroadcaster)
                     vfo_states = iq_message.get("vfo_states", {})
                     vfo_state_dict = vfo_states.get(self.vfo)
@@ -619,6 +642,16 @@ class LoRaDecoder(BaseDecoderProcess):
                             f"and process every {process_samples} samples ({process_interval}s)"
                         )
 
+                        # Keep overlap for packet boundaries
+                        # SF7 packet is ~50-150ms, SF11 can be 200-500ms, so 0.5s is safe
+                        overlap_samples = int(self.sample_rate * BATCH_OVERLAP_SECONDS)
+                        samples_buffer = SampleWindow(
+                            buffer_samples, dtype=np.complex64, overlap=overlap_samples
+                        )
+                        # Packets in the overlap are decoded by two consecutive batches,
+                        # whose start positions are one batch step apart
+                        self.packet_dedup = PacketDedupIndex(process_samples)
+
                     # Step 1: Frequency translation to VFO center
                     offset_freq = vfo_center - sdr_center
 
@@ -671,7 +704,8 @@ class LoRaDecoder(BaseDecoderProcess):
                     decimated = self._decimate_iq(translated, self.decimation_factor)
 
                     # Add to buffer
-                    samples_buffer = np.concatenate([samples_buffer, decimated])
+                    assert samples_buffer is not None, "Sample buffer not initialized"
+                    samples_buffer.append(decimated)
 
                     # Update stats
                     with self.stats_lock:
@@ -681,10 +715,13 @@ class LoRaDecoder(BaseDecoderProcess):
 
                     # Process when we have enough samples
                     if len(samples_buffer) >= process_samples:
+                        # Take the batch; the window keeps the overlap for the next one
+                        batch_start, batch_samples = samples_buffer.take_batch()
+
                         # Calculate flow rate
                         current_time = time.time()
                         time_elapsed = current_time - last_process_time
-                        samples_count = len(samples_buffer)
+                        samples_count = len(batch_samples)
                         flow_rate_sps = samples_count / time_elapsed if time_elapsed > 0 else 0
 
                         # Log batch processing stats (consistent with FSK/BPSK decoders)
@@ -708,7 +745,7 @@ class LoRaDecoder(BaseDecoderProcess):
                             extra_params += f", {ldro_str}"
 
                         logger.info(
-                            f"Batch: {len(samples_buffer)} samp ({time_elapsed:.1f}s, {flow_rate_sps/1e3:.1f}kS/s) | "
+                            f"Batch: {len(batch_samples)} samp ({time_elapsed:.1f}s, {flow_rate_sps/1e3:.1f}kS/s) | "
                             f"LoRa: {sf_str}, {bw_str}, {cr_str}, {extra_params} | "
                             f"VFO: {vfo_center:.0f}Hz, BW={vfo_bandwidth:.0f}Hz | "
                             f"Packets decoded so far: {self.packet_count}"
@@ -765,10 +802,10 @@ class LoRaDecoder(BaseDecoderProcess):
                             # Ensure buffer has enough samples for frame_sync (needs minimum 8200)
                             # Pad with zeros if needed to avoid GNU Radio buffer underrun
                             MIN_FRAME_SYNC_SAMPLES = 8200
-                            if len(samples_buffer) < MIN_FRAME_SYNC_SAMPLES:
-                                padding_needed = MIN_FRAME_SYNC_SAMPLES - len(samples_buffer)
-                                samples_buffer = np.concatenate(
-                                    [samples_buffer, np.zeros(padding_needed, dtype=np.complex64)]
+                            if len(batch_samples) < MIN_FRAME_SYNC_SAMPLES:
+                                padding_needed = MIN_FRAME_SYNC_SAMPLES - len(batch_samples)
+                                batch_samples = np.concatenate(
+                                    [batch_samples, np.zeros(padding_needed, dtype=np.complex64)]
                                 )
                                 logger.debug(
                                     f"Padded buffer with {padding_needed} zeros for frame_sync"
@@ -777,10 +814,12 @@ class LoRaDecoder(BaseDecoderProcess):
                             # Create new flowgraph for this batch
                             # Note: samples are already frequency-translated to baseband (0 Hz)
                             flowgraph = LoRaFlowgraph(
-                                samples=samples_buffer,
+                                samples=batch_samples,
                                 sample_rate=self.sample_rate,
                                 center_freq=0,  # Already translated to baseband
-                                callback=self._on_packet_decoded,
+                                callback=functools.partial(
+                                    self._on_batch_packet_decoded, batch_start
+                                ),
                                 sf=sf,
                                 bw=bw,
                                 cr=cr,
@@ -806,17 +845,6 @@ class LoRaDecoder(BaseDecoderProcess):
                                 self.bw = bw
                                 self.cr = cr
 
-                        # Keep overlap for packet boundaries
-                        # SF7 packet is ~50-150ms, SF11 can be 200-500ms, so 0.5s is safe
-                        if self.sample_rate is not None:
-                            overlap_samples = int(self.sample_rate * 0.5)  # 500ms overlap
-                            if len(samples_buffer) > overlap_samples:
-                                samples_buffer = samples_buffer[-overlap_samples:]
-                            else:
-                                samples_buffer = np.array([], dtype=np.complex64)
-                        else:
-                            samples_buffer = np.array([], dtype=np.complex64)
-
                     chunks_received += 1
 
                     # Monitor shared memory every 100 chunks
@@ -0,0 +1,496 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Batched demodulation of several FM/AM VFOs of one session.
+
+Separate FMDemodulator/AMDemodulator threads each run translate, decimate,
+detect, filter and resample on the same wideband IQ block, one numpy call per
+stage per VFO. MultiVFODemodulator reads the block once and demodulates the
+session's VFOs as rows of 2-D arrays instead:
+
+- VFOs with the same modulation and bandwidth form a VFOBatch. Each batch
+  translates the block to every VFO offset at once (NCOBank), then runs the
+  shared decimator, detector, audio filters and resampler across all rows. Per-VFO
+  state (NCO phases, filter histories, last samples) is kept as array rows.
+- Filter designs come from the demodulator classes themselves, so a batched VFO
+  produces the same audio as its thread demodulator would.
+- Squelch, audio chunking and the per-VFO audio queues stay per VFO (BatchedVFO),
+  which is also the handle the managers and the performance monitor see.
+- Squelch is decided from the channel power before the audio stage. A batch
+  whose rows are all squelched skips the detector, filters and resampler.
+
+A batch is rebuilt (filters restart) when its set of VFOs changes.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import signal
+
+from demodulators.demodulatorprocess import ISOLATION_BATCHED
+from pipeline.streaming.iqformat import get_iq_samples, num_iq_samples
+from pipeline.streaming.nco import NCOBank
+from pipeline.streaming.resampler import RationalResampler
+from pipeline.streaming.sampleindex import SampleGapDetector
+from pipeline.streaming.squelch import SquelchGate
+
+logger = logging.getLogger("multivfo-demodulator")
+
+MODULATION_FM = "fm"
+MODULATION_AM = "am"
+
+# Same calibration and gain as the thread demodulators
+CALIBRATION_OFFSET_DB = 17.0
+AUDIO_GAIN = 3.0
+
+
+class VFOBatch:
+    """
+    DSP state of same-modulation, same-bandwidth VFOs processed as rows of one array.
+    """
+
+    def __init__(
+        self,
+        modulation: str,
+        vfo_numbers: Tuple[int, ...],
+        designer,
+        sdr_sample_rate: float,
+        bandwidth: float,
+    ):
+        """
+        Initialize the batch.
+
+        Args:
+            modulation: MODULATION_FM or MODULATION_AM
+            vfo_numbers: VFO of each row, in row order
+            designer: Demodulator instance whose filter designs the batch uses
+            sdr_sample_rate: Wideband IQ sample rate in Hz
+            bandwidth: VFO bandwidth in Hz
+        """
+        self.modulation = modulation
+        self.vfo_numbers = tuple(vfo_numbers)
+        self.sdr_sample_rate = sdr_sample_rate
+        self.bandwidth = bandwidth
+        rows = len(self.vfo_numbers)
+
+        self.nco = NCOBank()
+        self.decimation_filter = designer._design_decimation_filter(sdr_sample_rate, bandwidth)
+        intermediate_rate = sdr_sample_rate / self.decimation_filter.decimation
+        self.intermediate_rate = intermediate_rate
+
+        # Post-detection filters in the order the thread demodulator applies them
+        audio_filter = (designer._design_audio_filter(intermediate_rate, bandwidth), np.ones(1))
+        if modulation == MODULATION_FM:
+            self.filters = [audio_filter, designer._design_deemphasis_filter(intermediate_rate)]
+        else:
+            self.filters = [designer._design_dc_blocker(intermediate_rate), audio_filter]
+        self.filter_states: List[Optional[np.ndarray]] = [
+            np.zeros((rows, max(len(b), len(a)) - 1)) for b, a in self.filters
+        ]
+        # Filter states after squelched blocks: as if fed silence, except the AM DC
+        # blocker (None), which restarts at steady state for the envelope
+        self._rest_states = [
+            None if modulation == MODULATION_AM and i == 0 else np.zeros_like(state)
+            for i, state in enumerate(self.filter_states)
+        ]
+
+        self.last_sample = np.zeros(rows, dtype=np.complex64)
+        self.audio_resampler = RationalResampler(intermediate_rate, designer.audio_sample_rate)
+
+    def channelize(
+        self, samples: np.ndarray, offset_freqs: np.ndarray
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Translate and decimate one wideband block for every row.
+
+        Args:
+            samples: Wideband complex IQ block
+            offset_freqs: Offset of each row's VFO from the SDR center in Hz
+
+        Returns:
+            (channel rows, RF power in dB per row), or None while the decimator
+            has produced no output yet
+        """
+        translated = self.nco.mix(samples, offset_freqs, self.sdr_sample_rate)
+        channels = self.decimation_filter.process(translated)
+        if channels.shape[-1] == 0:
+            return None
+
+        signal_power = np.mean(np.abs(channels) ** 2, axis=-1)
+        rf_power_db = 10 * np.log10(signal_power + 1e-10) + CALIBRATION_OFFSET_DB
+        return channels, rf_power_db
+
+    def demodulate(self, channels: np.ndarray) -> np.ndarray:
+        """
+        Run the audio stage (detector, filters, resampler, gain) on channel rows.
+
+        Args:
+            channels: Decimated rows from channelize()
+
+        Returns:
+            float32 audio rows
+        """
+        if self.modulation == MODULATION_FM:
+            # Phase difference to the previous sample, carried across blocks per row
+            previous = np.concatenate((self.last_sample[:, None], channels[:, :-1]), axis=-1)
+            demodulated = np.angle(channels * np.conj(previous))
+            self.last_sample = channels[:, -1]
+        else:
+            demodulated = np.abs(channels)
+
+        for i, (b, a) in enumerate(self.filters):
+            if self.filter_states[i] is None:
+                # Start at steady state for each row's first sample
+                self.filter_states[i] = signal.lfilter_zi(b, a)[None, :] * demodulated[:, :1]
+            demodulated, self.filter_states[i] = signal.lfilter(
+                b, a, demodulated, axis=-1, zi=self.filter_states[i]
+            )
+
+        audio = self.audio_resampler.process(demodulated) * AUDIO_GAIN
+        if self.modulation == MODULATION_AM and audio.shape[-1]:
+            # Normalize each row, as AMDemodulator does per block
+            audio = audio / (np.max(np.abs(audio), axis=-1, keepdims=True) + 1e-10) * 0.5
+        return np.clip(audio, -0.95, 0.95).astype(np.float32)
+
+    def skip(self, channels: np.ndarray) -> np.ndarray:
+        """
+        Pass over channel rows without running the audio stage (all rows squelched).
+
+        The filters and the resampler are left as if they had been fed silence,
+        so the next demodulate() rises from zero without a click.
+
+        Args:
+            channels: Decimated rows from channelize()
+
+        Returns:
+            Silent float32 audio rows of the length demodulate() would have produced
+        """
+        if self.modulation == MODULATION_FM:
+            self.last_sample = channels[:, -1]
+        self.filter_states = list(self._rest_states)
+        count = self.audio_resampler.skip(channels.shape[-1])
+        return np.zeros((channels.shape[0], count), dtype=np.float32)
+
+
+class BatchedVFO:
+    """
+    One VFO demodulated by a MultiVFODemodulator.
+
+    Holds the VFO's squelch, audio buffer and stats, and exposes the parts of
+    the demodulator interface the managers and the performance monitor use:
+    start(), stop(), join(), is_alive(), internal_mode, iq_queue, audio_queue,
+    stats and stats_lock.
+    """
+
+    isolation = ISOLATION_BATCHED
+
+    def __init__(self, engine, demodulator_class, audio_queue, session_id, vfo_number):
+        """
+        Initialize the VFO handle.
+
+        Args:
+            engine: MultiVFODemodulator of the session
+            demodulator_class: FMDemodulator or AMDemodulator (declares batched_modulation)
+            audio_queue: Queue receiving this VFO's audio messages
+            session_id: Session identifier
+            vfo_number: VFO number
+        """
+        self.engine = engine
+        self.demodulator_class = demodulator_class
+        self.modulation = demodulator_class.batched_modulation
+        self.audio_queue = audio_queue
+        self.session_id = session_id
+        self.vfo_number = vfo_number
+        self.internal_mode = False
+        self.name = f"{demodulator_class.__name__}-{session_id}-VFO{vfo_number} (batched)"
+
+        # Never started: supplies the class's filter designs, VFO lookup and stats layout
+        self.demodulator = demodulator_class(None, audio_queue, session_id, vfo_number=vfo_number)
+        self.stats: Dict[str, Any] = self.demodulator.stats
+        self.stats_lock = self.demodulator.stats_lock
+
+        self.audio_buffer = np.array([], dtype=np.float32)
+        self.squelch = SquelchGate()
+        self.squelch_open = False
+        self.last_rf_power_db: Optional[float] = None
+        self.last_power_time = 0.0
+        self.is_sleeping = False
+        self._attached = False
+
+    @property
+    def iq_queue(self):
+        return self.engine.iq_queue
+
+    def start(self):
+        """Add the VFO to the session's engine."""
+        self.engine.attach(self)
+        self._attached = True
+
+    def stop(self):
+        """Remove the VFO from the session's engine."""
+        self.engine.detach(self)
+        self._attached = False
+
+    def join(self, timeout: Optional[float] = None):
+        """Nothing to wait for: the engine drops the VFO before its next block."""
+
+    def is_alive(self) -> bool:
+        return self._attached and self.engine.is_alive()
+
+    def get_vfo_state(self):
+        return self.demodulator._get_active_vfo()
+
+    def check_in_band(self, vfo_state, sdr_center_freq, sdr_sample_rate, sample_count) -> bool:
+        """Track the sleeping state; False while the VFO is outside the SDR bandwidth."""
+        is_in_band, offset, margin = self.demodulator._is_vfo_in_sdr_bandwidth(
+            vfo_state.center_freq, sdr_center_freq, sdr_sample_rate
+        )
+        if not is_in_band:
+            with self.stats_lock:
+                self.stats["samples_dropped_out_of_band"] += sample_count
+                self.stats["is_sleeping"] = True
+            if not self.is_sleeping:
+                self.is_sleeping = True
+                logger.warning(
+                    f"{self.name} out of SDR bandwidth: VFO={vfo_state.center_freq/1e6:.3f}MHz, "
+                    f"offset={offset/1e3:.1f}kHz, exceeded by {abs(margin)/1e3:.1f}kHz"
+                )
+            return False
+
+        if self.is_sleeping:
+            self.is_sleeping = False
+            with self.stats_lock:
+                self.stats["is_sleeping"] = False
+            logger.info(f"{self.name} back in SDR bandwidth, resuming")
+        return True
+
+    def update_squelch(self, rf_power_db: float, squelch_threshold_db: float, duration: float):
+        """Squelch decision for one block of this VFO's channel; True if it is open."""
+        current_time = time.time()
+        if current_time - self.last_power_time >= 1.0 / self.demodulator.power_update_rate:
+            self.last_rf_power_db = rf_power_db
+            self.last_power_time = current_time
+
+        self.squelch_open = self.squelch.update(rf_power_db, squelch_threshold_db, duration)
+        return self.squelch_open
+
+    def deliver(self, audio: np.ndarray):
+        """Queue full chunks of this VFO's audio (silence while squelched)."""
+        if not self.squelch_open:
+            audio = np.zeros_like(audio)
+
+        chunk_size = self.demodulator.target_chunk_size
+        self.audio_buffer = np.concatenate([self.audio_buffer, audio])
+        max_buffer_samples = chunk_size * 10
+        if len(self.audio_buffer) > max_buffer_samples:
+            self.audio_buffer = self.audio_buffer[-max_buffer_samples:]
+            logger.warning(f"Audio buffer overflow for {self.name}, dropping old audio")
+
+        while len(self.audio_buffer) >= chunk_size:
+            chunk = self.audio_buffer[:chunk_size]
+            self.audio_buffer = self.audio_buffer[chunk_size:]
+            try:
+                self.audio_queue.put_nowait(
+                    {
+                        "session_id": self.session_id,
+                        "audio": chunk,
+                        "vfo_number": self.vfo_number,
+                        "rf_power_db": self.last_rf_power_db,
+                    }
+                )
+                with self.stats_lock:
+                    self.stats["audio_chunks_out"] += 1
+                    self.stats["audio_samples_out"] += len(chunk)
+            except queue.Full:
+                logger.debug(f"Audio queue full, dropping chunk for {self.name}")
+                break
+
+
+class MultiVFODemodulator(threading.Thread):
+    """
+    Demodulates all batched VFOs of one session from a single wideband IQ subscription.
+    """
+
+    def __init__(self, iq_queue, session_id):
+        """
+        Initialize the engine.
+
+        Args:
+            iq_queue: Wideband IQ subscriber queue from the IQBroadcaster
+            session_id: Session identifier
+        """
+        super().__init__(daemon=True, name=f"MultiVFODemodulator-{session_id}")
+        self.iq_queue = iq_queue
+        self.session_id = session_id
+        self.running = True
+        self.gap_detector = SampleGapDetector()
+
+        self.vfos: Dict[int, BatchedVFO] = {}
+        self.vfos_lock = threading.Lock()
+        # (modulation, bandwidth) -> VFOBatch
+        self.batches: Dict[Tuple[str, float], VFOBatch] = {}
+
+    def attach(self, vfo: BatchedVFO) -> None:
+        with self.vfos_lock:
+            self.vfos[vfo.vfo_number] = vfo
+
+    def detach(self, vfo: BatchedVFO) -> None:
+        with self.vfos_lock:
+            if self.vfos.get(vfo.vfo_number) is vfo:
+                del self.vfos[vfo.vfo_number]
+
+    def vfo_count(self) -> int:
+        with self.vfos_lock:
+            return len(self.vfos)
+
+    def _process_block(self, iq_message, vfos: List[BatchedVFO]) -> None:
+        samples = get_iq_samples(iq_message)
+        sdr_center_freq = iq_message.get("center_freq")
+        sdr_sample_rate = iq_message.get("sample_rate")
+        if samples is None or len(samples) == 0:
+            return
+
+        missing = self.gap_detector.check(iq_message)
+        now = time.time()
+        for vfo in vfos:
+            with vfo.stats_lock:
+                vfo.stats["iq_chunks_in"] += 1
+                vfo.stats["iq_samples_in"] += len(samples)
+                vfo.stats["last_activity"] = now
+                if missing:
+                    vfo.stats["sample_gaps"] += 1
+                    vfo.stats["samples_missing"] += missing
+        if missing:
+            # Restart the filters instead of running them across the discontinuity
+            self.batches.clear()
+
+        groups: Dict[Tuple[str, float], List[Tuple[BatchedVFO, Any]]] = {}
+        for vfo in vfos:
+            vfo_state = vfo.get_vfo_state()
+            if not vfo_state or vfo_state.modulation.lower() != vfo.modulation:
+                continue
+            if not vfo_state.center_freq:
+                continue
+            if not vfo.check_in_band(vfo_state, sdr_center_freq, sdr_sample_rate, len(samples)):
+                continue
+            groups.setdefault((vfo.modulation, vfo_state.bandwidth), []).append((vfo, vfo_state))
+
+        batches = {}
+        for key, members in groups.items():
+            members.sort(key=lambda member: member[0].vfo_number)
+            vfo_numbers = tuple(vfo.vfo_number for vfo, _ in members)
+            batch = self.batches.get(key)
+            if (
+                batch is None
+                or batch.vfo_numbers != vfo_numbers
+                or batch.sdr_sample_rate != sdr_sample_rate
+            ):
+                batch = VFOBatch(
+                    key[0], vfo_numbers, members[0][0].demodulator, sdr_sample_rate, key[1]
+                )
+                logger.info(
+                    f"Batch initialized for session {self.session_id}: {key[0].upper()} "
+                    f"bandwidth={key[1]/1e3:.1f} kHz, VFOs={list(vfo_numbers)}, "
+                    f"decimation={batch.decimation_filter.decimation}, "
+                    f"intermediate={batch.intermediate_rate/1e3:.1f} kHz"
+                )
+            batches[key] = batch
+
+            offsets = np.array([state.center_freq - sdr_center_freq for _, state in members])
+            result = batch.channelize(samples, offsets)
+            if result is None:
+                continue
+            channels, rf_power_db = result
+
+            # Squelch first: the audio stage only runs if some row is open
+            duration = channels.shape[-1] / batch.intermediate_rate
+            squelch_open = [
+                vfo.update_squelch(float(rf_power_db[row]), vfo_state.squelch, duration)
+                for row, (vfo, vfo_state) in enumerate(members)
+            ]
+            if any(squelch_open):
+                audio = batch.demodulate(channels)
+            else:
+                audio = batch.skip(channels)
+            for row, (vfo, _) in enumerate(members):
+                vfo.deliver(audio[row])
+
+        # Batches with no active VFO this block are dropped
+        self.batches = batches
+
+    def run(self):
+        """Main engine loop."""
+        logger.info(f"Multi-VFO demodulator started for session {self.session_id}")
+
+        ingest_window_start = time.time()
+        ingest_samples_accum = 0
+        ingest_chunks_accum = 0
+
+        while self.running:
+            with self.vfos_lock:
+                vfos = list(self.vfos.values())
+            try:
+                # Always drain the IQ queue, even with no active VFO, to avoid lag
+                if self.iq_queue.empty():
+                    time.sleep(0.01)
+                    continue
+
+                iq_message = self.iq_queue.get(timeout=0.1)
+                ingest_samples_accum += num_iq_samples(iq_message)
+                ingest_chunks_accum += 1
+                self._process_block(iq_message, vfos)
+
+            except Exception as e:
+                if self.running:
+                    logger.error(f"Error in multi-VFO demodulator: {str(e)}")
+                    logger.exception(e)
+                    for vfo in vfos:
+                        with vfo.stats_lock:
+                            vfo.stats["errors"] += 1
+                    self.batches.clear()
+                time.sleep(0.1)
+            finally:
+                # Time-based stats tick (every ~1s)
+                now = time.time()
+                dt = now - ingest_window_start
+                if dt >= 1.0:
+                    for vfo in vfos:
+                        with vfo.stats_lock:
+                            vfo.stats["ingest_samples_per_sec"] = ingest_samples_accum / dt
+                            vfo.stats["ingest_chunks_per_sec"] = ingest_chunks_accum / dt
+                            vfo.stats["is_sleeping"] = vfo.is_sleeping
+                    ingest_window_start = now
+                    ingest_samples_accum = 0
+                    ingest_chunks_accum = 0
+
+        logger.info(f"Multi-VFO demodulator stopped for session {self.session_id}")
+
+    def stop(self):
+        """Stop the engine thread."""
+        self.running = False
+
+
+__all__ = [
+    "BatchedVFO",
+    "MODULATION_AM",
+    "MODULATION_FM",
+    "MultiVFODemodulator",
+    "VFOBatch",
+]
@@ -0,0 +1,79 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Duplicate suppression for packets decoded from overlapping batches.
+
+Batch decoders keep an overlap between consecutive batches (see SampleWindow)
+so a frame crossing a batch boundary is seen whole by the next batch. A frame
+lying entirely in the overlap is then decoded by both batches. PacketDedupIndex
+remembers recently decoded payloads by CRC-32 and length, together with the
+sample position they were decoded at, and reports a payload as a duplicate when
+it comes back within the overlap distance. Entries older than that distance are
+forgotten, so a satellite repeating the same beacon later is still reported.
+"""
+
+import threading
+import zlib
+from typing import Dict, Tuple
+
+
+class PacketDedupIndex:
+    """
+    Short-lived index of decoded payloads keyed on CRC-32, length and sample position.
+    """
+
+    def __init__(self, window_samples: int):
+        """
+        Initialize the index.
+
+        Args:
+            window_samples: Two decodes of the same payload at most this many samples
+                apart are the same packet
+        """
+        self.window_samples = max(0, int(window_samples))
+        self.duplicates = 0
+        self._entries: Dict[Tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+
+    def check(self, payload: bytes, position: int) -> bool:
+        """
+        Record a decoded payload.
+
+        Args:
+            payload: Packet bytes
+            position: Global sample index the packet was decoded at (e.g. its batch start)
+
+        Returns:
+            True if the packet is new, False if it duplicates a recent decode
+        """
+        key = (zlib.crc32(payload), len(payload))
+        with self._lock:
+            # Forget entries too old to be matched again
+            horizon = position - self.window_samples
+            for old_key in [k for k, pos in self._entries.items() if pos < horizon]:
+                del self._entries[old_key]
+
+            previous = self._entries.get(key)
+            if previous is not None and abs(position - previous) <= self.window_samples:
+                self.duplicates += 1
+                return False
+            self._entries[key] = position
+            return True
+
+    def clear(self) -> None:
+        """Forget every entry."""
+        with self._lock:
+            self._entries.clear()
@@ -19,11 +19,18 @@ import logging
 import queue
 import threading
 import time
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Optional
 
 import numpy as np
 from scipy import signal
 
+from pipeline.streaming.backpressure import POLICY_DROP_OLDEST
+from pipeline.streaming.decimator import DecimatorChain
+from pipeline.streaming.iqformat import get_iq_samples
+from pipeline.streaming.nco import NCO
+from pipeline.streaming.resampler import RationalResampler
+from pipeline.streaming.sampleindex import SampleGapDetector
+from pipeline.streaming.squelch import SquelchGate
 from vfos.state import VFOManager
 
 logger = logging.getLogger("ssb-demodulator")
@@ -47,6 +54,13 @@ class SSBDemodulator(threading.Thread):
     process the same IQ samples without gaps.
     """
 
+    # Accepts narrowband streams from the shared channelizer (see IQBroadcaster.subscribe_channel)
+    accepts_channelized_iq = True
+    channel_min_sample_rate = 48e3
+
+    # Live audio: stay current under load by dropping the oldest queued IQ
+    iq_backpressure_policy = POLICY_DROP_OLDEST
+
     def __init__(
         self,
         iq_queue,
@@ -66,6 +80,8 @@ class SSBDemodulator(threading.Thread):
         self.vfo_number = vfo_number  # VFO number for multi-VFO mode
         self.running = True
         self.vfo_manager = VFOManager()
+        # Detects dropped IQ blocks so filter state is not carried across a gap
+        self.gap_detector = SampleGapDetector()
         self.mode = mode  # "usb", "lsb", or "cw"
 
         # Internal mode: bypasses VFO checks and uses provided parameters
@@ -80,7 +96,8 @@ class SSBDemodulator(threading.Thread):
         # Audio buffer to accumulate samples
         self.audio_buffer = np.array([], dtype=np.float32)
 
-        # Squelch state (for hysteresis)
+        # Squelch state (hysteresis and hold time), decided right after decimation
+        self.squelch = SquelchGate()
         self.squelch_open = False  # Track if squelch is open (signal present)
 
         # Power measurement settings
@@ -94,9 +111,13 @@ class SSBDemodulator(threading.Thread):
         self.current_bandwidth = None
         self.current_mode = None
 
+        # Phase-continuous frequency translation to baseband
+        self.nco = NCO()
+
         # Filters (will be initialized when we know sample rates)
-        self.decimation_filter: Optional[Tuple[np.ndarray, int]] = None
+        self.decimation_filter: Optional[DecimatorChain] = None
         self.audio_filter: Optional[np.ndarray] = None
+        self.audio_resampler: Optional[RationalResampler] = None
 
         # Performance monitoring stats
         self.stats: Dict[str, Any] = {
@@ -112,6 +133,8 @@ class SSBDemodulator(threading.Thread):
             "ingest_chunks_per_sec": 0.0,
             # Out-of-band accounting
             "samples_dropped_out_of_band": 0,
+            "sample_gaps": 0,
+            "samples_missing": 0,
             # Sleeping state (VFO out of SDR bandwidth)
             "is_sleeping": False,
         }
@@ -180,7 +203,7 @@ class SSBDemodulator(threading.Thread):
     def _design_decimation_filter(self, sdr_rate, bandwidth):
         """Design a decimation filter to reduce sample rate to appropriate level for SSB processing.
 
-        Uses IIR Butterworth filter for ~100-250x better performance than FIR at high sample rates.
+        Uses a streaming polyphase FIR that only computes the output samples it keeps.
         """
         # Target intermediate rate: ~48 kHz (sufficient for SSB bandwidth up to 22 kHz)
         # If bandwidth is higher, increase the target rate to accommodate it
@@ -190,23 +213,13 @@ class SSBDemodulator(threading.Thread):
         decimation = int(sdr_rate / target_rate)
         decimation = max(1, decimation)  # At least 1
 
-        # Simple lowpass filter for decimation
-        # We'll do sideband selection separately
-        nyquist = sdr_rate / 2.0
-
         # For complex signals centered at DC, we need to pass the full bandwidth
         # not just bandwidth/2. The bandwidth parameter is the full single-sideband width.
+        # Sideband selection is done separately by the audio filter.
         cutoff = min(bandwidth, 22000)
         cutoff = max(cutoff, 1500)  # At least 1.5 kHz
 
-        normalized_cutoff = cutoff / nyquist
-        normalized_cutoff = min(0.45, max(0.01, normalized_cutoff))
-
-        # Design IIR Butterworth filter
-        # 6th order filter provides good selectivity with minimal computational cost
-        b, a = signal.butter(6, normalized_cutoff, btype="low")
-
-        return (b, a), decimation
+        return DecimatorChain(sdr_rate, decimation, cutoff)
 
     def _design_audio_filter(self, intermediate_rate, vfo_bandwidth):
         """Design audio low-pass filter based on VFO bandwidth.
@@ -241,13 +254,7 @@ class SSBDemodulator(threading.Thread):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-
-        # Generate complex exponential for frequency shift
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _ssb_demodulate(self, samples):
         """
@@ -284,7 +291,6 @@ class SSBDemodulator(threading.Thread):
         logger.info(f"SSB demodulator started for session {self.session_id} (mode: {self.mode})")
 
         # State for filter applications
-        decimation_state = None
         audio_filter_state = None
 
         # Ingest-rate tracking and stats heartbeat
@@ -310,7 +316,7 @@ class SSBDemodulator(threading.Thread):
                     self.stats["last_activity"] = time.time()
 
                 # Extract samples and metadata first
-                samples = iq_message.get("samples")
+                samples = get_iq_samples(iq_message)
                 sdr_center_freq = iq_message.get("center_freq")
                 sdr_sample_rate = iq_message.get("sample_rate")
 
@@ -324,6 +330,15 @@ class SSBDemodulator(threading.Thread):
                 ingest_samples_accum += len(samples)
                 ingest_chunks_accum += 1
 
+                # Samples missing before this block: restart the filters instead of
+                # running them across the discontinuity
+                missing = self.gap_detector.check(iq_message)
+                if missing:
+                    with self.stats_lock:
+                        self.stats["sample_gaps"] += 1
+                        self.stats["samples_missing"] += missing
+                    self.decimation_filter = None
+
                 # Determine VFO parameters based on mode
                 if self.internal_mode:
                     # Internal mode: use provided parameters but still get VFO state for volume/squelch/bandwidth/frequency
@@ -371,20 +386,18 @@ class SSBDemodulator(threading.Thread):
                     self.current_mode = self.mode.lower()
 
                     # Design filters
-                    iir_coeffs, decimation = self._design_decimation_filter(
+                    self.decimation_filter = self._design_decimation_filter(
                         sdr_sample_rate, vfo_bandwidth
                     )
-                    self.decimation_filter = (iir_coeffs, decimation)
+                    decimation = self.decimation_filter.decimation
 
                     intermediate_rate = sdr_sample_rate / decimation
                     self.audio_filter = self._design_audio_filter(intermediate_rate, vfo_bandwidth)
+                    self.audio_resampler = RationalResampler(
+                        intermediate_rate, self.audio_sample_rate
+                    )
 
                     # Smooth filter state transitions instead of resetting to None
-                    initial_value = samples[0] if len(samples) > 0 else 0
-                    b, a = iir_coeffs
-                    decimation_state = self._resize_filter_state(
-                        decimation_state, b, initial_value, a
-                    )
                     audio_filter_state = self._resize_filter_state(
                         audio_filter_state, self.audio_filter, 0
                     )
@@ -442,19 +455,14 @@ class SSBDemodulator(threading.Thread):
                 translated = self._frequency_translate(samples, offset_freq, sdr_sample_rate)
 
                 # Step 2: Decimate and filter to bandwidth (sideband selection done by filter)
-                iir_coeffs, decimation = self.decimation_filter
-                b, a = iir_coeffs
-
-                if decimation_state is None:
-                    # Initialize filter state on first run
-                    decimation_state = signal.lfilter_zi(b, a) * translated[0]
-
-                filtered, decimation_state = signal.lfilter(b, a, translated, zi=decimation_state)
-                decimated = filtered[::decimation]
+                decimation = self.decimation_filter.decimation
+                decimated = self.decimation_filter.process(translated)
+                if len(decimated) == 0:
+                    continue
 
                 # Measure RF signal power for squelch AFTER filtering
                 # Calculate on every chunk for accurate squelch operation
-                signal_power = np.mean(np.abs(filtered) ** 2)
+                signal_power = np.mean(np.abs(decimated) ** 2)
                 rf_power_db_raw = 10 * np.log10(signal_power + 1e-10)
 
                 # Calibration offset (matches FM/AM demodulator to align with FFT waterfall)
@@ -473,66 +481,62 @@ class SSBDemodulator(threading.Thread):
 
                 intermediate_rate = sdr_sample_rate / decimation
 
-                # Step 3: SSB demodulation
-                demodulated = self._ssb_demodulate(decimated)
-
-                # Step 4: Audio filtering
-                if audio_filter_state is None:
-                    # Initialize filter state on first run
-                    audio_filter_state = signal.lfilter_zi(self.audio_filter, 1) * demodulated[0]
-
-                audio_filtered, audio_filter_state = signal.lfilter(
-                    self.audio_filter, 1, demodulated, zi=audio_filter_state
+                # Squelch decision from the channel power, before any audio work
+                if vfo_state and hasattr(vfo_state, "squelch"):
+                    squelch_threshold_db = vfo_state.squelch
+                else:
+                    # If no VFO state (shouldn't happen), disable squelch
+                    squelch_threshold_db = -200
+                self.squelch_open = self.squelch.update(
+                    rf_power_db, squelch_threshold_db, len(decimated) / intermediate_rate
                 )
 
-                # Step 5: Resample to audio rate (44.1 kHz)
-                num_output_samples = int(
-                    len(audio_filtered) * self.audio_sample_rate / intermediate_rate
-                )
-                if num_output_samples > 0:
-                    audio = signal.resample(audio_filtered, num_output_samples)
-
-                    # Apply amplification based on VFO volume setting
-                    # Get volume from VFO state if available, otherwise use default
-                    if vfo_state and hasattr(vfo_state, "volume"):
-                        # VFO volume is typically 0-100, normalize to gain factor
-                        # Map 0-100 to 0.0-10.0 gain (with 50 = 3.0x as default)
-                        audio_gain = (vfo_state.volume / 50.0) * 3.0
-                        audio_gain = max(0.1, min(10.0, audio_gain))  # Clamp to reasonable range
-                    else:
-                        audio_gain = 3.0  # Default 3x amplification
+                if not self.squelch_open:
+                    # Squelched: skip the audio stage and emit silence of the same length.
+                    # The audio filter is left as if it had been fed that silence, so when
+                    # the squelch opens its output rises from zero without a click
+                    audio_filter_state = self._resize_filter_state(None, self.audio_filter, 0)
+                    audio = np.zeros(self.audio_resampler.skip(len(decimated)), dtype=np.float32)
+                else:
+                    # Step 3: SSB demodulation
+                    demodulated = self._ssb_demodulate(decimated)
+
+                    # Step 4: Audio filtering
+                    if audio_filter_state is None:
+                        # Initialize filter state on first run
+                        audio_filter_state = (
+                            signal.lfilter_zi(self.audio_filter, 1) * demodulated[0]
+                        )
 
-                    audio = audio * audio_gain
+                    audio_filtered, audio_filter_state = signal.lfilter(
+                        self.audio_filter, 1, demodulated, zi=audio_filter_state
+                    )
 
-                    # Normalize and soft clipping
-                    # SSB typically has less dynamic range than FM
-                    max_val = np.max(np.abs(audio)) + 1e-10
-                    audio = audio / max_val * 0.5  # Scale to 50% to leave headroom
-                    audio = np.clip(audio, -0.95, 0.95)
+                    # Step 5: Resample to audio rate (44.1 kHz)
+                    audio = self.audio_resampler.process(audio_filtered)
+
+                    if len(audio) > 0:
+                        # Apply amplification based on VFO volume setting
+                        # Get volume from VFO state if available, otherwise use default
+                        if vfo_state and hasattr(vfo_state, "volume"):
+                            # VFO volume is typically 0-100, normalize to gain factor
+                            # Map 0-100 to 0.0-10.0 gain (with 50 = 3.0x as default)
+                            audio_gain = (vfo_state.volume / 50.0) * 3.0
+                            audio_gain = max(
+                                0.1, min(10.0, audio_gain)
+                            )  # Clamp to reasonable range
+                        else:
+                            audio_gain = 3.0  # Default 3x amplification
 
-                    # Apply squelch based on RF signal strength (measured earlier)
-                    # Get squelch from VFO state
-                    if vfo_state and hasattr(vfo_state, "squelch"):
-                        squelch_threshold_db = vfo_state.squelch
-                    else:
-                        # If no VFO state (shouldn't happen), disable squelch
-                        squelch_threshold_db = -200
+                        audio = audio * audio_gain
 
-                    squelch_hysteresis_db = 3  # 3 dB hysteresis to prevent flutter
+                        # Normalize and soft clipping
+                        # SSB typically has less dynamic range than FM
+                        max_val = np.max(np.abs(audio)) + 1e-10
+                        audio = audio / max_val * 0.5  # Scale to 50% to leave headroom
+                        audio = np.clip(audio, -0.95, 0.95)
 
-                    # Apply squelch with hysteresis
-                    if self.squelch_open:
-                        # Squelch is open - close if RF power drops below threshold
-                        if rf_power_db < (squelch_threshold_db - squelch_hysteresis_db):
-                            self.squelch_open = False
-                            audio = np.zeros_like(audio)  # Mute
-                    else:
-                        # Squelch is closed - open if RF power rises above threshold
-                        if rf_power_db > (squelch_threshold_db + squelch_hysteresis_db):
-                            self.squelch_open = True
-                            # Let audio through
-                        else:
-                            audio = np.zeros_like(audio)  # Keep muted
+                if len(audio) > 0:
 
                     # Convert to float32
                     audio = audio.astype(np.float32)
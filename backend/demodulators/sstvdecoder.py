@@ -31,6 +31,10 @@ except Exception:
     HAS_SETPROCTITLE = False
 
 from demodulators.basedecoderprocess import BaseDecoderProcess
+from pipeline.streaming.iqformat import get_iq_samples
+from pipeline.streaming.nco import NCO
+from pipeline.streaming.resampler import RationalResampler
+from pipeline.streaming.ringbuffer import SampleWindow
 
 logger = logging.getLogger("sstvdecoder")
 
@@ -181,6 +185,20 @@ HDR_SIZE = 0.030 + VIS_START_OFFSET
 HDR_WINDOW_SIZE = 0.010
 
 
+def image_duration(mode_spec):
+    """Seconds of audio an image of the given mode takes"""
+    return mode_spec["height"] * (
+        mode_spec["sync_pulse"]
+        + mode_spec["chan_count"] * (mode_spec["sep_pulse"] + mode_spec["scan_time"])
+    )
+
+
+# Audio kept while waiting for an image: the longest mode plus header and decode margins
+MAX_AUDIO_BUFFER_SECONDS = max(image_duration(mode.value) for mode in SSTVMode) + 15.0
+# Audio buffered while an image is being processed
+NEXT_DECODE_BUFFER_SECONDS = 5.0
+
+
 def calc_lum(freq):
     """Converts SSTV pixel frequency range into 0-255 luminance byte"""
     lum = int(round((freq - 1500) / 3.1372549))
@@ -211,7 +229,12 @@ class SSTVDecoder(BaseDecoderProcess):
         )
 
         self.audio_sample_rate = sample_rate
-        self.audio_buffer = np.array([], dtype=np.float32)
+        # Audio is appended in place; the array only grows while an image is captured
+        self.audio_window = SampleWindow(
+            int(self.audio_sample_rate * MAX_AUDIO_BUFFER_SECONDS),
+            dtype=np.float32,
+            initial_capacity=int(self.audio_sample_rate * 4.0),
+        )
         self.mode = None
 
         # Extract satellite and transmitter metadata from config (same pattern as FSKDecoder)
@@ -222,7 +245,9 @@ class SSTVDecoder(BaseDecoderProcess):
         self.last_sample = 0 + 0j
         self.sdr_sample_rate = None
         self.decimation_filter = None
+        self.nco = NCO()  # Phase-continuous frequency translation
         self.audio_filter = None
+        self.audio_resampler = None
         self.deemphasis_filter = None
         self.deemphasis_tau = 75e-6
 
@@ -247,6 +272,11 @@ class SSTVDecoder(BaseDecoderProcess):
         else:
             logger.info("No transmitter details provided")
 
+    @property
+    def audio_buffer(self) -> np.ndarray:
+        """Buffered audio, oldest first (a view into the audio window)"""
+        return self.audio_window.data
+
     def _get_decoder_type_for_init(self) -> str:
         return "SSTV"
 
@@ -254,11 +284,7 @@ class SSTVDecoder(BaseDecoderProcess):
 
     def _frequency_translate(self, samples, offset_freq, sample_rate):
         """Translate frequency by offset (shift signal in frequency domain)."""
-        if offset_freq == 0:
-            return samples
-        t = np.arange(len(samples)) / sample_rate
-        shift = np.exp(-2j * np.pi * offset_freq * t)
-        return samples * shift
+        return self.nco.mix(samples, offset_freq, sample_rate)
 
     def _design_decimation_filter(self, sdr_rate, bandwidth):
         """Design cascaded decimation filters for efficient multi-stage decimation."""
@@ -971,7 +997,9 @@ class SSTVDecoder(BaseDecoderProcess):
 
         # SSTV processing state
         processing = False
-        next_decode_buffer = np.array([], dtype=np.float32)
+        next_decode_buffer = SampleWindow(
+            int(self.audio_sample_rate * NEXT_DECODE_BUFFER_SECONDS), dtype=np.float32
+        )
         min_buffer_size = int(self.audio_sample_rate * 1.0)
 
         try:
@@ -1011,7 +1039,7 @@ class SSTVDecoder(BaseDecoderProcess):
                             self.stats["last_activity"] = time.time()
 
                         # Extract IQ samples and metadata
-                        samples = iq_message.get("samples")
+                        samples = get_iq_samples(iq_message)
                         sdr_center = iq_message.get("center_freq")
                         sdr_rate = iq_message.get("sample_rate")
 
@@ -1115,6 +1143,9 @@ class SSTVDecoder(BaseDecoderProcess):
                             self.deemphasis_filter = self._design_deemphasis_filter(
                                 intermediate_rate
                             )
+                            self.audio_resampler = RationalResampler(
+                                intermediate_rate, self.audio_sample_rate
+                            )
 
                             # Initialize filter states
                             initial_value = samples[0] if len(samples) > 0 else 0
@@ -1151,8 +1182,6 @@ class SSTVDecoder(BaseDecoderProcess):
                             )
                             decimated = filtered[::stage_decimation]
 
-                        intermediate_rate = sdr_rate / total_decimation
-
                         # Step 3: FM demodulation
                         demodulated = self._fm_demodulate(decimated)
 
@@ -1174,11 +1203,8 @@ class SSTVDecoder(BaseDecoderProcess):
                         )
 
                         # Step 6: Resample to audio rate (44.1 kHz)
-                        num_output_samples = int(
-                            len(deemphasized) * self.audio_sample_rate / intermediate_rate
-                        )
-                        if num_output_samples > 0:
-                            audio = signal.resample(deemphasized, num_output_samples)
+                        audio = self.audio_resampler.process(deemphasized)
+                        if len(audio) > 0:
                             audio = audio.astype(np.float32)
 
                             with self.stats_lock:
@@ -1186,12 +1212,10 @@ class SSTVDecoder(BaseDecoderProcess):
 
                             # Step 7: SSTV processing
                             if processing:
-                                next_decode_buffer = np.concatenate([next_decode_buffer, audio])
-                                max_next_buffer = int(self.audio_sample_rate * 5.0)
-                                if len(next_decode_buffer) > max_next_buffer:
-                                    next_decode_buffer = next_decode_buffer[-max_next_buffer:]
+                                # Keeps the newest NEXT_DECODE_BUFFER_SECONDS
+                                next_decode_buffer.append(audio)
                             else:
-                                self.audio_buffer = np.concatenate([self.audio_buffer, audio])
+                                self.audio_window.append(audio)
                 finally:
                     # Time-based stats tick (every ~1s), compute ingest rates regardless of processing state
                     current_time = time.time()
@@ -1224,8 +1248,7 @@ class SSTVDecoder(BaseDecoderProcess):
                     header_end = self._find_header()
                     if header_end is None:
                         max_buffer = int(self.audio_sample_rate * 2.0)
-                        if len(self.audio_buffer) > max_buffer:
-                            self.audio_buffer = self.audio_buffer[-max_buffer:]
+                        self.audio_window.keep_last(max_buffer)
                         continue
 
                     vis_end = header_end + round(VIS_BIT_SIZE * 9 * self.audio_sample_rate)
@@ -1235,7 +1258,7 @@ class SSTVDecoder(BaseDecoderProcess):
                     logger.info("Found SSTV header, decoding VIS...")
                     self.mode = self._decode_vis(header_end)
                     if self.mode is None:
-                        self.audio_buffer = self.audio_buffer[vis_end:]
+                        self.audio_window.consume(vis_end)
                         continue
 
                     self._send_status_update(DecoderStatus.CAPTURING, self.mode.value["name"])
@@ -1249,16 +1272,11 @@ class SSTVDecoder(BaseDecoderProcess):
                 if self.mode is not None:
                     mode_spec = self.mode.value
 
-                    image_duration = mode_spec["height"] * mode_spec["sync_pulse"]
-                    image_duration += (
-                        mode_spec["height"]
-                        * mode_spec["chan_count"]
-                        * (mode_spec["sep_pulse"] + mode_spec["scan_time"])
-                    )
-                    required_samples = round((image_duration + 5.0) * self.audio_sample_rate)
+                    duration = image_duration(mode_spec)
+                    required_samples = round((duration + 5.0) * self.audio_sample_rate)
 
                     if len(self.audio_buffer) - self.decode_start_pos < required_samples:
-                        if time.time() - self.header_found_time > image_duration + 10.0:
+                        if time.time() - self.header_found_time > duration + 10.0:
                             logger.warning("Timeout waiting for full image data, decoding partial")
                         else:
                             continue
@@ -1279,8 +1297,9 @@ class SSTVDecoder(BaseDecoderProcess):
                         self.stats["images_decoded"] += 1  # type: ignore[operator]
 
                     self.mode = None
-                    self.audio_buffer = next_decode_buffer
-                    next_decode_buffer = np.array([], dtype=np.float32)
+                    self.audio_window.clear()
+                    self.audio_window.append(next_decode_buffer.data)
+                    next_decode_buffer.clear()
                     processing = False
                     logger.info(
                         f"Finished processing, starting next decode with {len(self.audio_buffer)} buffered samples"
@@ -0,0 +1,201 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Long-lived GNU Radio flowgraphs for the gr-satellites packet decoders.
+
+The FSK, BPSK and AFSK decoders used to build a fresh gr.top_block for every
+batch, copy the batch into a vector_source via a Python list, run it to the end
+and tear it down again. AGC, FLL, Costas loop and clock recovery restarted cold
+each time, and a packet crossing a batch boundary was lost.
+
+StreamingFlowgraph builds the demodulator -> deframer -> message handler chain
+once and keeps it running. The decoder loop pushes samples into a
+RingBufferSource, a source block backed by a preallocated SampleRingBuffer;
+the scheduler pulls them out in its own thread, and decoded PDUs reach the
+existing message handlers through the deframer's message port as before.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+from gnuradio import gr
+
+from pipeline.streaming.ringbuffer import SampleRingBuffer
+
+# Seconds of samples the source can hold before the oldest are dropped
+DEFAULT_BUFFER_SECONDS = 10.0
+
+# Seconds work() waits for samples before handing control back to the scheduler
+SOURCE_WAIT_TIMEOUT = 0.05
+
+# Seconds to wait for buffered samples to be consumed on flush and close
+FLUSH_TIMEOUT = 5.0
+
+
+class RingBufferSource(gr.sync_block):
+    """Source block streaming the samples pushed into its ring buffer"""
+
+    def __init__(self, dtype=np.complex64, capacity=1 << 20):
+        gr.sync_block.__init__(self, name="ring_buffer_source", in_sig=None, out_sig=[dtype])
+        self.ring = SampleRingBuffer(capacity, dtype)
+
+    def push(self, samples):
+        """Queue samples for the flowgraph; returns the number of old samples dropped"""
+        return self.ring.write(samples)
+
+    def close(self):
+        """End the stream once the buffered samples have been produced"""
+        self.ring.close()
+
+    def work(self, input_items, output_items):
+        produced = self.ring.read_into(output_items[0], timeout=SOURCE_WAIT_TIMEOUT)
+        if produced == 0 and self.ring.closed:
+            return -1  # WORK_DONE
+        return produced
+
+
+class StreamingFlowgraph(gr.top_block):
+    """
+    Base class for decoder flowgraphs fed continuously from a ring buffer
+
+    Subclasses set stream_dtype and implement _build(), which creates and
+    connects the blocks after self.source. The flowgraph is built and started
+    on the first call to process_samples() and runs until close().
+    """
+
+    stream_dtype = np.complex64
+    decoding_status = None  # DecoderStatus.DECODING of the subclass module
+
+    def __init__(
+        self,
+        name,
+        sample_rate,
+        status_callback=None,
+        batch_interval=5.0,
+        logger=None,
+        buffer_seconds=DEFAULT_BUFFER_SECONDS,
+    ):
+        """
+        Args:
+            name: Flowgraph name
+            sample_rate: Input sample rate (Hz)
+            status_callback: Function to call for status updates (status, info)
+            batch_interval: Seconds between throughput log lines and status updates
+            logger: Logger instance to use for logging
+            buffer_seconds: Seconds of input the source buffers before dropping
+        """
+        super().__init__(name)
+        self.sample_rate = sample_rate
+        self.status_callback = status_callback
+        self.batch_interval = batch_interval
+        self.logger = logger or logging.getLogger("streamingflowgraph")
+
+        capacity = int(sample_rate * max(buffer_seconds, 2 * batch_interval))
+        self.source = RingBufferSource(self.stream_dtype, capacity)
+        self.started = False
+        self.closed = False
+        self.stream_info = ""
+
+        # Throughput tracking between log lines
+        self.last_batch_time = time.time()
+        self.last_batch_samples = 0
+        self.last_dropped = 0
+
+        # Most recent VFO values, for the log lines
+        self.batch_vfo_center = 0
+        self.batch_vfo_bandwidth = 0
+
+    def _build(self):
+        """Create and connect the blocks after self.source; returns a description for logs"""
+        raise NotImplementedError
+
+    def process_samples(self, samples, vfo_center=None, vfo_bandwidth=None):
+        """
+        Stream samples into the flowgraph
+
+        Args:
+            samples: numpy array of samples (stream_dtype)
+            vfo_center: VFO center frequency used for DSP processing these samples
+            vfo_bandwidth: VFO bandwidth used for DSP processing these samples
+        """
+        if self.closed:
+            return
+        if not self.started:
+            self.stream_info = self._build()
+            self.start()
+            self.started = True
+            self.last_batch_time = time.time()
+            self.logger.info(f"Streaming flowgraph started | {self.stream_info}")
+
+        if vfo_center is not None:
+            self.batch_vfo_center = vfo_center
+            self.batch_vfo_bandwidth = vfo_bandwidth
+        self.source.push(samples)
+
+        current_time = time.time()
+        time_elapsed = current_time - self.last_batch_time
+        if time_elapsed >= self.batch_interval:
+            self._log_throughput(current_time, time_elapsed)
+
+    def _log_throughput(self, current_time, time_elapsed):
+        ring = self.source.ring
+        samples_count = ring.total_written - self.last_batch_samples
+        dropped = ring.dropped - self.last_dropped
+        flow_rate_sps = samples_count / time_elapsed if time_elapsed > 0 else 0
+        vfo_info = ""
+        if self.batch_vfo_bandwidth:
+            vfo_info = f" | VFO: {self.batch_vfo_center:.0f}Hz, BW={self.batch_vfo_bandwidth:.0f}Hz"
+        self.logger.info(
+            f"Stream: {samples_count} samp ({time_elapsed:.1f}s, {flow_rate_sps/1e3:.1f}kS/s, "
+            f"buffered={ring.available}) | {self.stream_info}{vfo_info}"
+        )
+        if dropped:
+            self.logger.warning(f"Flowgraph fell behind: dropped {dropped} samples")
+
+        self.last_batch_time = current_time
+        self.last_batch_samples = ring.total_written
+        self.last_dropped = ring.dropped
+        if self.status_callback and self.decoding_status is not None:
+            self.status_callback(self.decoding_status, {"buffer_samples": ring.available})
+
+    def flush_buffer(self, timeout=FLUSH_TIMEOUT):
+        """Wait until the flowgraph has taken every buffered sample"""
+        if self.started and not self.closed:
+            if not self.source.ring.wait_empty(timeout):
+                self.logger.warning(
+                    f"Flowgraph did not drain {self.source.ring.available} samples in {timeout}s"
+                )
+
+    def close(self, timeout=FLUSH_TIMEOUT):
+        """Decode what is buffered, then stop the flowgraph"""
+        if self.closed:
+            return
+        if not self.started:
+            self.closed = True
+            return
+        self.source.close()
+        # The source returns WORK_DONE once drained, which lets the blocks finish on
+        # their own; stop() only if that takes too long
+        waiter = threading.Thread(target=self.wait, name="flowgraph-wait", daemon=True)
+        waiter.start()
+        waiter.join(timeout)
+        if waiter.is_alive():
+            self.logger.warning("Flowgraph did not finish in time, stopping it")
+            self.stop()
+            waiter.join()
+        self.closed = True
@@ -16,53 +16,177 @@
 
 import numpy as np
 
+# Averaging modes
+AVERAGING_BLOCK = "block"  # Mean of every N frames, one output per N inputs
+AVERAGING_SLIDING = "sliding"  # Mean of the last N frames, one output per input
+AVERAGING_EMA = "ema"  # Exponential moving average with a span of N frames
+AVERAGING_PEAK_HOLD = "peak_hold"  # Per-bin maximum, decaying by hold_decay_db per frame
+AVERAGING_MIN_HOLD = "min_hold"  # Per-bin minimum (noise floor), rising by hold_decay_db per frame
+
+AVERAGING_MODES = (
+    AVERAGING_BLOCK,
+    AVERAGING_SLIDING,
+    AVERAGING_EMA,
+    AVERAGING_PEAK_HOLD,
+    AVERAGING_MIN_HOLD,
+)
+
+DEFAULT_HOLD_DECAY_DB = 0.5
+
+# Sliding sums are rebuilt from the ring this often (in frames) to stop float drift
+_SLIDING_RESYNC_FRAMES = 1024
+
 
 class FFTAverager:
-    def __init__(self, logger, averaging_factor=4):
-        self.averaging_factor = averaging_factor
-        self.accumulated_ffts = []
+    """
+    Streaming averager for dB spectra.
+
+    All state lives in buffers allocated when the FFT size is first seen, and
+    every frame is folded in place. The returned array is an internal buffer that
+    stays valid until the next call to add_fft().
+    """
+
+    def __init__(
+        self,
+        logger,
+        averaging_factor=4,
+        mode=AVERAGING_BLOCK,
+        hold_decay_db=DEFAULT_HOLD_DECAY_DB,
+    ):
+        if mode not in AVERAGING_MODES:
+            raise ValueError(f"Unknown FFT averaging mode: {mode}")
+        self.averaging_factor = max(1, int(averaging_factor))
+        self.mode = mode
+        self.hold_decay_db = hold_decay_db
         self.fft_count = 0
         self.logger = logger
         self.current_fft_size = None
 
+        # Allocated by _allocate() once the FFT size is known
+        self._state = None  # Running sum (block/sliding), average (EMA) or held values
+        self._ring = None  # Last N frames (sliding)
+        self._output = None
+        self._scratch = None
+        self._filled = 0  # Frames in the current block / ring
+        self._ring_pos = 0
+        self._since_resync = 0
+
+    def _allocate(self, fft_size):
+        """Allocate the accumulators for an FFT size."""
+        self.current_fft_size = fft_size
+        self._state = np.zeros(fft_size, dtype=np.float64)
+        self._output = np.zeros(fft_size, dtype=np.float32)
+        self._scratch = np.zeros(fft_size, dtype=np.float64)
+        if self.mode == AVERAGING_SLIDING:
+            self._ring = np.zeros((self.averaging_factor, fft_size), dtype=np.float32)
+        else:
+            self._ring = None
+        self._clear()
+
+    def _clear(self):
+        """Forget accumulated frames without reallocating."""
+        if self._state is not None:
+            self._state.fill(0.0)
+        self._filled = 0
+        self._ring_pos = 0
+        self._since_resync = 0
+
     def add_fft(self, fft_data):
-        """Add FFT data to the accumulator and return averaged result if ready."""
+        """Add FFT data to the accumulator and return the averaged result if ready."""
         # Check if FFT size has changed
-        if self.current_fft_size is None:
-            self.current_fft_size = len(fft_data)
-        elif self.current_fft_size != len(fft_data):
-            # FFT size changed - clear accumulator and update size
-            self.logger.debug(
-                f"FFT size changed from {self.current_fft_size} to {len(fft_data)}, clearing accumulator"
-            )
-            self.accumulated_ffts = []
-            self.current_fft_size = len(fft_data)
-
-        self.accumulated_ffts.append(fft_data.copy())
+        if self.current_fft_size != len(fft_data):
+            if self.current_fft_size is not None:
+                self.logger.debug(
+                    f"FFT size changed from {self.current_fft_size} to {len(fft_data)}, clearing accumulator"
+                )
+            self._allocate(len(fft_data))
+
         self.fft_count += 1
 
-        if len(self.accumulated_ffts) >= self.averaging_factor:
-            # Average the accumulated FFTs
-            averaged_fft = np.mean(self.accumulated_ffts, axis=0)
+        if self.mode == AVERAGING_BLOCK:
+            return self._add_block(fft_data)
+        if self.mode == AVERAGING_SLIDING:
+            return self._add_sliding(fft_data)
+        if self.mode == AVERAGING_EMA:
+            return self._add_ema(fft_data)
+        return self._add_hold(fft_data)
+
+    def _add_block(self, fft_data):
+        self._state += fft_data
+        self._filled += 1
+        if self._filled < self.averaging_factor:
+            return None
+
+        np.divide(self._state, self._filled, out=self._output, casting="unsafe")
+        self._clear()
+        self.logger.debug(
+            f"Averaged {self.averaging_factor} FFTs, total processed: {self.fft_count}"
+        )
+        return self._output
+
+    def _add_sliding(self, fft_data):
+        slot = self._ring[self._ring_pos]
+        if self._filled == self.averaging_factor:
+            self._state -= slot
+        else:
+            self._filled += 1
+        slot[:] = fft_data
+        self._state += slot
+        self._ring_pos = (self._ring_pos + 1) % self.averaging_factor
 
-            # Clear the accumulator
-            self.accumulated_ffts = []
+        self._since_resync += 1
+        if self._since_resync >= _SLIDING_RESYNC_FRAMES:
+            np.sum(self._ring[: self._filled], axis=0, dtype=np.float64, out=self._state)
+            self._since_resync = 0
 
-            self.logger.debug(
-                f"Averaged {self.averaging_factor} FFTs, total processed: {self.fft_count}"
-            )
-            return averaged_fft
-        return None
+        np.divide(self._state, self._filled, out=self._output, casting="unsafe")
+        return self._output
+
+    def _add_ema(self, fft_data):
+        if self._filled == 0:
+            self._state[:] = fft_data
+            self._filled = 1
+        else:
+            alpha = 2.0 / (self.averaging_factor + 1.0)
+            np.subtract(fft_data, self._state, out=self._scratch)
+            self._scratch *= alpha
+            self._state += self._scratch
+        self._output[:] = self._state
+        return self._output
+
+    def _add_hold(self, fft_data):
+        if self._filled == 0:
+            self._state[:] = fft_data
+            self._filled = 1
+        elif self.mode == AVERAGING_PEAK_HOLD:
+            self._state -= self.hold_decay_db
+            np.maximum(self._state, fft_data, out=self._state)
+        else:
+            self._state += self.hold_decay_db
+            np.minimum(self._state, fft_data, out=self._state)
+        self._output[:] = self._state
+        return self._output
 
     def update_averaging_factor(self, new_factor):
         """Update averaging factor and clear accumulator."""
+        new_factor = max(1, int(new_factor))
         if new_factor != self.averaging_factor:
             self.averaging_factor = new_factor
-            self.accumulated_ffts = []
+            if self.current_fft_size is not None:
+                self._allocate(self.current_fft_size)
             self.logger.info(f"Updated FFT averaging factor to: {new_factor}")
 
+    def update_mode(self, new_mode):
+        """Switch averaging mode and clear accumulator."""
+        if new_mode not in AVERAGING_MODES:
+            raise ValueError(f"Unknown FFT averaging mode: {new_mode}")
+        if new_mode != self.mode:
+            self.mode = new_mode
+            if self.current_fft_size is not None:
+                self._allocate(self.current_fft_size)
+            self.logger.info(f"Updated FFT averaging mode to: {new_mode}")
+
     def reset(self):
         """Reset the averager, clearing all accumulated data."""
-        self.accumulated_ffts = []
-        self.current_fft_size = None
+        self._clear()
         self.logger.debug("FFT averager reset")
@@ -0,0 +1,132 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Batched power spectrum for the FFT processor.
+
+An IQ block is framed into (overlapping) segments with stride tricks, windowed
+and transformed in one multi-row scipy.fft call. Segment powers are averaged in
+the linear domain and converted to dB once. Windows and their normalisation are
+cached per (size, window) pair.
+"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import scipy.fft
+from numpy.lib.stride_tricks import sliding_window_view
+
+from workers.common import window_functions
+
+# Threads per transform; capped so several SDRs' FFT processors can share a small CPU
+DEFAULT_FFT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# Segments transformed per scipy.fft call (bounds the temporary frame matrix)
+DEFAULT_MAX_BATCH = 64
+
+
+class BatchedFFT:
+    """
+    Averaged, fftshifted power spectrum (dB) of an IQ block.
+    """
+
+    def __init__(self, workers: int = DEFAULT_FFT_WORKERS, max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        Initialize the engine.
+
+        Args:
+            workers: Threads used by scipy.fft for each batched transform
+            max_batch: Maximum number of segments transformed at once
+        """
+        self.workers = workers
+        self.max_batch = max_batch
+        # (fft_size, window name) -> (float32 window, sum of squared window)
+        self._windows: Dict[Tuple[int, str], Tuple[np.ndarray, float]] = {}
+
+    def get_window(self, fft_size: int, window_name: str) -> Tuple[np.ndarray, float]:
+        """
+        Cached window and its power sum.
+
+        Args:
+            fft_size: FFT size
+            window_name: Name from workers.common.window_functions (unknown names use hanning)
+
+        Returns:
+            Tuple of (float32 window, sum of the squared window)
+        """
+        key = (fft_size, window_name.lower())
+        cached = self._windows.get(key)
+        if cached is None:
+            window_func = window_functions.get(key[1], np.hanning)
+            window = np.asarray(window_func(fft_size), dtype=np.float32)
+            cached = (window, float(np.sum(window.astype(np.float64) ** 2)))
+            self._windows[key] = cached
+        return cached
+
+    @staticmethod
+    def count_segments(num_samples: int, fft_size: int, overlap: bool) -> Tuple[int, int]:
+        """
+        Number of segments a block yields and the step between them.
+
+        Args:
+            num_samples: Block length
+            fft_size: FFT size
+            overlap: 50% overlap if True, back-to-back segments otherwise
+
+        Returns:
+            Tuple of (num_segments, step)
+        """
+        if overlap:
+            step = fft_size // 2
+            return (num_samples - fft_size // 2) // step, step
+        return num_samples // fft_size, fft_size
+
+    def power_spectrum(
+        self, samples: np.ndarray, fft_size: int, window_name: str, overlap: bool
+    ) -> Optional[np.ndarray]:
+        """
+        Average power spectrum of all segments in a block.
+
+        Args:
+            samples: Complex IQ samples
+            fft_size: FFT size
+            window_name: Window function name
+            overlap: 50% segment overlap
+
+        Returns:
+            float32 power in dB with DC in the center, or None if the block is
+            shorter than one segment
+        """
+        num_segments, step = self.count_segments(len(samples), fft_size, overlap)
+        if num_segments <= 0:
+            return None
+
+        window, window_power = self.get_window(fft_size, window_name)
+        # Overlapped spectra are not window-corrected (matches the previous display levels)
+        window_correction = 1.0 if overlap else window_power / fft_size
+        scale = 1.0 / (fft_size * window_correction * num_segments)
+
+        samples = np.asarray(samples, dtype=np.complex64)
+        frames = sliding_window_view(samples, fft_size)[::step][:num_segments]
+
+        power_sum = np.zeros(fft_size, dtype=np.float64)
+        for start in range(0, num_segments, self.max_batch):
+            batch = frames[start : start + self.max_batch] * window
+            spectra = scipy.fft.fft(batch, axis=1, overwrite_x=True, workers=self.workers)
+            power_sum += np.sum(spectra.real**2 + spectra.imag**2, axis=0, dtype=np.float64)
+
+        power_db = 10.0 * np.log10(power_sum * scale + 1e-10)
+        return scipy.fft.fftshift(power_db).astype(np.float32)
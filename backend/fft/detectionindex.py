@@ -0,0 +1,149 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Index of detected signals in a recording.
+
+Detections are stored as SigMF annotations marked "gs:detection" by the IQ
+recorder. The index loads them once per metadata file version into sorted arrays
+so time and frequency range queries do not rescan the annotation list.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Indexes kept in memory
+MAX_CACHED_INDEXES = 16
+
+
+class DetectionIndex:
+    """
+    Detections of one recording, sorted by start sample.
+    """
+
+    def __init__(self, annotations: List[Dict[str, Any]], sample_rate: float):
+        detections = sorted(
+            (a for a in annotations if a.get("gs:detection")),
+            key=lambda a: a["core:sample_start"],
+        )
+        self.sample_rate = sample_rate
+        self.starts = np.array([a["core:sample_start"] for a in detections], dtype=np.int64)
+        self.ends = self.starts + np.array(
+            [a.get("core:sample_count", 0) for a in detections], dtype=np.int64
+        )
+        self.freq_lower = np.array(
+            [a.get("core:freq_lower_edge", -np.inf) for a in detections], dtype=np.float64
+        )
+        self.freq_upper = np.array(
+            [a.get("core:freq_upper_edge", np.inf) for a in detections], dtype=np.float64
+        )
+        self.peak_db = np.array([a.get("gs:peak_db", np.nan) for a in detections])
+        # Longest detection bounds how far back an overlapping one can start
+        self._max_length = int(np.max(self.ends - self.starts)) if len(detections) else 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_sigmf(cls, meta_file: Path) -> "DetectionIndex":
+        with open(meta_file, "r") as f:
+            metadata = json.load(f)
+        sample_rate = metadata.get("global", {}).get("core:sample_rate") or 0.0
+        return cls(metadata.get("annotations", []), sample_rate)
+
+    def query(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        freq_lower: Optional[float] = None,
+        freq_upper: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Detections overlapping a time and frequency window.
+
+        Args:
+            start_time: Window start in seconds from the start of the recording
+            end_time: Window end in seconds from the start of the recording
+            freq_lower: Lower frequency bound in Hz
+            freq_upper: Upper frequency bound in Hz
+            limit: Maximum number of detections returned (earliest first)
+
+        Returns:
+            List of detections with sample and time bounds, frequency edges and peak level
+        """
+        rate = self.sample_rate or 1.0
+        first = 0
+        last = len(self.starts)
+        if start_time is not None:
+            first = int(np.searchsorted(self.starts, start_time * rate - self._max_length))
+        if end_time is not None:
+            last = int(np.searchsorted(self.starts, end_time * rate, side="right"))
+
+        selected = np.arange(first, last)
+        keep = np.ones(len(selected), dtype=bool)
+        if start_time is not None:
+            keep &= self.ends[selected] >= start_time * rate
+        if freq_lower is not None:
+            keep &= self.freq_upper[selected] >= freq_lower
+        if freq_upper is not None:
+            keep &= self.freq_lower[selected] <= freq_upper
+        selected = selected[keep][:limit]
+
+        return [
+            {
+                "sample_start": int(self.starts[i]),
+                "sample_count": int(self.ends[i] - self.starts[i]),
+                "start_time": self.starts[i] / rate,
+                "end_time": self.ends[i] / rate,
+                "freq_lower": float(self.freq_lower[i]),
+                "freq_upper": float(self.freq_upper[i]),
+                "peak_db": None if np.isnan(self.peak_db[i]) else float(self.peak_db[i]),
+            }
+            for i in selected
+        ]
+
+
+_indexes: "OrderedDict[str, tuple]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_detection_index(recording_path: Path) -> DetectionIndex:
+    """
+    Detection index of a recording, rebuilt when its metadata file changes.
+
+    Raises:
+        FileNotFoundError: If the recording has no metadata file
+    """
+    meta_file = Path(f"{recording_path}.sigmf-meta")
+    mtime = meta_file.stat().st_mtime_ns
+    key = str(meta_file.resolve())
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == mtime:
+            _indexes.move_to_end(key)
+            return cached[1]
+
+    index = DetectionIndex.from_sigmf(meta_file)
+    with _indexes_lock:
+        _indexes[key] = (mtime, index)
+        while len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+    return index
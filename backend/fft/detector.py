@@ -0,0 +1,265 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Signal detection on the averaged FFT stream.
+
+Each spectrum is reduced to at most DETECTOR_BINS bins (pyramid level) and run
+through a cell-averaging CFAR: a bin is hot when it exceeds the mean power of the
+training cells on both sides (guard cells excluded) by threshold_db. Adjacent hot
+bins form regions. Regions are tracked across frames with hysteresis: a signal
+starts after min_frames consecutive frames and stops after hangover_frames frames
+without an overlapping region.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from fft.pyramid import derive_levels
+
+# Spectra are reduced to this many bins before detection
+DETECTOR_BINS = 2048
+
+DEFAULT_THRESHOLD_DB = 10.0
+DEFAULT_TRAINING_CELLS = 32
+DEFAULT_GUARD_CELLS = 4
+DEFAULT_MIN_FRAMES = 2
+DEFAULT_HANGOVER_FRAMES = 5
+# Hot regions closer than this many bins are merged
+DEFAULT_MERGE_BINS = 2
+
+EVENT_SIGNAL_START = "start"
+EVENT_SIGNAL_STOP = "stop"
+
+
+def cfar_mask(
+    power_db: np.ndarray,
+    threshold_db: float = DEFAULT_THRESHOLD_DB,
+    training_cells: int = DEFAULT_TRAINING_CELLS,
+    guard_cells: int = DEFAULT_GUARD_CELLS,
+) -> np.ndarray:
+    """
+    Cell-averaging CFAR over spectrum bins.
+
+    Args:
+        power_db: Power spectrum in dB
+        threshold_db: Required margin over the local noise estimate
+        training_cells: Cells averaged on each side
+        guard_cells: Cells skipped on each side of the cell under test
+
+    Returns:
+        Boolean mask of bins above the local threshold
+    """
+    linear = np.power(10.0, np.asarray(power_db, dtype=np.float64) / 10.0)
+    pad = training_cells + guard_cells
+    padded = np.pad(linear, pad, mode="reflect")
+    csum = np.concatenate(([0.0], np.cumsum(padded)))
+
+    n = len(linear)
+    idx = np.arange(n) + pad
+    lower = csum[idx - guard_cells] - csum[idx - pad]
+    upper = csum[idx + pad + 1] - csum[idx + guard_cells + 1]
+    noise = (lower + upper) / (2 * training_cells)
+
+    return linear > noise * 10.0 ** (threshold_db / 10.0)
+
+
+def mask_regions(mask: np.ndarray, merge_bins: int = DEFAULT_MERGE_BINS) -> List[tuple]:
+    """
+    Runs of hot bins as (first_bin, last_bin) pairs, merging runs split by short gaps.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+
+    regions: List[list] = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] - 1 <= merge_bins:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    return [(int(start), int(end)) for start, end in regions]
+
+
+@dataclass
+class TrackedSignal:
+    """A region followed across frames."""
+
+    signal_id: int
+    first_bin: int
+    last_bin: int
+    peak_db: float
+    start_time: float
+    start_sample_index: Optional[int]
+    end_time: float
+    end_sample_index: Optional[int]
+    frames_seen: int = 1
+    frames_missed: int = 0
+    active: bool = False
+    # Widest extent while active, in bins
+    extent: List[int] = field(default_factory=list)
+
+
+class SignalDetector:
+    """
+    CFAR detector with time hysteresis for one SDR's spectrum stream.
+    """
+
+    def __init__(
+        self,
+        threshold_db: float = DEFAULT_THRESHOLD_DB,
+        training_cells: int = DEFAULT_TRAINING_CELLS,
+        guard_cells: int = DEFAULT_GUARD_CELLS,
+        min_frames: int = DEFAULT_MIN_FRAMES,
+        hangover_frames: int = DEFAULT_HANGOVER_FRAMES,
+        merge_bins: int = DEFAULT_MERGE_BINS,
+    ):
+        self.threshold_db = threshold_db
+        self.training_cells = training_cells
+        self.guard_cells = guard_cells
+        self.min_frames = max(1, int(min_frames))
+        self.hangover_frames = max(0, int(hangover_frames))
+        self.merge_bins = merge_bins
+
+        self._tracks: List[TrackedSignal] = []
+        self._next_id = 0
+        self._bins = 0
+        self._center_freq = 0.0
+        self._sample_rate = 0.0
+
+    def reset(self) -> List[Dict[str, Any]]:
+        """
+        Forget tracked signals (e.g. on retune).
+
+        Returns:
+            Stop events for signals that were active
+        """
+        events = [self._event(EVENT_SIGNAL_STOP, t) for t in self._tracks if t.active]
+        self._tracks = []
+        return events
+
+    def process(
+        self,
+        power_db: np.ndarray,
+        center_freq: float,
+        sample_rate: float,
+        timestamp: float,
+        sample_index: Optional[int] = None,
+        num_samples: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Feed one averaged spectrum.
+
+        Args:
+            power_db: fftshifted power spectrum in dB
+            center_freq: Center frequency in Hz
+            sample_rate: Sample rate in Hz (the spectrum spans this bandwidth)
+            timestamp: Time of the first sample of the block the spectrum covers
+            sample_index: Index of the first sample of that block (optional)
+            num_samples: Number of samples in the block
+
+        Returns:
+            Signal start/stop events, each with frequency bounds in Hz
+        """
+        end_time = timestamp + (num_samples / sample_rate if sample_rate else 0.0)
+        end_sample_index = None if sample_index is None else sample_index + num_samples
+
+        size = len(power_db)
+        if size > DETECTOR_BINS and size % DETECTOR_BINS == 0:
+            power_db = derive_levels(power_db, [DETECTOR_BINS])[DETECTOR_BINS]
+        if len(power_db) != self._bins:
+            events = self.reset()
+            self._bins = len(power_db)
+        else:
+            events = []
+        self._center_freq = center_freq
+        self._sample_rate = sample_rate
+
+        mask = cfar_mask(power_db, self.threshold_db, self.training_cells, self.guard_cells)
+        regions = mask_regions(mask, self.merge_bins)
+
+        matched = set()
+        for first_bin, last_bin in regions:
+            peak_db = float(np.max(power_db[first_bin : last_bin + 1]))
+            track = next(
+                (
+                    t
+                    for t in self._tracks
+                    if id(t) not in matched and first_bin <= t.last_bin and last_bin >= t.first_bin
+                ),
+                None,
+            )
+            if track is None:
+                track = TrackedSignal(
+                    signal_id=self._next_id,
+                    first_bin=first_bin,
+                    last_bin=last_bin,
+                    peak_db=peak_db,
+                    start_time=timestamp,
+                    start_sample_index=sample_index,
+                    end_time=end_time,
+                    end_sample_index=end_sample_index,
+                    frames_seen=0,
+                    extent=[first_bin, last_bin],
+                )
+                self._next_id += 1
+                self._tracks.append(track)
+            else:
+                track.first_bin, track.last_bin = first_bin, last_bin
+                track.extent = [min(track.extent[0], first_bin), max(track.extent[1], last_bin)]
+                track.peak_db = max(track.peak_db, peak_db)
+            matched.add(id(track))
+            track.end_time, track.end_sample_index = end_time, end_sample_index
+            track.frames_seen += 1
+            track.frames_missed = 0
+
+            if not track.active and track.frames_seen >= self.min_frames:
+                track.active = True
+                events.append(self._event(EVENT_SIGNAL_START, track))
+
+        remaining = []
+        for track in self._tracks:
+            if id(track) not in matched:
+                track.frames_missed += 1
+                if not track.active:
+                    # Never confirmed: drop it at once
+                    continue
+                if track.frames_missed > self.hangover_frames:
+                    events.append(self._event(EVENT_SIGNAL_STOP, track))
+                    continue
+            remaining.append(track)
+        self._tracks = remaining
+        return events
+
+    def _bin_freq(self, bin_edge: float) -> float:
+        return self._center_freq + (bin_edge / self._bins - 0.5) * self._sample_rate
+
+    def _event(self, event: str, track: TrackedSignal) -> Dict[str, Any]:
+        payload = {
+            "event": event,
+            "signal_id": track.signal_id,
+            "freq_lower": self._bin_freq(track.extent[0]),
+            "freq_upper": self._bin_freq(track.extent[1] + 1),
+            "peak_db": track.peak_db,
+            "start_time": track.start_time,
+            "start_sample_index": track.start_sample_index,
+        }
+        if event == EVENT_SIGNAL_STOP:
+            # Last frame the signal was seen in, not the frame the hangover ran out
+            payload["stop_time"] = track.end_time
+            payload["stop_sample_index"] = track.end_sample_index
+        return payload
@@ -16,13 +16,17 @@
 
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
-import numpy as np
 import psutil
 
-from fft.averager import FFTAverager
-from workers.common import window_functions
+from fft.averager import AVERAGING_BLOCK, AVERAGING_MODES, FFTAverager
+from fft.batchedfft import BatchedFFT
+from fft.detector import SignalDetector
+from fft.pyramid import derive_levels, pyramid_levels
+from pipeline.streaming.backpressure import coalesce_latest, message_duration_ms, queue_lag_ms
+from pipeline.streaming.iqformat import get_iq_samples
+from pipeline.streaming.sampleindex import SampleGapDetector
 
 logger = logging.getLogger("fft-processor")
 
@@ -47,17 +51,34 @@ def fft_processor_process(iq_queue, data_queue, stop_event, client_id):
     fft_size = 16384
     fft_window = "hanning"
     fft_averaging = 6
+    fft_averaging_mode = AVERAGING_BLOCK
     fft_overlap = True
+    # Coarser sizes other subscribers want, derived from the fft_size spectrum
+    fft_levels: List[int] = []
 
     # Initialize FFT averager
     fft_averager = FFTAverager(logger, averaging_factor=fft_averaging)
 
+    # Batched FFT engine (caches windows across messages)
+    spectrum = BatchedFFT()
+
+    # Optional signal detector on the averaged spectra (enabled in-band by the main process)
+    detector: Optional[SignalDetector] = None
+    detections: List[Dict[str, Any]] = []
+
+    # Blocks the SDR worker could not queue show up as sample_index gaps
+    gap_detector = SampleGapDetector()
+
     # Performance monitoring stats
     stats: Dict[str, Any] = {
         "iq_chunks_in": 0,
         "iq_samples_in": 0,
         "fft_results_out": 0,
         "queue_timeouts": 0,
+        "sample_gaps": 0,
+        "samples_missing": 0,
+        "blocks_coalesced": 0,
+        "lag_ms": 0.0,
         "last_activity": None,
         "errors": 0,
         "cpu_percent": 0.0,
@@ -103,19 +124,35 @@ def fft_processor_process(iq_queue, data_queue, stop_event, client_id):
                     # Timeout or queue closed - check stop_event and continue
                     continue
 
+                # The display only needs the newest spectrum: when we fall behind, skip
+                # straight to the latest queued block (coalesce backpressure policy)
+                stats["lag_ms"] = queue_lag_ms(iq_queue, message_duration_ms(iq_message))
+                iq_message, skipped = coalesce_latest(iq_queue, iq_message)
+
                 # Update stats
-                stats["iq_chunks_in"] += 1
+                stats["iq_chunks_in"] += 1 + len(skipped)
+                stats["blocks_coalesced"] += len(skipped)
                 stats["last_activity"] = time.time()
 
-                # Handle configuration updates
-                if "config" in iq_message:
-                    config = iq_message["config"]
+                # Configuration carried by skipped blocks still applies, oldest first.
+                # Skipped blocks are deliberate, so they do not count as sample gaps
+                config: Dict[str, Any] = {}
+                reset_averager = False
+                for message in skipped + [iq_message]:
+                    message_config = message.get("config") or {}
+                    reset_averager = reset_averager or message_config.get("reset_averager", False)
+                    config.update({k: v for k, v in message_config.items() if v is not None})
+                    if message is not iq_message:
+                        gap_detector.check(message)
 
+                # Handle configuration updates
+                if config:
                     # Handle reset command (e.g., on sample rate change)
-                    if config.get("reset_averager", False):
+                    if reset_averager:
                         fft_averager.reset()
                         logger.info("FFT averager reset due to sample rate change")
-                        continue  # Skip processing this empty message
+                        if detector is not None:
+                            detections.extend(detector.reset())
 
                     if (
                         "fft_size" in config
@@ -142,6 +179,14 @@ def fft_processor_process(iq_queue, data_queue, stop_event, client_id):
                         fft_averager.update_averaging_factor(fft_averaging)
                         logger.info(f"Updated FFT averaging: {fft_averaging}")
 
+                    if (
+                        config.get("fft_averaging_mode") in AVERAGING_MODES
+                        and config["fft_averaging_mode"] != fft_averaging_mode
+                    ):
+                        fft_averaging_mode = config["fft_averaging_mode"]
+                        fft_averager.update_mode(fft_averaging_mode)
+                        logger.info(f"Updated FFT averaging mode: {fft_averaging_mode}")
+
                     if (
                         "fft_overlap" in config
                         and config["fft_overlap"] is not None
@@ -150,73 +195,42 @@ def fft_processor_process(iq_queue, data_queue, stop_event, client_id):
                         fft_overlap = config["fft_overlap"]
                         logger.info(f"Updated FFT overlap: {fft_overlap}")
 
+                    if "fft_levels" in config and list(config["fft_levels"]) != fft_levels:
+                        fft_levels = list(config["fft_levels"])
+                        logger.info(f"Updated FFT pyramid levels: {fft_levels}")
+
+                    if "signal_detection" in config:
+                        detection_config = dict(config["signal_detection"])
+                        if detector is not None:
+                            detections.extend(detector.reset())
+                        if detection_config.pop("enabled", False):
+                            detector = SignalDetector(**detection_config)
+                            logger.info(f"Signal detection enabled: {detection_config}")
+                        else:
+                            detector = None
+                            logger.info("Signal detection disabled")
+
                 # Extract samples
-                samples = iq_message.get("samples")
+                samples = get_iq_samples(iq_message)
                 if samples is None or len(samples) == 0:
                     continue
 
                 # Update sample count
                 stats["iq_samples_in"] += len(samples)
-
-                # Calculate the number of samples needed for the FFT
-                actual_fft_size = fft_size
-
-                # Apply window function
-                window_func = window_functions.get(fft_window.lower(), np.hanning)
-                window = window_func(actual_fft_size)
-
-                # Calculate FFT segments based on overlap setting
-                if fft_overlap:
-                    # Use 50% overlap
-                    overlap_step = actual_fft_size // 2
-                    num_segments = (len(samples) - actual_fft_size // 2) // (actual_fft_size // 2)
-                else:
-                    # No overlap - use non-overlapping segments
-                    overlap_step = actual_fft_size
-                    num_segments = len(samples) // actual_fft_size
-
-                if num_segments <= 0:
+                missing = gap_detector.check(iq_message)
+                if missing:
+                    stats["sample_gaps"] += 1
+                    stats["samples_missing"] += missing
+
+                # Windowed, averaged power spectrum of all segments in the block
+                fft_result = spectrum.power_spectrum(samples, fft_size, fft_window, fft_overlap)
+                if fft_result is None:
                     overlap_type = "with overlap" if fft_overlap else "without overlap"
                     logger.debug(
-                        f"Not enough samples for FFT {overlap_type}: {len(samples)} < {actual_fft_size}"
+                        f"Not enough samples for FFT {overlap_type}: {len(samples)} < {fft_size}"
                     )
                     continue
 
-                fft_result = np.zeros(actual_fft_size)
-
-                for i in range(num_segments):
-                    start_idx = i * overlap_step
-                    segment = samples[start_idx : start_idx + actual_fft_size]
-
-                    windowed_segment = segment * window
-
-                    # Perform FFT
-                    fft_segment = np.fft.fft(windowed_segment)
-
-                    # Shift DC to center
-                    fft_segment = np.fft.fftshift(fft_segment)
-
-                    # Proper power normalization
-                    N = len(fft_segment)
-                    if fft_overlap:
-                        # Use simpler correction for overlapped FFTs
-                        window_correction = 1.0
-                    else:
-                        # Use proper window correction for non-overlapped FFTs
-                        window_correction = np.sum(window**2) / N
-
-                    power = 10 * np.log10(
-                        (np.abs(fft_segment) ** 2) / (N * window_correction) + 1e-10
-                    )
-                    fft_result += power
-
-                # Average the segments
-                if num_segments > 0:
-                    fft_result /= num_segments
-
-                # Convert to Float32 for efficiency in transmission
-                fft_result = fft_result.astype(np.float32)
-
                 # Add FFT to averager and send only when ready
                 averaged_fft = fft_averager.add_fft(fft_result)
                 if averaged_fft is not None:
@@ -233,6 +247,14 @@ def fft_processor_process(iq_queue, data_queue, stop_event, client_id):
                             "timestamp": time.time(),
                         }
 
+                        # Coarser resolutions for subscribers with a smaller FFT size
+                        levels = pyramid_levels(len(averaged_fft), fft_levels)
+                        if levels:
+                            fft_message["levels"] = {
+                                size: level.tobytes()
+                                for size, level in derive_levels(averaged_fft, levels).items()
+                            }
+
                         # Pass through playback timing info if present (for playback mode)
                         if "recording_datetime" in iq_message:
                             fft_message["recording_datetime"] = iq_message["recording_datetime"]
@@ -256,6 +278,34 @@ def fft_processor_process(iq_queue, data_queue, stop_event, client_id):
                         logger.debug(f"Failed to send FFT data to queue: {e}")
                         stats["queue_timeouts"] += 1
 
+                    if detector is not None:
+                        detections.extend(
+                            detector.process(
+                                averaged_fft,
+                                iq_message.get("center_freq"),
+                                iq_message.get("sample_rate"),
+                                iq_message.get("timestamp") or time.time(),
+                                iq_message.get("sample_index"),
+                                len(samples),
+                            )
+                        )
+
+                if detections:
+                    try:
+                        data_queue.put(
+                            {
+                                "type": "signal_detection",
+                                "client_id": client_id,
+                                "detections": detections,
+                                "timestamp": time.time(),
+                            },
+                            timeout=0.5,
+                        )
+                    except Exception as e:
+                        logger.debug(f"Failed to send signal detections to queue: {e}")
+                        stats["queue_timeouts"] += 1
+                    detections = []
+
                 # Periodically send stats to main process
                 current_time = time.time()
                 if current_time - last_stats_send >= stats_send_interval:
@@ -0,0 +1,79 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Multi-resolution FFT pyramid.
+
+The FFT processor runs a single FFT size per SDR: the largest any client asked
+for. Coarser resolutions are derived from that spectrum by summing the power of
+adjacent bins, so clients with different RBW settings share one FFT and one
+averager.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Coarsest level worth deriving
+MIN_PYRAMID_SIZE = 64
+
+
+def pyramid_levels(top_size: int, sizes: Iterable[int]) -> List[int]:
+    """
+    Requested sizes that can be derived from the top FFT size.
+
+    Args:
+        top_size: FFT size actually computed
+        sizes: FFT sizes requested by subscribers
+
+    Returns:
+        Distinct sizes smaller than top_size that divide it, largest first
+    """
+    levels = set()
+    for size in sizes:
+        size = int(size)
+        if MIN_PYRAMID_SIZE <= size < top_size and top_size % size == 0:
+            levels.add(size)
+    return sorted(levels, reverse=True)
+
+
+def derive_levels(power_db: np.ndarray, sizes: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Coarser spectra derived from a full-resolution one.
+
+    Each coarse bin sums the power of the fine bins it covers, centered on the
+    coarse bin frequency. The sum is divided by the number of fine bins so the
+    noise floor matches what an FFT of the coarse size would display. A narrow
+    carrier keeps all its power in one coarse bin, so it reads up to the window's
+    noise bandwidth (a few dB) higher than a native coarse FFT would show it.
+
+    Args:
+        power_db: fftshifted power spectrum in dB
+        sizes: Level sizes (each must divide len(power_db))
+
+    Returns:
+        Dict mapping level size to its float32 spectrum in dB
+    """
+    top_size = len(power_db)
+    linear = np.power(10.0, np.asarray(power_db, dtype=np.float64) / 10.0)
+
+    levels: Dict[int, np.ndarray] = {}
+    for size in sizes:
+        ratio = top_size // size
+        # Shift so that each group straddles its coarse bin center (DC stays centered)
+        grouped = np.roll(linear, ratio // 2).reshape(size, ratio)
+        power = np.sum(grouped, axis=1) / ratio
+        levels[size] = (10.0 * np.log10(power + 1e-20)).astype(np.float32)
+    return levels
@@ -0,0 +1,208 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Per-client spectrum views.
+
+The FFT processor produces one full-resolution spectrum per frame, but a browser
+only draws a canvas one or two thousand pixels wide. A client may register the
+width it draws and the part of the band it is zoomed into; it then receives
+only that span, max-hold decimated to its width and optionally quantized to
+uint8 dB. Clients that never register keep receiving the full float32 frame.
+
+This is an opt-in server-side API (the set-spectrum-view command). The bundled
+web UI does not register a view yet, so it still receives full float32 frames;
+the saving applies only to clients that send set-spectrum-view.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+ENCODING_FLOAT32 = "float32"
+ENCODING_UINT8 = "uint8"
+
+MIN_VIEW_WIDTH = 16
+MAX_VIEW_WIDTH = 16384
+
+
+@dataclass(frozen=True)
+class SpectrumView:
+    """Display geometry registered by one client."""
+
+    width: int
+    # Visible span as fractions of the band (0.0 = lowest bin, 1.0 = highest)
+    start: float = 0.0
+    end: float = 1.0
+    quantize: bool = False
+
+
+def decimate_max_hold(spectrum: np.ndarray, width: int) -> np.ndarray:
+    """
+    Reduce a spectrum to at most `width` points, keeping the peak of each group.
+
+    Args:
+        spectrum: Power values in dB
+        width: Number of output points
+
+    Returns:
+        The spectrum itself if it already fits, otherwise `width` group maxima
+    """
+    if len(spectrum) <= width:
+        return spectrum
+    edges = (np.arange(width, dtype=np.int64) * len(spectrum)) // width
+    return np.maximum.reduceat(spectrum, edges)
+
+
+def quantize_db(values: np.ndarray) -> Tuple[np.ndarray, float, float]:
+    """
+    Quantize dB values to uint8 over the frame's own range.
+
+    Args:
+        values: Power values in dB
+
+    Returns:
+        Tuple of (uint8 codes, db_offset, db_scale) with dB = offset + code * scale
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.uint8), 0.0, 1.0
+    low = float(np.floor(np.min(values)))
+    high = float(np.max(values))
+    scale = max(high - low, 1e-3) / 255.0
+    codes = np.rint((values - low) / scale)
+    return np.clip(codes, 0, 255).astype(np.uint8), low, scale
+
+
+class SpectrumViews:
+    """
+    Registered views of the clients of one SDR.
+    """
+
+    def __init__(self):
+        self._views: Dict[str, SpectrumView] = {}
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def set_view(
+        self,
+        client_id: str,
+        width: int,
+        start: float = 0.0,
+        end: float = 1.0,
+        quantize: bool = False,
+    ) -> SpectrumView:
+        """
+        Register or update a client's view.
+
+        Args:
+            client_id: Client identifier
+            width: Display width in pixels
+            start: Start of the visible span as a fraction of the band
+            end: End of the visible span as a fraction of the band
+            quantize: Send uint8 dB instead of float32
+
+        Returns:
+            The stored (clamped) view
+
+        Raises:
+            ValueError: If the span is empty
+        """
+        start = min(max(float(start), 0.0), 1.0)
+        end = min(max(float(end), 0.0), 1.0)
+        if end <= start:
+            raise ValueError(f"Empty spectrum span: {start} - {end}")
+        width = min(max(int(width), MIN_VIEW_WIDTH), MAX_VIEW_WIDTH)
+        view = SpectrumView(width=width, start=start, end=end, quantize=bool(quantize))
+        self._views[client_id] = view
+        return view
+
+    def remove(self, client_id: str) -> None:
+        """
+        Forget a client's view (it goes back to full frames).
+
+        Args:
+            client_id: Client identifier
+        """
+        self._views.pop(client_id, None)
+
+    def get_view(self, client_id: str) -> Optional[SpectrumView]:
+        """Registered view of a client, or None."""
+        return self._views.get(client_id)
+
+    def client_ids(self) -> List[str]:
+        """Clients that receive rendered views instead of full frames."""
+        return list(self._views)
+
+    def render(
+        self, fft_data: bytes, client_ids: Optional[Iterable[str]] = None
+    ) -> List[Tuple[Dict[str, Any], List[str]]]:
+        """
+        Build the frame for every registered view.
+
+        Clients with identical views share one rendered frame.
+
+        Args:
+            fft_data: Full spectrum as float32 bytes (fftshifted, in dB)
+            client_ids: Only render for these clients (default: all registered)
+
+        Returns:
+            List of (payload fields, client ids) pairs
+        """
+        if client_ids is None:
+            client_ids = self._views.keys()
+        groups: Dict[SpectrumView, List[str]] = {}
+        for client_id in client_ids:
+            view = self._views.get(client_id)
+            if view is not None:
+                groups.setdefault(view, []).append(client_id)
+        if not groups:
+            return []
+
+        spectrum = np.frombuffer(fft_data, dtype=np.float32)
+        fft_size = len(spectrum)
+
+        frames = []
+        for view, client_ids in groups.items():
+            start_bin = min(int(view.start * fft_size), max(fft_size - 1, 0))
+            end_bin = max(int(np.ceil(view.end * fft_size)), start_bin + 1)
+            decimated = decimate_max_hold(spectrum[start_bin:end_bin], view.width)
+
+            payload: Dict[str, Any] = {
+                "fft_size": fft_size,
+                "start_bin": start_bin,
+                "end_bin": end_bin,
+                "bins": len(decimated),
+            }
+            if view.quantize:
+                codes, db_offset, db_scale = quantize_db(decimated)
+                payload.update(
+                    {
+                        "data": codes.tobytes(),
+                        "encoding": ENCODING_UINT8,
+                        "db_offset": db_offset,
+                        "db_scale": db_scale,
+                    }
+                )
+            else:
+                payload.update(
+                    {
+                        "data": np.ascontiguousarray(decimated, dtype=np.float32).tobytes(),
+                        "encoding": ENCODING_FLOAT32,
+                    }
+                )
+            frames.append((payload, client_ids))
+        return frames
@@ -17,14 +17,29 @@
 
 import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 
 import numpy as np
+import scipy.fft
+from numpy.lib.stride_tricks import sliding_window_view
 from PIL import Image
 
 logger = logging.getLogger("waterfall-generator")
 
+# FFT frames transformed per scipy.fft call when rendering rows
+FRAMES_PER_BATCH = 256
+
+# Row chunks handed out per pool worker (more chunks give smoother progress)
+CHUNKS_PER_WORKER = 8
+
+# Histogram used for dB auto-scaling: 0.1 dB bins over [-300, 200) dB
+HISTOGRAM_DB_MIN = -300.0
+HISTOGRAM_DB_MAX = 200.0
+HISTOGRAM_BIN_DB = 0.1
+
 
 class WaterfallConfig:
     """Configuration for waterfall generation"""
@@ -38,6 +53,7 @@ class WaterfallConfig:
         "db_range": [-80, 0],
         "generate_thumbnail": True,
         "thumbnail_size": [512, 256],
+        "workers": 0,
     }
 
     def __init__(
@@ -49,6 +65,7 @@ class WaterfallConfig:
         db_range: Tuple[float, float] = (-80, 0),
         generate_thumbnail: bool = True,
         thumbnail_size: Tuple[int, int] = (512, 256),
+        workers: int = 0,
     ):
         self.fft_size = fft_size
         self.max_height = max_height
@@ -57,6 +74,8 @@ class WaterfallConfig:
         self.db_range = db_range
         self.generate_thumbnail = generate_thumbnail
         self.thumbnail_size = thumbnail_size
+        # Render processes; 0 uses one per CPU core
+        self.workers = workers
 
     @classmethod
     def load_from_file(cls, config_path: Path) -> "WaterfallConfig":
@@ -165,15 +184,181 @@ class WaterfallConfig:
         return (rgb * 255).astype(np.uint8)
 
 
+def build_sample_reader(data_file: Path, dtype_info: dict):
+    """
+    Reader returning complex samples [start_idx, start_idx + count) from a memory-mapped
+    SigMF data file.
+    """
+    kind = dtype_info["kind"]
+    if kind == "cf32":
+        iq_data = np.memmap(data_file, dtype=np.complex64, mode="r")
+
+        def read_samples(start_idx: int, count: int) -> np.ndarray:
+            return iq_data[start_idx : start_idx + count]
+
+        return read_samples
+
+    raw = np.memmap(data_file, dtype=dtype_info["numpy_dtype"], mode="r")
+
+    if kind == "ci16":
+
+        def read_samples(start_idx: int, count: int) -> np.ndarray:
+            offset = start_idx * 2
+            chunk = raw[offset : offset + count * 2]
+            if chunk.size < count * 2:
+                count = chunk.size // 2
+                chunk = chunk[: count * 2]
+            i_vals = chunk[0::2].astype(np.float32)
+            q_vals = chunk[1::2].astype(np.float32)
+            return i_vals + 1j * q_vals
+
+    elif kind == "ci8":
+
+        def read_samples(start_idx: int, count: int) -> np.ndarray:
+            offset = start_idx * 2
+            chunk = raw[offset : offset + count * 2]
+            if chunk.size < count * 2:
+                count = chunk.size // 2
+                chunk = chunk[: count * 2]
+            i_vals = chunk[0::2].astype(np.float32)
+            q_vals = chunk[1::2].astype(np.float32)
+            return i_vals + 1j * q_vals
+
+    elif kind == "cu8":
+
+        def read_samples(start_idx: int, count: int) -> np.ndarray:
+            offset = start_idx * 2
+            chunk = raw[offset : offset + count * 2]
+            if chunk.size < count * 2:
+                count = chunk.size // 2
+                chunk = chunk[: count * 2]
+            i_vals = chunk[0::2].astype(np.float32) - 128.0
+            q_vals = chunk[1::2].astype(np.float32) - 128.0
+            return i_vals + 1j * q_vals
+
+    else:
+        raise ValueError(f"Unsupported SigMF datatype kind: {kind}")
+
+    return read_samples
+
+
+def make_window(name: str, fft_size: int) -> np.ndarray:
+    """Window function by name (rectangular if unknown)."""
+    if name == "hann":
+        return np.hanning(fft_size)
+    if name == "hamming":
+        return np.hamming(fft_size)
+    if name == "blackman":
+        return np.blackman(fft_size)
+    return np.ones(fft_size)
+
+
+def _render_rows(
+    data_file: str,
+    dtype_info: dict,
+    window_name: str,
+    dimensions: dict,
+    row_start: int,
+    row_end: int,
+) -> Tuple[int, np.ndarray]:
+    """
+    Render waterfall rows [row_start, row_end).
+
+    Runs in a pool worker, so it opens its own memory-mapped reader. Frames are
+    transformed FRAMES_PER_BATCH at a time and their powers summed into rows.
+
+    Returns:
+        Tuple of (row_start, float32 dB rows of shape (row_end - row_start, fft_size))
+    """
+    fft_size = dimensions["width"]
+    hop_size = dimensions["hop_size"]
+    frames_per_row = dimensions["frames_per_row"]
+
+    sample_reader = build_sample_reader(Path(data_file), dtype_info)
+    window = make_window(window_name, fft_size).astype(np.float32)
+
+    num_rows = row_end - row_start
+    power = np.zeros((num_rows, fft_size), dtype=np.float64)
+
+    first_frame = row_start * frames_per_row
+    num_frames = num_rows * frames_per_row
+    for batch_start in range(0, num_frames, FRAMES_PER_BATCH):
+        batch_frames = min(FRAMES_PER_BATCH, num_frames - batch_start)
+        start_idx = (first_frame + batch_start) * hop_size
+        count = (batch_frames - 1) * hop_size + fft_size
+
+        samples = np.asarray(sample_reader(start_idx, count), dtype=np.complex64)
+        batch_frames = min(batch_frames, (len(samples) - fft_size) // hop_size + 1)
+        if batch_frames <= 0:
+            break
+
+        frames = sliding_window_view(samples, fft_size)[::hop_size][:batch_frames] * window
+        spectra = scipy.fft.fft(frames, axis=1, overwrite_x=True)
+        frame_power = spectra.real**2 + spectra.imag**2
+
+        # Sum each run of frames that belongs to the same row
+        local_rows = (batch_start + np.arange(batch_frames)) // frames_per_row
+        run_starts = np.flatnonzero(np.r_[True, local_rows[1:] != local_rows[:-1]])
+        power[local_rows[run_starts]] += np.add.reduceat(frame_power, run_starts, axis=0)
+
+    power /= frames_per_row
+    with np.errstate(divide="ignore"):
+        rows_db = 10 * np.log10(power + 1e-20)
+    return row_start, np.fft.fftshift(rows_db, axes=1).astype(np.float32)
+
+
+class _StreamingDbHistogram:
+    """Fixed-bin histogram of dB values for percentile estimates without keeping the values."""
+
+    def __init__(self):
+        self.num_bins = int(round((HISTOGRAM_DB_MAX - HISTOGRAM_DB_MIN) / HISTOGRAM_BIN_DB))
+        self.counts = np.zeros(self.num_bins, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+
+    def add(self, values: np.ndarray):
+        bins = ((values - HISTOGRAM_DB_MIN) / HISTOGRAM_BIN_DB).astype(np.int64)
+        np.clip(bins, 0, self.num_bins - 1, out=bins)
+        self.counts += np.bincount(bins.ravel(), minlength=self.num_bins)
+        self.total += values.size
+        self.sum += float(np.sum(values, dtype=np.float64))
+
+    def value_at_rank(self, rank: int) -> float:
+        """Value of the rank-th smallest sample (0-based), to bin resolution."""
+        bin_idx = int(np.searchsorted(np.cumsum(self.counts), rank, side="right"))
+        return HISTOGRAM_DB_MIN + (min(bin_idx, self.num_bins - 1) + 0.5) * HISTOGRAM_BIN_DB
+
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+
 class WaterfallGenerator:
     """
     Generate waterfall spectrograms from IQ recordings in SigMF format.
     """
 
-    def __init__(self, config: Optional[WaterfallConfig] = None):
+    def __init__(
+        self,
+        config: Optional[WaterfallConfig] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+    ):
+        """
+        Args:
+            config: Waterfall configuration (defaults if None)
+            progress_callback: Called with (percent, message) as rows are rendered;
+                progress is logged instead if None
+        """
         self.config = config or WaterfallConfig()
+        self.progress_callback = progress_callback
         self.logger = logging.getLogger("waterfall-generator")
 
+    def _report_progress(self, progress: float):
+        message = f"Progress: {progress:.0f}%"
+        if self.progress_callback:
+            self.progress_callback(progress, message)
+        else:
+            self.logger.info(message)
+
     def _get_sigmf_dtype_info(self, datatype: str) -> Optional[dict]:
         if not datatype:
             return None
@@ -191,57 +376,7 @@ class WaterfallGenerator:
         return None
 
     def _build_sample_reader(self, data_file: Path, dtype_info: dict):
-        kind = dtype_info["kind"]
-        if kind == "cf32":
-            iq_data = np.memmap(data_file, dtype=np.complex64, mode="r")
-
-            def read_samples(start_idx: int, count: int) -> np.ndarray:
-                return iq_data[start_idx : start_idx + count]
-
-            return read_samples
-
-        raw = np.memmap(data_file, dtype=dtype_info["numpy_dtype"], mode="r")
-
-        if kind == "ci16":
-
-            def read_samples(start_idx: int, count: int) -> np.ndarray:
-                offset = start_idx * 2
-                chunk = raw[offset : offset + count * 2]
-                if chunk.size < count * 2:
-                    count = chunk.size // 2
-                    chunk = chunk[: count * 2]
-                i_vals = chunk[0::2].astype(np.float32)
-                q_vals = chunk[1::2].astype(np.float32)
-                return i_vals + 1j * q_vals
-
-        elif kind == "ci8":
-
-            def read_samples(start_idx: int, count: int) -> np.ndarray:
-                offset = start_idx * 2
-                chunk = raw[offset : offset + count * 2]
-                if chunk.size < count * 2:
-                    count = chunk.size // 2
-                    chunk = chunk[: count * 2]
-                i_vals = chunk[0::2].astype(np.float32)
-                q_vals = chunk[1::2].astype(np.float32)
-                return i_vals + 1j * q_vals
-
-        elif kind == "cu8":
-
-            def read_samples(start_idx: int, count: int) -> np.ndarray:
-                offset = start_idx * 2
-                chunk = raw[offset : offset + count * 2]
-                if chunk.size < count * 2:
-                    count = chunk.size // 2
-                    chunk = chunk[: count * 2]
-                i_vals = chunk[0::2].astype(np.float32) - 128.0
-                q_vals = chunk[1::2].astype(np.float32) - 128.0
-                return i_vals + 1j * q_vals
-
-        else:
-            raise ValueError(f"Unsupported SigMF datatype kind: {kind}")
-
-        return read_samples
+        return build_sample_reader(data_file, dtype_info)
 
     def generate_from_sigmf(self, recording_path: Path) -> bool:
         """
@@ -304,14 +439,7 @@ class WaterfallGenerator:
 
             # Create window function for auto-scaling
             fft_size = dimensions["width"]
-            if self.config.window == "hann":
-                window = np.hanning(fft_size)
-            elif self.config.window == "hamming":
-                window = np.hamming(fft_size)
-            elif self.config.window == "blackman":
-                window = np.blackman(fft_size)
-            else:
-                window = np.ones(fft_size)
+            window = make_window(self.config.window, fft_size)
 
             # Auto-scale dB range by sampling FFTs from the recording
             self.config.db_range = self._auto_scale_db_range(
@@ -319,7 +447,7 @@ class WaterfallGenerator:
             )
 
             # Generate full waterfall
-            waterfall_data = self._generate_waterfall_data(sample_reader, total_samples, dimensions)
+            waterfall_data = self._generate_waterfall_data(data_file, dtype_info, dimensions)
 
             # Apply colormap and save
             output_path = Path(f"{recording_base}.png")
@@ -354,11 +482,12 @@ class WaterfallGenerator:
     ) -> Tuple[float, float]:
         """
         Auto-scale dB range by sampling FFT frames from the recording.
-        Uses the same algorithm as the UI waterfall (auto-scaling.js).
+        Uses the same algorithm as the UI waterfall (auto-scaling.js), with the
+        percentiles read from a histogram rather than a sorted copy of every bin.
 
         Args:
-            iq_data: Memory-mapped IQ data
-            sample_rate: Sample rate in Hz
+            sample_reader: Reader returned by build_sample_reader()
+            total_samples: Number of complex samples in the recording
             fft_size: FFT size
             window: Window function
 
@@ -378,52 +507,46 @@ class WaterfallGenerator:
             return self.config.db_range
         sample_positions = np.linspace(0, total_possible_ffts, num_samples, dtype=int)
 
-        # Collect FFT power values from sampled frames
-        all_values = []
+        # Fold the sampled FFT frames into a histogram, a batch at a time
+        histogram = _StreamingDbHistogram()
 
-        for pos in sample_positions:
-            # Extract samples
-            samples = sample_reader(pos, fft_size)
-            if len(samples) < fft_size:
+        for batch_start in range(0, len(sample_positions), FRAMES_PER_BATCH):
+            frames = [
+                sample_reader(pos, fft_size)
+                for pos in sample_positions[batch_start : batch_start + FRAMES_PER_BATCH]
+            ]
+            frames = [samples for samples in frames if len(samples) == fft_size]
+            if not frames:
                 continue
 
             # Apply window and FFT
-            windowed = samples * window
-            spectrum = np.fft.fft(windowed)
-            spectrum = np.fft.fftshift(spectrum)
+            spectra = scipy.fft.fft(np.stack(frames) * window, axis=1)
 
             # Convert to power in dB
-            power = np.abs(spectrum) ** 2
+            power = spectra.real**2 + spectra.imag**2
             with np.errstate(divide="ignore"):
-                db_spectrum = 10 * np.log10(power + 1e-20)
-
-            all_values.extend(db_spectrum)
-
-        # Convert to numpy array for analysis
-        all_values = np.array(all_values)
+                histogram.add(10 * np.log10(power + 1e-20))
 
-        # Sort for percentile calculation
-        sorted_values = np.sort(all_values)
+        if histogram.total == 0:
+            self.logger.warning("Not enough samples for auto-scaling, using default range")
+            return self.config.db_range
 
         # Use 'medium' preset strategy (matches UI default)
         # Use 5th to 97th percentile with moderate padding
-        low_idx = int(len(sorted_values) * 0.05)
-        high_idx = int(len(sorted_values) * 0.97)
-
-        min_db = sorted_values[low_idx]
-        max_db = sorted_values[high_idx]
+        min_db = histogram.value_at_rank(int(histogram.total * 0.05))
+        max_db = histogram.value_at_rank(int(histogram.total * 0.97))
 
         # Apply moderate padding with extra headroom to prevent clipping
         min_db = np.floor(min_db - 5)
         max_db = np.ceil(max_db + 15)  # Increased from +5 to +15 for headroom
 
         # Calculate statistics for logging
-        mean_db = np.mean(all_values)
-        median_db = np.median(all_values)
+        mean_db = histogram.mean()
+        median_db = histogram.value_at_rank(histogram.total // 2)
 
         self.logger.info(
             f"Auto-scaled dB range: [{min_db:.1f}, {max_db:.1f}] "
-            f"(mean: {mean_db:.1f}, median: {median_db:.1f}, samples: {len(all_values)})"
+            f"(mean: {mean_db:.1f}, median: {median_db:.1f}, samples: {histogram.total})"
         )
 
         return (min_db, max_db)
@@ -472,76 +595,65 @@ class WaterfallGenerator:
         }
 
     def _generate_waterfall_data(
-        self, sample_reader, total_samples: int, dimensions: dict
+        self, data_file: Path, dtype_info: dict, dimensions: dict
     ) -> np.ndarray:
         """
         Generate waterfall data from IQ samples.
 
+        Rows are split into chunks rendered by _render_rows(), in a process pool
+        when more than one worker is configured.
+
         Returns:
             2D array of shape (height, width) with dB values
         """
         fft_size = dimensions["width"]
-        hop_size = dimensions["hop_size"]
         height = dimensions["height"]
-        frames_per_row = dimensions["frames_per_row"]
-
-        # Create window function
-        if self.config.window == "hann":
-            window = np.hanning(fft_size)
-        elif self.config.window == "hamming":
-            window = np.hamming(fft_size)
-        elif self.config.window == "blackman":
-            window = np.blackman(fft_size)
-        else:
-            window = np.ones(fft_size)
 
         # Allocate output array
         waterfall = np.zeros((height, fft_size), dtype=np.float32)
+        if height <= 0:
+            return waterfall
 
-        self.logger.info(f"Processing {dimensions['total_frames']} FFT frames into {height} rows")
-
-        # Process in chunks to save memory
-        row_idx = 0
-        frame_idx = 0
-
-        while frame_idx + fft_size <= total_samples and row_idx < height:
-            # Accumulate frames_per_row FFT frames
-            accumulated_spectrum = np.zeros(fft_size, dtype=np.float32)
-
-            for _ in range(frames_per_row):
-                samples = sample_reader(frame_idx, fft_size)
-                if len(samples) < fft_size:
-                    break
-
-                # Apply window and FFT
-                windowed = samples * window
-                spectrum = np.fft.fft(windowed)
-                spectrum = np.fft.fftshift(spectrum)  # Center DC
-
-                # Convert to power (magnitude squared)
-                power = np.abs(spectrum) ** 2
-                accumulated_spectrum += power
-
-                frame_idx += hop_size
+        workers = self.config.workers or os.cpu_count() or 1
+        workers = max(1, min(workers, height))
+        rows_per_chunk = max(1, -(-height // (workers * CHUNKS_PER_WORKER)))
+        chunks = [
+            (row_start, min(row_start + rows_per_chunk, height))
+            for row_start in range(0, height, rows_per_chunk)
+        ]
 
-            # Average and convert to dB
-            if frames_per_row > 0:
-                accumulated_spectrum /= frames_per_row
-
-            # Convert to dB (avoid log(0))
-            with np.errstate(divide="ignore"):
-                db_spectrum = 10 * np.log10(accumulated_spectrum + 1e-20)
-
-            waterfall[row_idx] = db_spectrum
-            row_idx += 1
-
-            # Progress logging every 10%
-            if row_idx % max(1, height // 10) == 0:
-                progress = (row_idx / height) * 100
-                self.logger.info(f"Progress: {progress:.0f}%")
+        self.logger.info(
+            f"Processing {dimensions['total_frames']} FFT frames into {height} rows "
+            f"({len(chunks)} chunks, {workers} workers)"
+        )
 
-        # Trim to actual rows processed
-        waterfall = waterfall[:row_idx]
+        render_args = (str(data_file), dtype_info, self.config.window, dimensions)
+        rows_done = 0
+        last_reported = 0
+
+        def store(result):
+            nonlocal rows_done, last_reported
+            row_start, rows = result
+            waterfall[row_start : row_start + len(rows)] = rows
+            rows_done += len(rows)
+
+            # Progress reporting every 10%
+            progress = (rows_done / height) * 100
+            if progress - last_reported >= 10 or rows_done == height:
+                last_reported = progress
+                self._report_progress(progress)
+
+        if workers == 1:
+            for row_start, row_end in chunks:
+                store(_render_rows(*render_args, row_start, row_end))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_render_rows, *render_args, row_start, row_end)
+                    for row_start, row_end in chunks
+                ]
+                for future in as_completed(futures):
+                    store(future.result())
 
         return waterfall
 
@@ -0,0 +1,164 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Recent waterfall rows of one SDR.
+
+Once a client has asked for history (get-fft-history), every FFT frame sent to the
+SDR room is also stored here, max-hold decimated to at most `width` bins and
+quantized to uint8 dB with a per-row offset and scale. Until then nothing is
+stored, so SDRs whose clients never scroll back pay nothing per frame. Rows live
+in a fixed ring shared by all clients of the SDR, so memory is bounded by
+max_rows * width bytes. A client joining a running SDR gets the history in one
+binary message and can page further back by sequence number.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from fft.spectrumview import ENCODING_UINT8, decimate_max_hold, quantize_db
+
+DEFAULT_HISTORY_SECONDS = 60.0
+DEFAULT_HISTORY_ROWS = 2048
+DEFAULT_HISTORY_WIDTH = 2048
+
+# Rows sent per history message unless the client asks for fewer
+DEFAULT_HISTORY_BURST_ROWS = 512
+
+
+class WaterfallHistory:
+    """
+    Ring buffer of quantized FFT rows.
+    """
+
+    def __init__(
+        self,
+        seconds: float = DEFAULT_HISTORY_SECONDS,
+        max_rows: int = DEFAULT_HISTORY_ROWS,
+        width: int = DEFAULT_HISTORY_WIDTH,
+    ):
+        """
+        Initialize the history.
+
+        Args:
+            seconds: Rows older than this (relative to the newest row) are not returned
+            max_rows: Ring capacity in rows
+            width: Maximum bins stored per row
+        """
+        self.seconds = seconds
+        self.max_rows = max_rows
+        self.width = width
+
+        self._rows = np.zeros((max_rows, width), dtype=np.uint8)
+        self._db_offset = np.zeros(max_rows, dtype=np.float32)
+        self._db_scale = np.zeros(max_rows, dtype=np.float32)
+        self._timestamps = np.zeros(max_rows, dtype=np.float64)
+
+        self._next_seq = 0  # Sequence number the next row gets
+        self._count = 0  # Rows currently held
+        self._bins = 0  # Bins per stored row
+        self._fft_size = 0  # FFT size the stored rows were decimated from
+
+        # Rows are only kept once some client has asked for them
+        self.active = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def activate(self) -> None:
+        """Start keeping rows (the caller checks `active` before appending)."""
+        self.active = True
+
+    def clear(self) -> None:
+        """Drop all rows (sequence numbers keep counting)."""
+        self._count = 0
+
+    def append(self, fft_data: bytes, timestamp: Optional[float] = None) -> int:
+        """
+        Store one FFT frame.
+
+        Args:
+            fft_data: Full spectrum as float32 bytes (fftshifted, in dB)
+            timestamp: Frame time in seconds since the epoch (default: now)
+
+        Returns:
+            Sequence number of the stored row
+        """
+        spectrum = np.frombuffer(fft_data, dtype=np.float32)
+        row = decimate_max_hold(spectrum, self.width)
+
+        # A new FFT size changes the bin layout, so older rows no longer line up
+        if len(spectrum) != self._fft_size:
+            self._fft_size = len(spectrum)
+            self._bins = len(row)
+            self._count = 0
+
+        codes, db_offset, db_scale = quantize_db(row)
+        slot = self._next_seq % self.max_rows
+        self._rows[slot, : self._bins] = codes
+        self._db_offset[slot] = db_offset
+        self._db_scale[slot] = db_scale
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+
+        seq = self._next_seq
+        self._next_seq += 1
+        self._count = min(self._count + 1, self.max_rows)
+        return seq
+
+    def _oldest_seq(self) -> int:
+        """Oldest sequence number still inside the time window."""
+        first = self._next_seq - self._count
+        if self._count == 0:
+            return first
+        slots = np.arange(first, self._next_seq) % self.max_rows
+        timestamps = self._timestamps[slots]
+        return first + int(np.searchsorted(timestamps, timestamps[-1] - self.seconds))
+
+    def get_rows(
+        self, before_seq: Optional[int] = None, max_rows: int = DEFAULT_HISTORY_BURST_ROWS
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Newest rows older than before_seq, oldest first.
+
+        Args:
+            before_seq: Only rows with a smaller sequence number (default: up to the newest)
+            max_rows: Maximum number of rows returned
+
+        Returns:
+            Payload with the rows as one uint8 block (rows x bins) and per-row float32
+            db_offset/db_scale and float64 timestamps, or None if there are no such rows
+        """
+        end = self._next_seq if before_seq is None else min(int(before_seq), self._next_seq)
+        oldest = self._oldest_seq()
+        start = max(oldest, end - max(int(max_rows), 0))
+        if end <= start:
+            return None
+
+        slots = np.arange(start, end) % self.max_rows
+        return {
+            "first_seq": start,
+            "last_seq": end - 1,
+            "rows": end - start,
+            "bins": self._bins,
+            "fft_size": self._fft_size,
+            "encoding": ENCODING_UINT8,
+            "data": self._rows[slots, : self._bins].tobytes(),
+            "db_offset": self._db_offset[slots].tobytes(),
+            "db_scale": self._db_scale[slots].tobytes(),
+            "timestamps": self._timestamps[slots].tobytes(),
+            "has_more": start > oldest,
+        }
@@ -0,0 +1,395 @@
+# Ground Station - Waterfall Tiles
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Deep-zoom waterfall tiles for SigMF recordings.
+
+Level L splits the recording into 2**L tiles along time (y) and up to 2**L tiles
+along frequency (x). Each tile is TILE_SIZE x TILE_SIZE pixels; the FFT size grows
+with the frequency split so every column is one FFT bin, and each row averages up
+to MAX_FRAMES_PER_ROW frames spread over its time span. Time runs top to bottom
+and y=0 is the start of the recording.
+
+Tiles are rendered on first request, written as PNGs to a "<recording>.sigmf-tiles"
+directory next to the .sigmf-meta file, and kept in an in-memory LRU. The tile
+directory is itself trimmed least-recently-used first when it outgrows its budget.
+"""
+
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import scipy.fft
+from PIL import Image
+
+from fft.waterfallgenerator import (
+    WaterfallConfig,
+    WaterfallGenerator,
+    build_sample_reader,
+    make_window,
+)
+
+logger = logging.getLogger("waterfall-tiles")
+
+TILE_SIZE = 256
+MAX_TILE_FFT_SIZE = 65536
+MAX_LEVEL = 24
+
+# Frames averaged per row at most; coarse levels sample their span instead of reading all of it
+MAX_FRAMES_PER_ROW = 8
+
+# Complex samples transformed per scipy.fft call while rendering a tile
+SAMPLES_PER_BATCH = 1 << 22
+
+TILES_DIR_SUFFIX = ".sigmf-tiles"
+TILES_INFO_FILE = "tiles.json"
+
+DEFAULT_MEMORY_TILES = 512
+DEFAULT_DISK_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_OPEN_PYRAMIDS = 8
+
+
+class WaterfallTilePyramid:
+    """
+    Tile pyramid of one SigMF recording.
+    """
+
+    def __init__(
+        self,
+        recording_path: Path,
+        window: str = "hann",
+        disk_cache_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+    ):
+        """
+        Open a recording for tiling.
+
+        Args:
+            recording_path: Path to the recording (without extension)
+            window: Window function name (see make_window)
+            disk_cache_bytes: Budget for rendered tiles kept on disk
+
+        Raises:
+            FileNotFoundError: If the data or metadata file is missing
+            ValueError: If the metadata is unusable or the recording is shorter than one tile
+        """
+        self.recording_path = Path(recording_path)
+        self.data_file = Path(f"{self.recording_path}.sigmf-data")
+        self.meta_file = Path(f"{self.recording_path}.sigmf-meta")
+        self.tiles_dir = Path(f"{self.recording_path}{TILES_DIR_SUFFIX}")
+        self.window = window
+        self.disk_cache_bytes = disk_cache_bytes
+        self._lock = threading.Lock()
+
+        if not self.data_file.exists() or not self.meta_file.exists():
+            raise FileNotFoundError(f"Recording not found: {self.recording_path}")
+
+        with open(self.meta_file, "r") as f:
+            metadata = json.load(f)
+        global_meta = metadata.get("global", {})
+        captures = metadata.get("captures") or [{}]
+
+        self.sample_rate = global_meta.get("core:sample_rate")
+        if not self.sample_rate:
+            raise ValueError("Missing sample_rate in metadata")
+        self.center_frequency = captures[0].get("core:frequency")
+
+        datatype = global_meta.get("core:datatype", "cf32_le")
+        dtype_info = WaterfallGenerator()._get_sigmf_dtype_info(datatype)
+        if not dtype_info:
+            raise ValueError(f"Unsupported SigMF datatype: {datatype}")
+
+        self.data_size = self.data_file.stat().st_size
+        self.total_samples = self.data_size // dtype_info["bytes_per_sample"]
+        if self.total_samples < TILE_SIZE:
+            raise ValueError("Recording is too short to tile")
+
+        self._sample_reader = build_sample_reader(self.data_file, dtype_info)
+        self.max_level = self._find_max_level()
+        self.db_range = self._load_or_create_info()
+        self._disk_bytes = sum(p.stat().st_size for p in self.tiles_dir.glob("*/*.png"))
+
+    def _find_max_level(self) -> int:
+        """Deepest level whose rows still advance by at least a quarter of a frame."""
+        level = 0
+        while level < MAX_LEVEL:
+            _, y_tiles, fft_size = self.grid(level + 1)
+            samples_per_row = self.total_samples / (y_tiles * TILE_SIZE)
+            if samples_per_row < fft_size / 4 or fft_size > self.total_samples:
+                break
+            level += 1
+        return level
+
+    def _load_or_create_info(self) -> Tuple[float, float]:
+        """Read the pyramid's dB range, discarding stale tiles if the recording changed."""
+        info_file = self.tiles_dir / TILES_INFO_FILE
+        try:
+            with open(info_file, "r") as f:
+                info = json.load(f)
+            if info.get("data_size") == self.data_size and info.get("window") == self.window:
+                return tuple(info["db_range"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # Missing or stale: start over
+        shutil.rmtree(self.tiles_dir, ignore_errors=True)
+        self.tiles_dir.mkdir(parents=True, exist_ok=True)
+
+        generator = WaterfallGenerator(WaterfallConfig(fft_size=TILE_SIZE, window=self.window))
+        min_db, max_db = generator._auto_scale_db_range(
+            self._sample_reader,
+            self.total_samples,
+            TILE_SIZE,
+            make_window(self.window, TILE_SIZE),
+        )
+        db_range = (float(min_db), float(max_db))
+
+        with open(info_file, "w") as f:
+            json.dump({"data_size": self.data_size, "window": self.window, "db_range": db_range}, f)
+        return db_range
+
+    @staticmethod
+    def grid(level: int) -> Tuple[int, int, int]:
+        """
+        Tile grid of a level.
+
+        Returns:
+            Tuple of (x_tiles, y_tiles, fft_size)
+        """
+        freq_level = min(level, int(np.log2(MAX_TILE_FFT_SIZE // TILE_SIZE)))
+        return 1 << freq_level, 1 << level, TILE_SIZE << freq_level
+
+    def info(self) -> Dict:
+        """Pyramid description for clients."""
+        return {
+            "tile_size": TILE_SIZE,
+            "max_level": self.max_level,
+            "levels": [
+                dict(zip(("x_tiles", "y_tiles", "fft_size"), self.grid(level)))
+                for level in range(self.max_level + 1)
+            ],
+            "sample_rate": self.sample_rate,
+            "center_frequency": self.center_frequency,
+            "duration": self.total_samples / self.sample_rate,
+            "db_range": list(self.db_range),
+        }
+
+    def render_tile(self, level: int, x: int, y: int) -> np.ndarray:
+        """
+        Render one tile.
+
+        Returns:
+            float32 dB array of shape (TILE_SIZE, TILE_SIZE)
+
+        Raises:
+            ValueError: If (level, x, y) is outside the pyramid
+        """
+        x_tiles, y_tiles, fft_size = self.grid(level)
+        if not (0 <= level <= self.max_level and 0 <= x < x_tiles and 0 <= y < y_tiles):
+            raise ValueError(f"Tile out of range: level={level} x={x} y={y}")
+
+        window = make_window(self.window, fft_size).astype(np.float32)
+        # Scale to the level-0 window power so the noise floor matches db_range at every level
+        reference = make_window(self.window, TILE_SIZE)
+        scale = float(np.sum(reference**2) / np.sum(window.astype(np.float64) ** 2))
+
+        tile_span = self.total_samples / y_tiles
+        samples_per_row = tile_span / TILE_SIZE
+        frames_per_row = int(np.clip(samples_per_row // fft_size, 1, MAX_FRAMES_PER_ROW))
+        last_start = self.total_samples - fft_size
+
+        # Frame start positions, row-major
+        row_starts = y * tile_span + np.arange(TILE_SIZE) * samples_per_row
+        offsets = np.linspace(0, max(samples_per_row - fft_size, 0), frames_per_row)
+        starts = np.minimum((row_starts[:, None] + offsets[None, :]).astype(np.int64), last_start)
+        starts = starts.ravel()
+
+        power = np.empty((len(starts), TILE_SIZE), dtype=np.float64)
+        bins = slice(x * TILE_SIZE, (x + 1) * TILE_SIZE)
+        batch = max(1, SAMPLES_PER_BATCH // fft_size)
+        for batch_start in range(0, len(starts), batch):
+            frames = np.stack(
+                [
+                    np.asarray(self._sample_reader(int(start), fft_size), dtype=np.complex64)
+                    for start in starts[batch_start : batch_start + batch]
+                ]
+            )
+            spectra = scipy.fft.fftshift(
+                scipy.fft.fft(frames * window, axis=1, overwrite_x=True), axes=1
+            )[:, bins]
+            power[batch_start : batch_start + len(frames)] = spectra.real**2 + spectra.imag**2
+
+        power = power.reshape(TILE_SIZE, frames_per_row, TILE_SIZE).mean(axis=1) * scale
+        with np.errstate(divide="ignore"):
+            return (10 * np.log10(power + 1e-20)).astype(np.float32)
+
+    def _encode_png(self, tile_db: np.ndarray) -> bytes:
+        db_min, db_max = self.db_range
+        normalized = np.clip((tile_db - db_min) / (db_max - db_min), 0, 1)
+        rgb = _colormap_lut()[(normalized * 255).astype(np.uint8)]
+        buffer = io.BytesIO()
+        Image.fromarray(rgb, mode="RGB").save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def tile_path(self, level: int, x: int, y: int) -> Path:
+        return self.tiles_dir / str(level) / f"{x}_{y}.png"
+
+    def get_tile_png(self, level: int, x: int, y: int) -> bytes:
+        """
+        PNG bytes of a tile, from disk if it was rendered before.
+
+        Raises:
+            ValueError: If (level, x, y) is outside the pyramid
+        """
+        path = self.tile_path(level, x, y)
+        try:
+            png = path.read_bytes()
+            os.utime(path)  # Mark as recently used for disk eviction
+            return png
+        except FileNotFoundError:
+            pass
+
+        png = self._encode_png(self.render_tile(level, x, y))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name: concurrent requests for the same tile each write their own
+        # file, and the last os.replace wins with identical content
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+            tmp.write(png)
+        os.replace(tmp.name, path)
+        with self._lock:
+            self._disk_bytes += len(png)
+            if self._disk_bytes > self.disk_cache_bytes:
+                self._trim_disk_cache()
+        return png
+
+    def _trim_disk_cache(self):
+        """Delete least recently used tiles until the directory is under 90% of its budget."""
+        tiles = sorted(self.tiles_dir.glob("*/*.png"), key=lambda p: p.stat().st_mtime)
+        self._disk_bytes = sum(p.stat().st_size for p in tiles)
+        target = int(self.disk_cache_bytes * 0.9)
+        for tile in tiles:
+            if self._disk_bytes <= target:
+                break
+            size = tile.stat().st_size
+            tile.unlink(missing_ok=True)
+            self._disk_bytes -= size
+        logger.debug(
+            f"Trimmed tile cache for {self.recording_path.name} to {self._disk_bytes} bytes"
+        )
+
+
+class WaterfallTileCache:
+    """
+    Open pyramids and an in-memory LRU of PNG tiles shared across recordings.
+    """
+
+    def __init__(
+        self,
+        max_tiles: int = DEFAULT_MEMORY_TILES,
+        max_pyramids: int = DEFAULT_OPEN_PYRAMIDS,
+        disk_cache_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+    ):
+        self.max_tiles = max_tiles
+        self.max_pyramids = max_pyramids
+        self.disk_cache_bytes = disk_cache_bytes
+        self._tiles: "OrderedDict[Tuple[str, int, int, int], bytes]" = OrderedDict()
+        self._pyramids: "OrderedDict[str, WaterfallTilePyramid]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_pyramid(self, recording_path: Path) -> WaterfallTilePyramid:
+        """
+        Open (or reuse) the pyramid of a recording, reopening it if the data file changed.
+        """
+        key = _cache_key(recording_path)
+        with self._lock:
+            pyramid = self._pyramids.get(key)
+            if pyramid is not None:
+                self._pyramids.move_to_end(key)
+
+        data_file = Path(f"{recording_path}.sigmf-data")
+        if pyramid is not None and data_file.exists():
+            if data_file.stat().st_size == pyramid.data_size:
+                return pyramid
+
+        self.invalidate(recording_path, remove_files=False)
+        pyramid = WaterfallTilePyramid(recording_path, disk_cache_bytes=self.disk_cache_bytes)
+        with self._lock:
+            self._pyramids[key] = pyramid
+            while len(self._pyramids) > self.max_pyramids:
+                self._pyramids.popitem(last=False)
+        return pyramid
+
+    def get_info(self, recording_path: Path) -> Dict:
+        return self.get_pyramid(recording_path).info()
+
+    def get_tile(self, recording_path: Path, level: int, x: int, y: int) -> bytes:
+        """
+        PNG bytes of a tile, rendering it on first request.
+
+        Raises:
+            FileNotFoundError: If the recording does not exist
+            ValueError: If the recording cannot be tiled or the tile is out of range
+        """
+        pyramid = self.get_pyramid(recording_path)
+        key = (_cache_key(recording_path), level, x, y)
+        with self._lock:
+            png = self._tiles.get(key)
+            if png is not None:
+                self._tiles.move_to_end(key)
+                return png
+
+        png = pyramid.get_tile_png(level, x, y)
+        with self._lock:
+            self._tiles[key] = png
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return png
+
+    def invalidate(self, recording_path: Path, remove_files: bool = True):
+        """Forget a recording's cached tiles, and delete its tile directory if remove_files."""
+        key = _cache_key(recording_path)
+        with self._lock:
+            self._pyramids.pop(key, None)
+            for tile_key in [k for k in self._tiles if k[0] == key]:
+                del self._tiles[tile_key]
+        if remove_files:
+            shutil.rmtree(f"{recording_path}{TILES_DIR_SUFFIX}", ignore_errors=True)
+
+
+def _cache_key(recording_path: Path) -> str:
+    return str(Path(recording_path).resolve())
+
+
+_lut: Optional[np.ndarray] = None
+
+
+def _colormap_lut() -> np.ndarray:
+    global _lut
+    if _lut is None:
+        _lut = WaterfallConfig.get_colormap_lut()
+    return _lut
+
+
+# Shared by the HTTP tile endpoints
+waterfall_tile_cache = WaterfallTileCache()
@@ -28,6 +28,8 @@ from typing import Any, Dict, List, Tuple, Union
 
 from PIL import Image
 
+from fft.waterfalltiles import TILES_DIR_SUFFIX, waterfall_tile_cache
+
 
 def get_disk_usage(path: Path) -> Dict[str, Union[int, str]]:
     """
@@ -252,6 +254,12 @@ def delete_recording_files(recordings_dir: Path, recording_name: str, logger) ->
         snapshot_file.unlink()
         deleted_files.append(snapshot_file.name)
 
+    # Delete waterfall tiles rendered for the recording
+    tiles_dir = recordings_dir / f"{recording_name}{TILES_DIR_SUFFIX}"
+    if tiles_dir.exists():
+        waterfall_tile_cache.invalidate(recordings_dir / recording_name)
+        deleted_files.append(tiles_dir.name)
+
     if deleted_files:
         logger.info(f"Deleted recording '{recording_name}': {', '.join(deleted_files)}")
 
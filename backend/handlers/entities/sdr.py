@@ -24,6 +24,9 @@ from demodulators.amdemodulator import AMDemodulator
 from demodulators.fmdemodulator import FMDemodulator
 from demodulators.fmstereodemodulator import FMStereoDemodulator
 from demodulators.ssbdemodulator import SSBDemodulator
+from fft.averager import AVERAGING_BLOCK, AVERAGING_MODES
+from fft.detector import DEFAULT_THRESHOLD_DB
+from fft.waterfallhistory import DEFAULT_HISTORY_BURST_ROWS
 from handlers.entities.filebrowser import emit_file_browser_state
 from pipeline.orchestration.processmanager import process_manager
 from server.audiorecorder import start_audio_recording, stop_audio_recording
@@ -167,6 +170,14 @@ async def sdr_data_request_routing(sio, cmd, data, logger, client_id):
                 # FFT Averaging
                 fft_averaging = _coerce_int(data.get("fftAveraging", 1), 1, "fftAveraging", logger)
 
+                # FFT averaging mode (block, sliding, ema, peak_hold, min_hold)
+                fft_averaging_mode = data.get("fftAveragingMode", AVERAGING_BLOCK)
+                if fft_averaging_mode not in AVERAGING_MODES:
+                    logger.warning(
+                        f"fftAveragingMode is invalid ({fft_averaging_mode}); using default {AVERAGING_BLOCK}."
+                    )
+                    fft_averaging_mode = AVERAGING_BLOCK
+
                 # Antenna port
                 antenna = data.get("antenna", None)
                 if isinstance(antenna, str) and antenna.strip().lower() in ("", "none"):
@@ -195,6 +206,7 @@ async def sdr_data_request_routing(sio, cmd, data, logger, client_id):
                     rtl_agc=rtl_agc,
                     fft_window=fft_window,
                     fft_averaging=fft_averaging,
+                    fft_averaging_mode=fft_averaging_mode,
                     sdr_id=sdr_id,
                     recording_path=recording_path,
                     serial_number=sdr_serial,
@@ -219,9 +231,11 @@ async def sdr_data_request_routing(sio, cmd, data, logger, client_id):
                         if client != client_id
                     ]
 
-                    # For every other client id, send an update
+                    # For every other client id, send an update; the FFT size stays
+                    # per client, so theirs is left alone
+                    shared_config = {k: v for k, v in sdr_config.items() if k != "fft_size"}
                     for other_client in other_clients:
-                        await sio.emit("sdr-config", sdr_config, room=other_client)
+                        await sio.emit("sdr-config", shared_config, room=other_client)
 
                 is_running = process_manager.is_sdr_process_running(sdr_id)
                 if is_running:
@@ -492,6 +506,80 @@ async def sdr_data_request_routing(sio, cmd, data, logger, client_id):
                 reply["success"] = False
                 reply["error"] = str(e)
 
+        elif cmd == "set-spectrum-view":
+            # Opt-in: clients that never send this keep getting full float32 frames
+            try:
+                sdr_id = data.get("selectedSDRId", None)
+
+                # Display width in pixels and visible span as fractions of the band
+                width = _coerce_int(data.get("width", 2048), 2048, "width", logger)
+                view_start = _coerce_float(data.get("viewStart", 0.0), 0.0, "viewStart", logger)
+                view_end = _coerce_float(data.get("viewEnd", 1.0), 1.0, "viewEnd", logger)
+                quantize = bool(data.get("quantize", False))
+
+                view = process_manager.set_spectrum_view(
+                    sdr_id, client_id, width, view_start, view_end, quantize
+                )
+                if view is None:
+                    raise Exception(f"SDR {sdr_id} is not streaming")
+
+                reply["success"] = True
+                reply["data"] = {
+                    "width": view.width,
+                    "viewStart": view.start,
+                    "viewEnd": view.end,
+                    "quantize": view.quantize,
+                }
+
+            except Exception as e:
+                logger.error(f"Error setting spectrum view: {str(e)}")
+                reply["success"] = False
+                reply["error"] = str(e)
+
+        elif cmd == "clear-spectrum-view":
+            sdr_id = data.get("selectedSDRId", None)
+            process_manager.clear_spectrum_view(sdr_id, client_id)
+            reply["success"] = True
+
+        elif cmd == "get-fft-history":
+            sdr_id = data.get("selectedSDRId", None)
+
+            # Scroll back: rows older than beforeSeq (the client's oldest row)
+            before_seq = _coerce_int(data.get("beforeSeq", None), None, "beforeSeq", logger)
+            max_rows = _coerce_int(
+                data.get("maxRows", DEFAULT_HISTORY_BURST_ROWS),
+                DEFAULT_HISTORY_BURST_ROWS,
+                "maxRows",
+                logger,
+            )
+
+            reply["success"] = True
+            reply["data"] = process_manager.get_fft_history(sdr_id, before_seq, max_rows)
+
+        elif cmd == "set-signal-detection":
+            try:
+                sdr_id = data.get("selectedSDRId", None)
+                enabled = bool(data.get("enabled", False))
+                threshold_db = data.get("thresholdDb", None)
+                if threshold_db is not None:
+                    threshold_db = _coerce_float(
+                        threshold_db, DEFAULT_THRESHOLD_DB, "thresholdDb", logger
+                    )
+
+                settings = process_manager.set_signal_detection(
+                    sdr_id, client_id, enabled, threshold_db
+                )
+                if settings is None:
+                    raise Exception(f"SDR {sdr_id} is not streaming")
+
+                reply["success"] = True
+                reply["data"] = settings
+
+            except Exception as e:
+                logger.error(f"Error setting signal detection: {str(e)}")
+                reply["success"] = False
+                reply["error"] = str(e)
+
         elif cmd == "save-waterfall-snapshot":
             try:
                 waterfall_image = data.get("waterfallImage", None)
@@ -19,6 +19,8 @@ import queue
 import threading
 import time
 
+from pipeline.streaming.backpressure import POLICY_DROP_NEWEST, queue_lag_ms
+from tracker import messages as tracker_messages
 from tracker.messages import tracker_stats
 from tracker.runner import tracker_process
 
@@ -362,6 +364,9 @@ class PerformanceMonitor(threading.Thread):
                     ),
                     "delivered": sub_info["delivered"],
                     "dropped": sub_info["dropped"],
+                    "dropped_samples": sub_info.get("dropped_samples", 0),
+                    "policy": sub_info.get("policy", POLICY_DROP_NEWEST),
+                    "lag_ms": queue_lag_ms(sub_info["queue"], sub_info.get("message_ms", 0.0)),
                 }
 
         # Calculate rates from previous snapshot
@@ -415,6 +420,7 @@ class PerformanceMonitor(threading.Thread):
         # Get queue sizes
         iq_queue_fft = process_info.get("iq_queue_fft")
         data_queue = process_info.get("data_queue")
+        data_bridge = process_info.get("data_bridge")
 
         input_queue_size = iq_queue_fft.qsize() if iq_queue_fft else 0
         input_queue_maxsize = getattr(iq_queue_fft, "_maxsize", None) if iq_queue_fft else None
@@ -467,6 +473,7 @@ class PerformanceMonitor(threading.Thread):
                 else False
             ),
             "connections": connections,
+            "data_queue_bridge": data_bridge.get_stats() if data_bridge else None,
         }
 
     def _poll_audio_broadcaster(
@@ -735,7 +742,8 @@ class PerformanceMonitor(threading.Thread):
                         logger.debug(f"Could not check audio queue connection: {e}")
 
                 demod_metrics[key] = {
-                    "type": type(demod_instance).__name__,
+                    "type": demod_entry.get("class_name") or type(demod_instance).__name__,
+                    "isolation": demod_entry.get("isolation", "thread"),
                     "session_id": session_id,
                     "vfo_number": vfo_num,
                     "demod_id": key,
@@ -1365,6 +1373,11 @@ class PerformanceMonitor(threading.Thread):
                         "tracking_cycles_per_sec": tracking_cycles_rate,
                     },
                     "connections": connections,
+                    "queue_bridge": (
+                        tracker_messages.tracker_bridge.get_stats()
+                        if tracker_messages.tracker_bridge
+                        else None
+                    ),
                     "is_alive": tracker_process.is_alive() if tracker_process else False,
                 }
 
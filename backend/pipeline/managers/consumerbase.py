@@ -15,9 +15,24 @@
 
 
 import logging
+import multiprocessing
 import queue as queue_module
+from typing import Union
 
 from audio.audiobroadcaster import AudioBroadcaster
+from demodulators.demodulatorprocess import (
+    ISOLATION_BATCHED,
+    ISOLATION_MODES,
+    ISOLATION_PROCESS,
+    ISOLATION_THREAD,
+    DemodulatorProcess,
+)
+from demodulators.multivfodemodulator import BatchedVFO, MultiVFODemodulator
+from pipeline.streaming.backpressure import POLICY_DROP_NEWEST, POLICY_DROP_OLDEST
+from pipeline.streaming.iqbroadcaster import TRANSPORT_SHM
+
+# IQ queue depth for consumers that do not declare iq_queue_maxsize
+DEFAULT_IQ_QUEUE_MAXSIZE = 10
 
 
 class ConsumerManager:
@@ -49,6 +64,7 @@ class ConsumerManager:
         subscription_prefix,
         vfo_number=None,
         consumer_key_override=None,
+        isolation=ISOLATION_THREAD,
         **kwargs,
     ):
         """
@@ -62,6 +78,11 @@ class ConsumerManager:
             storage_key: "demodulators" or "recorders"
             subscription_prefix: "demod" or "recorder"
             vfo_number: VFO number for demodulators (1-4). If None, uses session_id as key
+            consumer_key_override: Storage key for recorders instead of session_id
+            isolation: ISOLATION_THREAD (default), ISOLATION_PROCESS to run a demodulator
+                       in a worker process fed from the shared-memory IQ ring, or
+                       ISOLATION_BATCHED to demodulate an FM/AM VFO in the session's
+                       MultiVFODemodulator (other demodulators fall back to a thread)
             **kwargs: Additional arguments to pass to the consumer constructor
 
         Returns:
@@ -73,6 +94,23 @@ class ConsumerManager:
 
         process_info = self.processes[sdr_id]
 
+        if isolation not in ISOLATION_MODES:
+            self.logger.error(f"Unknown consumer isolation: {isolation}")
+            return False
+        run_in_process = isolation == ISOLATION_PROCESS and storage_key == "demodulators"
+        run_batched = (
+            isolation == ISOLATION_BATCHED
+            and storage_key == "demodulators"
+            and getattr(consumer_class, "batched_modulation", None) is not None
+            and not kwargs.get("internal_mode", False)
+        )
+        if run_in_process:
+            isolation = ISOLATION_PROCESS
+        elif run_batched:
+            isolation = ISOLATION_BATCHED
+        else:
+            isolation = ISOLATION_THREAD
+
         # Create storage key based on whether this is VFO-based or session-based
         # For demodulators with VFO number, store as nested dict: demodulators[session_id][vfo_number]
         # For recorders, store as: recorders[session_id]
@@ -114,8 +152,11 @@ class ConsumerManager:
                 if isinstance(existing_entry, dict)
                 else existing_entry
             )
-            # If same type, check if it's in internal mode
-            if isinstance(existing, consumer_class):
+            # Worker processes report the class they run
+            existing_class = getattr(existing, "demodulator_class", type(existing))
+            existing_isolation = getattr(existing, "isolation", ISOLATION_THREAD)
+            # If same type and isolation, check if it's in internal mode
+            if issubclass(existing_class, consumer_class) and existing_isolation == isolation:
                 # Check if existing is an internal demodulator (created by decoder)
                 is_internal = getattr(existing, "internal_mode", False)
                 # Check if we're requesting internal mode
@@ -144,7 +185,7 @@ class ConsumerManager:
                         self._stop_consumer(sdr_id, session_id, storage_key, vfo_number)
             else:
                 # Different type, stop the old one first
-                log_msg = f"Switching from {type(existing).__name__} to {consumer_class.__name__} for session {session_id}"
+                log_msg = f"Switching from {existing_class.__name__} to {consumer_class.__name__} for session {session_id}"
                 if vfo_number is not None:
                     log_msg += f" VFO {vfo_number}"
                 self.logger.info(log_msg)
@@ -169,11 +210,52 @@ class ConsumerManager:
                 if consumer_key_override:
                     subscription_key = f"{subscription_key}:{consumer_key_override}"
 
-            # Subscribe to the broadcaster to get a dedicated queue
-            # Increased maxsize from 3 to 10 for better burst handling on slower CPUs (RPi5)
-            subscriber_queue = iq_broadcaster.subscribe(
-                subscription_key, maxsize=10, session_id_hint=session_id
+            # Subscribe to the broadcaster to get a dedicated queue. Consumers declare their
+            # queue depth and what to drop when they fall behind; the default depth of 10
+            # handles bursts on slower CPUs (RPi5)
+            maxsize = getattr(consumer_class, "iq_queue_maxsize", DEFAULT_IQ_QUEUE_MAXSIZE)
+            policy = getattr(consumer_class, "iq_backpressure_policy", POLICY_DROP_NEWEST)
+            # Channels follow VFO state, so internal demodulators (tuned by a decoder
+            # rather than a VFO) take the wideband stream
+            accepts_channel = (
+                getattr(consumer_class, "accepts_channelized_iq", False)
+                and vfo_number is not None
+                and not kwargs.get("internal_mode", False)
             )
+            if run_batched:
+                # The session's multi-VFO engine owns the (wideband) subscription
+                engine_entry = self._get_multivfo_engine(
+                    process_info, iq_broadcaster, session_id, policy
+                )
+                subscription_key = engine_entry["subscription_key"]
+                subscriber_queue = engine_entry["instance"].iq_queue
+            elif accepts_channel:
+                # Narrowband stream for this VFO from the shared channelizer; a worker
+                # process gets it through the channelizer's shared-memory ring
+                subscriber_queue = iq_broadcaster.subscribe_channel(
+                    subscription_key,
+                    vfo_number,
+                    maxsize=maxsize,
+                    session_id_hint=session_id,
+                    min_sample_rate=consumer_class.channel_min_sample_rate,
+                    policy=policy,
+                    for_process=run_in_process,
+                )
+            elif run_in_process:
+                # Samples reach the worker through the shared-memory ring; only
+                # descriptors are pickled through the queue
+                subscriber_queue = iq_broadcaster.subscribe(
+                    subscription_key,
+                    maxsize=maxsize,
+                    for_process=True,
+                    session_id_hint=session_id,
+                    transport=TRANSPORT_SHM,
+                    policy=policy,
+                )
+            else:
+                subscriber_queue = iq_broadcaster.subscribe(
+                    subscription_key, maxsize=maxsize, session_id_hint=session_id, policy=policy
+                )
 
             # Add vfo_number to kwargs for multi-VFO support
             if vfo_number is not None:
@@ -183,8 +265,13 @@ class ConsumerManager:
             # This allows multiple consumers (transcription, UI, etc.) to receive audio independently
             audio_broadcaster_instance = None
             if storage_key == "demodulators":
-                # Create input queue for the audio broadcaster
-                broadcaster_input_queue: queue_module.Queue = queue_module.Queue(maxsize=10)
+                # Create input queue for the audio broadcaster; a worker process
+                # sends its audio chunks back through a multiprocessing queue
+                broadcaster_input_queue: Union[queue_module.Queue, multiprocessing.Queue] = (
+                    multiprocessing.Queue(maxsize=10)
+                    if run_in_process
+                    else queue_module.Queue(maxsize=10)
+                )
 
                 # Create and start the audio broadcaster
                 audio_broadcaster_instance = AudioBroadcaster(
@@ -202,7 +289,7 @@ class ConsumerManager:
                         # Subscribe the existing global audio_queue to this broadcaster
                         web_audio_key = f"web_audio:{session_id}:vfo{vfo_number}"
                         audio_broadcaster_instance.subscribe_existing_queue(
-                            web_audio_key, global_audio_queue
+                            web_audio_key, global_audio_queue, policy=POLICY_DROP_OLDEST
                         )
                         self.logger.info(
                             f"Subscribed global audio_queue to audio broadcaster for session {session_id} VFO {vfo_number}"
@@ -216,7 +303,16 @@ class ConsumerManager:
                 audio_queue = broadcaster_input_queue
 
             # Create and start the consumer with the subscriber queue
-            consumer = consumer_class(subscriber_queue, audio_queue, session_id, **kwargs)
+            if run_batched:
+                consumer = BatchedVFO(
+                    engine_entry["instance"], consumer_class, audio_queue, session_id, vfo_number
+                )
+            elif run_in_process:
+                consumer = DemodulatorProcess(
+                    consumer_class, subscriber_queue, audio_queue, session_id, **kwargs
+                )
+            else:
+                consumer = consumer_class(subscriber_queue, audio_queue, session_id, **kwargs)
             consumer.start()
 
             # Store reference along with subscription key for cleanup
@@ -231,6 +327,7 @@ class ConsumerManager:
                     "instance": consumer,
                     "subscription_key": subscription_key,
                     "class_name": consumer_class.__name__,
+                    "isolation": isolation,
                     "audio_broadcaster": audio_broadcaster_instance,  # Store audio broadcaster for transcription
                 }
 
@@ -253,6 +350,10 @@ class ConsumerManager:
             )
             if vfo_number is not None:
                 log_msg += f" VFO {vfo_number}"
+            if run_in_process:
+                log_msg += f" in worker process (pid={consumer.pid})"
+            elif run_batched:
+                log_msg += " in the session's multi-VFO demodulator"
             self.logger.info(log_msg)
             return True
 
@@ -261,6 +362,50 @@ class ConsumerManager:
             self.logger.exception(e)
             return False
 
+    def _get_multivfo_engine(self, process_info, iq_broadcaster, session_id, policy):
+        """
+        Get or start the MultiVFODemodulator of a session.
+
+        Returns:
+            dict: {"instance", "subscription_key"} stored in process_info["multivfo_demodulators"]
+        """
+        engines = process_info.setdefault("multivfo_demodulators", {})
+        engine_entry = engines.get(session_id)
+        if engine_entry and engine_entry["instance"].is_alive():
+            return engine_entry
+
+        # The engine mixes all of the session's VFOs out of the wideband block in one
+        # vectorized pass, so it cannot use a single VFO channel
+        subscription_key = f"demod:{session_id}:multivfo"
+        subscriber_queue = iq_broadcaster.subscribe(
+            subscription_key,
+            maxsize=DEFAULT_IQ_QUEUE_MAXSIZE,
+            session_id_hint=session_id,
+            policy=policy,
+        )
+        engine = MultiVFODemodulator(subscriber_queue, session_id)
+        engine.start()
+        engine_entry = {"instance": engine, "subscription_key": subscription_key}
+        engines[session_id] = engine_entry
+        self.logger.info(f"Started multi-VFO demodulator for session {session_id}")
+        return engine_entry
+
+    def _release_multivfo_engine(self, process_info, session_id):
+        """Stop a session's MultiVFODemodulator once it has no VFOs left."""
+        engines = process_info.get("multivfo_demodulators", {})
+        engine_entry = engines.get(session_id)
+        if not engine_entry or engine_entry["instance"].vfo_count():
+            return
+
+        engine = engine_entry["instance"]
+        engine.stop()
+        engine.join(timeout=2.0)
+        iq_broadcaster = process_info.get("iq_broadcaster")
+        if iq_broadcaster:
+            iq_broadcaster.unsubscribe(engine_entry["subscription_key"])
+        del engines[session_id]
+        self.logger.info(f"Stopped multi-VFO demodulator for session {session_id}")
+
     def _stop_consumer(self, sdr_id, session_id, storage_key, vfo_number=None):
         """
         Internal method to stop a consumer. Should be overridden by subclasses.
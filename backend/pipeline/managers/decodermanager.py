@@ -20,10 +20,12 @@ import os
 import signal
 import threading
 import time
+from multiprocessing import resource_tracker
 
 from pipeline.config.decoderconfigservice import decoder_config_service
 from pipeline.registries.decoderregistry import decoder_registry
 from pipeline.registries.demodulatorregistry import demodulator_registry
+from pipeline.streaming.iqbroadcaster import TRANSPORT_SHM
 
 
 class DecoderManager:
@@ -324,8 +326,18 @@ class DecoderManager:
                 # Subscribe to the broadcaster to get a dedicated IQ queue
                 # Use multiprocessing queue for process-based decoders (FSK, BPSK, LoRa, etc.)
                 # Increased maxsize from 3 to 10 for better burst handling on slower CPUs (RPi5)
+                # Samples travel through the broadcaster's shared-memory ring; only small
+                # descriptors are pickled through the queue. These decoders stay on the
+                # wideband stream rather than a channel: they latch the input rate on the
+                # first block and size their filters from it, while a channel's rate
+                # changes with the VFO bandwidth. Each one therefore still copies every
+                # wideband block out of the ring and translates and decimates it itself.
                 iq_queue = iq_broadcaster.subscribe(
-                    subscription_key, maxsize=10, for_process=True, session_id_hint=session_id
+                    subscription_key,
+                    maxsize=10,
+                    for_process=True,
+                    session_id_hint=session_id,
+                    transport=TRANSPORT_SHM,
                 )
 
                 # Resolve decoder configuration using DecoderConfigService
@@ -357,8 +369,11 @@ class DecoderManager:
                 # Add resolved config parameters
                 decoder_kwargs["config"] = decoder_config
 
-                # Create and start the decoder with the IQ queue
+                # Create and start the decoder with the IQ queue. The decoder attaches to
+                # the shared IQ ring and VFO channel; it must inherit a running resource
+                # tracker, or the one it starts itself unlinks both segments when it exits.
                 decoder = decoder_class(iq_queue, data_queue, session_id, **decoder_kwargs)
+                resource_tracker.ensure_running()
                 decoder.start()
 
                 # No verbose debug logging by default
@@ -619,7 +634,9 @@ class DecoderManager:
                     # Get demodulator type name from the instance class
                     from pipeline.registries.demodulatorregistry import demodulator_registry
 
-                    demod_class_name = type(vfo_demod).__name__
+                    demod_class_name = demod_entry[vfo_number].get("class_name") or (
+                        type(vfo_demod).__name__
+                    )
                     demod_type = "UNKNOWN"
                     for demod_name in demodulator_registry.list_demodulators():
                         if (
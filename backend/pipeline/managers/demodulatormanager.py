@@ -15,7 +15,9 @@
 
 
 import logging
+import multiprocessing
 
+from demodulators.demodulatorprocess import ISOLATION_BATCHED, ISOLATION_THREAD
 from pipeline.managers.consumerbase import ConsumerManager
 
 
@@ -24,15 +26,31 @@ class DemodulatorManager(ConsumerManager):
     Manager for demodulator consumers
     """
 
-    def __init__(self, processes):
+    def __init__(self, processes, default_isolation=ISOLATION_THREAD):
         super().__init__(processes)
         self.logger = logging.getLogger("demodulator-manager")
+        # Where demodulators run when start_demodulator() is not told (--demodulator-isolation)
+        self.default_isolation = default_isolation
 
     def start_demodulator(
-        self, sdr_id, session_id, demodulator_class, audio_queue, vfo_number=None, **kwargs
+        self,
+        sdr_id,
+        session_id,
+        demodulator_class,
+        audio_queue,
+        vfo_number=None,
+        isolation=None,
+        **kwargs,
     ):
         """
-        Start a demodulator thread for a specific session and VFO.
+        Start a demodulator for a specific session and VFO.
+
+        By default the demodulator runs as a thread in the server process. With
+        isolation="process" it runs in a worker process (DemodulatorProcess) that
+        reads IQ from the broadcaster's shared-memory ring and sends audio back over
+        a multiprocessing queue, so several VFOs demodulate on separate cores. With
+        isolation="batched" FM and AM VFOs of the session are demodulated together
+        by one MultiVFODemodulator, as rows of shared arrays.
 
         Args:
             sdr_id: Device identifier
@@ -40,6 +58,7 @@ class DemodulatorManager(ConsumerManager):
             demodulator_class: The demodulator class to instantiate (e.g., FMDemodulator, AMDemodulator, SSBDemodulator)
             audio_queue: Queue where demodulated audio will be placed
             vfo_number: VFO number (1-4). If None, uses session_id as key for backward compatibility
+            isolation: "thread", "process" or "batched"; None uses default_isolation
             **kwargs: Additional arguments to pass to the demodulator constructor
 
         Returns:
@@ -53,9 +72,20 @@ class DemodulatorManager(ConsumerManager):
             "demodulators",
             "demod",
             vfo_number=vfo_number,
+            isolation=isolation or self.default_isolation,
             **kwargs,
         )
 
+    def _stop_instance(self, demodulator):
+        """Stop a demodulator thread or worker process and wait for it to exit."""
+        demodulator.stop()
+        demodulator.join(timeout=2.0)  # Wait up to 2 seconds
+        if isinstance(demodulator, multiprocessing.Process) and demodulator.is_alive():
+            # Worker did not exit in time
+            self.logger.warning(f"Terminating unresponsive {demodulator.name}")
+            demodulator.terminate()
+            demodulator.join(timeout=0.5)
+
     def stop_demodulator(self, sdr_id, session_id, vfo_number=None):
         """
         Stop a demodulator thread for a specific session and VFO.
@@ -93,9 +123,8 @@ class DemodulatorManager(ConsumerManager):
                 subscription_key = vfo_entry["subscription_key"]
                 audio_broadcaster = vfo_entry.get("audio_broadcaster")
 
-                demod_name = type(demodulator).__name__
-                demodulator.stop()
-                demodulator.join(timeout=2.0)  # Wait up to 2 seconds
+                demod_name = vfo_entry.get("class_name") or type(demodulator).__name__
+                self._stop_instance(demodulator)
 
                 # Stop audio broadcaster if it exists
                 if audio_broadcaster:
@@ -122,9 +151,12 @@ class DemodulatorManager(ConsumerManager):
                         f"Stopped audio broadcaster for session {session_id} VFO {vfo_number}"
                     )
 
-                # Unsubscribe from the IQ broadcaster
+                # Unsubscribe from the IQ broadcaster; batched VFOs share the
+                # subscription of the session's multi-VFO engine
                 iq_broadcaster = process_info.get("iq_broadcaster")
-                if iq_broadcaster:
+                if vfo_entry.get("isolation") == ISOLATION_BATCHED:
+                    self._release_multivfo_engine(process_info, session_id)
+                elif iq_broadcaster:
                     iq_broadcaster.unsubscribe(subscription_key)
 
                 # Remove from storage
@@ -147,9 +179,8 @@ class DemodulatorManager(ConsumerManager):
                     subscription_key = vfo_entry["subscription_key"]
                     audio_broadcaster = vfo_entry.get("audio_broadcaster")
 
-                    demod_name = type(demodulator).__name__
-                    demodulator.stop()
-                    demodulator.join(timeout=2.0)
+                    demod_name = vfo_entry.get("class_name") or type(demodulator).__name__
+                    self._stop_instance(demodulator)
 
                     # Stop audio broadcaster if it exists
                     if audio_broadcaster:
@@ -170,7 +201,9 @@ class DemodulatorManager(ConsumerManager):
                         ):
                             del process_info["broadcasters"][broadcaster_key]
 
-                    if iq_broadcaster:
+                    if vfo_entry.get("isolation") == ISOLATION_BATCHED:
+                        self._release_multivfo_engine(process_info, session_id)
+                    elif iq_broadcaster:
                         iq_broadcaster.unsubscribe(subscription_key)
 
                     stopped_count += 1
@@ -23,8 +23,12 @@ import numpy as np
 
 from common.constants import DictKeys, QueueMessageTypes, SocketEvents
 from common.sdrconfig import SDRConfig
+from fft.detector import EVENT_SIGNAL_STOP
 from fft.processor import fft_processor_process
+from fft.spectrumview import SpectrumViews
+from fft.waterfallhistory import DEFAULT_HISTORY_BURST_ROWS, WaterfallHistory
 from handlers.entities.filebrowser import emit_file_browser_state
+from pipeline.orchestration.queuebridge import QueueBridge
 from pipeline.streaming.iqbroadcaster import IQBroadcaster
 from vfos.state import VFOManager
 from workers.rtlsdrworker import rtlsdr_worker_process
@@ -271,6 +275,7 @@ class ProcessLifecycleManager:
             for param in [
                 "fft_size",
                 "fft_window",
+                "fft_averaging_mode",
                 "sample_rate",
                 "center_freq",
                 "gain",
@@ -287,23 +292,30 @@ class ProcessLifecycleManager:
                 if param in sdr_config:
                     config[param] = sdr_config[param]
 
+            # The SDR runs the largest FFT any client asked for; smaller ones are derived
+            config["fft_size"] = self._update_fft_sizes(
+                self.processes[sdr_id], client_id, sdr_config.get("fft_size")
+            )
+
             # Send configuration to the process
             self.processes[sdr_id]["config_queue"].put(config)
 
             # Notify all other clients about the configuration change
             other_clients = [c for c in self.processes[sdr_id]["clients"] if c != client_id]
             if other_clients:
-                # Build the full config dict to send to clients
+                # Build the full config dict to send to clients (FFT size stays per client)
                 notification_config = {
                     "center_freq": config.get("center_freq", sdr_config.get("center_freq")),
                     "sample_rate": config.get("sample_rate", sdr_config.get("sample_rate")),
                     "gain": config.get("gain", sdr_config.get("gain")),
-                    "fft_size": config.get("fft_size", sdr_config.get("fft_size")),
                     "fft_window": config.get("fft_window", sdr_config.get("fft_window")),
                     "bias_t": config.get("bias_t", sdr_config.get("bias_t", False)),
                     "tuner_agc": config.get("tuner_agc", sdr_config.get("tuner_agc", False)),
                     "rtl_agc": config.get("rtl_agc", sdr_config.get("rtl_agc", False)),
                     "fft_averaging": sdr_config.get("fft_averaging", 1),
+                    "fft_averaging_mode": config.get(
+                        "fft_averaging_mode", sdr_config.get("fft_averaging_mode")
+                    ),
                 }
                 for other_client in other_clients:
                     await self.sio.emit("sdr-config", notification_config, room=other_client)
@@ -317,6 +329,11 @@ class ProcessLifecycleManager:
                 # Send a message to the UI of the specific client that streaming started
                 await self.sio.emit(SocketEvents.SDR_STATUS, {"streaming": True}, room=client_id)
 
+                # Backfill the waterfall with what the other clients have already seen
+                history = self.processes[sdr_id]["waterfall_history"].get_rows()
+                if history is not None:
+                    await self.sio.emit(SocketEvents.SDR_FFT_HISTORY, history, room=client_id)
+
             return sdr_id
 
         else:
@@ -346,6 +363,7 @@ class ProcessLifecycleManager:
                 rtl_agc=sdr_config.get("rtl_agc", False),
                 fft_window=sdr_config.get("fft_window"),
                 fft_averaging=sdr_config.get("fft_averaging"),
+                fft_averaging_mode=sdr_config.get("fft_averaging_mode"),
                 recording_path=sdr_config.get("recording_path", ""),
                 serial_number=sdr_config.get("serial_number", 0),
                 host=hostname,
@@ -414,13 +432,23 @@ class ProcessLifecycleManager:
                 "stop_event": stop_event,
                 "clients": {client_id},
                 "demodulators": {},  # Will store demodulator threads per session
+                "multivfo_demodulators": {},  # Batched FM/AM engine per session
                 "recorders": {},  # Will store recorder threads per session (separate from demodulators)
                 "decoders": {},  # Will store decoder threads per session (SSTV, AFSK, Morse, etc.)
                 "fft_stats": {},  # Latest stats from FFT processor
+                "spectrum_views": SpectrumViews(),  # Per-client decimated FFT views
+                "waterfall_history": WaterfallHistory(),  # Recent rows for late-joining clients
+                "signal_detection": {"enabled": False},  # Detector settings for the FFT processor
+                "signal_detection_sent": {"enabled": False},
+                "signal_detection_clients": set(),  # Clients receiving detection events
+                "fft_sizes": {},  # FFT size requested by each client
+                "fft_levels": [],  # Pyramid levels the FFT processor should derive
+                "fft_levels_sent": [],  # Levels the FFT processor has been told about
                 "device": sdr_device,  # Store device info for runtime snapshots
             }
 
             # Send initial configuration
+            self._update_fft_sizes(self.processes[sdr_id], client_id, config.get("fft_size"))
             config_queue.put(config)
 
             # Add this client to the room (skip for internal observation sessions)
@@ -451,6 +479,15 @@ class ProcessLifecycleManager:
             if client_id in process_info["clients"]:
                 # Remove client from Socket.IO room
                 process_info["clients"].remove(client_id)
+                process_info["spectrum_views"].remove(client_id)
+                self._drop_signal_detection_client(process_info, client_id)
+
+                # A coarser FFT may now be enough for the remaining clients
+                old_fft_size = max(process_info["fft_sizes"].values(), default=None)
+                process_info["fft_sizes"].pop(client_id, None)
+                new_fft_size = self._update_fft_sizes(process_info)
+                if process_info["clients"] and new_fft_size and new_fft_size != old_fft_size:
+                    process_info["config_queue"].put({"fft_size": new_fft_size})
 
                 # Make a client leave a specific room (skip for internal observation sessions)
                 if not VFOManager.is_internal_session(client_id):
@@ -652,20 +689,26 @@ class ProcessLifecycleManager:
                 except Exception:
                     pass
 
+            # Rows from the old tuning would not line up with the new ones
+            process_info["waterfall_history"].clear()
+
             # Flush data_queue (FFT output to UI) - CRITICAL for fast UI sync!
             # At high sample rates (4-8 MHz), this queue accumulates hundreds of stale FFT messages
-            data_queue = process_info.get("data_queue")
-            if data_queue:
-                flushed_count = 0
-                while not data_queue.empty():
-                    try:
-                        data_queue.get_nowait()
-                        flushed_count += 1
-                    except Exception:
-                        break
+            data_bridge = process_info.get("data_bridge")
+            if data_bridge:
+                flushed_count = data_bridge.discard_pending()
                 if flushed_count > 0:
                     self.logger.info(f"Flushed {flushed_count} stale FFT messages from data_queue")
 
+        # Other clients may want a larger FFT than this one; the SDR runs the largest
+        if config.get("fft_size") and config.get("client_id"):
+            config = {
+                **config,
+                "fft_size": self._update_fft_sizes(
+                    process_info, config["client_id"], config["fft_size"]
+                ),
+            }
+
         # Send configuration to the process
         process_info["config_queue"].put(config)
 
@@ -809,10 +852,276 @@ class ProcessLifecycleManager:
             self.logger.error(f"Error restarting decoder {session_id} VFO{vfo_number}: {e}")
             self.logger.exception(e)
 
+    def set_spectrum_view(self, sdr_id, client_id, width, start=0.0, end=1.0, quantize=False):
+        """
+        Register the display geometry of a client so it receives decimated FFT frames
+
+        Opt-in: clients that never call this (currently including the bundled web UI)
+        keep receiving the full float32 spectrum.
+
+        Args:
+            sdr_id: Device identifier
+            client_id: Client identifier
+            width: Display width in pixels
+            start: Start of the visible span as a fraction of the band
+            end: End of the visible span as a fraction of the band
+            quantize: Send uint8 dB instead of float32
+
+        Returns:
+            The stored SpectrumView, or None if the SDR is not running
+        """
+        process_info = self.processes.get(sdr_id)
+        if process_info is None:
+            return None
+        return process_info["spectrum_views"].set_view(client_id, width, start, end, quantize)
+
+    def clear_spectrum_view(self, sdr_id, client_id):
+        """
+        Return a client to full-resolution FFT frames
+
+        Args:
+            sdr_id: Device identifier
+            client_id: Client identifier
+        """
+        process_info = self.processes.get(sdr_id)
+        if process_info is not None:
+            process_info["spectrum_views"].remove(client_id)
+
+    def get_fft_history(self, sdr_id, before_seq=None, max_rows=DEFAULT_HISTORY_BURST_ROWS):
+        """
+        Fetch stored waterfall rows of an SDR, e.g. when a client scrolls back
+
+        The first request starts the history, so it is empty until frames arrive.
+
+        Args:
+            sdr_id: Device identifier
+            before_seq: Only rows older than this sequence number (default: newest rows)
+            max_rows: Maximum number of rows
+
+        Returns:
+            History payload, or None if the SDR is not running or has no such rows
+        """
+        process_info = self.processes.get(sdr_id)
+        if process_info is None:
+            return None
+        history = process_info["waterfall_history"]
+        history.activate()
+        return history.get_rows(before_seq, max_rows)
+
+    def set_signal_detection(self, sdr_id, client_id, enabled, threshold_db=None):
+        """
+        Subscribe a client to signal detection events of an SDR, or unsubscribe it
+
+        The detector in the FFT processor runs only while at least one client is
+        subscribed, and events go to the subscribed clients only.
+
+        Args:
+            sdr_id: Device identifier
+            client_id: Client identifier
+            enabled: Receive detection events
+            threshold_db: CFAR margin over the local noise floor (optional)
+
+        Returns:
+            The stored detector settings, or None if the SDR is not running
+        """
+        process_info = self.processes.get(sdr_id)
+        if process_info is None:
+            return None
+        clients = process_info["signal_detection_clients"]
+        if enabled:
+            clients.add(client_id)
+        else:
+            clients.discard(client_id)
+
+        settings = {"enabled": bool(clients)}
+        if clients:
+            # The latest threshold wins; the detector is shared by all subscribers
+            if threshold_db is not None:
+                settings["threshold_db"] = float(threshold_db)
+            elif "threshold_db" in process_info["signal_detection"]:
+                settings["threshold_db"] = process_info["signal_detection"]["threshold_db"]
+        process_info["signal_detection"] = settings
+        self._send_signal_detection(process_info)
+        return settings
+
+    def _drop_signal_detection_client(self, process_info, client_id):
+        """
+        Unsubscribe a leaving client and stop the detector if nobody else wants events
+
+        Args:
+            process_info: Process information of the SDR
+            client_id: Client identifier
+        """
+        clients = process_info["signal_detection_clients"]
+        if client_id not in clients:
+            return
+        clients.discard(client_id)
+        if not clients:
+            process_info["signal_detection"] = {"enabled": False}
+            self._send_signal_detection(process_info)
+
+    def _send_signal_detection(self, process_info):
+        """
+        Send changed detector settings in-band on the FFT IQ queue (retried with the next frame)
+
+        Args:
+            process_info: Process information of the SDR
+        """
+        settings = process_info["signal_detection"]
+        if settings == process_info["signal_detection_sent"]:
+            return
+        try:
+            process_info["iq_queue_fft"].put_nowait(
+                {
+                    "samples": np.array([], dtype=np.complex64),
+                    "center_freq": 0,
+                    "sample_rate": None,
+                    "timestamp": 0,
+                    "config": {"signal_detection": dict(settings)},
+                }
+            )
+            process_info["signal_detection_sent"] = dict(settings)
+        except Exception:
+            pass
+
+    def _annotate_recordings(self, process_info, detections):
+        """
+        Add finished detections to the SigMF annotations of active IQ recordings
+
+        Args:
+            process_info: Process information of the SDR
+            detections: Detector events (only stop events carry a full time span)
+        """
+        stopped = [d for d in detections if d.get("event") == EVENT_SIGNAL_STOP]
+        if not stopped:
+            return
+        for recorder_entry in process_info.get("recorders", {}).values():
+            recorder = (
+                recorder_entry.get("instance")
+                if isinstance(recorder_entry, dict)
+                else recorder_entry
+            )
+            if not hasattr(recorder, "annotate_detection"):
+                continue
+            for detection in stopped:
+                try:
+                    recorder.annotate_detection(detection)
+                except Exception as e:
+                    self.logger.error(f"Failed to annotate detected signal: {e}")
+
+    def _update_fft_sizes(self, process_info, client_id=None, fft_size=None):
+        """
+        Track the FFT size each client asked for
+
+        The FFT processor computes the largest size once and derives the smaller
+        ones as pyramid levels, so clients with different RBW settings share it.
+
+        Args:
+            process_info: Process information of the SDR
+            client_id: Client whose size changed (optional)
+            fft_size: FFT size the client asked for (optional)
+
+        Returns:
+            FFT size the SDR should run, or fft_size if no client asked for one
+        """
+        fft_sizes = process_info["fft_sizes"]
+        if client_id is not None and fft_size:
+            fft_sizes[client_id] = int(fft_size)
+
+        sizes = sorted(set(fft_sizes.values()), reverse=True)
+        process_info["fft_levels"] = sizes[1:]
+        self._send_fft_levels(process_info)
+        return sizes[0] if sizes else fft_size
+
+    def _send_fft_levels(self, process_info):
+        """
+        Tell the FFT processor which pyramid levels to derive
+
+        The request travels in-band on the FFT IQ queue like the averager reset. If
+        the queue is full it is retried with the next FFT frame.
+
+        Args:
+            process_info: Process information of the SDR
+        """
+        levels = process_info["fft_levels"]
+        if levels == process_info["fft_levels_sent"]:
+            return
+        try:
+            process_info["iq_queue_fft"].put_nowait(
+                {
+                    "samples": np.array([], dtype=np.complex64),
+                    "center_freq": 0,
+                    "sample_rate": None,
+                    "timestamp": 0,
+                    "config": {"fft_levels": list(levels)},
+                }
+            )
+            process_info["fft_levels_sent"] = list(levels)
+        except Exception:
+            pass
+
+    async def _emit_fft_data(self, process_info, sdr_id, fft_payload, levels=None):
+        """
+        Send an FFT frame to the SDR room
+
+        Clients that asked for a smaller FFT size get the matching pyramid level,
+        clients that registered a spectrum view get their own decimated frame and
+        everyone else gets the full spectrum.
+
+        Args:
+            process_info: Process information of the SDR
+            sdr_id: Device identifier
+            fft_payload: Payload with the full float32 spectrum in "data"
+            levels: Coarser spectra keyed by FFT size (optional)
+        """
+        self._send_fft_levels(process_info)
+        self._send_signal_detection(process_info)
+        history = process_info["waterfall_history"]
+        if history.active:
+            history.append(fft_payload["data"])
+
+        spectrum_views = process_info["spectrum_views"]
+        fft_sizes = process_info["fft_sizes"]
+        levels = levels or {}
+
+        # Clients that cannot share the plain room broadcast, grouped by level
+        by_level = {}
+        for client_id in process_info["clients"]:
+            if VFOManager.is_internal_session(client_id):
+                continue
+            level = fft_sizes.get(client_id) if fft_sizes.get(client_id) in levels else None
+            if level is not None or spectrum_views.get_view(client_id) is not None:
+                by_level.setdefault(level, []).append(client_id)
+
+        if not by_level:
+            await self.sio.emit(SocketEvents.SDR_FFT_DATA, fft_payload, room=sdr_id)
+            return
+
+        await self.sio.emit(
+            SocketEvents.SDR_FFT_DATA,
+            fft_payload,
+            room=sdr_id,
+            skip_sid=[c for client_ids in by_level.values() for c in client_ids],
+        )
+        for level, client_ids in by_level.items():
+            level_payload = fft_payload if level is None else {**fft_payload, "data": levels[level]}
+            for client_id in client_ids:
+                if spectrum_views.get_view(client_id) is None:
+                    await self.sio.emit(SocketEvents.SDR_FFT_DATA, level_payload, room=client_id)
+            for view_fields, view_clients in spectrum_views.render(
+                level_payload["data"], client_ids
+            ):
+                view_payload = {**level_payload, **view_fields}
+                for client_id in view_clients:
+                    await self.sio.emit(SocketEvents.SDR_FFT_DATA, view_payload, room=client_id)
+
     async def _monitor_data_queue(self, sdr_id):
         """
         Monitor the data queue for a specific device
 
+        Messages are drained by a QueueBridge reader thread and dispatched here in
+        batches as they arrive.
+
         Args:
             sdr_id: Device identifier
         """
@@ -820,201 +1129,34 @@ class ProcessLifecycleManager:
             return
 
         process_info = self.processes[sdr_id]
-        data_queue = process_info["data_queue"]
+        bridge = QueueBridge(
+            process_info["data_queue"],
+            name=f"data-{sdr_id}",
+            type_key=DictKeys.TYPE,
+            keep_running=lambda: sdr_id in self.processes and process_info["process"].is_alive(),
+        )
+        process_info["data_bridge"] = bridge
+
+        def bind(handler):
+            return lambda data: handler(sdr_id, process_info, data)
+
+        bridge.register(QueueMessageTypes.FFT_DATA, bind(self._on_fft_data))
+        bridge.register(QueueMessageTypes.SIGNAL_DETECTION, bind(self._on_signal_detection))
+        bridge.register("stats", bind(self._on_stats))
+        bridge.register(QueueMessageTypes.STREAMING_START, bind(self._on_streaming_start))
+        bridge.register(QueueMessageTypes.CONFIG_ERROR, bind(self._on_config_error))
+        bridge.register(QueueMessageTypes.ERROR, bind(self._on_error))
+        bridge.register(QueueMessageTypes.TERMINATED, bind(self._on_terminated))
+        bridge.register("decoder-restart-request", bind(self._on_decoder_restart_request))
+        bridge.register(
+            ["decoder-status", "decoder-progress", "decoder-output", "decoder-stats"],
+            bind(self._on_decoder_message),
+        )
 
         self.logger.info(f"Started monitoring data queue for device {sdr_id}")
 
         try:
-            while sdr_id in self.processes and process_info["process"].is_alive():
-                # Check if data is available
-                if not data_queue.empty():
-                    try:
-                        # Get data from the queue
-                        data = data_queue.get()
-
-                        # Process data based on type
-                        data_type = data.get(DictKeys.TYPE)
-                        client_id = data.get(DictKeys.CLIENT_ID)
-
-                        if data_type == QueueMessageTypes.FFT_DATA:
-                            # Send FFT data to all clients connected to this SDR
-                            # Include playback timing info if present (for playback mode)
-                            fft_payload = {
-                                "data": data[DictKeys.DATA],
-                            }
-                            if "recording_datetime" in data:
-                                fft_payload["recording_datetime"] = data["recording_datetime"]
-                            if "playback_elapsed_seconds" in data:
-                                fft_payload["playback_elapsed_seconds"] = data[
-                                    "playback_elapsed_seconds"
-                                ]
-                            if "playback_remaining_seconds" in data:
-                                fft_payload["playback_remaining_seconds"] = data[
-                                    "playback_remaining_seconds"
-                                ]
-                            if "playback_total_seconds" in data:
-                                fft_payload["playback_total_seconds"] = data[
-                                    "playback_total_seconds"
-                                ]
-
-                            await self.sio.emit(SocketEvents.SDR_FFT_DATA, fft_payload, room=sdr_id)
-
-                        elif data_type == "stats":
-                            # Store stats for performance monitoring
-                            # Check if it's FFT stats or worker stats based on presence of sdr_id
-                            if "sdr_id" in data:
-                                # Worker process stats
-                                process_info["worker_stats"] = data.get("stats", {})
-                            else:
-                                # FFT processor stats
-                                process_info["fft_stats"] = data.get("stats", {})
-
-                        elif data_type == QueueMessageTypes.STREAMING_START:
-                            # Send streaming status to all clients connected to this SDR
-                            await self.sio.emit(
-                                SocketEvents.SDR_STATUS, {"streaming": True}, room=sdr_id
-                            )
-
-                        elif data_type == QueueMessageTypes.CONFIG_ERROR:
-                            # Send config error to all clients connected to this SDR
-                            await self.sio.emit(
-                                SocketEvents.SDR_CONFIG_ERROR,
-                                {DictKeys.MESSAGE: f"SDR error: {data[DictKeys.MESSAGE]}"},
-                                room=sdr_id,
-                            )
-                            self.logger.error(
-                                f"Config error from SDR process: {data[DictKeys.MESSAGE]}"
-                            )
-
-                        elif data_type == QueueMessageTypes.ERROR:
-                            # Send error to all clients connected to this SDR
-                            await self.sio.emit(
-                                SocketEvents.SDR_ERROR,
-                                {DictKeys.MESSAGE: f"SDR error: {data[DictKeys.MESSAGE]}"},
-                                room=sdr_id,
-                            )
-                            self.logger.error(f"Error from SDR process: {data[DictKeys.MESSAGE]}")
-
-                        elif data_type == QueueMessageTypes.TERMINATED:
-                            # Process has terminated
-                            self.logger.info(f"SDR process for device {sdr_id} has terminated")
-
-                            # Notify all clients
-                            for client_id in process_info["clients"]:
-                                await self.sio.emit(
-                                    SocketEvents.SDR_STATUS, {"streaming": False}, room=sdr_id
-                                )
-
-                            # Don't delete process info here - let the finally block handle cleanup
-                            # This ensures stop_sdr_process() can still kill the process if needed
-                            # Process info will be deleted in stop_sdr_process() after proper cleanup
-
-                            # Exit the loop
-                            break
-
-                        elif data_type == "decoder-restart-request":
-                            # Decoder has requested restart (e.g., SHM threshold exceeded)
-                            session_id = data.get("session_id")
-                            vfo_number = data.get("vfo")
-                            reason = data.get("reason", "unknown")
-                            shm_count = data.get("shm_count", "unknown")
-
-                            if session_id and vfo_number is not None:
-                                self.logger.warning(
-                                    f"Decoder {session_id} VFO{vfo_number} requests restart: {reason} "
-                                    f"(SHM segments: {shm_count})"
-                                )
-
-                                # Mark restart-in-progress to avoid duplicate restart triggers
-                                try:
-                                    decoders = process_info.get("decoders", {})
-                                    if (
-                                        session_id in decoders
-                                        and vfo_number in decoders[session_id]
-                                    ):
-                                        decoders[session_id][vfo_number][
-                                            "restart_in_progress"
-                                        ] = True
-                                except Exception:
-                                    pass
-
-                                # Restart the decoder asynchronously without blocking the queue monitor
-                                asyncio.create_task(
-                                    self._restart_decoder_async(
-                                        sdr_id, session_id, vfo_number, reason
-                                    )
-                                )
-                            else:
-                                self.logger.error(
-                                    f"Decoder restart request missing session_id or vfo: {data}"
-                                )
-
-                        elif data_type in [
-                            "decoder-status",
-                            "decoder-progress",
-                            "decoder-output",
-                            "decoder-stats",
-                        ]:
-                            # Decoder messages (SSTV, AFSK, Morse, GMSK, etc.)
-                            session_id = data.get("session_id")
-                            if session_id:
-                                # Store performance stats for PerformanceMonitor (decoder-stats only)
-                                if data_type == "decoder-stats" and "perf_stats" in data:
-                                    vfo = data.get("vfo")
-                                    if vfo is not None:
-                                        # Store stats in process_info for PerformanceMonitor to access
-                                        if "decoders" in process_info:
-                                            if session_id in process_info["decoders"]:
-                                                if vfo in process_info["decoders"][session_id]:
-                                                    entry = process_info["decoders"][session_id][
-                                                        vfo
-                                                    ]
-                                                    # Revert to unconditional store of perf_stats (remove newer-only guard and warnings)
-                                                    entry["stats"] = data["perf_stats"]
-                                                    # Ensure no leftover timestamp field is kept/used
-                                                    if "stats_timestamp" in entry:
-                                                        del entry["stats_timestamp"]
-                                    # Don't emit decoder-stats to UI - only used internally by PerformanceMonitor
-                                    # UI receives aggregated performance data via 'performance-metrics' events
-                                    continue
-
-                                # Check if this is an internal session (automated observation)
-                                is_internal = VFOManager.is_internal_session(session_id)
-
-                                if is_internal:
-                                    # Broadcast internal session decoder events to all clients
-                                    await self.sio.emit(SocketEvents.DECODER_DATA, data)
-                                else:
-                                    # Send to specific session only (user sessions)
-                                    await self.sio.emit(
-                                        SocketEvents.DECODER_DATA, data, room=session_id
-                                    )
-
-                                # If decoder output was saved, emit file browser state update
-                                if data_type == "decoder-output" and "output" in data:
-                                    output = data["output"]
-                                    if "filepath" in output:
-                                        await emit_file_browser_state(
-                                            self.sio,
-                                            {
-                                                "action": "decoded-saved",
-                                                "decoder_type": data.get("decoder_type"),
-                                                "filepath": output["filepath"],
-                                                "filename": output.get("filename"),
-                                            },
-                                            self.logger,
-                                        )
-                            else:
-                                self.logger.warning(
-                                    f"Decoder message missing session_id: {data_type}"
-                                )
-
-                    except Exception as e:
-                        self.logger.error(f"Error processing data from SDR process: {str(e)}")
-                        self.logger.exception(e)
-                else:
-                    # Short sleep to avoid CPU hogging
-                    await asyncio.sleep(0.05)
+            await bridge.run()
 
         except Exception as e:
             self.logger.error(f"Error monitoring data queue for device {sdr_id}: {str(e)}")
@@ -1025,3 +1167,143 @@ class ProcessLifecycleManager:
             # Make sure the process is cleaned up
             if sdr_id in self.processes:
                 await self.stop_sdr_process(sdr_id)
+
+    async def _on_fft_data(self, sdr_id, process_info, data):
+        # Send FFT data to all clients connected to this SDR
+        # Include playback timing info if present (for playback mode)
+        fft_payload = {
+            "data": data[DictKeys.DATA],
+        }
+        for key in (
+            "recording_datetime",
+            "playback_elapsed_seconds",
+            "playback_remaining_seconds",
+            "playback_total_seconds",
+        ):
+            if key in data:
+                fft_payload[key] = data[key]
+
+        await self._emit_fft_data(process_info, sdr_id, fft_payload, data.get("levels"))
+
+    async def _on_signal_detection(self, sdr_id, process_info, data):
+        detections = data.get("detections", [])
+        self._annotate_recordings(process_info, detections)
+        for client_id in list(process_info["signal_detection_clients"]):
+            await self.sio.emit(
+                SocketEvents.SDR_SIGNAL_DETECTION,
+                {"sdr_id": sdr_id, "detections": detections},
+                room=client_id,
+            )
+
+    def _on_stats(self, sdr_id, process_info, data):
+        # Store stats for performance monitoring
+        # Check if it's FFT stats or worker stats based on presence of sdr_id
+        if "sdr_id" in data:
+            # Worker process stats
+            process_info["worker_stats"] = data.get("stats", {})
+        else:
+            # FFT processor stats
+            process_info["fft_stats"] = data.get("stats", {})
+
+    async def _on_streaming_start(self, sdr_id, process_info, data):
+        # Send streaming status to all clients connected to this SDR
+        await self.sio.emit(SocketEvents.SDR_STATUS, {"streaming": True}, room=sdr_id)
+
+    async def _on_config_error(self, sdr_id, process_info, data):
+        # Send config error to all clients connected to this SDR
+        await self.sio.emit(
+            SocketEvents.SDR_CONFIG_ERROR,
+            {DictKeys.MESSAGE: f"SDR error: {data[DictKeys.MESSAGE]}"},
+            room=sdr_id,
+        )
+        self.logger.error(f"Config error from SDR process: {data[DictKeys.MESSAGE]}")
+
+    async def _on_error(self, sdr_id, process_info, data):
+        # Send error to all clients connected to this SDR
+        await self.sio.emit(
+            SocketEvents.SDR_ERROR,
+            {DictKeys.MESSAGE: f"SDR error: {data[DictKeys.MESSAGE]}"},
+            room=sdr_id,
+        )
+        self.logger.error(f"Error from SDR process: {data[DictKeys.MESSAGE]}")
+
+    async def _on_terminated(self, sdr_id, process_info, data):
+        # Process has terminated
+        self.logger.info(f"SDR process for device {sdr_id} has terminated")
+
+        # Notify all clients
+        await self.sio.emit(SocketEvents.SDR_STATUS, {"streaming": False}, room=sdr_id)
+
+        # Don't delete process info here - let _monitor_data_queue's cleanup handle it
+        # This ensures stop_sdr_process() can still kill the process if needed
+        process_info["data_bridge"].stop()
+
+    def _on_decoder_restart_request(self, sdr_id, process_info, data):
+        # Decoder has requested restart (e.g., SHM threshold exceeded)
+        session_id = data.get("session_id")
+        vfo_number = data.get("vfo")
+        reason = data.get("reason", "unknown")
+        shm_count = data.get("shm_count", "unknown")
+
+        if session_id and vfo_number is not None:
+            self.logger.warning(
+                f"Decoder {session_id} VFO{vfo_number} requests restart: {reason} "
+                f"(SHM segments: {shm_count})"
+            )
+
+            # Mark restart-in-progress to avoid duplicate restart triggers
+            try:
+                decoders = process_info.get("decoders", {})
+                if session_id in decoders and vfo_number in decoders[session_id]:
+                    decoders[session_id][vfo_number]["restart_in_progress"] = True
+            except Exception:
+                pass
+
+            # Restart the decoder asynchronously without blocking the queue monitor
+            asyncio.create_task(self._restart_decoder_async(sdr_id, session_id, vfo_number, reason))
+        else:
+            self.logger.error(f"Decoder restart request missing session_id or vfo: {data}")
+
+    async def _on_decoder_message(self, sdr_id, process_info, data):
+        # Decoder messages (SSTV, AFSK, Morse, GMSK, etc.)
+        data_type = data.get(DictKeys.TYPE)
+        session_id = data.get("session_id")
+        if not session_id:
+            self.logger.warning(f"Decoder message missing session_id: {data_type}")
+            return
+
+        if data_type == "decoder-stats":
+            # Store performance stats for PerformanceMonitor
+            vfo = data.get("vfo")
+            if "perf_stats" in data and vfo is not None:
+                entry = process_info.get("decoders", {}).get(session_id, {}).get(vfo)
+                if entry is not None:
+                    entry["stats"] = data["perf_stats"]
+                    # Ensure no leftover timestamp field is kept/used
+                    entry.pop("stats_timestamp", None)
+            # Don't emit decoder-stats to UI - only used internally by PerformanceMonitor
+            # UI receives aggregated performance data via 'performance-metrics' events
+            return
+
+        # Check if this is an internal session (automated observation)
+        if VFOManager.is_internal_session(session_id):
+            # Broadcast internal session decoder events to all clients
+            await self.sio.emit(SocketEvents.DECODER_DATA, data)
+        else:
+            # Send to specific session only (user sessions)
+            await self.sio.emit(SocketEvents.DECODER_DATA, data, room=session_id)
+
+        # If decoder output was saved, emit file browser state update
+        if data_type == "decoder-output" and "output" in data:
+            output = data["output"]
+            if "filepath" in output:
+                await emit_file_browser_state(
+                    self.sio,
+                    {
+                        "action": "decoded-saved",
+                        "decoder_type": data.get("decoder_type"),
+                        "filepath": output["filepath"],
+                        "filename": output.get("filename"),
+                    },
+                    self.logger,
+                )
@@ -20,6 +20,7 @@ import signal
 from typing import Any, Dict, List, Optional
 
 from common.constants import SocketEvents
+from fft.waterfallhistory import DEFAULT_HISTORY_BURST_ROWS
 from monitoring.performancemonitor import PerformanceMonitor
 from pipeline.managers.audiorecordermanager import AudioRecorderManager
 from pipeline.managers.decodermanager import DecoderManager
@@ -220,6 +221,65 @@ class ProcessManager:
         """
         await self.lifecycle_manager.update_configuration(sdr_id, config)
 
+    def set_spectrum_view(self, sdr_id, client_id, width, start=0.0, end=1.0, quantize=False):
+        """
+        Register the display geometry of a client (delegates to lifecycle manager)
+
+        Args:
+            sdr_id: Device identifier
+            client_id: Client identifier
+            width: Display width in pixels
+            start: Start of the visible span as a fraction of the band
+            end: End of the visible span as a fraction of the band
+            quantize: Send uint8 dB instead of float32
+
+        Returns:
+            The stored SpectrumView, or None if the SDR is not running
+        """
+        return self.lifecycle_manager.set_spectrum_view(
+            sdr_id, client_id, width, start, end, quantize
+        )
+
+    def clear_spectrum_view(self, sdr_id, client_id):
+        """
+        Return a client to full-resolution FFT frames (delegates to lifecycle manager)
+
+        Args:
+            sdr_id: Device identifier
+            client_id: Client identifier
+        """
+        self.lifecycle_manager.clear_spectrum_view(sdr_id, client_id)
+
+    def get_fft_history(self, sdr_id, before_seq=None, max_rows=DEFAULT_HISTORY_BURST_ROWS):
+        """
+        Fetch stored waterfall rows of an SDR (delegates to lifecycle manager)
+
+        Args:
+            sdr_id: Device identifier
+            before_seq: Only rows older than this sequence number (default: newest rows)
+            max_rows: Maximum number of rows
+
+        Returns:
+            History payload, or None if the SDR is not running or has no such rows
+        """
+        return self.lifecycle_manager.get_fft_history(sdr_id, before_seq, max_rows)
+
+    def set_signal_detection(self, sdr_id, client_id, enabled, threshold_db=None):
+        """
+        Subscribe a client to signal detection events or unsubscribe it (delegates to
+        lifecycle manager)
+
+        Args:
+            sdr_id: Device identifier
+            client_id: Client identifier
+            enabled: Receive detection events
+            threshold_db: CFAR margin over the local noise floor (optional)
+
+        Returns:
+            The stored detector settings, or None if the SDR is not running
+        """
+        return self.lifecycle_manager.set_signal_detection(sdr_id, client_id, enabled, threshold_db)
+
     def is_sdr_process_running(self, sdr_id):
         """
         Check if an SDR process exists and is running
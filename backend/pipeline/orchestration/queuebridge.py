@@ -0,0 +1,276 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Bridge from a process queue into the asyncio event loop.
+
+A reader thread blocks on the queue, drains whatever else is waiting into a
+batch and hands the batch to the loop with call_soon_threadsafe. The loop side
+dispatches messages in order to handlers registered per message type, so a
+message is handled as soon as it arrives instead of on the next poll tick, and a
+burst from several producers is handled in one wakeup.
+
+At most max_pending_batches batches wait in the loop; beyond that the reader
+stops draining and the process queue applies its own backpressure.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+# Messages handed to the loop per wakeup
+DEFAULT_MAX_BATCH = 64
+# Batches waiting in the loop before the reader stops draining
+DEFAULT_MAX_PENDING_BATCHES = 4
+# How often the reader re-checks stop and keep_running while the queue is idle
+DEFAULT_POLL_TIMEOUT = 0.5
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+
+class QueueBridge:
+    """
+    Drains a multiprocessing (or thread) queue into per-type asyncio handlers.
+    """
+
+    def __init__(
+        self,
+        source_queue,
+        name: str,
+        type_key: str = "type",
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_pending_batches: int = DEFAULT_MAX_PENDING_BATCHES,
+        keep_running: Optional[Callable[[], bool]] = None,
+        poll_timeout: float = DEFAULT_POLL_TIMEOUT,
+    ):
+        """
+        Initialize the bridge.
+
+        Args:
+            source_queue: Queue to drain (needs get(timeout=...) and get_nowait())
+            name: Name used for the reader thread and in logs
+            type_key: Message key the handler is selected by
+            max_batch: Maximum messages handed to the loop per wakeup
+            max_pending_batches: Batches allowed to wait in the loop
+            keep_running: Checked by the reader while idle; the bridge ends when it returns False
+            poll_timeout: Seconds the reader blocks before re-checking stop/keep_running
+        """
+        self.logger = logging.getLogger("queue-bridge")
+        self.source_queue = source_queue
+        self.name = name
+        self.type_key = type_key
+        self.max_batch = max(1, int(max_batch))
+        self.keep_running = keep_running
+        self.poll_timeout = poll_timeout
+
+        self._handlers: Dict[Any, Handler] = {}
+        self._default_handler: Optional[Handler] = None
+        self._pending_slots = threading.Semaphore(max(1, int(max_pending_batches)))
+        self._stop_event = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batches: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats: Dict[str, Any] = {
+            "messages": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "unhandled": 0,
+            "handler_errors": 0,
+            "last_dispatch_ms": 0.0,
+            "by_type": {},
+        }
+
+    def register(self, message_types: Union[Any, Iterable[Any]], handler: Handler) -> None:
+        """
+        Route messages of one or more types to a handler.
+
+        Args:
+            message_types: Value of type_key, or a list/tuple/set of values
+            handler: Called with the message; may be a coroutine function
+        """
+        if isinstance(message_types, (list, tuple, set, frozenset)):
+            for message_type in message_types:
+                self._handlers[message_type] = handler
+        else:
+            self._handlers[message_types] = handler
+
+    def set_default_handler(self, handler: Optional[Handler]) -> None:
+        """Handler for messages whose type has no registered handler."""
+        self._default_handler = handler
+
+    def stop(self) -> None:
+        """
+        End the bridge. Safe to call from a handler; messages after the current one
+        are not dispatched.
+        """
+        self._stop_event.set()
+        if self._loop is not None and self._batches is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._batches.put_nowait, None)
+            except RuntimeError:
+                # Loop already closed
+                pass
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def discard_pending(self) -> int:
+        """
+        Drop messages waiting in the source queue and in the loop (e.g. stale FFT
+        frames after a retune). Call from the event loop thread.
+
+        Returns:
+            Number of messages dropped
+        """
+        dropped = 0
+        if self._batches is not None:
+            kept = []
+            while not self._batches.empty():
+                batch = self._batches.get_nowait()
+                if batch is None:
+                    kept.append(batch)
+                    continue
+                dropped += len(batch)
+                self._pending_slots.release()
+            for batch in kept:
+                self._batches.put_nowait(batch)
+
+        while True:
+            try:
+                self.source_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            dropped += 1
+        return dropped
+
+    async def run(self) -> None:
+        """
+        Start the reader thread and dispatch batches until the bridge stops.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._batches = asyncio.Queue()
+        self._thread = threading.Thread(
+            target=self._reader, name=f"QueueBridge-{self.name}", daemon=True
+        )
+        self._thread.start()
+        self.logger.debug(f"Queue bridge '{self.name}' started")
+
+        try:
+            while not self._stop_event.is_set():
+                batch = await self._batches.get()
+                if batch is None:
+                    break
+                try:
+                    await self._dispatch(batch)
+                finally:
+                    self._pending_slots.release()
+        finally:
+            self._stop_event.set()
+            self.logger.debug(f"Queue bridge '{self.name}' stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of throughput and queue-depth metrics."""
+        pending = self._batches.qsize() if self._batches is not None else 0
+        return {**self.stats, "pending_batches": pending, "by_type": dict(self.stats["by_type"])}
+
+    async def _dispatch(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        by_type = self.stats["by_type"]
+        for message in batch:
+            if self._stop_event.is_set():
+                break
+            message_type = message.get(self.type_key) if isinstance(message, dict) else None
+            by_type[message_type] = by_type.get(message_type, 0) + 1
+            handler = self._handlers.get(message_type, self._default_handler)
+            if handler is None:
+                self.stats["unhandled"] += 1
+                continue
+            try:
+                result = handler(message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                self.logger.error(f"Error handling {message_type} message from {self.name}: {e}")
+                self.logger.exception(e)
+        self.stats["last_dispatch_ms"] = (time.perf_counter() - started) * 1000.0
+
+    def _should_continue(self) -> bool:
+        if self._stop_event.is_set():
+            return False
+        if self.keep_running is None:
+            return True
+        try:
+            return bool(self.keep_running())
+        except Exception:
+            return False
+
+    def _queue_depth(self) -> int:
+        try:
+            return int(self.source_queue.qsize())
+        except (NotImplementedError, OSError, ValueError):
+            # multiprocessing.Queue.qsize() is not available on macOS
+            return 0
+
+    def _reader(self) -> None:
+        """Reader thread: block for one message, drain the rest, hand the batch over."""
+        try:
+            while self._should_continue():
+                if not self._pending_slots.acquire(timeout=self.poll_timeout):
+                    continue
+                try:
+                    first = self.source_queue.get(timeout=self.poll_timeout)
+                except queue.Empty:
+                    self._pending_slots.release()
+                    continue
+
+                batch = [first]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self.source_queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                depth = self._queue_depth()
+                self.stats["messages"] += len(batch)
+                self.stats["batches"] += 1
+                self.stats["last_batch_size"] = len(batch)
+                self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+                self.stats["queue_depth"] = depth
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], depth)
+
+                if not self._post(batch):
+                    return
+        except (OSError, ValueError, EOFError) as e:
+            # Queue closed under us
+            self.logger.debug(f"Queue bridge '{self.name}' source closed: {e}")
+        finally:
+            self._post(None)
+
+    def _post(self, batch: Optional[List[Dict[str, Any]]]) -> bool:
+        try:
+            self._loop.call_soon_threadsafe(self._batches.put_nowait, batch)
+            return True
+        except RuntimeError:
+            # Loop closed
+            return False
@@ -0,0 +1,296 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Backpressure policies for broadcaster subscriber queues.
+
+What should happen when a subscriber cannot keep up depends on the subscriber:
+
+- drop_newest: discard the new message (historical behaviour)
+- drop_oldest: evict the oldest queued message to make room; live audio stays
+  current instead of playing stale chunks
+- block: wait up to a timeout for room; recorders stay lossless under short
+  stalls. The wait happens in a BlockingFeeder thread of the subscriber's own,
+  so it never delays the broadcaster or other subscribers
+- coalesce: replace everything queued with the new message; displays only ever
+  render the newest frame
+
+Lag is reported as queue depth in milliseconds of signal.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+from pipeline.streaming.iqformat import num_iq_samples
+
+POLICY_DROP_NEWEST = "drop_newest"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_BLOCK = "block"
+POLICY_COALESCE = "coalesce"
+
+BACKPRESSURE_POLICIES = (POLICY_DROP_NEWEST, POLICY_DROP_OLDEST, POLICY_BLOCK, POLICY_COALESCE)
+
+# Maximum time a POLICY_BLOCK subscriber's feeder waits for room in its queue
+DEFAULT_BLOCK_TIMEOUT = 0.5
+
+# Messages a BlockingFeeder holds while its subscriber is stalled
+DEFAULT_FEEDER_DEPTH = 50
+
+# Audio chunks do not carry their rate; demodulators output 44.1 kHz
+DEFAULT_AUDIO_SAMPLE_RATE = 44100
+
+
+def validate_policy(policy: str) -> str:
+    """
+    Check a backpressure policy name.
+
+    Args:
+        policy: Policy name
+
+    Returns:
+        The policy name
+
+    Raises:
+        ValueError: If the policy is unknown
+    """
+    if policy not in BACKPRESSURE_POLICIES:
+        raise ValueError(f"Unknown backpressure policy: {policy}")
+    return policy
+
+
+def _evict(target_queue, limit: Optional[int] = None) -> List[Any]:
+    evicted: List[Any] = []
+    while limit is None or len(evicted) < limit:
+        try:
+            evicted.append(target_queue.get_nowait())
+        except queue.Empty:
+            break
+    return evicted
+
+
+def deliver(
+    target_queue,
+    message: Any,
+    policy: str = POLICY_DROP_NEWEST,
+    block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+) -> Tuple[bool, List[Any]]:
+    """
+    Put a message on a subscriber queue according to its backpressure policy.
+
+    Works with both queue.Queue and multiprocessing.Queue.
+
+    Args:
+        target_queue: Subscriber queue
+        message: Message to deliver
+        policy: One of BACKPRESSURE_POLICIES
+        block_timeout: Maximum wait for POLICY_BLOCK, in seconds
+
+    Returns:
+        Tuple of (delivered, evicted): whether the new message was queued, and
+        the previously queued messages that were discarded to make room
+
+    Raises:
+        Exception: Queue errors other than queue.Full are propagated
+    """
+    if policy == POLICY_BLOCK:
+        try:
+            target_queue.put(message, block=True, timeout=block_timeout)
+            return True, []
+        except queue.Full:
+            return False, []
+
+    if policy == POLICY_COALESCE:
+        evicted = _evict(target_queue)
+        try:
+            target_queue.put_nowait(message)
+            return True, evicted
+        except queue.Full:
+            return False, evicted
+
+    try:
+        target_queue.put_nowait(message)
+        return True, []
+    except queue.Full:
+        if policy != POLICY_DROP_OLDEST:
+            return False, []
+
+    # POLICY_DROP_OLDEST: make room, retrying in case a consumer raced us
+    evicted = []
+    for _ in range(3):
+        evicted.extend(_evict(target_queue, limit=1))
+        try:
+            target_queue.put_nowait(message)
+            return True, evicted
+        except queue.Full:
+            continue
+    return False, evicted
+
+
+class BlockingFeeder(threading.Thread):
+    """
+    Delivers messages to one POLICY_BLOCK subscriber from a thread of its own.
+
+    The broadcaster hands messages over with submit(), which never waits; only
+    this thread waits for room in the subscriber's queue. A message is dropped
+    when the hand-over queue is full or when the subscriber stays full for
+    block_timeout.
+    """
+
+    def __init__(
+        self,
+        target_queue,
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+        depth: int = DEFAULT_FEEDER_DEPTH,
+        on_result: Optional[Callable[[bool, Any], None]] = None,
+        name: str = "blocking-feeder",
+    ):
+        """
+        Args:
+            target_queue: Subscriber queue (queue.Queue or multiprocessing.Queue)
+            block_timeout: Maximum wait for room in target_queue, in seconds
+            depth: Messages held while the subscriber is stalled
+            on_result: Called with (delivered, message) after each delivery attempt
+            name: Thread name
+        """
+        super().__init__(daemon=True, name=name)
+        self.target_queue = target_queue
+        self.block_timeout = block_timeout
+        self.pending: queue.Queue[Any] = queue.Queue(maxsize=depth)
+        self.on_result = on_result
+        self.running = True
+        self.error: Optional[Exception] = None
+        self.logger = logging.getLogger("blocking-feeder")
+
+    def submit(self, message: Any) -> bool:
+        """
+        Queue a message for delivery without waiting.
+
+        Returns:
+            False if the feeder is already holding depth messages (message dropped)
+
+        Raises:
+            RuntimeError: If the feeder stopped because the subscriber queue failed
+        """
+        if self.error is not None:
+            raise RuntimeError(f"Subscriber queue failed: {self.error}")
+        try:
+            self.pending.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def flush(self) -> int:
+        """Discard the messages not yet delivered; returns how many were discarded."""
+        return len(_evict(self.pending))
+
+    def run(self):
+        while self.running:
+            try:
+                message = self.pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                delivered, _ = deliver(self.target_queue, message, POLICY_BLOCK, self.block_timeout)
+            except Exception as e:
+                self.logger.warning(f"Error delivering to {self.name}: {e}")
+                self.error = e
+                break
+            if self.on_result is not None:
+                self.on_result(delivered, message)
+
+    def stop(self):
+        self.running = False
+
+
+def coalesce_latest(source_queue, message: Any) -> Tuple[Any, List[Any]]:
+    """
+    Consumer-side coalescing: skip to the newest message already queued.
+
+    Args:
+        source_queue: Queue the message was read from
+        message: Message just read
+
+    Returns:
+        Tuple of (newest message, skipped older messages)
+    """
+    skipped: List[Any] = []
+    for newer in _evict(source_queue):
+        skipped.append(message)
+        message = newer
+    return message, skipped
+
+
+def message_num_samples(message: Any) -> int:
+    """
+    Number of samples carried by an IQ, ring-descriptor or audio message.
+
+    Args:
+        message: Message dict
+
+    Returns:
+        Sample count, or 0 if the message carries no samples
+    """
+    if not isinstance(message, dict):
+        return 0
+    if message.get("samples") is not None:
+        return num_iq_samples(message)
+    if message.get("shm_length") is not None:
+        return int(message["shm_length"])
+    if message.get("audio") is not None:
+        return len(message["audio"])
+    return 0
+
+
+def message_duration_ms(message: Any) -> float:
+    """
+    Duration of the signal carried by an IQ or audio message.
+
+    Args:
+        message: IQ message ("samples"/"shm_length", "sample_rate") or audio message ("audio")
+
+    Returns:
+        Duration in milliseconds, or 0.0 if unknown
+    """
+    num_samples = message_num_samples(message)
+    if not num_samples:
+        return 0.0
+    if message.get("audio") is not None:
+        sample_rate = message.get("sample_rate", DEFAULT_AUDIO_SAMPLE_RATE)
+    else:
+        sample_rate = message.get("sample_rate")
+    if not sample_rate:
+        return 0.0
+    return 1000.0 * num_samples / sample_rate
+
+
+def queue_lag_ms(target_queue, message_ms: float) -> float:
+    """
+    Estimate how far behind a subscriber is.
+
+    Args:
+        target_queue: Subscriber queue
+        message_ms: Duration of one queued message in milliseconds
+
+    Returns:
+        Queue depth in milliseconds of signal (0.0 if the depth is unavailable)
+    """
+    try:
+        depth = target_queue.qsize()
+    except NotImplementedError:
+        # multiprocessing.Queue.qsize() is not available on macOS
+        return 0.0
+    return depth * message_ms
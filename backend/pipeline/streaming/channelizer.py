@@ -0,0 +1,623 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Shared per-SDR channelizer producing narrowband, decimated streams per VFO.
+
+Instead of every demodulator running its own full-rate frequency translation and
+decimation filter over the whole SDR bandwidth, the channelizer runs one
+overlap-save FFT over each wideband block and cuts every VFO channel out of that
+shared spectrum:
+
+1. The block is split into frames of FFT_SIZE samples with 25% overlap and all
+   frames are transformed in one batched FFT.
+2. For each channel, the bins around the VFO offset are multiplied by the
+   frequency response of a lowpass prototype and inverse transformed with a
+   smaller IFFT (FFT_SIZE / decimation), which filters, shifts to baseband and
+   decimates in one step.
+3. The overlapping (circularly aliased) part of every frame is discarded and the
+   remaining sub-bin frequency offset is removed with a phase-continuous rotator
+   at the output rate.
+
+Channel messages use the same format as raw IQ messages (samples, center_freq,
+sample_rate, ...) with center_freq set to the channel center, so consumers that
+compute their offset as vfo_center - center_freq work unchanged.
+
+Process subscribers (e.g. process-isolated demodulators) get the same messages
+through a shared-memory ring per channel: the channel block is written once and
+only a descriptor is pickled through each subscriber's multiprocessing queue, as
+the IQBroadcaster does for the wideband stream.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import scipy.fft
+from scipy import signal
+
+from pipeline.streaming.backpressure import (
+    POLICY_BLOCK,
+    POLICY_DROP_NEWEST,
+    deliver,
+    message_num_samples,
+    validate_policy,
+)
+from pipeline.streaming.iqformat import as_complex_message
+from pipeline.streaming.iqring import IQSharedRing, SharedRingQueue
+from vfos.state import VFOManager
+
+logger = logging.getLogger("iq-channelizer")
+
+# FFT size for the shared analysis transform
+DEFAULT_FFT_SIZE = 8192
+
+# Default minimum output rate per channel (matches the FM demodulator's intermediate rate)
+DEFAULT_MIN_CHANNEL_RATE = 200e3
+
+# Output rate must leave room for the filter transition band around the channel
+CHANNEL_RATE_FACTOR = 2.5
+
+
+class FFTChannelizer:
+    """
+    Overlap-save FFT filterbank that extracts several channels from one stream.
+
+    Stateless with respect to threads; IQChannelizer drives it from its thread.
+    """
+
+    def __init__(self, fft_size: int = DEFAULT_FFT_SIZE):
+        """
+        Initialize the filterbank.
+
+        Args:
+            fft_size: Analysis FFT size (power of two)
+        """
+        if fft_size & (fft_size - 1):
+            raise ValueError("fft_size must be a power of two")
+        self.fft_size = fft_size
+        self.overlap = fft_size // 4
+        self.hop = fft_size - self.overlap
+
+        self.sample_rate: Optional[float] = None
+        self.center_freq: Optional[float] = None
+        self.pending = np.zeros(self.overlap, dtype=np.complex64)
+        # Global sample index of pending[0]; starts negative so the zero padding
+        # covers the first frame's discarded overlap and no input is lost
+        self.start_index = -self.overlap
+        self.gaps = 0
+
+        # Channel key -> decimation of its last output, to flag rate changes
+        self.channel_decimations: Dict[Any, int] = {}
+
+        # (sample_rate, bandwidth, decimation) -> frequency response at the selected bins
+        self._responses: Dict[Tuple[float, float, int], np.ndarray] = {}
+
+    def reset(self, start_index: int = 0):
+        """
+        Drop buffered samples (e.g. after a sample rate change or a gap in the input).
+
+        Args:
+            start_index: Sample index of the next input sample
+        """
+        self.pending = np.zeros(self.overlap, dtype=np.complex64)
+        self.start_index = start_index - self.overlap
+
+    def get_decimation(self, sample_rate: float, bandwidth: float, min_rate: float) -> int:
+        """
+        Pick the power-of-two decimation for a channel.
+
+        Args:
+            sample_rate: Input sample rate in Hz
+            bandwidth: Channel bandwidth in Hz
+            min_rate: Minimum output sample rate requested by subscribers
+
+        Returns:
+            Decimation factor (power of two, at most overlap size)
+        """
+        required_rate = max(min_rate, bandwidth * CHANNEL_RATE_FACTOR)
+        decimation = 1
+        while decimation * 2 <= self.overlap and sample_rate / (decimation * 2) >= required_rate:
+            decimation *= 2
+        return decimation
+
+    def _get_response(self, sample_rate: float, bandwidth: float, decimation: int) -> np.ndarray:
+        key = (sample_rate, bandwidth, decimation)
+        response = self._responses.get(key)
+        if response is None:
+            out_rate = sample_rate / decimation
+            # Demodulators filter to their passband themselves (SSB/AM pass up to
+            # +/- bandwidth around the VFO), so keep the full bandwidth on both sides
+            cutoff = min(max(bandwidth * 1.1, 2500.0), out_rate * 0.4)
+            taps = signal.firwin(self.overlap + 1, cutoff, window=("kaiser", 8.0), fs=sample_rate)
+            full_response = np.fft.fft(taps, self.fft_size)
+            bins = self.fft_size // decimation
+            relative_bins = np.r_[0 : bins // 2, -bins // 2 : 0]
+            response = full_response[relative_bins].astype(np.complex64)
+            if len(self._responses) > 32:
+                self._responses.clear()
+            self._responses[key] = response
+        return response
+
+    def process(
+        self,
+        samples: np.ndarray,
+        sample_rate: float,
+        center_freq: float,
+        channels: List[Dict[str, Any]],
+        sample_index: Optional[int] = None,
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Feed a wideband block and extract all requested channels.
+
+        If the block's sample index does not follow the buffered samples, the
+        filterbank restarts at the block instead of splicing across the gap.
+
+        Args:
+            samples: Wideband complex samples
+            sample_rate: Input sample rate in Hz
+            center_freq: SDR center frequency in Hz
+            channels: List of dicts with "key", "center_freq", "bandwidth" and
+                      "min_sample_rate"
+            sample_index: Sample index of the block's first sample, if known
+
+        Returns:
+            Dict of channel key -> {"samples", "sample_rate", "center_freq",
+            "sample_index"} for channels that are inside the SDR bandwidth.
+            sample_index counts samples at the channel rate. When a channel's
+            decimation changes, its index continues on the new rate's grid and
+            the message carries "discontinuity": True.
+        """
+        next_index = self.start_index + len(self.pending)
+        if sample_index is None:
+            sample_index = next_index
+
+        if sample_rate != self.sample_rate or center_freq != self.center_freq:
+            self.sample_rate = sample_rate
+            self.center_freq = center_freq
+            self.reset(sample_index)
+        elif sample_index != next_index:
+            self.gaps += 1
+            self.reset(sample_index)
+
+        buffer = np.concatenate((self.pending, samples.astype(np.complex64, copy=False)))
+        if len(buffer) < self.fft_size:
+            self.pending = buffer
+            return {}
+
+        num_frames = (len(buffer) - self.fft_size) // self.hop + 1
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, self.fft_size)[:: self.hop][
+            :num_frames
+        ]
+        spectra = scipy.fft.fft(frames, axis=1)
+        frame_starts = self.start_index + np.arange(num_frames, dtype=np.int64) * self.hop
+
+        consumed = num_frames * self.hop
+        self.pending = buffer[consumed:].copy()
+        self.start_index += consumed
+
+        outputs: Dict[Any, Dict[str, Any]] = {}
+        for channel in channels:
+            result = self._extract_channel(channel, spectra, frame_starts, sample_rate, center_freq)
+            if result is not None:
+                outputs[channel["key"]] = result
+
+        # Forget channels that went away
+        active_keys = {channel["key"] for channel in channels}
+        for key in [key for key in self.channel_decimations if key not in active_keys]:
+            del self.channel_decimations[key]
+        return outputs
+
+    def _extract_channel(
+        self,
+        channel: Dict[str, Any],
+        spectra: np.ndarray,
+        frame_starts: np.ndarray,
+        sample_rate: float,
+        center_freq: float,
+    ) -> Optional[Dict[str, Any]]:
+        bandwidth = float(channel["bandwidth"])
+        offset = float(channel["center_freq"]) - center_freq
+        if abs(offset) + bandwidth / 2.0 > sample_rate / 2.0:
+            return None
+
+        decimation = self.get_decimation(
+            sample_rate, bandwidth, channel.get("min_sample_rate", DEFAULT_MIN_CHANNEL_RATE)
+        )
+        previous_decimation = self.channel_decimations.get(channel["key"])
+        self.channel_decimations[channel["key"]] = decimation
+        bins = self.fft_size // decimation
+        response = self._get_response(sample_rate, bandwidth, decimation)
+
+        # Coarse shift: whole FFT bins; fine shift: residual below one bin
+        bin_offset = int(round(offset * self.fft_size / sample_rate))
+        residual = offset - bin_offset * sample_rate / self.fft_size
+        relative_bins = np.r_[0 : bins // 2, -bins // 2 : 0]
+        selected = spectra[:, (bin_offset + relative_bins) % self.fft_size] * response
+
+        decimated = scipy.fft.ifft(selected, axis=1)[:, self.overlap // decimation :]
+        per_frame = decimated.shape[1]
+
+        # Global full-rate index of every output sample. Selecting bins mixes each frame
+        # relative to its own start; re-reference to the global index and remove the
+        # residual offset so the output is phase-continuous across frames and blocks.
+        output_index = (
+            frame_starts[:, None]
+            + self.overlap
+            + np.arange(per_frame, dtype=np.int64)[None, :] * decimation
+        )
+        frame_cycles = ((bin_offset * frame_starts) % self.fft_size) / self.fft_size
+        cycles = np.mod(residual / sample_rate * output_index + frame_cycles[:, None], 1.0)
+        rotator = np.exp(-2j * np.pi * cycles)
+
+        output = (decimated * rotator).ravel().astype(np.complex64) / decimation
+        result = {
+            "samples": output,
+            "sample_rate": sample_rate / decimation,
+            "center_freq": center_freq + offset,
+            # Output samples sit on the full-rate grid every `decimation` samples
+            "sample_index": int(output_index[0, 0]) // decimation,
+        }
+        if previous_decimation is not None and previous_decimation != decimation:
+            # The index changed scale; consumers restart rather than see a gap or overlap
+            result["discontinuity"] = True
+        return result
+
+
+class IQChannelizer(threading.Thread):
+    """
+    Per-SDR channelizer thread feeding narrowband VFO streams to subscribers.
+
+    Subscribers sharing the same session and VFO share one channel computation.
+    The thread only subscribes to the IQBroadcaster while it has subscribers.
+    Channels with process subscribers also get a shared-memory ring, which only
+    this thread writes to, creates and releases.
+    """
+
+    def __init__(self, iq_broadcaster, sdr_id: str, fft_size: int = DEFAULT_FFT_SIZE):
+        """
+        Initialize the channelizer.
+
+        Args:
+            iq_broadcaster: IQBroadcaster providing the wideband stream
+            sdr_id: Identifier for this SDR device (used for logging)
+            fft_size: Analysis FFT size
+        """
+        super().__init__(daemon=True, name=f"IQChannelizer-{sdr_id}")
+        self.iq_broadcaster = iq_broadcaster
+        self.sdr_id = sdr_id
+        self.source_key = f"channelizer:{sdr_id}"
+        self.source_queue: Optional[queue.Queue] = None
+        self.filterbank = FFTChannelizer(fft_size)
+        self.vfo_manager = VFOManager()
+        self.running = True
+
+        # subscription_key -> {queue, session_id, vfo_number, min_sample_rate, maxsize, policy,
+        #                      for_process, delivered, dropped, dropped_samples}
+        self.subscribers: Dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+        # (session_id, vfo_number) -> shared ring for the channel's process subscribers
+        self.channel_rings: Dict[Tuple[str, int], IQSharedRing] = {}
+
+        self.stats: Dict[str, Any] = {
+            "blocks_in": 0,
+            "channel_blocks_out": 0,
+            "channel_blocks_dropped": 0,
+            "last_activity": None,
+            "errors": 0,
+        }
+        self.stats_lock = threading.Lock()
+
+    def add_subscriber(
+        self,
+        subscription_key: str,
+        session_id: str,
+        vfo_number: int,
+        maxsize: int = 10,
+        min_sample_rate: float = DEFAULT_MIN_CHANNEL_RATE,
+        policy: str = POLICY_DROP_NEWEST,
+        for_process: bool = False,
+    ) -> Union[queue.Queue, SharedRingQueue]:
+        """
+        Subscribe to the narrowband stream of a VFO.
+
+        Args:
+            subscription_key: Unique key of the subscriber
+            session_id: Session owning the VFO
+            vfo_number: VFO number to follow (frequency and bandwidth track VFO state)
+            maxsize: Maximum size of the subscriber queue
+            min_sample_rate: Minimum output sample rate the subscriber needs
+            policy: Backpressure policy when the queue is full (block is not
+                    supported, one slow channel must not stall the others)
+            for_process: If True, the subscriber is a process and receives the channel
+                         through a shared-memory ring
+
+        Returns:
+            Queue receiving channel messages; a SharedRingQueue for process subscribers
+        """
+        if validate_policy(policy) == POLICY_BLOCK:
+            raise ValueError("Channel subscribers cannot use the block policy")
+        with self.lock:
+            if subscription_key not in self.subscribers:
+                info: Dict[str, Any] = {
+                    "session_id": session_id,
+                    "vfo_number": vfo_number,
+                    "min_sample_rate": min_sample_rate,
+                    "maxsize": maxsize,
+                    "policy": policy,
+                    "for_process": for_process,
+                    "delivered": 0,
+                    "dropped": 0,
+                    "dropped_samples": 0,
+                }
+                if for_process:
+                    info["queue"] = multiprocessing.Queue(maxsize=maxsize)
+                    info["ring_queue"] = SharedRingQueue(info["queue"], session_id=session_id)
+                else:
+                    info["queue"] = queue.Queue(maxsize=maxsize)
+                self.subscribers[subscription_key] = info
+                logger.info(
+                    f"Channel subscriber {subscription_key} added for {session_id} VFO{vfo_number}"
+                    f"{' (process)' if for_process else ''}"
+                )
+            info = self.subscribers[subscription_key]
+            subscriber_queue: Union[queue.Queue, SharedRingQueue] = info.get(
+                "ring_queue", info["queue"]
+            )
+            needs_source = self.source_queue is None
+
+        if needs_source:
+            # Idle until the first channel subscriber appears
+            self.source_queue = self.iq_broadcaster.subscribe(
+                self.source_key, maxsize=10, enrich_vfo_states=False
+            )
+        return subscriber_queue
+
+    def remove_subscriber(self, subscription_key: str) -> bool:
+        """
+        Remove a channel subscriber.
+
+        Args:
+            subscription_key: Key passed to add_subscriber()
+
+        Returns:
+            True if the subscriber existed
+        """
+        with self.lock:
+            info = self.subscribers.pop(subscription_key, None)
+            if info is None:
+                return False
+            release_source = not self.subscribers and self.source_queue is not None
+            if release_source:
+                self.source_queue = None
+
+        logger.info(f"Channel subscriber {subscription_key} removed")
+        if release_source:
+            self.iq_broadcaster.unsubscribe(self.source_key)
+        return True
+
+    def flush(self):
+        """
+        Flush all channel queues and buffered samples (e.g. after a sample rate change).
+        """
+        with self.lock:
+            self.filterbank.reset()
+            for info in self.subscribers.values():
+                subscriber_queue = info["queue"]
+                while True:
+                    try:
+                        subscriber_queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+    def _build_channels(self) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, int], List[str]]]:
+        """
+        Collect the active channels from VFO state (called with self.lock held).
+        """
+        channels: List[Dict[str, Any]] = []
+        channel_subscribers: Dict[Tuple[str, int], List[str]] = {}
+        min_rates: Dict[Tuple[str, int], float] = {}
+        for key, info in self.subscribers.items():
+            channel_key = (info["session_id"], info["vfo_number"])
+            channel_subscribers.setdefault(channel_key, []).append(key)
+            min_rates[channel_key] = max(min_rates.get(channel_key, 0.0), info["min_sample_rate"])
+
+        for channel_key, min_rate in min_rates.items():
+            session_id, vfo_number = channel_key
+            vfo_state = self.vfo_manager.get_vfo_state(session_id, vfo_number)
+            if not vfo_state or not vfo_state.active or not vfo_state.center_freq:
+                continue
+            channels.append(
+                {
+                    "key": channel_key,
+                    "center_freq": vfo_state.center_freq,
+                    "bandwidth": vfo_state.bandwidth,
+                    "min_sample_rate": min_rate,
+                }
+            )
+        return channels, channel_subscribers
+
+    def _write_to_ring(
+        self, channel_key: Tuple[str, int], channel_message: Dict[str, Any], max_depth: int
+    ) -> Dict[str, Any]:
+        """
+        Write a channel block into the channel's shared ring (called with self.lock held).
+
+        Channel blocks vary slightly in length, so a new ring gets slots twice the
+        size of the block that created it rather than being replaced on every
+        slightly longer block. Slots are sized, as in the IQBroadcaster, at twice
+        the deepest process subscriber queue.
+
+        Args:
+            channel_key: (session_id, vfo_number) of the channel
+            channel_message: Channel message with "samples"
+            max_depth: Deepest queue among the channel's process subscribers
+
+        Returns:
+            The message with "samples" replaced by ring descriptor fields
+        """
+        samples = channel_message["samples"]
+        num_slots = 2 * max_depth + 2
+        ring = self.channel_rings.get(channel_key)
+        if ring is None or len(samples) > ring.slot_samples or ring.num_slots < num_slots:
+            if ring is not None:
+                ring.close()
+            ring = IQSharedRing(
+                slot_samples=2 * max(len(samples), 1), num_slots=num_slots, name_prefix="gs-ch"
+            )
+            self.channel_rings[channel_key] = ring
+            logger.info(
+                f"Created channel ring {ring.name} for {channel_key[0]} VFO{channel_key[1]} "
+                f"({num_slots} slots x {ring.slot_samples} samples)"
+            )
+
+        descriptor_message = {k: v for k, v in channel_message.items() if k != "samples"}
+        descriptor_message.update(ring.write(samples))
+        return descriptor_message
+
+    def _deliver_channel(
+        self,
+        channel_key: Tuple[str, int],
+        channel_message: Dict[str, Any],
+        subscription_keys: List[str],
+    ):
+        """
+        Deliver one channel block to its subscribers (called with self.lock held).
+
+        Args:
+            channel_key: (session_id, vfo_number) of the channel
+            channel_message: Channel message with "samples"
+            subscription_keys: Subscribers of the channel
+        """
+        process_depths = [
+            self.subscribers[key]["maxsize"]
+            for key in subscription_keys
+            if self.subscribers[key]["for_process"]
+        ]
+        descriptor_message = None
+        if process_depths:
+            # Written once for all process subscribers of the channel
+            descriptor_message = self._write_to_ring(
+                channel_key, channel_message, max(process_depths)
+            )
+
+        for subscription_key in subscription_keys:
+            info = self.subscribers[subscription_key]
+            message = descriptor_message if info["for_process"] else channel_message
+            delivered, evicted = deliver(info["queue"], message, info["policy"])
+            lost = evicted if delivered else evicted + [message]
+            if delivered:
+                info["delivered"] += 1
+            if lost:
+                info["dropped"] += len(lost)
+                info["dropped_samples"] += sum(message_num_samples(m) for m in lost)
+            with self.stats_lock:
+                if delivered:
+                    self.stats["channel_blocks_out"] += 1
+                self.stats["channel_blocks_dropped"] += len(lost)
+
+    def _release_rings(self):
+        """
+        Close the rings of channels left without process subscribers (called with self.lock held).
+        """
+        in_use = {
+            (info["session_id"], info["vfo_number"])
+            for info in self.subscribers.values()
+            if info["for_process"]
+        }
+        for channel_key in [key for key in self.channel_rings if key not in in_use]:
+            self.channel_rings.pop(channel_key).close()
+
+    def run(self):
+        """
+        Main channelizer loop.
+        """
+        logger.info(f"IQ channelizer started for SDR {self.sdr_id}")
+
+        while self.running:
+            source_queue = self.source_queue
+            if source_queue is None:
+                time.sleep(0.1)
+                continue
+
+            try:
+                try:
+                    iq_message = source_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                # Converted once here for all channels
+                iq_message = as_complex_message(iq_message)
+                samples = iq_message.get("samples")
+                if samples is None or len(samples) == 0:
+                    continue
+
+                with self.stats_lock:
+                    self.stats["blocks_in"] += 1
+                    self.stats["last_activity"] = time.time()
+
+                with self.lock:
+                    channels, channel_subscribers = self._build_channels()
+                    outputs = self.filterbank.process(
+                        samples,
+                        iq_message.get("sample_rate"),
+                        iq_message.get("center_freq"),
+                        channels,
+                        sample_index=iq_message.get("sample_index"),
+                    )
+
+                    metadata = {k: v for k, v in iq_message.items() if k != "samples"}
+                    for channel_key, output in outputs.items():
+                        session_id = channel_key[0]
+                        version, vfo_states = self.vfo_manager.get_vfo_states_snapshot(session_id)
+                        channel_message = dict(metadata)
+                        channel_message.update(output)
+                        channel_message["channelized"] = True
+                        channel_message["vfo_states"] = vfo_states
+                        channel_message["vfo_version"] = version
+                        self._deliver_channel(
+                            channel_key,
+                            channel_message,
+                            channel_subscribers.get(channel_key, []),
+                        )
+
+                    self._release_rings()
+
+            except Exception as e:
+                if self.running:
+                    logger.error(f"Error in channelizer loop: {e}")
+                    logger.exception(e)
+                    with self.stats_lock:
+                        self.stats["errors"] += 1
+
+        with self.lock:
+            for ring in self.channel_rings.values():
+                ring.close()
+            self.channel_rings.clear()
+
+        logger.info(f"IQ channelizer stopped for SDR {self.sdr_id}")
+
+    def stop(self):
+        """
+        Stop the channelizer thread.
+        """
+        self.running = False
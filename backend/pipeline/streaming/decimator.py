@@ -0,0 +1,245 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Streaming FIR decimation.
+
+Filtering at the full input rate and keeping every N-th sample computes N times
+more outputs than are used. The decimators here run scipy's polyphase upfirdn
+over the block plus the filter history, so only the kept outputs are computed,
+and carry both the history and the decimation phase across blocks: the output
+is the same however the input is split into blocks.
+
+Blocks may be 2-D, one row per channel: every row is filtered with the same
+taps in one call and keeps its own history (see the batched multi-VFO engine).
+
+Large ratios are split into stages (largest factor first). Intermediate stages
+only need to keep aliases out of the final passband, so their transition bands
+are wide and their filters short; the last stage keeps the band up to its output
+Nyquist alias-free. Linear-phase FIR taps avoid the group delay distortion of
+the IIR chains they replace. Designs are cached per (rate, ratio, passband).
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import signal
+
+# Largest ratio handled by a single stage when the total ratio can be split
+MAX_STAGE_DECIMATION = 8
+
+DEFAULT_STOPBAND_DB = 60.0
+
+# The final passband is limited to this fraction of the output rate
+MAX_PASSBAND_FRACTION = 0.45
+
+
+def split_decimation(decimation: int, max_stage: int = MAX_STAGE_DECIMATION) -> List[int]:
+    """
+    Split a decimation ratio into stage ratios, largest first.
+
+    Prime factors are grouped while the stage ratio stays within max_stage; a
+    prime larger than max_stage gets a stage of its own.
+
+    Args:
+        decimation: Total decimation ratio
+        max_stage: Largest ratio per stage
+
+    Returns:
+        Stage ratios whose product is the total ratio (empty for ratio 1)
+    """
+    factors = []
+    remaining = max(1, int(decimation))
+    divisor = 2
+    while divisor * divisor <= remaining:
+        while remaining % divisor == 0:
+            factors.append(divisor)
+            remaining //= divisor
+        divisor += 1
+    if remaining > 1:
+        factors.append(remaining)
+
+    stages: List[int] = []
+    for factor in sorted(factors, reverse=True):
+        for i, stage in enumerate(stages):
+            if stage * factor <= max_stage:
+                stages[i] = stage * factor
+                break
+        else:
+            stages.append(factor)
+    return sorted(stages, reverse=True)
+
+
+def design_decimation_stages(
+    input_rate: float,
+    decimation: int,
+    passband_hz: float,
+    stopband_db: float = DEFAULT_STOPBAND_DB,
+) -> Tuple[Tuple[np.ndarray, int], ...]:
+    """
+    Design the FIR taps of a multi-stage decimator.
+
+    Args:
+        input_rate: Input sample rate in Hz
+        decimation: Total decimation ratio
+        passband_hz: One-sided passband to keep (Hz from DC); clipped to the output band
+        stopband_db: Alias rejection
+
+    Returns:
+        Tuple of (float32 taps, stage ratio) per stage
+    """
+    return _design_decimation_stages(
+        float(input_rate), max(1, int(decimation)), float(passband_hz), float(stopband_db)
+    )
+
+
+@lru_cache(maxsize=64)
+def _design_decimation_stages(
+    input_rate: float, decimation: int, passband_hz: float, stopband_db: float
+) -> Tuple[Tuple[np.ndarray, int], ...]:
+    ratios = split_decimation(decimation)
+    output_rate = input_rate / decimation
+    passband = min(passband_hz, MAX_PASSBAND_FRACTION * output_rate)
+
+    stages = []
+    rate = input_rate
+    for i, ratio in enumerate(ratios):
+        stage_output_rate = rate / ratio
+        if i == len(ratios) - 1:
+            # Last stage: nothing aliases below the output Nyquist frequency
+            stopband = stage_output_rate / 2.0
+        else:
+            # Later stages remove what aliases between passband and stage_output_rate - passband
+            stopband = stage_output_rate - passband
+        width = max(stopband - passband, 1e-3 * rate)
+
+        numtaps, beta = signal.kaiserord(stopband_db, width / (rate / 2.0))
+        # Odd length for a symmetric (type I) filter
+        numtaps = max(numtaps | 1, 2 * ratio + 1)
+        taps = signal.firwin(
+            numtaps, (passband + stopband) / 2.0, window=("kaiser", beta), fs=rate
+        ).astype(np.float32)
+        taps.setflags(write=False)
+        stages.append((taps, ratio))
+        rate = stage_output_rate
+    return tuple(stages)
+
+
+class PolyphaseDecimator:
+    """
+    Stateful single-stage FIR decimator.
+    """
+
+    def __init__(self, taps: np.ndarray, decimation: int):
+        """
+        Initialize the decimator.
+
+        Args:
+            taps: FIR lowpass taps
+            decimation: Decimation ratio
+        """
+        self.taps = np.asarray(taps)
+        self.decimation = max(1, int(decimation))
+        self._history: Optional[np.ndarray] = None
+        self._phase = 0  # Index in the next block of the next output sample
+
+    def reset(self) -> None:
+        """Forget the filter history (e.g. after a gap in the input)."""
+        self._history = None
+        self._phase = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Filter and decimate one block.
+
+        Args:
+            samples: Input block (1-D, or 2-D with one channel per row)
+
+        Returns:
+            Output samples for the input positions phase, phase + N, ... in this block
+        """
+        n = self.decimation
+        history_len = len(self.taps) - 1
+        length = samples.shape[-1]
+        if self._history is None:
+            # Start as if the first sample had been held, like lfilter_zi
+            first = (
+                samples[..., :1] if length else np.zeros(samples.shape[:-1] + (1,), samples.dtype)
+            )
+            self._history = np.repeat(first, history_len, axis=-1)
+
+        count = max(0, -(-(length - self._phase) // n))
+        buffer = np.concatenate((self._history, samples), axis=-1)
+
+        if count:
+            # Output at buffer position first_out (+ k*n) needs buffer[first_out - history_len:]
+            first_out = history_len + self._phase
+            start = first_out % n
+            skip = (first_out - start) // n
+            output = signal.upfirdn(self.taps, buffer[..., start:], down=n, axis=-1)
+            output = output[..., skip : skip + count]
+        else:
+            output = np.zeros(
+                samples.shape[:-1] + (0,), dtype=np.result_type(samples.dtype, self.taps.dtype)
+            )
+
+        if history_len:
+            self._history = buffer[..., buffer.shape[-1] - history_len :]
+        self._phase = self._phase + count * n - length
+        return output
+
+
+class DecimatorChain:
+    """
+    Multi-stage streaming decimator designed for a rate, ratio and passband.
+    """
+
+    def __init__(
+        self,
+        input_rate: float,
+        decimation: int,
+        passband_hz: float,
+        stopband_db: float = DEFAULT_STOPBAND_DB,
+    ):
+        """
+        Initialize the chain.
+
+        Args:
+            input_rate: Input sample rate in Hz
+            decimation: Total decimation ratio
+            passband_hz: One-sided passband to keep (Hz from DC)
+            stopband_db: Alias rejection
+        """
+        self.input_rate = input_rate
+        self.decimation = max(1, int(decimation))
+        self.output_rate = input_rate / self.decimation
+        self.stages = [
+            PolyphaseDecimator(taps, ratio)
+            for taps, ratio in design_decimation_stages(
+                input_rate, self.decimation, passband_hz, stopband_db
+            )
+        ]
+
+    def reset(self) -> None:
+        """Forget the history of every stage."""
+        for stage in self.stages:
+            stage.reset()
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Decimate one block through all stages."""
+        for stage in self.stages:
+            samples = stage.process(samples)
+        return samples
@@ -15,16 +15,34 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import multiprocessing
 import queue
 import threading
 import time
-from dataclasses import asdict
+from multiprocessing import resource_tracker
 from typing import Any, Dict, Optional, Union
 
+from pipeline.streaming.backpressure import (
+    DEFAULT_BLOCK_TIMEOUT,
+    POLICY_BLOCK,
+    POLICY_DROP_NEWEST,
+    BlockingFeeder,
+    deliver,
+    message_duration_ms,
+    message_num_samples,
+    validate_policy,
+)
+from pipeline.streaming.channelizer import DEFAULT_MIN_CHANNEL_RATE, IQChannelizer
+from pipeline.streaming.iqformat import as_complex_message
+from pipeline.streaming.iqring import IQSharedRing, SharedRingQueue
 from vfos.state import VFOManager
 
+# Subscription transports
+TRANSPORT_QUEUE = "queue"  # Full IQ message pickled through the subscriber queue
+TRANSPORT_SHM = "shm"  # Samples in a shared-memory ring, only descriptors through the queue
+
 
 class IQBroadcaster(threading.Thread):
     """
@@ -62,35 +80,72 @@ class IQBroadcaster(threading.Thread):
             "messages_in": 0,
             "messages_broadcast": 0,
             "messages_dropped": 0,
+            "samples_dropped": 0,
             "queue_timeouts": 0,
             "last_activity": None,
             "errors": 0,
         }
         self.stats_lock = threading.Lock()
 
+        # Shared-memory ring for TRANSPORT_SHM subscribers (created on first use)
+        self.iq_ring: Optional[IQSharedRing] = None
+
+        # Shared channelizer for narrowband VFO subscribers (created on first use)
+        self.channelizer: Optional[IQChannelizer] = None
+
     def subscribe(
         self,
         session_id: str,
         maxsize: int = 50,
         for_process: bool = False,
         session_id_hint: Optional[str] = None,
-    ) -> Union[queue.Queue[Any], multiprocessing.Queue[Any]]:
+        transport: str = TRANSPORT_QUEUE,
+        enrich_vfo_states: bool = True,
+        policy: str = POLICY_DROP_NEWEST,
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+    ) -> Union[queue.Queue[Any], multiprocessing.Queue[Any], SharedRingQueue]:
         """
         Create a new subscriber queue for a session.
 
         Args:
             session_id: Session identifier (client session ID)
             maxsize: Maximum size of the subscriber queue (default: 50)
-                    If the demodulator can't keep up and the queue fills,
-                    new samples will be dropped for that subscriber.
+                    What happens when the subscriber can't keep up and the
+                    queue fills is set by policy.
             for_process: If True, creates multiprocessing.Queue for Process subscribers.
                         Use this when subscriber is a multiprocessing.Process rather than
                         a threading.Thread. Default: False (threading queue)
             session_id_hint: Optional canonical session ID used for metadata enrichment.
+            transport: TRANSPORT_QUEUE (default) sends full IQ messages through the queue.
+                       TRANSPORT_SHM writes samples once into a shared-memory ring and only
+                       sends small descriptors; requires for_process=True.
+            enrich_vfo_states: If False, messages are delivered without VFO states
+                               (for internal subscribers that are not tied to a session).
+            policy: Backpressure policy when the queue is full (see backpressure.py):
+                    drop_newest (default), drop_oldest, block or coalesce. Block
+                    subscribers are fed from a thread of their own, so waiting on
+                    them never delays the broadcaster.
+            block_timeout: Maximum wait in seconds for the block policy.
 
         Returns:
-            Queue that will receive copies of IQ samples (threading or multiprocessing)
+            Queue that will receive copies of IQ samples (threading or multiprocessing).
+            For TRANSPORT_SHM a SharedRingQueue wrapping the descriptor queue is returned.
         """
+        if transport not in (TRANSPORT_QUEUE, TRANSPORT_SHM):
+            raise ValueError(f"Unknown IQ transport: {transport}")
+        if transport == TRANSPORT_SHM and not for_process:
+            raise ValueError("Shared-memory transport is only supported for process subscribers")
+        validate_policy(policy)
+
+        if transport == TRANSPORT_SHM:
+            # The subscriber process registers the ring with a resource tracker when it
+            # attaches. Unless this process already runs one the subscriber inherits, it
+            # starts its own tracker, which unlinks the ring as soon as the subscriber exits.
+            resource_tracker.ensure_running()
+            # Create the VFO state channel now, before the subscriber is forked, rather
+            # than with the first block; subscribers attach to it from their own process
+            self.vfo_manager.get_shared_channel()
+
         with self.lock:
             if session_id not in self.subscribers:
                 # Create appropriate queue type based on subscriber needs
@@ -110,15 +165,98 @@ class IQBroadcaster(threading.Thread):
                     "session_id": resolved_session_id,
                     "maxsize": maxsize,
                     "is_process_queue": for_process,
+                    "transport": transport,
+                    "enrich_vfo_states": enrich_vfo_states,
+                    "policy": policy,
+                    "block_timeout": block_timeout,
                     "delivered": 0,
                     "dropped": 0,
+                    "dropped_samples": 0,
+                    "message_ms": 0.0,
                 }
-                self.logger.info(f"Subscribed session {session_id} (queue: {queue_type})")
-            result: Union[queue.Queue[Any], multiprocessing.Queue[Any]] = self.subscribers[
-                session_id
-            ]["queue"]
+                if transport == TRANSPORT_SHM:
+                    self.subscribers[session_id]["ring_queue"] = SharedRingQueue(
+                        subscriber_queue, session_id=resolved_session_id
+                    )
+                if policy == POLICY_BLOCK:
+                    subscriber_info = self.subscribers[session_id]
+                    feeder = BlockingFeeder(
+                        subscriber_queue,
+                        block_timeout=block_timeout,
+                        on_result=functools.partial(self._on_feeder_result, subscriber_info),
+                        name=f"IQFeeder-{session_id}",
+                    )
+                    subscriber_info["feeder"] = feeder
+                    feeder.start()
+                self.logger.info(
+                    f"Subscribed session {session_id} (queue: {queue_type}, transport: {transport}, "
+                    f"policy: {policy})"
+                )
+            subscriber_info = self.subscribers[session_id]
+            if subscriber_info.get("transport") == TRANSPORT_SHM:
+                ring_queue: SharedRingQueue = subscriber_info["ring_queue"]
+                return ring_queue
+            result: Union[queue.Queue[Any], multiprocessing.Queue[Any]] = subscriber_info["queue"]
             return result
 
+    def subscribe_channel(
+        self,
+        session_id: str,
+        vfo_number: int,
+        maxsize: int = 10,
+        session_id_hint: Optional[str] = None,
+        min_sample_rate: float = DEFAULT_MIN_CHANNEL_RATE,
+        policy: str = POLICY_DROP_NEWEST,
+        for_process: bool = False,
+    ) -> Union[queue.Queue[Any], SharedRingQueue]:
+        """
+        Subscribe to the narrowband, decimated stream of a VFO.
+
+        The stream is cut out of the wideband IQ by the shared channelizer, so
+        subscribers on the same session and VFO share one channel computation.
+        Messages have the same format as IQ messages, with center_freq set to the
+        channel center and sample_rate to the channel rate.
+
+        Args:
+            session_id: Subscription key (same format as for subscribe())
+            vfo_number: VFO whose frequency and bandwidth the channel follows
+            maxsize: Maximum size of the subscriber queue (default: 10)
+            session_id_hint: Optional canonical session ID owning the VFO
+            min_sample_rate: Minimum channel sample rate the subscriber needs
+            policy: Backpressure policy when the queue is full (block is not
+                    supported; the channelizer serves all channels from one thread)
+            for_process: If True, the subscriber is a process; channel samples reach it
+                         through a shared-memory ring owned by the channelizer
+
+        Returns:
+            Threading queue receiving channel messages, or a SharedRingQueue for
+            process subscribers
+        """
+        if for_process:
+            # Same reason as for TRANSPORT_SHM in subscribe(): the subscriber must
+            # inherit this process's resource tracker
+            resource_tracker.ensure_running()
+
+        resolved_session_id = session_id_hint or self._extract_session_id(session_id)
+        if not resolved_session_id:
+            resolved_session_id = session_id
+
+        with self.lock:
+            if self.channelizer is None:
+                self.channelizer = IQChannelizer(self, self.sdr_id)
+                self.channelizer.start()
+            channelizer = self.channelizer
+
+        return channelizer.add_subscriber(
+            session_id,
+            resolved_session_id,
+            vfo_number,
+            maxsize=maxsize,
+            min_sample_rate=min_sample_rate,
+            policy=policy,
+            for_process=for_process,
+        )
+
     def unsubscribe(self, session_id: str):
         """
         Remove a subscriber queue.
@@ -128,8 +266,20 @@ class IQBroadcaster(threading.Thread):
         """
         with self.lock:
             if session_id in self.subscribers:
-                del self.subscribers[session_id]
+                self._remove_subscriber(session_id)
                 self.logger.info(f"Unsubscribed session {session_id}")
+            channelizer = self.channelizer
+
+        # Channel subscribers are keyed the same way
+        if channelizer is not None:
+            channelizer.remove_subscriber(session_id)
+
+    def _remove_subscriber(self, session_id: str):
+        # Caller holds self.lock
+        subscriber_info = self.subscribers.pop(session_id)
+        feeder = subscriber_info.get("feeder")
+        if feeder is not None:
+            feeder.stop()
 
     def get_subscriber_count(self) -> int:
         """
@@ -151,7 +301,8 @@ class IQBroadcaster(threading.Thread):
         with self.lock:
             for session_id, subscriber_info in self.subscribers.items():
                 subscriber_queue = subscriber_info["queue"]
-                flushed_count = 0
+                feeder = subscriber_info.get("feeder")
+                flushed_count = feeder.flush() if feeder is not None else 0
                 while not subscriber_queue.empty():
                     try:
                         subscriber_queue.get_nowait()
@@ -162,6 +313,10 @@ class IQBroadcaster(threading.Thread):
                     self.logger.debug(
                         f"Flushed {flushed_count} items from queue for session {session_id}"
                     )
+            channelizer = self.channelizer
+
+        if channelizer is not None:
+            channelizer.flush()
 
     def _extract_session_id(self, subscription_key: str) -> str:
         """
@@ -210,25 +365,23 @@ class IQBroadcaster(threading.Thread):
 
         Fetches all VFO states for the session from VFOManager and adds them
         to the IQ message. Each decoder can then extract its specific VFO state.
+        The state dicts come from VFOManager's per-version snapshot cache, so they
+        are only rebuilt when a VFO actually changes.
 
         Args:
             iq_message: Original IQ message from SDR worker
             session_id: Session ID to fetch VFO states for
 
         Returns:
-            Enriched IQ message with vfo_states dict added
+            Enriched IQ message with vfo_states dict and vfo_version added
         """
         try:
-            # Get all VFO states for this session (returns dict of {vfo_number: VFOState})
-            vfo_states = self.vfo_manager.get_all_vfo_states(session_id)
-
-            # Convert VFOState dataclasses to dicts for serialization
-            vfo_states_dict = {}
-            for vfo_number, vfo_state in vfo_states.items():
-                vfo_states_dict[vfo_number] = asdict(vfo_state)
+            # Shared read-only dict of {vfo_number: vfo_state_dict} for this version
+            version, vfo_states_dict = self.vfo_manager.get_vfo_states_snapshot(session_id)
 
             # Add to IQ message
             iq_message["vfo_states"] = vfo_states_dict
+            iq_message["vfo_version"] = version
 
         except Exception as e:
             # If we fail to get VFO states, log but don't crash the broadcaster
@@ -238,6 +391,98 @@ class IQBroadcaster(threading.Thread):
 
         return iq_message
 
+    @staticmethod
+    def _queued_depth(subscriber_info: Dict[str, Any]) -> int:
+        """Blocks a subscriber can have outstanding: its queue plus its feeder's backlog."""
+        feeder = subscriber_info.get("feeder")
+        backlog = feeder.pending.maxsize if feeder is not None else 0
+        return int(subscriber_info["maxsize"]) + backlog
+
+    def _write_to_ring(self, iq_message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Write the IQ block into the shared-memory ring and build the descriptor message.
+
+        The ring is (re)created when the block no longer fits a slot or when a
+        subscriber's queue could hold more descriptors than the ring has slots.
+        Slots are sized at twice the deepest subscriber queue (including what a
+        block subscriber's feeder holds) so a descriptor is normally consumed long
+        before its slot is reused.
+
+        The ring holds complex64 samples, so packed integer blocks are converted
+        here, once for all shared-memory subscribers.
+
+        Args:
+            iq_message: Original IQ message from SDR worker
+
+        Returns:
+            IQ message with "samples" replaced by ring descriptor fields, or None
+            if the message carries no samples
+        """
+        iq_message = as_complex_message(iq_message)
+        samples = iq_message.get("samples")
+        if samples is None:
+            return None
+
+        max_depth = max(
+            (
+                self._queued_depth(info)
+                for info in self.subscribers.values()
+                if info.get("transport") == TRANSPORT_SHM
+            ),
+            default=0,
+        )
+        num_slots = 2 * max_depth + 2
+        ring = self.iq_ring
+        if ring is None or len(samples) > ring.slot_samples or ring.num_slots < num_slots:
+            if ring is not None:
+                ring.close()
+            ring = IQSharedRing(slot_samples=len(samples), num_slots=num_slots)
+            self.iq_ring = ring
+            self.logger.info(
+                f"Created shared IQ ring {ring.name} for SDR {self.sdr_id} "
+                f"({num_slots} slots x {len(samples)} samples)"
+            )
+
+        descriptor_message = {k: v for k, v in iq_message.items() if k != "samples"}
+        descriptor_message.update(ring.write(samples))
+
+        # VFO states travel through the shared VFO channel; only the version goes here
+        descriptor_message["vfo_channel"] = self.vfo_manager.get_shared_channel().name
+        descriptor_message["vfo_version"] = self.vfo_manager.get_version()
+        return descriptor_message
+
+    def _record_delivery(
+        self, subscriber_info: Dict[str, Any], delivered: bool, evicted: list, num_samples: int
+    ):
+        """
+        Update the per-subscriber and broadcaster counters after a delivery attempt.
+
+        Called from the broadcaster loop and from the feeder threads of block subscribers.
+
+        Args:
+            subscriber_info: Subscriber entry
+            delivered: Whether the new block was queued
+            evicted: Previously queued blocks the policy discarded to make room
+            num_samples: Samples in the new block
+        """
+        # Subscriber can't keep up - the policy decided which blocks to drop
+        lost_messages = len(evicted) + (0 if delivered else 1)
+        lost_samples = sum(message_num_samples(m) for m in evicted) + (
+            0 if delivered else num_samples
+        )
+        with self.stats_lock:
+            if delivered:
+                subscriber_info["delivered"] += 1
+                self.stats["messages_broadcast"] += 1
+            if lost_messages:
+                subscriber_info["dropped"] += lost_messages
+                subscriber_info["dropped_samples"] += lost_samples
+            self.stats["messages_dropped"] += lost_messages
+            self.stats["samples_dropped"] += lost_samples
+
+    def _on_feeder_result(self, subscriber_info: Dict[str, Any], delivered: bool, message: Any):
+        self._record_delivery(subscriber_info, delivered, [], message_num_samples(message))
+
     def run(self):
         """
         Main broadcaster loop.
@@ -266,60 +511,80 @@ class IQBroadcaster(threading.Thread):
                         self.stats["queue_timeouts"] += 1
                     continue
 
-                # Broadcast to all subscribers
+                # Drops are also counted in samples; the gap shows up in the consumer's
+                # sample_index sequence
+                num_samples = message_num_samples(iq_message)
+                message_ms = message_duration_ms(iq_message)
+
+                # Write the block once into the shared ring for shm subscribers, and take
+                # a snapshot of the subscribers so delivery runs without holding the lock
                 with self.lock:
-                    dead_subscribers = []
-                    for subscription_key, subscriber_info in self.subscribers.items():
-                        subscriber_queue = subscriber_info["queue"]
-                        is_process_queue = subscriber_info.get("is_process_queue", False)
-
-                        # Extract session_id from subscription key and enrich message with VFO states
-                        session_id = subscriber_info.get("session_id") or self._extract_session_id(
-                            subscription_key
+                    descriptor_message = None
+                    if any(
+                        info.get("transport") == TRANSPORT_SHM for info in self.subscribers.values()
+                    ):
+                        descriptor_message = self._write_to_ring(iq_message)
+                    subscribers = list(self.subscribers.items())
+
+                # Broadcast to all subscribers
+                dead_subscribers = []
+                for subscription_key, subscriber_info in subscribers:
+                    subscriber_queue = subscriber_info["queue"]
+                    subscriber_info["message_ms"] = message_ms
+
+                    # Extract session_id from subscription key and enrich message with VFO states
+                    session_id = subscriber_info.get("session_id") or self._extract_session_id(
+                        subscription_key
+                    )
+                    if not subscriber_info.get("enrich_vfo_states", True):
+                        enriched_message = iq_message
+                    elif (
+                        subscriber_info.get("transport") == TRANSPORT_SHM
+                        and descriptor_message is not None
+                    ):
+                        # Same descriptor for every shm subscriber; the reader resolves
+                        # its session's VFO states from the version it carries
+                        enriched_message = descriptor_message
+                    elif session_id:
+                        # Create enriched message with VFO states for this specific session
+                        enriched_message = self._enrich_iq_message_with_vfo_states(
+                            iq_message.copy(), session_id
                         )
-                        if session_id:
-                            # Create enriched message with VFO states for this specific session
-                            enriched_message = self._enrich_iq_message_with_vfo_states(
-                                iq_message.copy(), session_id
-                            )
+                    else:
+                        # Fallback if we can't extract session_id (shouldn't happen)
+                        enriched_message = iq_message.copy()
+                        enriched_message["vfo_states"] = {}
+
+                    feeder = subscriber_info.get("feeder")
+                    try:
+                        if feeder is not None:
+                            # Block policy: the feeder thread waits and reports the outcome
+                            if feeder.submit(enriched_message):
+                                continue
+                            delivered, evicted = False, []
                         else:
-                            # Fallback if we can't extract session_id (shouldn't happen)
-                            enriched_message = iq_message.copy()
-                            enriched_message["vfo_states"] = {}
-
-                        try:
-                            # Handle both threading and multiprocessing queues
-                            if is_process_queue:
-                                # Multiprocessing queue - use block=False
-                                subscriber_queue.put(enriched_message, block=False)
-                            else:
-                                # Threading queue - use put_nowait()
-                                subscriber_queue.put_nowait(enriched_message)
-
-                            subscriber_info["delivered"] += 1
-                            with self.stats_lock:
-                                self.stats["messages_broadcast"] += 1
-
-                        except (queue.Full, Exception) as e:
-                            # Handle full queue for both types
-                            if isinstance(e, queue.Full) or (
-                                is_process_queue and "full" in str(e).lower()
-                            ):
-                                # Subscriber can't keep up - drop this sample
-                                subscriber_info["dropped"] += 1
-                                with self.stats_lock:
-                                    self.stats["messages_dropped"] += 1
-                            else:
-                                # Mark subscriber for removal if there's an error
-                                self.logger.warning(
-                                    f"Error broadcasting to {subscription_key}: {e}"
-                                )
-                                dead_subscribers.append(subscription_key)
-
-                    # Clean up dead subscribers
-                    for dead_key in dead_subscribers:
-                        del self.subscribers[dead_key]
-                        self.logger.info(f"Removed dead subscriber {dead_key}")
+                            # Handles both threading and multiprocessing queues
+                            delivered, evicted = deliver(
+                                subscriber_queue,
+                                enriched_message,
+                                subscriber_info.get("policy", POLICY_DROP_NEWEST),
+                                subscriber_info.get("block_timeout", DEFAULT_BLOCK_TIMEOUT),
+                            )
+                    except Exception as e:
+                        # Mark subscriber for removal if there's an error
+                        self.logger.warning(f"Error broadcasting to {subscription_key}: {e}")
+                        dead_subscribers.append(subscription_key)
+                        continue
+
+                    self._record_delivery(subscriber_info, delivered, evicted, num_samples)
+
+                # Clean up dead subscribers
+                if dead_subscribers:
+                    with self.lock:
+                        for dead_key in dead_subscribers:
+                            if dead_key in self.subscribers:
+                                self._remove_subscriber(dead_key)
+                                self.logger.info(f"Removed dead subscriber {dead_key}")
 
             except Exception as e:
                 if self.running:
@@ -328,6 +593,16 @@ class IQBroadcaster(threading.Thread):
                     with self.stats_lock:
                         self.stats["errors"] += 1
 
+        with self.lock:
+            for subscriber_info in self.subscribers.values():
+                if subscriber_info.get("feeder") is not None:
+                    subscriber_info["feeder"].stop()
+
+        # Release the shared ring; readers still attached keep their mapping until they detach
+        if self.iq_ring is not None:
+            self.iq_ring.close()
+            self.iq_ring = None
+
         self.logger.info(f"IQ broadcaster stopped for SDR {self.sdr_id}")
 
     def stop(self):
@@ -335,4 +610,6 @@ class IQBroadcaster(threading.Thread):
         Stop the broadcaster thread.
         """
         self.running = False
+        if self.channelizer is not None:
+            self.channelizer.stop()
         self.logger.info(f"Stopping IQ broadcaster for SDR {self.sdr_id}")
@@ -0,0 +1,212 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Sample formats carried by IQ messages.
+
+By default "samples" is a complex64 array. A source whose hardware delivers
+integer samples (e.g. 8-bit RTL-SDR) may instead send them as read, which keeps
+messages 2-4x smaller on every queue hop:
+
+    "samples":   interleaved I/Q integers (uint8 for cu8, int16 for ci16)
+    "iq_format": "cu8" or "ci16"
+    "iq_scale":  factor mapping (raw - offset) to [-1.0, 1.0]
+    "iq_offset": [offset_i, offset_q], the zero level of each rail (the source
+                 puts the block mean here, so unpacking also removes DC)
+
+Consumers call get_iq_samples() and only pay for the float conversion when they
+actually need complex samples; recorders can write the integers untouched.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+IQ_FORMAT_CF32 = "cf32"
+IQ_FORMAT_CU8 = "cu8"
+IQ_FORMAT_CI16 = "ci16"
+
+# Raw dtype, full-scale factor and nominal zero level of each integer format
+PACKED_FORMATS: Dict[str, tuple] = {
+    IQ_FORMAT_CU8: (np.uint8, 1.0 / 127.5, 127.5),
+    IQ_FORMAT_CI16: (np.int16, 1.0 / 32768.0, 0.0),
+}
+
+# SigMF core:datatype of each format
+SIGMF_DATATYPES = {
+    IQ_FORMAT_CF32: "cf32_le",
+    IQ_FORMAT_CU8: "cu8",
+    IQ_FORMAT_CI16: "ci16_le",
+}
+
+
+def get_iq_format(iq_message: Dict[str, Any]) -> str:
+    """
+    Sample format of an IQ message (cf32 when the message does not say).
+
+    Args:
+        iq_message: IQ message
+
+    Returns:
+        One of IQ_FORMAT_CF32, IQ_FORMAT_CU8, IQ_FORMAT_CI16
+    """
+    return iq_message.get("iq_format") or IQ_FORMAT_CF32
+
+
+def block_offset(raw: np.ndarray) -> list:
+    """
+    Per-rail mean of an interleaved integer block, used as its zero level.
+
+    Args:
+        raw: Interleaved I/Q integers
+
+    Returns:
+        [offset_i, offset_q]
+    """
+    if len(raw) < 2:
+        return [0.0, 0.0]
+    return [float(v) for v in raw.reshape(-1, 2).mean(axis=0)]
+
+
+def packed_fields(iq_format: str, offset: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+    """
+    Message fields describing a packed integer block.
+
+    Args:
+        iq_format: IQ_FORMAT_CU8 or IQ_FORMAT_CI16
+        offset: Zero level per rail (defaults to the format's nominal zero)
+
+    Returns:
+        Dict with "iq_format", "iq_scale" and "iq_offset" to merge into IQ messages
+    """
+    _, scale, zero = PACKED_FORMATS[iq_format]
+    if offset is None:
+        offset = [zero, zero]
+    return {"iq_format": iq_format, "iq_scale": scale, "iq_offset": list(offset)}
+
+
+def unpack_iq(
+    raw: np.ndarray,
+    iq_format: str,
+    scale: Optional[float] = None,
+    offset: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Convert interleaved integer samples to complex64.
+
+    Args:
+        raw: Interleaved I/Q integers
+        iq_format: IQ_FORMAT_CU8 or IQ_FORMAT_CI16
+        scale: Full-scale factor (defaults to the format's)
+        offset: Zero level per rail (defaults to the format's nominal zero)
+
+    Returns:
+        complex64 samples, len(raw) // 2 of them
+    """
+    _, default_scale, zero = PACKED_FORMATS[iq_format]
+    scale = default_scale if scale is None else scale
+    offset_pair = np.asarray([zero, zero] if offset is None else offset, dtype=np.float32)
+
+    num_samples = len(raw) // 2
+    out = np.empty(num_samples, dtype=np.complex64)
+    rails = out.view(np.float32).reshape(-1, 2)
+    np.subtract(raw[: 2 * num_samples].reshape(-1, 2), offset_pair, out=rails)
+    rails *= np.float32(scale)
+    return out
+
+
+def pack_iq(
+    samples: np.ndarray,
+    iq_format: str,
+    scale: Optional[float] = None,
+    offset: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Quantize complex samples to an interleaved integer format.
+
+    Args:
+        samples: Complex samples
+        iq_format: IQ_FORMAT_CU8 or IQ_FORMAT_CI16
+        scale: Full-scale factor (defaults to the format's)
+        offset: Zero level per rail (defaults to the format's nominal zero)
+
+    Returns:
+        Interleaved I/Q integers of the format's dtype (values are clipped)
+    """
+    dtype, default_scale, zero = PACKED_FORMATS[iq_format]
+    scale = default_scale if scale is None else scale
+    offset_pair = np.asarray([zero, zero] if offset is None else offset, dtype=np.float32)
+
+    rails = np.asarray(samples, dtype=np.complex64).view(np.float32).reshape(-1, 2)
+    values = np.rint(rails / np.float32(scale) + offset_pair)
+    limits = np.iinfo(dtype)
+    return np.clip(values, limits.min, limits.max).astype(dtype).reshape(-1)
+
+
+def get_iq_samples(iq_message: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    Complex samples of an IQ message, converting packed integers if needed.
+
+    Args:
+        iq_message: IQ message
+
+    Returns:
+        complex64 samples, or None if the message carries no samples
+    """
+    samples = iq_message.get("samples")
+    if samples is None:
+        return None
+    iq_format = get_iq_format(iq_message)
+    if iq_format == IQ_FORMAT_CF32:
+        return samples
+    return unpack_iq(samples, iq_format, iq_message.get("iq_scale"), iq_message.get("iq_offset"))
+
+
+def num_iq_samples(iq_message: Dict[str, Any]) -> int:
+    """
+    Number of complex samples in an IQ message without converting it.
+
+    Args:
+        iq_message: IQ message
+
+    Returns:
+        Sample count (0 if the message carries no samples)
+    """
+    samples = iq_message.get("samples")
+    if samples is None:
+        return 0
+    if get_iq_format(iq_message) == IQ_FORMAT_CF32:
+        return len(samples)
+    return len(samples) // 2
+
+
+def as_complex_message(iq_message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of an IQ message with its samples converted to complex64.
+
+    Args:
+        iq_message: IQ message
+
+    Returns:
+        The message itself if already cf32, otherwise a shallow copy without the
+        packing fields
+    """
+    if get_iq_format(iq_message) == IQ_FORMAT_CF32:
+        return iq_message
+    converted = {
+        k: v for k, v in iq_message.items() if k not in ("iq_format", "iq_scale", "iq_offset")
+    }
+    converted["samples"] = get_iq_samples(iq_message)
+    return converted
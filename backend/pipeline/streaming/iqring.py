@@ -0,0 +1,351 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Shared-memory ring buffer transport for IQ fan-out to decoder processes.
+
+The IQBroadcaster writes every IQ block once into a shared-memory ring owned by
+the SDR. Process subscribers only receive a small descriptor through their
+multiprocessing.Queue (shm name, slot, sequence number and length) and copy the
+samples out of the ring themselves. This avoids pickling multi-megabyte complex64
+blocks once per decoder.
+
+Each slot carries a header with the sequence number of the block it holds. The
+writer invalidates the header while it copies samples in, so a reader that lags
+so far behind that its slot has been reused detects the overrun instead of
+returning torn data.
+"""
+
+from __future__ import annotations
+
+import queue
+import time
+import uuid
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from vfos.sharedstate import VFOStateReader
+
+# Per-slot header: [sequence number, number of valid samples]
+HEADER_FIELDS = 2
+HEADER_DTYPE = np.int64
+SAMPLE_DTYPE = np.complex64
+
+# Sequence value marking a slot that is empty or currently being written
+SEQ_INVALID = -1
+
+# Descriptor keys carried in place of "samples"
+DESCRIPTOR_KEYS = (
+    "shm_name",
+    "shm_slots",
+    "shm_slot_samples",
+    "shm_slot",
+    "shm_seq",
+    "shm_length",
+)
+
+
+class IQSharedRing:
+    """
+    Single-writer ring of fixed-size IQ slots in shared memory.
+
+    The ring is created by the IQBroadcaster (one per SDR). Readers in other
+    processes attach by name using IQRingReader.
+    """
+
+    def __init__(self, slot_samples: int, num_slots: int, name_prefix: str = "gs-iq"):
+        """
+        Create the shared-memory segment.
+
+        Args:
+            slot_samples: Capacity of each slot in complex samples
+            num_slots: Number of slots in the ring
+            name_prefix: Prefix for the shared-memory segment name
+        """
+        if slot_samples <= 0 or num_slots <= 0:
+            raise ValueError("slot_samples and num_slots must be positive")
+
+        self.slot_samples = int(slot_samples)
+        self.num_slots = int(num_slots)
+        header_bytes = self.num_slots * HEADER_FIELDS * np.dtype(HEADER_DTYPE).itemsize
+        data_bytes = self.num_slots * self.slot_samples * np.dtype(SAMPLE_DTYPE).itemsize
+
+        self.shm = shared_memory.SharedMemory(
+            name=f"{name_prefix}-{uuid.uuid4().hex[:12]}",
+            create=True,
+            size=header_bytes + data_bytes,
+        )
+        self.headers = np.ndarray(
+            (self.num_slots, HEADER_FIELDS), dtype=HEADER_DTYPE, buffer=self.shm.buf
+        )
+        self.slots = np.ndarray(
+            (self.num_slots, self.slot_samples),
+            dtype=SAMPLE_DTYPE,
+            buffer=self.shm.buf,
+            offset=header_bytes,
+        )
+        self.headers[:, 0] = SEQ_INVALID
+        self.headers[:, 1] = 0
+        self.next_seq = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, samples: np.ndarray) -> Dict[str, Any]:
+        """
+        Copy a block of samples into the next slot.
+
+        Args:
+            samples: 1-D complex array, at most slot_samples long
+
+        Returns:
+            Descriptor dict identifying the written slot
+        """
+        length = len(samples)
+        if length > self.slot_samples:
+            raise ValueError(f"Block of {length} samples exceeds slot size {self.slot_samples}")
+
+        seq = self.next_seq
+        slot = seq % self.num_slots
+
+        # Invalidate first so readers still holding an old descriptor for this slot
+        # see the overrun rather than a half-written block
+        self.headers[slot, 0] = SEQ_INVALID
+        self.slots[slot, :length] = samples
+        self.headers[slot, 1] = length
+        self.headers[slot, 0] = seq
+        self.next_seq = seq + 1
+
+        return {
+            "shm_name": self.shm.name,
+            "shm_slots": self.num_slots,
+            "shm_slot_samples": self.slot_samples,
+            "shm_slot": slot,
+            "shm_seq": seq,
+            "shm_length": length,
+        }
+
+    def close(self):
+        """
+        Release and unlink the shared-memory segment.
+        """
+        # Drop numpy views before closing, otherwise the buffer export blocks close()
+        self.headers = None
+        self.slots = None
+        try:
+            self.shm.close()
+        except Exception:
+            pass
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class IQRingReader:
+    """
+    Reader cursor over an IQSharedRing, used inside the subscriber process.
+
+    Attaches lazily to the segment named in each descriptor and re-attaches when
+    the writer replaces the ring (e.g. after a block size change). Keeps its own
+    sequence cursor so blocks skipped by the broadcaster (full queue) and blocks
+    overwritten before they could be read are both accounted for.
+    """
+
+    def __init__(self):
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.headers: Optional[np.ndarray] = None
+        self.slots: Optional[np.ndarray] = None
+        self.expected_seq: Optional[int] = None
+        self.blocks_read = 0
+        self.overruns = 0
+        self.missed = 0
+
+    def _attach(self, descriptor: Dict[str, Any]):
+        self.detach()
+        # Attaching registers the segment with this process's resource tracker. That is
+        # only harmless when the tracker is the broadcaster's, inherited because it was
+        # running before this process was forked (see IQBroadcaster.subscribe)
+        shm = shared_memory.SharedMemory(name=descriptor["shm_name"], create=False)
+
+        num_slots = int(descriptor["shm_slots"])
+        slot_samples = int(descriptor["shm_slot_samples"])
+        header_bytes = num_slots * HEADER_FIELDS * np.dtype(HEADER_DTYPE).itemsize
+        self.shm = shm
+        self.headers = np.ndarray((num_slots, HEADER_FIELDS), dtype=HEADER_DTYPE, buffer=shm.buf)
+        self.slots = np.ndarray(
+            (num_slots, slot_samples), dtype=SAMPLE_DTYPE, buffer=shm.buf, offset=header_bytes
+        )
+        self.expected_seq = None
+
+    def read(self, descriptor: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Copy the block referenced by a descriptor out of the ring.
+
+        Args:
+            descriptor: Descriptor produced by IQSharedRing.write()
+
+        Returns:
+            Copy of the samples, or None if the slot was overwritten (overrun)
+        """
+        if self.shm is None or self.shm.name != descriptor["shm_name"]:
+            self._attach(descriptor)
+
+        assert self.headers is not None and self.slots is not None
+        slot = descriptor["shm_slot"]
+        seq = descriptor["shm_seq"]
+        length = descriptor["shm_length"]
+
+        if self.expected_seq is not None and seq > self.expected_seq:
+            self.missed += seq - self.expected_seq
+        self.expected_seq = seq + 1
+
+        # Seqlock-style read: header must match before and after the copy
+        if int(self.headers[slot, 0]) != seq:
+            self.overruns += 1
+            return None
+        samples = self.slots[slot, :length].copy()
+        if int(self.headers[slot, 0]) != seq:
+            self.overruns += 1
+            return None
+
+        self.blocks_read += 1
+        return samples
+
+    def detach(self):
+        """
+        Release the mapping of the current ring, if any.
+        """
+        self.headers = None
+        self.slots = None
+        if self.shm is not None:
+            try:
+                self.shm.close()
+            except Exception:
+                pass
+            self.shm = None
+
+
+class SharedRingQueue:
+    """
+    Queue-like handle given to process subscribers of the shared-memory transport.
+
+    Wraps the multiprocessing.Queue that carries descriptors and returns fully
+    hydrated IQ messages (with "samples" and "vfo_states"), so decoders keep calling
+    get(timeout=...) exactly as they do with a plain queue. VFO states are taken
+    from the shared VFO channel and only re-read when the message's vfo_version
+    changes.
+    """
+
+    def __init__(self, descriptor_queue, session_id: str = ""):
+        """
+        Args:
+            descriptor_queue: multiprocessing.Queue receiving descriptor messages
+            session_id: Session whose VFO states are attached to each message
+        """
+        self.descriptor_queue = descriptor_queue
+        self.session_id = session_id
+        self._reader: Optional[IQRingReader] = None
+        self._vfo_reader: Optional[VFOStateReader] = None
+
+    def __getstate__(self):
+        # Mappings are per-process; the child re-attaches on first read
+        state = self.__dict__.copy()
+        state["_reader"] = None
+        state["_vfo_reader"] = None
+        return state
+
+    @property
+    def reader(self) -> IQRingReader:
+        if self._reader is None:
+            self._reader = IQRingReader()
+        return self._reader
+
+    def _hydrate(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            samples = self.reader.read(message)
+        except FileNotFoundError:
+            # Ring was replaced and unlinked before we got to this descriptor
+            self.reader.overruns += 1
+            return None
+        if samples is None:
+            return None
+        hydrated = {k: v for k, v in message.items() if k not in DESCRIPTOR_KEYS}
+        hydrated["samples"] = samples
+
+        vfo_channel = hydrated.pop("vfo_channel", None)
+        if vfo_channel is not None:
+            if self._vfo_reader is None:
+                self._vfo_reader = VFOStateReader()
+            try:
+                hydrated["vfo_states"] = self._vfo_reader.get_session_states(
+                    vfo_channel, hydrated.get("vfo_version", 0), self.session_id
+                )
+            except FileNotFoundError:
+                hydrated["vfo_states"] = {}
+        return hydrated
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Return the next IQ message, skipping blocks lost to ring overruns.
+
+        Raises:
+            queue.Empty: If no readable block arrives within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+                message = self.descriptor_queue.get(block, remaining)
+            else:
+                message = self.descriptor_queue.get(block)
+            hydrated = self._hydrate(message)
+            if hydrated is not None:
+                return hydrated
+            if not block or (deadline is not None and time.monotonic() >= deadline):
+                raise queue.Empty
+
+    def get_nowait(self) -> Dict[str, Any]:
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        return bool(self.descriptor_queue.empty())
+
+    def qsize(self) -> int:
+        return int(self.descriptor_queue.qsize())
+
+    def full(self) -> bool:
+        return bool(self.descriptor_queue.full())
+
+    def get_reader_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Per-reader counters: blocks read, overruns and blocks missed
+        """
+        reader = self.reader
+        return {
+            "blocks_read": reader.blocks_read,
+            "overruns": reader.overruns,
+            "missed": reader.missed,
+        }
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.detach()
+        if self._vfo_reader is not None:
+            self._vfo_reader.detach()
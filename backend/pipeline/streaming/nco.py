@@ -0,0 +1,173 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Numerically controlled oscillator for frequency translation.
+
+Demodulators and decoders shift their VFO to baseband by multiplying every IQ
+block with a complex exponential. Building that exponential from a fresh time
+axis for each block costs a full np.exp per sample and restarts the phase at
+zero, which puts a phase step at every block boundary.
+
+The NCO keeps its phase (in cycles) across blocks. The rotator for a block of
+n samples at a given frequency and rate, exp(-2j*pi*f/rate*k) for k < n, does
+not depend on where the block starts, so it is computed once per block length
+and reused; the block start phase is applied as one complex scalar. When the
+frequency changes (VFO retune, Doppler tracking) the rotators are rebuilt and the
+phase carries on from where the previous block ended, so the output stays
+continuous.
+
+NCOBank does the same for several offsets of one stream at once: one row per
+offset, one phase per row, and a cached rotator matrix per block length.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+# Distinct block lengths whose rotators are kept
+DEFAULT_MAX_CACHED_LENGTHS = 4
+
+
+class NCO:
+    """
+    Phase-continuous frequency translator for one IQ stream.
+    """
+
+    def __init__(self, max_cached_lengths: int = DEFAULT_MAX_CACHED_LENGTHS):
+        """
+        Initialize the oscillator.
+
+        Args:
+            max_cached_lengths: Number of block lengths whose rotators are cached
+        """
+        self.max_cached_lengths = max(1, int(max_cached_lengths))
+        self.phase = 0.0  # Phase at the start of the next block, in cycles [0, 1)
+        self._step = 0.0  # Cycles per sample of the cached rotators
+        self._rotators: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def reset(self) -> None:
+        """Restart at zero phase and drop cached rotators."""
+        self.phase = 0.0
+        self._rotators.clear()
+
+    def _rotator(self, length: int) -> np.ndarray:
+        rotator = self._rotators.get(length)
+        if rotator is not None:
+            self._rotators.move_to_end(length)
+            return rotator
+
+        # Wrap cycles in float64 before the exp so long blocks keep full precision
+        cycles = np.mod(self._step * np.arange(length, dtype=np.float64), 1.0)
+        rotator = np.exp(-2j * np.pi * cycles).astype(np.complex64)
+        self._rotators[length] = rotator
+        while len(self._rotators) > self.max_cached_lengths:
+            self._rotators.popitem(last=False)
+        return rotator
+
+    def mix(self, samples: np.ndarray, offset_freq: float, sample_rate: float) -> np.ndarray:
+        """
+        Shift a block down by offset_freq (the signal at +offset_freq moves to 0 Hz).
+
+        Args:
+            samples: Complex IQ block
+            offset_freq: Frequency to move to baseband in Hz (negative shifts up)
+            sample_rate: Sample rate of the block in Hz
+
+        Returns:
+            Translated block (complex64 for complex64 input)
+        """
+        length = len(samples)
+        if offset_freq == 0 or length == 0 or not sample_rate:
+            return samples
+
+        step = float(offset_freq) / float(sample_rate)
+        if step != self._step:
+            self._step = step
+            self._rotators.clear()
+
+        start = np.complex64(np.exp(-2j * np.pi * self.phase))
+        output = samples * self._rotator(length)
+        output *= start
+
+        self.phase = (self.phase + step * length) % 1.0
+        return output
+
+
+class NCOBank:
+    """
+    Phase-continuous frequency translators for several offsets of one IQ stream.
+    """
+
+    def __init__(self, max_cached_lengths: int = DEFAULT_MAX_CACHED_LENGTHS):
+        """
+        Initialize the oscillators.
+
+        Args:
+            max_cached_lengths: Number of block lengths whose rotator matrices are cached
+        """
+        self.max_cached_lengths = max(1, int(max_cached_lengths))
+        self.phases = np.zeros(0)  # Per-row phase at the start of the next block, in cycles
+        self._steps = np.zeros(0)  # Per-row cycles per sample of the cached rotators
+        self._rotators: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def reset(self) -> None:
+        """Forget all rows and cached rotators."""
+        self.phases = np.zeros(0)
+        self._steps = np.zeros(0)
+        self._rotators.clear()
+
+    def _rotator(self, length: int) -> np.ndarray:
+        rotator = self._rotators.get(length)
+        if rotator is not None:
+            self._rotators.move_to_end(length)
+            return rotator
+
+        cycles = np.mod(np.outer(self._steps, np.arange(length, dtype=np.float64)), 1.0)
+        rotator = np.exp(-2j * np.pi * cycles).astype(np.complex64)
+        self._rotators[length] = rotator
+        while len(self._rotators) > self.max_cached_lengths:
+            self._rotators.popitem(last=False)
+        return rotator
+
+    def mix(self, samples: np.ndarray, offset_freqs, sample_rate: float) -> np.ndarray:
+        """
+        Shift one block down by each offset (row r has offset_freqs[r] at 0 Hz).
+
+        Rows keep their phase while the number of offsets stays the same; a
+        different number of offsets restarts every row at zero phase.
+
+        Args:
+            samples: Complex IQ block (1-D)
+            offset_freqs: Frequencies to move to baseband in Hz, one per row
+            sample_rate: Sample rate of the block in Hz
+
+        Returns:
+            Translated blocks, shape (len(offset_freqs), len(samples))
+        """
+        steps = np.asarray(offset_freqs, dtype=np.float64) / float(sample_rate)
+        if steps.shape != self.phases.shape:
+            self.phases = np.zeros(len(steps))
+        if steps.shape != self._steps.shape or not np.array_equal(steps, self._steps):
+            self._steps = steps
+            self._rotators.clear()
+
+        length = len(samples)
+        start = np.exp(-2j * np.pi * self.phases).astype(np.complex64)
+        output = samples[None, :] * self._rotator(length)
+        output *= start[:, None]
+
+        self.phases = (self.phases + steps * length) % 1.0
+        return output
@@ -0,0 +1,187 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Streaming rational resampling for audio.
+
+Resampling each block on its own with an FFT treats the block as periodic
+(wrap-around clicks at the edges) and rounds the output length per block, so the
+output rate drifts from the nominal one. The resampler here converts by a fixed
+ratio up/down computed once, runs a polyphase FIR whose input history is kept
+across blocks, and tracks input and output sample counts globally: after N
+input samples it has produced exactly ceil(N * up / down) output samples, however
+the input was split into blocks.
+
+Output sample m sits at position m * down / up on the input grid. It is computed
+from the input samples before that position with polyphase branch
+(m * down) mod up of a lowpass designed like scipy's resample_poly.
+
+Blocks may be 2-D, one row per channel; all rows share the sample counts, and
+the output positions and branch taps are worked out once for all of them.
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import signal
+
+# Largest denominator used when the rate ratio is not an exact fraction
+MAX_RATIO_DENOMINATOR = 4096
+
+# Half filter length per unit of max(up, down), as in scipy.signal.resample_poly
+HALF_LENGTH_FACTOR = 10
+KAISER_BETA = 5.0
+
+
+def resample_ratio(input_rate: float, output_rate: float) -> Tuple[int, int]:
+    """
+    Reduced (up, down) ratio converting input_rate to output_rate.
+
+    Args:
+        input_rate: Input sample rate in Hz
+        output_rate: Output sample rate in Hz
+
+    Returns:
+        (up, down) with output_rate / input_rate ~= up / down
+    """
+    if float(input_rate).is_integer() and float(output_rate).is_integer():
+        ratio = Fraction(int(output_rate), int(input_rate))
+    else:
+        ratio = Fraction(output_rate / input_rate)
+    ratio = ratio.limit_denominator(MAX_RATIO_DENOMINATOR)
+    return ratio.numerator, ratio.denominator
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filters(up: int, down: int) -> np.ndarray:
+    """Lowpass taps split into `up` branches of equal length (branch x tap)."""
+    max_rate = max(up, down)
+    half_len = HALF_LENGTH_FACTOR * max_rate
+    taps = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", KAISER_BETA))
+    taps *= up
+
+    branch_len = -(-len(taps) // up)
+    padded = np.zeros(branch_len * up)
+    padded[: len(taps)] = taps
+    # Branch p holds taps p, p + up, p + 2*up, ...
+    branches = padded.reshape(branch_len, up).T.astype(np.float32)
+    branches.setflags(write=False)
+    return branches
+
+
+class RationalResampler:
+    """
+    Stateful up/down resampler for one real or complex sample stream (or a stack of them).
+    """
+
+    def __init__(self, input_rate: float, output_rate: float):
+        """
+        Initialize the resampler.
+
+        Args:
+            input_rate: Input sample rate in Hz
+            output_rate: Output sample rate in Hz
+        """
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up, self.down = resample_ratio(input_rate, output_rate)
+        self._branches = _polyphase_filters(self.up, self.down) if self.up != self.down else None
+        self._taps_per_branch = self._branches.shape[1] if self._branches is not None else 1
+
+        self._history: Optional[np.ndarray] = None
+        self._input_count = 0  # Global index of the next input sample
+        self._output_count = 0  # Global index of the next output sample
+
+    def reset(self) -> None:
+        """Forget history and restart the sample counts."""
+        self._history = None
+        self._input_count = 0
+        self._output_count = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample one block.
+
+        Args:
+            samples: Input block (1-D, or 2-D with one channel per row)
+
+        Returns:
+            Every output sample whose position falls inside the input seen so far
+        """
+        samples = np.asarray(samples)
+        if self._branches is None:
+            return samples
+
+        history_len = self._taps_per_branch - 1
+        length = samples.shape[-1]
+        if self._history is None:
+            # Start as if the first sample had been held
+            first = (
+                samples[..., :1] if length else np.zeros(samples.shape[:-1] + (1,), samples.dtype)
+            )
+            self._history = np.repeat(first, history_len, axis=-1)
+
+        input_end = self._input_count + length
+        # Output m needs input floor(m * down / up), which must already be here
+        output_end = -(-input_end * self.up // self.down)
+        output_index = np.arange(self._output_count, output_end, dtype=np.int64)
+
+        buffer = np.concatenate((self._history, samples), axis=-1)
+        if len(output_index):
+            positions = output_index * self.down
+            newest = positions // self.up - self._input_count + history_len
+            gather = newest[:, None] - np.arange(self._taps_per_branch)[None, :]
+            branches = self._branches[positions % self.up]
+            # Row by row: a broadcast einsum over all rows is several times slower
+            rows = buffer.reshape(-1, buffer.shape[-1])
+            output = np.stack([np.einsum("ij,ij->i", row[gather], branches) for row in rows])
+            output = output.reshape(buffer.shape[:-1] + (len(output_index),))
+        else:
+            output = np.zeros(
+                samples.shape[:-1] + (0,), dtype=np.result_type(samples.dtype, np.float32)
+            )
+
+        if history_len:
+            self._history = buffer[..., buffer.shape[-1] - history_len :]
+        self._input_count = input_end
+        self._output_count = output_end
+        return output
+
+    def skip(self, count: int) -> int:
+        """
+        Advance over input samples without computing output (e.g. while squelched).
+
+        The sample counts move on as if count samples had been processed, so the
+        output rate stays exact, and the history is cleared as if they had been
+        silence.
+
+        Args:
+            count: Number of input samples to pass over
+
+        Returns:
+            Number of output samples those input samples would have produced
+        """
+        if self._branches is None:
+            return count
+        input_end = self._input_count + count
+        output_end = -(-input_end * self.up // self.down)
+        skipped = output_end - self._output_count
+        if self._history is not None:
+            self._history = np.zeros_like(self._history)
+        self._input_count = input_end
+        self._output_count = output_end
+        return skipped
@@ -0,0 +1,291 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Preallocated sample buffers for decoders.
+
+Growing a buffer with np.concatenate on every chunk copies everything buffered
+so far each time. The buffers here keep a fixed array instead:
+
+- SampleRingBuffer is a FIFO between one writer and one reader thread (e.g. a
+  decoder loop feeding a GNU Radio source block). Writes copy the new samples
+  in, reads copy the oldest unread samples out; a condition variable lets the
+  reader wait for data instead of spinning. When the writer gets ahead by more
+  than the capacity, the oldest unread samples are overwritten and counted as
+  dropped, so the reader stays close to real time.
+- SampleWindow holds the most recent samples as one contiguous array for
+  decoders that work on whole batches or index into the signal (LoRa, SSTV).
+  Consumed samples are only skipped; the live window is moved back to the
+  start of the array when the end is reached, so appends are amortised O(1).
+  take_batch() keeps a configurable overlap, so a frame crossing a batch
+  boundary is seen whole by the next batch; global sample indices let callers
+  recognise frames decoded twice from the overlap.
+"""
+
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SampleRingBuffer:
+    """
+    Fixed-capacity FIFO of samples shared by one writer and one reader thread.
+    """
+
+    def __init__(self, capacity: int, dtype=np.complex64):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Maximum number of unread samples held
+            dtype: Sample dtype
+        """
+        self.capacity = max(1, int(capacity))
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.zeros(self.capacity, dtype=self.dtype)
+        self._write_count = 0  # Total samples written
+        self._read_count = 0  # Total samples read or dropped
+        self.dropped = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def available(self) -> int:
+        """Number of unread samples."""
+        with self._condition:
+            return self._write_count - self._read_count
+
+    @property
+    def total_written(self) -> int:
+        """Number of samples written since creation."""
+        return self._write_count
+
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Append samples, overwriting the oldest unread ones if there is no room.
+
+        Args:
+            samples: 1-D samples (converted to the buffer dtype)
+
+        Returns:
+            Number of unread samples dropped to make room
+        """
+        samples = np.asarray(samples, dtype=self.dtype).ravel()
+        count = len(samples)
+        if count == 0:
+            return 0
+        if count > self.capacity:
+            # Only the newest capacity samples can be kept
+            skipped = count - self.capacity
+            samples = samples[skipped:]
+            count = self.capacity
+        else:
+            skipped = 0
+
+        with self._condition:
+            start = (self._write_count + skipped) % self.capacity
+            first = min(count, self.capacity - start)
+            self._buffer[start : start + first] = samples[:first]
+            self._buffer[: count - first] = samples[first:]
+            self._write_count += skipped + count
+
+            overrun = self._write_count - self._read_count - self.capacity
+            dropped = max(0, overrun)
+            if dropped:
+                self._read_count += dropped
+                self.dropped += dropped
+            self._condition.notify_all()
+        return dropped
+
+    def read_into(self, out: np.ndarray, timeout: Optional[float] = None) -> int:
+        """
+        Move the oldest unread samples into out.
+
+        Args:
+            out: Destination array; up to len(out) samples are copied
+            timeout: Seconds to wait for data when the buffer is empty (None: no wait)
+
+        Returns:
+            Number of samples copied (0 if none arrived in time or the buffer is closed)
+        """
+        with self._condition:
+            if self._write_count == self._read_count and timeout and not self.closed:
+                self._condition.wait(timeout)
+            count = min(len(out), self._write_count - self._read_count)
+            if count <= 0:
+                return 0
+            start = self._read_count % self.capacity
+            first = min(count, self.capacity - start)
+            out[:first] = self._buffer[start : start + first]
+            out[first:count] = self._buffer[: count - first]
+            self._read_count += count
+            self._condition.notify_all()
+        return count
+
+    def read(self, max_count: Optional[int] = None) -> np.ndarray:
+        """
+        Take up to max_count unread samples (all of them by default) without waiting.
+
+        Returns:
+            A new array with the samples, oldest first
+        """
+        count = self.available if max_count is None else min(max_count, self.available)
+        out = np.empty(count, dtype=self.dtype)
+        return out[: self.read_into(out)]
+
+    def wait_empty(self, timeout: float) -> bool:
+        """
+        Wait until the reader has taken every unread sample.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if the buffer is empty
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._write_count == self._read_count, timeout)
+
+    def clear(self) -> None:
+        """Discard every unread sample."""
+        with self._condition:
+            self._read_count = self._write_count
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Mark the end of the stream and wake a waiting reader."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class SampleWindow:
+    """
+    Contiguous window of the most recent samples, with overlap between batches.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        dtype=np.float32,
+        overlap: int = 0,
+        initial_capacity: Optional[int] = None,
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            capacity: Maximum number of samples held; older samples are dropped
+            dtype: Sample dtype
+            overlap: Samples take_batch() keeps for the next batch
+            initial_capacity: Samples to allocate room for up front (default: capacity);
+                the array grows on demand up to capacity
+        """
+        self.capacity = max(1, int(capacity))
+        self.dtype = np.dtype(dtype)
+        self.overlap = max(0, min(int(overlap), self.capacity))
+        initial = self.capacity if initial_capacity is None else int(initial_capacity)
+        # Twice the live size, so compaction happens at most once per half an array of appends
+        self._buffer = np.zeros(2 * max(1, min(initial, self.capacity)), dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+        self.start_index = 0  # Global index of data[0]
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def data(self) -> np.ndarray:
+        """The buffered samples, oldest first (a view, valid until the next append)."""
+        return self._buffer[self._start : self._end]
+
+    @property
+    def end_index(self) -> int:
+        """Global index one past the newest sample."""
+        return self.start_index + len(self)
+
+    def append(self, samples: np.ndarray) -> int:
+        """
+        Append samples, dropping the oldest ones if the window is full.
+
+        Args:
+            samples: 1-D samples (converted to the window dtype)
+
+        Returns:
+            Number of samples dropped to make room (buffered ones, or the start of
+            samples itself if it alone exceeds the capacity)
+        """
+        samples = np.asarray(samples, dtype=self.dtype).ravel()
+        count = len(samples)
+        if count == 0:
+            return 0
+
+        dropped = max(0, len(self) + count - self.capacity)
+        if dropped:
+            self.dropped += dropped
+            skipped = max(0, count - self.capacity)
+            self.consume(dropped - skipped)
+            if skipped:
+                self.start_index += skipped
+                samples = samples[skipped:]
+                count = len(samples)
+
+        if self._end + count > len(self._buffer):
+            length = len(self)
+            needed = length + count
+            size = len(self._buffer)
+            if 2 * needed > size:
+                # Grow (up to twice the capacity) and copy the live window over
+                size = min(2 * self.capacity, max(2 * needed, 2 * size))
+                buffer = np.zeros(size, dtype=self.dtype)
+                buffer[:length] = self.data
+                self._buffer = buffer
+            else:
+                # Move the live window back to the start of the array
+                self._buffer[:length] = self.data
+            self._start, self._end = 0, length
+        self._buffer[self._end : self._end + count] = samples
+        self._end += count
+        return dropped
+
+    def consume(self, count: int) -> None:
+        """Drop the oldest count samples (all of them if count exceeds the length)."""
+        count = max(0, min(int(count), len(self)))
+        self._start += count
+        self.start_index += count
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def keep_last(self, count: int) -> None:
+        """Drop all but the newest count samples."""
+        self.consume(len(self) - max(0, int(count)))
+
+    def clear(self) -> None:
+        """Drop every sample (the global index keeps counting)."""
+        self.consume(len(self))
+
+    def take_batch(self) -> Tuple[int, np.ndarray]:
+        """
+        Copy out the buffered samples, keeping the last overlap samples for the next batch.
+
+        Returns:
+            (global index of the first sample, copy of the samples)
+        """
+        start_index = self.start_index
+        batch = self.data.copy()
+        self.keep_last(self.overlap)
+        return start_index, batch
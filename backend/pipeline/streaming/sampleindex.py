@@ -0,0 +1,137 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Sample indexing for IQ messages.
+
+SDR workers stamp every IQ block with "sample_index", the index of its first
+sample in the worker's stream, and "hw_timestamp_ns" when the driver reports a
+hardware time. The index advances for every block read from the device, whether
+or not a queue accepted it, so a consumer that sees the index jump knows exactly
+how many samples it missed (queue drops in the worker or the broadcaster, or
+hardware overflows detected from the timestamps).
+"""
+
+from typing import Any, Dict, Optional
+
+from pipeline.streaming.iqformat import num_iq_samples
+
+
+class SampleClock:
+    """
+    Producer side: assigns sample indices to the blocks read by an SDR worker.
+    """
+
+    def __init__(self):
+        self.next_index = 0
+        self.hardware_gaps = 0
+        self.hardware_samples_lost = 0
+        self._last_hw_time_ns: Optional[int] = None
+        self._last_count = 0
+        self._last_rate: Optional[float] = None
+
+    def stamp(
+        self, num_samples: int, sample_rate: float, hw_time_ns: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Assign the index of a block that was just read.
+
+        If the driver provides hardware timestamps, samples the device dropped
+        (e.g. on overflow) are detected from the time jump and skipped in the index.
+
+        Args:
+            num_samples: Number of samples in the block
+            sample_rate: Current sample rate in Hz
+            hw_time_ns: Hardware timestamp of the first sample in ns, if available
+
+        Returns:
+            Dict with "sample_index" and "hw_timestamp_ns" to merge into IQ messages
+        """
+        if (
+            hw_time_ns is not None
+            and self._last_hw_time_ns is not None
+            and sample_rate == self._last_rate
+            and sample_rate
+        ):
+            expected_ns = self._last_hw_time_ns + self._last_count * 1e9 / sample_rate
+            missing = int(round((hw_time_ns - expected_ns) * sample_rate / 1e9))
+            if missing > 0:
+                self.next_index += missing
+                self.hardware_gaps += 1
+                self.hardware_samples_lost += missing
+
+        index = self.next_index
+        self.next_index += num_samples
+        self._last_hw_time_ns = hw_time_ns
+        self._last_count = num_samples
+        self._last_rate = sample_rate
+        return {"sample_index": index, "hw_timestamp_ns": hw_time_ns}
+
+    def skip(self, num_samples: int):
+        """
+        Advance the index over samples that were read but never published.
+
+        Args:
+            num_samples: Number of discarded samples
+        """
+        self.next_index += num_samples
+
+
+class SampleGapDetector:
+    """
+    Consumer side: detects missing samples between consecutive IQ messages.
+
+    Messages without a sample index (e.g. from older producers) are ignored. An
+    index that goes backwards means the producer restarted, and a message marked
+    "discontinuity" starts a new index scale (a channel whose rate changed); in
+    both cases the detector resynchronizes without reporting a gap.
+    """
+
+    def __init__(self):
+        self.next_index: Optional[int] = None
+        self.gaps = 0
+        self.samples_lost = 0
+
+    def check(self, iq_message: Dict[str, Any], num_samples: Optional[int] = None) -> int:
+        """
+        Check a message for a gap before it.
+
+        Args:
+            iq_message: IQ message carrying "sample_index"
+            num_samples: Number of samples in the message (defaults to the samples it carries)
+
+        Returns:
+            Number of samples missing before this message (0 if contiguous or unknown)
+        """
+        index = iq_message.get("sample_index")
+        if index is None:
+            return 0
+        if num_samples is None:
+            num_samples = num_iq_samples(iq_message)
+
+        missing = 0
+        resync = bool(iq_message.get("discontinuity"))
+        if not resync and self.next_index is not None and index > self.next_index:
+            missing = index - self.next_index
+            self.gaps += 1
+            self.samples_lost += missing
+        self.next_index = index + num_samples
+        return missing
+
+    def reset(self):
+        """
+        Forget the expected index (e.g. after a retune or sample rate change).
+        """
+        self.next_index = None
@@ -0,0 +1,85 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Squelch decision for the audio demodulators.
+
+The demodulators measure RF power on the decimated channel, before any audio
+processing. SquelchGate turns that measurement into an open/closed decision
+right there, so a demodulator can skip its whole audio stage (detector, audio
+filters, de-emphasis, resampling) while the squelch is closed and only emit
+silence of the right length.
+
+The gate opens above threshold + hysteresis and closes below threshold -
+hysteresis, like the per-demodulator squelch it replaces. Once open it stays open
+for hold_time seconds of channel samples after the power has dropped below the
+close level, so short fades and syllable gaps are not chopped.
+"""
+
+# Same hysteresis as the demodulators used before the gate
+DEFAULT_HYSTERESIS_DB = 3.0
+
+# Seconds the squelch stays open after the signal drops below the close level
+DEFAULT_HOLD_TIME = 0.25
+
+
+class SquelchGate:
+    """
+    Hysteresis squelch with hold time, updated once per block of channel samples.
+    """
+
+    def __init__(
+        self, hysteresis_db: float = DEFAULT_HYSTERESIS_DB, hold_time: float = DEFAULT_HOLD_TIME
+    ):
+        """
+        Initialize the gate (closed).
+
+        Args:
+            hysteresis_db: Distance of the open and close levels from the threshold
+            hold_time: Seconds to stay open after the power drops below the close level
+        """
+        self.hysteresis_db = hysteresis_db
+        self.hold_time = hold_time
+        self.is_open = False
+        self._hold_remaining = 0.0
+
+    def reset(self) -> None:
+        """Close the gate."""
+        self.is_open = False
+        self._hold_remaining = 0.0
+
+    def update(self, rf_power_db: float, threshold_db: float, duration: float) -> bool:
+        """
+        Update the gate with the power of one block.
+
+        Args:
+            rf_power_db: Channel power of the block in dB
+            threshold_db: Squelch threshold in dB
+            duration: Length of the block in seconds (counts down the hold time)
+
+        Returns:
+            True if the block should be demodulated, False if it is squelched
+        """
+        if rf_power_db > threshold_db + self.hysteresis_db:
+            self.is_open = True
+            self._hold_remaining = self.hold_time
+        elif self.is_open:
+            if rf_power_db < threshold_db - self.hysteresis_db:
+                self._hold_remaining -= duration
+                if self._hold_remaining < 0:
+                    self.is_open = False
+            else:
+                self._hold_remaining = self.hold_time
+        return self.is_open
@@ -6,13 +6,13 @@ import tempfile
 import zipfile
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Set
+from typing import Optional, Set
 
 import socketio
 from engineio.payload import Payload
 from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 from audio.audiobroadcaster import AudioBroadcaster
@@ -22,12 +22,15 @@ from common.logger import logger
 from db import *  # noqa: F401,F403
 from db import engine  # Explicit import for type checker
 from db.migrations import run_migrations
+from fft.detectionindex import get_detection_index
+from fft.waterfalltiles import waterfall_tile_cache
 from observations import events as obs_events
 from observations.events import emit_scheduled_observations_changed as _emit
 from observations.events import set_socketio_instance
 from observations.executor import ObservationExecutor
 from observations.sync import ObservationSchedulerSync
 from pipeline.orchestration.processmanager import process_manager
+from pipeline.streaming.backpressure import POLICY_DROP_OLDEST
 from server import shutdown
 from server.firsttime import first_time_initialization, run_initial_sync
 from server.scheduler import run_initial_observation_generation, start_scheduler, stop_scheduler
@@ -83,13 +86,14 @@ async def lifespan(fastapiapp: FastAPI):
     shutdown.audio_broadcaster = audio_broadcaster
 
     # Subscribe consumers to broadcaster
-    playback_queue = audio_broadcaster.subscribe("playback", maxsize=10)
+    playback_queue = audio_broadcaster.subscribe("playback", maxsize=10, policy=POLICY_DROP_OLDEST)
     shutdown.audio_consumer = WebAudioStreamer(playback_queue, sio, event_loop)
     shutdown.audio_consumer.start()
 
     # Initialize ProcessManager with event loop for TranscriptionManager
     process_manager.set_event_loop(event_loop)
     logger.info("ProcessManager initialized with event loop")
+    process_manager.demodulator_manager.default_isolation = arguments.demodulator_isolation
 
     asyncio.create_task(handle_tracker_messages(sio))
     await tracker_manager.sync_tracking_state_from_db()
@@ -295,6 +299,54 @@ async def download_decoded_folder(foldername: str, background_tasks: BackgroundT
     )
 
 
+def _resolve_recording(recordings_root: Path, recording_name: str) -> Path:
+    recording_path = (recordings_root / recording_name).resolve()
+    if recording_path.parent != recordings_root:
+        raise HTTPException(status_code=400, detail="Invalid recording name")
+    if not Path(f"{recording_path}.sigmf-data").exists():
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return recording_path
+
+
+@app.get("/api/recordings/{recording_name}/tiles")
+async def get_recording_tiles_info(recording_name: str):
+    """Describe the waterfall tile pyramid of a recording."""
+    recording_path = _resolve_recording(Path(recordings_dir).resolve(), recording_name)
+    try:
+        return await asyncio.to_thread(waterfall_tile_cache.get_info, recording_path)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/api/recordings/{recording_name}/tiles/{level}/{x}/{y}.png")
+async def get_recording_tile(recording_name: str, level: int, x: int, y: int):
+    """Serve one waterfall tile, rendering it on first request."""
+    recording_path = _resolve_recording(Path(recordings_dir).resolve(), recording_name)
+    try:
+        png = await asyncio.to_thread(waterfall_tile_cache.get_tile, recording_path, level, x, y)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=png, media_type="image/png")
+
+
+@app.get("/api/recordings/{recording_name}/detections")
+async def get_recording_detections(
+    recording_name: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    freq_lower: Optional[float] = None,
+    freq_upper: Optional[float] = None,
+    limit: Optional[int] = None,
+):
+    """List signals detected in a recording, optionally within a time (s) and frequency (Hz) window."""
+    recording_path = _resolve_recording(Path(recordings_dir).resolve(), recording_name)
+    try:
+        index = await asyncio.to_thread(get_detection_index, recording_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"detections": index.query(start, end, freq_lower, freq_upper, limit)}
+
+
 # This catch-all route comes AFTER specific API routes
 @app.get("/{full_path:path}")
 async def serve_spa(request: Request, full_path: str):
@@ -492,7 +492,7 @@ class SessionTracker:
                         inst = vfo_entry.get("instance")
                         # vfo_num is expected to be int; guard otherwise
                         if isinstance(vfo_num, int):
-                            entry["demodulators"][sid][vfo_num] = (
+                            entry["demodulators"][sid][vfo_num] = vfo_entry.get("class_name") or (
                                 type(inst).__name__ if inst else None
                             )
                 # Recorders
@@ -75,35 +75,25 @@ def generate_waterfall_task(
             default_config_path = Path("backend/data/configs/waterfall_config.json")
             config = WaterfallConfig.load_from_file(default_config_path)
 
-        # Create generator
-        generator = WaterfallGenerator(config)
-
-        # Monkey-patch the logger to send progress updates
+        # Create generator, reporting row progress and log messages on the progress queue
         if _progress_queue:
+
+            def report_progress(progress, msg):
+                logger.info(msg)
+                _progress_queue.put(
+                    {"type": "output", "output": msg, "stream": "stdout", "progress": progress}
+                )
+
+            generator = WaterfallGenerator(config, progress_callback=report_progress)
             original_info = generator.logger.info
 
             def progress_info(msg):
                 original_info(msg)
-                # Parse progress from message if it contains "Progress: XX%"
-                if "Progress:" in msg and "%" in msg:
-                    try:
-                        # Extract percentage from "Progress: 50%"
-                        progress_str = msg.split("Progress:")[1].split("%")[0].strip()
-                        progress = float(progress_str)
-                        _progress_queue.put(
-                            {
-                                "type": "output",
-                                "output": msg,
-                                "stream": "stdout",
-                                "progress": progress,
-                            }
-                        )
-                    except (ValueError, IndexError):
-                        _progress_queue.put({"type": "output", "output": msg, "stream": "stdout"})
-                else:
-                    _progress_queue.put({"type": "output", "output": msg, "stream": "stdout"})
+                _progress_queue.put({"type": "output", "output": msg, "stream": "stdout"})
 
             generator.logger.info = progress_info
+        else:
+            generator = WaterfallGenerator(config)
 
         # Generate waterfall
         success = generator.generate_from_sigmf(recording_path_obj)
@@ -0,0 +1,130 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for running demodulators in worker processes (demodulators/demodulatorprocess.py).
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+
+import numpy as np
+
+from demodulators.demodulatorprocess import DemodulatorProcess, VFOMirrorQueue
+from pipeline.streaming.iqbroadcaster import TRANSPORT_SHM, IQBroadcaster
+from vfos.state import VFOManager
+
+
+class EchoDemodulator(threading.Thread):
+    """Stand-in demodulator: emits the VFO frequency and block length per IQ block."""
+
+    def __init__(self, iq_queue, audio_queue, session_id, vfo_number=None, internal_mode=False):
+        super().__init__(daemon=True)
+        self.iq_queue = iq_queue
+        self.audio_queue = audio_queue
+        self.session_id = session_id
+        self.vfo_number = vfo_number
+        self.running = True
+        self.stats = {"iq_chunks_in": 0}
+        self.stats_lock = threading.Lock()
+
+    def run(self):
+        vfo_manager = VFOManager()
+        while self.running:
+            try:
+                message = self.iq_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            with self.stats_lock:
+                self.stats["iq_chunks_in"] += 1
+            vfo_state = vfo_manager.get_vfo_state(self.session_id, self.vfo_number)
+            self.audio_queue.put(
+                {
+                    "audio": np.abs(message["samples"]).astype(np.float32),
+                    "center_freq": vfo_state.center_freq,
+                    "vfo_number": self.vfo_number,
+                }
+            )
+
+    def stop(self):
+        self.running = False
+
+
+class TestVFOMirrorQueue:
+    """Test cases for mirroring VFO states into the worker's VFOManager."""
+
+    def test_states_loaded_on_version_change(self):
+        """VFO states carried by a message become visible through get_vfo_state()."""
+        source: queue.Queue = queue.Queue()
+        mirror = VFOMirrorQueue(source, "mirror-session")
+        source.put(
+            {
+                "samples": np.zeros(4, dtype=np.complex64),
+                "vfo_version": 7,
+                "vfo_states": {1: {"vfo_number": 1, "center_freq": 437_000_000, "active": True}},
+            }
+        )
+
+        mirror.get(timeout=1.0)
+
+        vfo_state = VFOManager().get_vfo_state("mirror-session", 1)
+        assert vfo_state.center_freq == 437_000_000
+        assert vfo_state.active
+
+
+class TestDemodulatorProcess:
+    """Test cases for the worker process host."""
+
+    def test_worker_receives_iq_and_returns_audio(self):
+        """IQ from the shared ring is demodulated in the worker and audio comes back."""
+        session_id = "process-session"
+        VFOManager().update_vfo_state(session_id, 1, center_freq=145_800_000, active=True)
+
+        source: queue.Queue = queue.Queue()
+        broadcaster = IQBroadcaster(source, "test-sdr")
+        iq_queue = broadcaster.subscribe(
+            f"demod:{session_id}:vfo1",
+            maxsize=4,
+            for_process=True,
+            session_id_hint=session_id,
+            transport=TRANSPORT_SHM,
+        )
+        audio_queue: multiprocessing.Queue = multiprocessing.Queue()
+        worker = DemodulatorProcess(
+            EchoDemodulator, iq_queue, audio_queue, session_id, stats_interval=0.1, vfo_number=1
+        )
+        broadcaster.start()
+        worker.start()
+        try:
+            source.put({"samples": np.full(32, 2.0, dtype=np.complex64), "sample_rate": 1e6})
+            audio = audio_queue.get(timeout=10.0)
+
+            deadline = time.time() + 5.0
+            while worker.stats.get("iq_chunks_in", 0) < 1 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            worker.stop()
+            worker.join(timeout=5.0)
+            broadcaster.stop()
+            broadcaster.join(timeout=2.0)
+
+        assert worker.exitcode == 0
+        assert worker.pid != multiprocessing.current_process().pid
+        np.testing.assert_array_equal(audio["audio"], np.full(32, 2.0, dtype=np.float32))
+        assert audio["center_freq"] == 145_800_000
+        assert worker.stats["iq_chunks_in"] == 1
+        assert worker.stats["pid"] == worker.pid
@@ -0,0 +1,175 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for batched multi-VFO demodulation (demodulators/multivfodemodulator.py).
+"""
+
+import queue
+import time
+
+import numpy as np
+import pytest
+
+from demodulators.amdemodulator import AMDemodulator
+from demodulators.fmdemodulator import FMDemodulator
+from demodulators.multivfodemodulator import BatchedVFO, MultiVFODemodulator, VFOBatch
+from vfos.state import VFOManager
+
+RATE = 2.048e6
+CENTER = 145_000_000
+
+
+def fm_signal(offset, audio_freq, count, deviation=5e3, start=0):
+    """FM carrier at offset Hz from center, modulated by an audio tone."""
+    t = np.arange(start, start + count) / RATE
+    phase = 2 * np.pi * offset * t + deviation / audio_freq * np.sin(2 * np.pi * audio_freq * t)
+    return np.exp(1j * phase).astype(np.complex64)
+
+
+def dominant_freq(audio, rate=44100):
+    spectrum = np.abs(np.fft.rfft(audio * np.hanning(len(audio))))
+    return np.argmax(spectrum[1:]) * rate / len(audio) + rate / len(audio)
+
+
+class TestVFOBatch:
+    """Test cases for demodulating VFOs as rows of one array."""
+
+    @pytest.mark.parametrize(
+        "demodulator_class, modulation", [(FMDemodulator, "fm"), (AMDemodulator, "am")]
+    )
+    def test_rows_match_single_vfo_batches(self, demodulator_class, modulation):
+        """Each row of a batch produces the audio it would produce on its own."""
+        designer = demodulator_class(None, queue.Queue(), "batch-session", vfo_number=1)
+        samples = fm_signal(100e3, 1000, 60000) + 0.5 * fm_signal(-300e3, 2000, 60000)
+        offsets = [100e3, -300e3, 250e3]
+
+        batch = VFOBatch(modulation, (1, 2, 3), designer, RATE, 25000)
+        singles = [VFOBatch(modulation, (n,), designer, RATE, 25000) for n in (1, 2, 3)]
+        for start, end in ((0, 16384), (16384, 60000)):
+            channels, rf_power_db = batch.channelize(samples[start:end], np.array(offsets))
+            audio = batch.demodulate(channels)
+            assert audio.shape[0] == 3
+            for row, (single, offset) in enumerate(zip(singles, offsets)):
+                single_channels, single_power = single.channelize(
+                    samples[start:end], np.array([offset])
+                )
+                single_audio = single.demodulate(single_channels)
+                np.testing.assert_allclose(audio[row], single_audio[0], atol=1e-4)
+                assert rf_power_db[row] == pytest.approx(single_power[0], abs=1e-3)
+
+    def test_fm_rows_recover_their_own_tones(self):
+        designer = FMDemodulator(None, queue.Queue(), "batch-session", vfo_number=1)
+        samples = fm_signal(100e3, 1000, 204800) + fm_signal(-300e3, 2500, 204800)
+        batch = VFOBatch("fm", (1, 2), designer, RATE, 25000)
+        channels, rf_power_db = batch.channelize(samples, np.array([100e3, -300e3]))
+        audio = batch.demodulate(channels)
+
+        assert dominant_freq(audio[0, 1000:]) == pytest.approx(1000, abs=20)
+        assert dominant_freq(audio[1, 1000:]) == pytest.approx(2500, abs=20)
+        # Both carriers are in band at unit amplitude
+        assert np.all(rf_power_db > 10)
+
+    def test_skip_keeps_output_length_and_reopens_cleanly(self):
+        """Skipped blocks yield silence of the right length; demodulation resumes without a spike."""
+        designer = FMDemodulator(None, queue.Queue(), "batch-session", vfo_number=1)
+        samples = fm_signal(100e3, 1000, 3 * 65536)
+        reference = VFOBatch("fm", (1,), designer, RATE, 25000)
+        gated = VFOBatch("fm", (1,), designer, RATE, 25000)
+
+        lengths = []
+        for i, gate_open in enumerate((True, False, True)):
+            block = samples[i * 65536 : (i + 1) * 65536]
+            channels, _ = reference.channelize(block, np.array([100e3]))
+            expected = reference.demodulate(channels)
+            channels, _ = gated.channelize(block, np.array([100e3]))
+            audio = gated.demodulate(channels) if gate_open else gated.skip(channels)
+            assert audio.shape == expected.shape
+            lengths.append(audio.shape[-1])
+            if not gate_open:
+                assert not np.any(audio)
+
+        # After reopening the audio rises from silence, then follows the
+        # continuously demodulated signal
+        assert abs(audio[0, 0]) < 0.01
+        assert np.max(np.abs(np.diff(audio[0]))) <= np.max(np.abs(np.diff(expected[0]))) + 0.01
+        np.testing.assert_allclose(audio[0, 2000:], expected[0, 2000:], atol=0.02)
+        assert sum(lengths) == reference.audio_resampler._output_count
+
+
+class TestMultiVFODemodulator:
+    """Test cases for the session engine and its per-VFO handles."""
+
+    def test_vfos_get_audio_from_one_subscription(self):
+        session_id = "multivfo-session"
+        vfo_manager = VFOManager()
+        for vfo_number, offset in ((1, 100e3), (2, -300e3)):
+            vfo_manager.update_vfo_state(
+                session_id,
+                vfo_number,
+                center_freq=int(CENTER + offset),
+                bandwidth=25000,
+                modulation="FM",
+                active=True,
+                squelch=-150,
+            )
+
+        iq_queue: queue.Queue = queue.Queue()
+        engine = MultiVFODemodulator(iq_queue, session_id)
+        audio_queues = {1: queue.Queue(), 2: queue.Queue()}
+        vfos = [BatchedVFO(engine, FMDemodulator, audio_queues[n], session_id, n) for n in (1, 2)]
+        for vfo in vfos:
+            vfo.start()
+        engine.start()
+        try:
+            block = 65536
+            for i in range(8):
+                samples = fm_signal(100e3, 1000, block, start=i * block) + fm_signal(
+                    -300e3, 2500, block, start=i * block
+                )
+                iq_queue.put(
+                    {
+                        "samples": samples,
+                        "center_freq": CENTER,
+                        "sample_rate": RATE,
+                        "sample_index": i * block,
+                    }
+                )
+
+            chunks = {1: [], 2: []}
+            deadline = time.time() + 10.0
+            while min(len(c) for c in chunks.values()) < 8 and time.time() < deadline:
+                for n, audio_queue in audio_queues.items():
+                    try:
+                        chunks[n].append(audio_queue.get(timeout=0.05))
+                    except queue.Empty:
+                        pass
+            while vfos[0].stats["iq_chunks_in"] < 8 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            for vfo in vfos:
+                vfo.stop()
+            engine.stop()
+            engine.join(timeout=2.0)
+
+        assert engine.vfo_count() == 0
+        for n, tone in ((1, 1000), (2, 2500)):
+            assert len(chunks[n]) >= 8
+            assert all(chunk["vfo_number"] == n for chunk in chunks[n])
+            audio = np.concatenate([chunk["audio"] for chunk in chunks[n][2:8]])
+            assert dominant_freq(audio) == pytest.approx(tone, abs=20)
+        assert vfos[0].stats["iq_chunks_in"] == 8
+        assert vfos[0].stats["audio_chunks_out"] >= 8
+        assert not vfos[0].is_alive()
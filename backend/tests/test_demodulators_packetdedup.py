@@ -0,0 +1,48 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+from demodulators.packetdedup import PacketDedupIndex
+
+
+class TestPacketDedupIndex:
+    def test_same_payload_within_window_is_duplicate(self):
+        index = PacketDedupIndex(window_samples=1000)
+        assert index.check(b"beacon", 0)
+        assert not index.check(b"beacon", 800)
+        assert index.duplicates == 1
+
+    def test_different_payloads_are_kept(self):
+        index = PacketDedupIndex(window_samples=1000)
+        assert index.check(b"beacon 1", 0)
+        assert index.check(b"beacon 2", 500)
+
+    def test_repeat_after_window_is_new(self):
+        index = PacketDedupIndex(window_samples=1000)
+        assert index.check(b"beacon", 0)
+        assert index.check(b"beacon", 1500)
+        # The entry now points at the newer decode
+        assert not index.check(b"beacon", 2000)
+
+    def test_old_entries_are_forgotten(self):
+        index = PacketDedupIndex(window_samples=10)
+        for position in range(0, 1000, 20):
+            index.check(position.to_bytes(2, "big"), position)
+        assert len(index._entries) == 1
+
+    def test_clear(self):
+        index = PacketDedupIndex(window_samples=1000)
+        index.check(b"beacon", 0)
+        index.clear()
+        assert index.check(b"beacon", 10)
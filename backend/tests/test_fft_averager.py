@@ -0,0 +1,100 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Tests for the streaming FFT averager (fft/averager.py).
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from fft.averager import (
+    AVERAGING_BLOCK,
+    AVERAGING_EMA,
+    AVERAGING_MIN_HOLD,
+    AVERAGING_PEAK_HOLD,
+    AVERAGING_SLIDING,
+    FFTAverager,
+)
+
+logger = logging.getLogger("test-fft-averager")
+
+
+def frames(count, size=64, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(-100.0, -20.0, size).astype(np.float32) for _ in range(count)]
+
+
+class TestFFTAverager:
+    """Test cases for the averaging modes."""
+
+    def test_block_mean(self):
+        """Block mode emits the mean of every N frames and nothing in between."""
+        averager = FFTAverager(logger, averaging_factor=3)
+        data = frames(6)
+
+        results = [averager.add_fft(frame) for frame in data]
+
+        assert results[0] is None and results[1] is None and results[3] is None
+        np.testing.assert_allclose(results[5], np.mean(data[3:], axis=0), rtol=1e-6)
+
+    def test_sliding_mean_every_frame(self):
+        """Sliding mode emits the mean of the last N frames on every input."""
+        averager = FFTAverager(logger, averaging_factor=4, mode=AVERAGING_SLIDING)
+        data = frames(10)
+
+        for i, frame in enumerate(data):
+            result = averager.add_fft(frame)
+            np.testing.assert_allclose(
+                result, np.mean(data[max(0, i - 3) : i + 1], axis=0), rtol=1e-5
+            )
+
+    def test_ema_converges_and_reuses_buffer(self):
+        """EMA tracks a step change and always returns the same preallocated array."""
+        averager = FFTAverager(logger, averaging_factor=5, mode=AVERAGING_EMA)
+        first = averager.add_fft(np.full(8, -100.0, dtype=np.float32))
+
+        for _ in range(60):
+            result = averager.add_fft(np.full(8, -40.0, dtype=np.float32))
+
+        assert result is first
+        np.testing.assert_allclose(result, -40.0, atol=1e-3)
+
+    @pytest.mark.parametrize("mode, sign", [(AVERAGING_PEAK_HOLD, 1), (AVERAGING_MIN_HOLD, -1)])
+    def test_hold_with_decay(self, mode, sign):
+        """Held values follow new extremes and relax by hold_decay_db per frame."""
+        averager = FFTAverager(logger, mode=mode, hold_decay_db=1.0)
+        averager.add_fft(np.full(4, -60.0 + sign * 20.0, dtype=np.float32))
+
+        result = None
+        for _ in range(5):
+            result = averager.add_fft(np.full(4, -60.0, dtype=np.float32))
+
+        np.testing.assert_allclose(result, -60.0 + sign * 15.0)
+
+    def test_mode_change_and_reset_clear_state(self):
+        """Switching mode or resetting discards accumulated frames."""
+        averager = FFTAverager(logger, averaging_factor=2, mode=AVERAGING_SLIDING)
+        averager.add_fft(np.zeros(4, dtype=np.float32))
+
+        averager.update_mode(AVERAGING_BLOCK)
+        assert averager.add_fft(np.ones(4, dtype=np.float32)) is None
+        averager.reset()
+        assert averager.add_fft(np.ones(4, dtype=np.float32)) is None
+        with pytest.raises(ValueError):
+            averager.update_mode("median")
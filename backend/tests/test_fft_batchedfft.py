@@ -0,0 +1,71 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the batched FFT engine (fft/batchedfft.py).
+"""
+
+import numpy as np
+import pytest
+
+from fft.batchedfft import BatchedFFT
+
+
+def reference_spectrum(samples, fft_size, overlap):
+    """Segment-by-segment linear power average, as a plain loop."""
+    window = np.hanning(fft_size)
+    step = fft_size // 2 if overlap else fft_size
+    num_segments, _ = BatchedFFT.count_segments(len(samples), fft_size, overlap)
+    correction = 1.0 if overlap else np.sum(window**2) / fft_size
+    power = np.zeros(fft_size)
+    for i in range(num_segments):
+        segment = samples[i * step : i * step + fft_size] * window
+        power += np.abs(np.fft.fftshift(np.fft.fft(segment))) ** 2 / (fft_size * correction)
+    return 10 * np.log10(power / num_segments + 1e-10)
+
+
+class TestBatchedFFT:
+    """Test cases for the batched power spectrum."""
+
+    @pytest.mark.parametrize("overlap", [True, False])
+    def test_matches_segment_loop(self, overlap):
+        """Batched result equals the per-segment reference, across several batches."""
+        rng = np.random.default_rng(3)
+        samples = (rng.normal(size=5000) + 1j * rng.normal(size=5000)).astype(np.complex64)
+        engine = BatchedFFT(max_batch=4)
+
+        result = engine.power_spectrum(samples, 256, "hanning", overlap)
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, reference_spectrum(samples, 256, overlap), atol=1e-3)
+
+    def test_tone_lands_in_its_bin(self):
+        """A tone at +fs/8 peaks 1/8 of the way above the center bin."""
+        n = np.arange(4096)
+        samples = np.exp(2j * np.pi * n / 8).astype(np.complex64)
+
+        result = BatchedFFT().power_spectrum(samples, 512, "blackman", True)
+
+        assert int(np.argmax(result)) == 256 + 64
+
+    def test_short_block_and_window_cache(self):
+        """Blocks shorter than a segment yield None; windows are built once per key."""
+        engine = BatchedFFT()
+
+        assert (
+            engine.power_spectrum(np.zeros(100, dtype=np.complex64), 256, "hanning", False) is None
+        )
+        first = engine.get_window(256, "Hanning")[0]
+        assert engine.get_window(256, "hanning")[0] is first
@@ -0,0 +1,84 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the recording detection index (fft/detectionindex.py).
+"""
+
+import json
+
+import pytest
+
+from fft.detectionindex import DetectionIndex, get_detection_index
+
+RATE = 1000.0
+
+
+def detection(start_s, length_s, lower, upper):
+    return {
+        "core:sample_start": int(start_s * RATE),
+        "core:sample_count": int(length_s * RATE),
+        "core:freq_lower_edge": lower,
+        "core:freq_upper_edge": upper,
+        "gs:detection": True,
+        "gs:peak_db": -40.0,
+    }
+
+
+ANNOTATIONS = [
+    detection(50.0, 1.0, 100, 200),
+    {"core:sample_start": 0, "core:sample_count": 0, "core:comment": "Gap"},
+    detection(10.0, 30.0, 300, 400),
+    detection(45.0, 2.0, 150, 250),
+]
+
+
+class TestDetectionIndex:
+    """Test cases for time and frequency queries."""
+
+    def test_only_detections_sorted(self):
+        index = DetectionIndex(ANNOTATIONS, RATE)
+        assert len(index) == 3
+        assert [d["start_time"] for d in index.query()] == [10.0, 45.0, 50.0]
+
+    def test_time_window_includes_long_overlaps(self):
+        """A detection that started before the window but overlaps it is returned."""
+        index = DetectionIndex(ANNOTATIONS, RATE)
+        assert [d["start_time"] for d in index.query(start_time=35.0, end_time=46.0)] == [
+            10.0,
+            45.0,
+        ]
+        assert index.query(start_time=42.0, end_time=44.0) == []
+
+    def test_frequency_window_and_limit(self):
+        index = DetectionIndex(ANNOTATIONS, RATE)
+        assert [d["freq_lower"] for d in index.query(freq_lower=210, freq_upper=320)] == [
+            300.0,
+            150.0,
+        ]
+        assert len(index.query(limit=1)) == 1
+
+    def test_rebuilt_when_metadata_changes(self, tmp_path):
+        base = tmp_path / "rec"
+        meta = {"global": {"core:sample_rate": RATE}, "annotations": ANNOTATIONS[:1]}
+        (tmp_path / "rec.sigmf-meta").write_text(json.dumps(meta))
+        assert len(get_detection_index(base)) == 1
+
+        meta["annotations"] = ANNOTATIONS
+        (tmp_path / "rec.sigmf-meta").write_text(json.dumps(meta))
+        assert len(get_detection_index(base)) == 3
+
+        with pytest.raises(FileNotFoundError):
+            get_detection_index(tmp_path / "missing")
@@ -0,0 +1,100 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the FFT stream signal detector (fft/detector.py).
+"""
+
+import numpy as np
+
+from fft.detector import (
+    EVENT_SIGNAL_START,
+    EVENT_SIGNAL_STOP,
+    SignalDetector,
+    cfar_mask,
+    mask_regions,
+)
+
+SIZE = 1024
+CENTER = 100e6
+RATE = 1.024e6
+
+
+def spectrum(seed, signals=()):
+    """Noise floor around -100 dB with (first_bin, last_bin, level_db) signals."""
+    rng = np.random.default_rng(seed)
+    power = -100.0 + 10 * np.log10(rng.exponential(1.0, SIZE))
+    for first, last, level in signals:
+        power[first : last + 1] = level
+    return power.astype(np.float32)
+
+
+class TestSignalDetector:
+    """Test cases for CFAR detection and time hysteresis."""
+
+    def test_cfar_finds_carrier_only(self):
+        """A strong narrow carrier is hot; averaged noise is not."""
+        noise = np.full(SIZE, -100.0)
+        noise[500:504] = -60.0
+
+        regions = mask_regions(cfar_mask(noise, threshold_db=10.0))
+        assert regions == [(500, 503)]
+
+    def test_regions_merge_short_gaps(self):
+        """Runs separated by up to merge_bins cold bins form one region."""
+        mask = np.zeros(32, dtype=bool)
+        mask[[3, 4, 7, 8, 20]] = True
+
+        assert mask_regions(mask, merge_bins=2) == [(3, 8), (20, 20)]
+        assert mask_regions(mask, merge_bins=1) == [(3, 4), (7, 8), (20, 20)]
+
+    def test_start_and_stop_with_hysteresis(self):
+        """A burst starts after min_frames and stops hangover_frames after it fades."""
+        detector = SignalDetector(threshold_db=15.0, min_frames=2, hangover_frames=2)
+        burst = [(256, 259, -50.0)]
+        frames = [burst] * 4 + [()] * 4
+
+        events = []
+        for i, signals in enumerate(frames):
+            for event in detector.process(
+                spectrum(i, signals),
+                CENTER,
+                RATE,
+                timestamp=10.0 + i,
+                sample_index=i * 1000,
+                num_samples=1000,
+            ):
+                events.append((i, event))
+
+        assert [(i, e["event"]) for i, e in events] == [
+            (1, EVENT_SIGNAL_START),
+            (6, EVENT_SIGNAL_STOP),
+        ]
+        stop = events[1][1]
+        assert stop["start_time"] == 10.0 and stop["stop_time"] == 13.0 + 1000 / RATE
+        assert (stop["start_sample_index"], stop["stop_sample_index"]) == (0, 4000)
+        assert stop["freq_lower"] == CENTER + (256 / SIZE - 0.5) * RATE
+        assert stop["freq_upper"] == CENTER + (260 / SIZE - 0.5) * RATE
+        assert stop["peak_db"] == -50.0
+
+    def test_single_frame_blip_ignored_and_reset_stops(self):
+        """Unconfirmed regions emit nothing; reset closes active signals."""
+        detector = SignalDetector(threshold_db=15.0, min_frames=2)
+        assert detector.process(spectrum(0, [(100, 103, -40.0)]), CENTER, RATE, 0.0) == []
+        assert detector.process(spectrum(1), CENTER, RATE, 1.0) == []
+
+        detector.process(spectrum(2, [(100, 103, -40.0)]), CENTER, RATE, 2.0)
+        detector.process(spectrum(3, [(100, 103, -40.0)]), CENTER, RATE, 3.0)
+        assert [e["event"] for e in detector.reset()] == [EVENT_SIGNAL_STOP]
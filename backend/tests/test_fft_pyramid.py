@@ -0,0 +1,50 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the multi-resolution FFT pyramid (fft/pyramid.py).
+"""
+
+import numpy as np
+
+from fft.batchedfft import BatchedFFT
+from fft.pyramid import derive_levels, pyramid_levels
+
+
+class TestPyramid:
+    """Test cases for deriving coarse spectra from a fine one."""
+
+    def test_levels_filter_requested_sizes(self):
+        """Only smaller sizes that divide the top size become levels."""
+        assert pyramid_levels(16384, [16384, 4096, 1024, 4096, 3000, 32, 32768]) == [4096, 1024]
+
+    def test_level_matches_native_fft(self):
+        """A derived level puts the tone in the native bin and the noise at the native level."""
+        rng = np.random.default_rng(7)
+        n = np.arange(1 << 16)
+        samples = 0.1 * (rng.normal(size=n.size) + 1j * rng.normal(size=n.size))
+        samples += np.exp(2j * np.pi * n * (-0.2))
+        samples = samples.astype(np.complex64)
+        engine = BatchedFFT()
+
+        fine = engine.power_spectrum(samples, 4096, "blackman", False)
+        native = engine.power_spectrum(samples, 512, "blackman", False)
+        derived = derive_levels(fine, [512])[512]
+
+        assert derived.dtype == np.float32
+        assert int(np.argmax(derived)) == int(np.argmax(native)) == 256 - int(0.2 * 512)
+        assert abs(np.median(derived) - np.median(native)) < 1.0
+        # The tone's power is not spread by the coarse window, so it may only read higher
+        assert 0.0 <= derived.max() - native.max() < 4.0
@@ -0,0 +1,99 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for per-client spectrum views (fft/spectrumview.py).
+"""
+
+import numpy as np
+import pytest
+
+from fft.spectrumview import (
+    ENCODING_FLOAT32,
+    ENCODING_UINT8,
+    SpectrumViews,
+    decimate_max_hold,
+    quantize_db,
+)
+
+
+class TestReduction:
+    """Test cases for decimation and quantization."""
+
+    def test_max_hold_keeps_narrow_peaks(self):
+        """A single-bin carrier survives a 16x reduction at full level."""
+        spectrum = np.full(16384, -100.0, dtype=np.float32)
+        spectrum[5001] = -20.0
+
+        decimated = decimate_max_hold(spectrum, 1024)
+
+        assert len(decimated) == 1024
+        assert decimated.max() == -20.0
+        assert int(np.argmax(decimated)) == 5001 // 16
+
+    def test_quantize_round_trip(self):
+        """Codes map back to dB within half a quantization step."""
+        values = np.linspace(-120.0, -30.0, 500).astype(np.float32)
+
+        codes, db_offset, db_scale = quantize_db(values)
+
+        assert codes.dtype == np.uint8
+        restored = db_offset + codes.astype(np.float64) * db_scale
+        assert np.max(np.abs(restored - values)) <= db_scale / 2 + 1e-6
+
+
+class TestSpectrumViews:
+    """Test cases for the per-client view registry."""
+
+    def test_views_render_per_zoom(self):
+        """Clients at different zooms get different frames; equal views share one."""
+        spectrum = np.arange(16384, dtype=np.float32)
+        views = SpectrumViews()
+        views.set_view("wide", 1000)
+        views.set_view("zoomed", 1000, start=0.5, end=0.75, quantize=True)
+        views.set_view("wide-too", 1000)
+
+        frames = {tuple(ids): payload for payload, ids in views.render(spectrum.tobytes())}
+
+        wide = frames[("wide", "wide-too")]
+        zoomed = frames[("zoomed",)]
+        assert wide["encoding"] == ENCODING_FLOAT32
+        assert (wide["start_bin"], wide["end_bin"], wide["bins"]) == (0, 16384, 1000)
+        assert np.frombuffer(wide["data"], dtype=np.float32)[-1] == 16383
+        assert zoomed["encoding"] == ENCODING_UINT8
+        assert (zoomed["start_bin"], zoomed["end_bin"]) == (8192, 12288)
+        assert len(zoomed["data"]) == 1000
+        assert len(wide["data"]) + len(zoomed["data"]) < spectrum.nbytes / 10
+
+    def test_narrow_span_is_not_upsampled(self):
+        """Spans narrower than the display are sent bin for bin."""
+        views = SpectrumViews()
+        views.set_view("c", 2000, start=0.25, end=0.26)
+
+        ((payload, _),) = views.render(np.zeros(16384, dtype=np.float32).tobytes())
+
+        assert payload["bins"] == payload["end_bin"] - payload["start_bin"] < 2000
+
+    def test_rejects_empty_span_and_removes(self):
+        """Empty spans are refused; removed clients go back to full frames."""
+        views = SpectrumViews()
+        with pytest.raises(ValueError):
+            views.set_view("c", 1000, start=0.6, end=0.4)
+
+        views.set_view("c", 1000)
+        views.remove("c")
+
+        assert len(views) == 0
+        assert views.render(np.zeros(64, dtype=np.float32).tobytes()) == []
@@ -0,0 +1,99 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Tests for the waterfall history ring (fft/waterfallhistory.py).
+"""
+
+import numpy as np
+
+from fft.waterfallhistory import WaterfallHistory
+
+
+def frame(level, size=64):
+    spectrum = np.full(size, -100.0, dtype=np.float32)
+    spectrum[size // 2] = level
+    return spectrum.tobytes()
+
+
+def decode(payload):
+    codes = np.frombuffer(payload["data"], dtype=np.uint8).reshape(payload["rows"], payload["bins"])
+    offsets = np.frombuffer(payload["db_offset"], dtype=np.float32)
+    scales = np.frombuffer(payload["db_scale"], dtype=np.float32)
+    return offsets[:, None] + codes * scales[:, None]
+
+
+class TestWaterfallHistory:
+    """Test cases for storing and paging rows."""
+
+    def test_rows_round_trip_oldest_first(self):
+        """Rows come back decimated, dequantized and in arrival order."""
+        history = WaterfallHistory(max_rows=8, width=16)
+        for i in range(3):
+            history.append(frame(-50.0 + i), timestamp=100.0 + i)
+
+        payload = history.get_rows()
+        rows = decode(payload)
+
+        assert (payload["first_seq"], payload["last_seq"], payload["bins"]) == (0, 2, 16)
+        assert payload["fft_size"] == 64 and not payload["has_more"]
+        np.testing.assert_allclose(rows.max(axis=1), [-50.0, -49.0, -48.0], atol=0.3)
+        np.testing.assert_allclose(rows.min(axis=1), -100.0, atol=0.3)
+
+    def test_ring_bound_and_scroll_back(self):
+        """The ring keeps max_rows rows and pages backwards by sequence number."""
+        history = WaterfallHistory(max_rows=4, width=16)
+        for i in range(10):
+            history.append(frame(-60.0), timestamp=float(i))
+
+        newest = history.get_rows(max_rows=3)
+        assert (newest["first_seq"], newest["last_seq"], newest["has_more"]) == (7, 9, True)
+
+        older = history.get_rows(before_seq=newest["first_seq"], max_rows=3)
+        assert (older["first_seq"], older["last_seq"], older["has_more"]) == (6, 6, False)
+        assert history.get_rows(before_seq=6) is None
+
+    def test_time_window(self):
+        """Rows older than `seconds` before the newest row are not returned."""
+        history = WaterfallHistory(seconds=2.0, max_rows=16, width=16)
+        for t in (0.0, 1.0, 2.5, 3.0, 4.0):
+            history.append(frame(-60.0), timestamp=t)
+
+        payload = history.get_rows()
+        assert payload["first_seq"] == 2
+        np.testing.assert_array_equal(
+            np.frombuffer(payload["timestamps"], dtype=np.float64), [2.5, 3.0, 4.0]
+        )
+
+    def test_fft_size_change_and_clear(self):
+        """A new FFT size or an explicit clear drops stored rows."""
+        history = WaterfallHistory(max_rows=8, width=16)
+        history.append(frame(-60.0, size=64))
+        history.append(frame(-60.0, size=8))
+
+        payload = history.get_rows()
+        assert (payload["rows"], payload["bins"], payload["fft_size"]) == (1, 8, 8)
+
+        history.clear()
+        assert len(history) == 0 and history.get_rows() is None
+
+    def test_inactive_until_requested(self):
+        """A new history is inactive; activate() switches it on without adding rows."""
+        history = WaterfallHistory(max_rows=8, width=16)
+        assert not history.active and history.get_rows() is None
+
+        history.activate()
+        assert history.active and history.get_rows() is None
@@ -0,0 +1,134 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Tests for the waterfall tile pyramid (fft/waterfalltiles.py).
+"""
+
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from fft.waterfalltiles import TILE_SIZE, WaterfallTileCache, WaterfallTilePyramid
+
+SAMPLE_RATE = 1_000_000
+NUM_SAMPLES = 1_000_000
+BURST = (600_000, 610_000)
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """One second of noise with a 10 ms tone burst at +250 kHz."""
+    rng = np.random.default_rng(3)
+    noise = 0.01 * (rng.standard_normal(NUM_SAMPLES) + 1j * rng.standard_normal(NUM_SAMPLES))
+    n = np.arange(BURST[0], BURST[1])
+    noise[BURST[0] : BURST[1]] += np.exp(2j * np.pi * 0.25 * n)
+
+    base = tmp_path / "burst"
+    noise.astype(np.complex64).tofile(f"{base}.sigmf-data")
+    with open(f"{base}.sigmf-meta", "w") as f:
+        json.dump(
+            {
+                "global": {"core:datatype": "cf32_le", "core:sample_rate": SAMPLE_RATE},
+                "captures": [{"core:sample_start": 0, "core:frequency": 100e6}],
+            },
+            f,
+        )
+    return base
+
+
+class TestWaterfallTiles:
+    """Test cases for tile rendering and caching."""
+
+    def test_levels_and_info(self, recording):
+        """Levels deepen until rows would overlap heavily; info describes each grid."""
+        pyramid = WaterfallTilePyramid(recording)
+        info = pyramid.info()
+
+        assert info["max_level"] >= 2
+        assert info["levels"][0] == {"x_tiles": 1, "y_tiles": 1, "fft_size": TILE_SIZE}
+        assert info["levels"][1]["fft_size"] == 2 * TILE_SIZE
+        assert info["center_frequency"] == 100e6
+        assert info["db_range"][0] < info["db_range"][1]
+
+    def test_burst_visible_in_zoomed_tile(self, recording):
+        """The burst lands in the tile and column that cover its time and frequency."""
+        pyramid = WaterfallTilePyramid(recording)
+        level = 2
+        x_tiles, y_tiles, fft_size = pyramid.grid(level)
+        y = BURST[0] * y_tiles // NUM_SAMPLES
+        tone_bin = fft_size // 2 + fft_size // 4
+        x, column = divmod(tone_bin, TILE_SIZE)
+
+        tile = pyramid.render_tile(level, x, y)
+        assert tile.shape == (TILE_SIZE, TILE_SIZE)
+
+        row = int((BURST[0] + 5_000) * y_tiles / NUM_SAMPLES % 1 * TILE_SIZE)
+        assert tile[row, column] > np.median(tile) + 30
+        assert tile[0, column] < np.median(tile) + 10
+
+        with pytest.raises(ValueError):
+            pyramid.render_tile(level, x_tiles, 0)
+
+    def test_tiles_cached_on_disk_and_in_memory(self, recording):
+        """Tiles are written beside the recording and served from memory afterwards."""
+        cache = WaterfallTileCache(max_tiles=1)
+        png = cache.get_tile(recording, 1, 0, 1)
+
+        tile_file = recording.parent / "burst.sigmf-tiles" / "1" / "0_1.png"
+        assert tile_file.read_bytes() == png
+        assert Image.open(io.BytesIO(png)).size == (TILE_SIZE, TILE_SIZE)
+        assert cache.get_tile(recording, 1, 0, 1) is png
+
+        # Evicted from memory by another tile, then reloaded from disk
+        cache.get_tile(recording, 0, 0, 0)
+        assert cache.get_tile(recording, 1, 0, 1) == png
+
+        cache.invalidate(recording)
+        assert not tile_file.parent.parent.exists()
+
+    def test_disk_cache_trimmed(self, recording):
+        """The tile directory is trimmed least recently used first."""
+        pyramid = WaterfallTilePyramid(recording, disk_cache_bytes=1)
+        pyramid.get_tile_png(1, 0, 0)
+        pyramid.get_tile_png(1, 0, 1)
+
+        assert not pyramid.tile_path(1, 0, 0).exists()
+
+    def test_concurrent_requests_for_one_tile(self, recording, monkeypatch):
+        """Rendering the same tile from several threads at once succeeds for all of them."""
+        pyramid = WaterfallTilePyramid(recording)
+        # Hold every thread between writing its temp file and moving it into place
+        barrier = threading.Barrier(4)
+        replace = os.replace
+
+        def replace_together(src, dst):
+            barrier.wait(timeout=10.0)
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", replace_together)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            pngs = list(pool.map(lambda _: pyramid.get_tile_png(1, 0, 1), range(4)))
+
+        assert all(png == pngs[0] for png in pngs)
+        assert pyramid.tile_path(1, 0, 1).read_bytes() == pngs[0]
+        assert not list(pyramid.tile_path(1, 0, 1).parent.glob("*.tmp"))
@@ -0,0 +1,235 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for subscriber backpressure policies (pipeline/streaming/backpressure.py).
+"""
+
+import queue
+import time
+
+import numpy as np
+import pytest
+
+from audio.audiobroadcaster import AudioBroadcaster
+from pipeline.streaming.backpressure import (
+    POLICY_BLOCK,
+    POLICY_COALESCE,
+    POLICY_DROP_NEWEST,
+    POLICY_DROP_OLDEST,
+    BlockingFeeder,
+    coalesce_latest,
+    deliver,
+    message_duration_ms,
+    queue_lag_ms,
+    validate_policy,
+)
+from pipeline.streaming.iqbroadcaster import IQBroadcaster
+
+
+def _full_queue(*items):
+    q = queue.Queue(maxsize=len(items))
+    for item in items:
+        q.put_nowait(item)
+    return q
+
+
+def _drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+class TestDeliver:
+    """Test cases for each policy on a full queue."""
+
+    def test_drop_newest_keeps_queue(self):
+        q = _full_queue(1, 2)
+
+        assert deliver(q, 3, POLICY_DROP_NEWEST) == (False, [])
+        assert _drain(q) == [1, 2]
+
+    def test_drop_oldest_evicts_head(self):
+        q = _full_queue(1, 2)
+
+        assert deliver(q, 3, POLICY_DROP_OLDEST) == (True, [1])
+        assert _drain(q) == [2, 3]
+
+    def test_coalesce_replaces_everything(self):
+        q = _full_queue(1, 2)
+
+        assert deliver(q, 3, POLICY_COALESCE) == (True, [1, 2])
+        assert _drain(q) == [3]
+
+    def test_block_waits_for_room(self):
+        q = _full_queue(1)
+        start = time.monotonic()
+
+        assert deliver(q, 2, POLICY_BLOCK, block_timeout=0.05) == (False, [])
+        assert time.monotonic() - start >= 0.04
+
+    def test_unknown_policy_is_rejected(self):
+        with pytest.raises(ValueError):
+            validate_policy("drop_random")
+
+
+class TestBlockingFeeder:
+    """Test cases for delivering to a block subscriber from its own thread."""
+
+    def test_submit_does_not_wait(self):
+        target = _full_queue(0)
+        results = []
+        feeder = BlockingFeeder(
+            target, block_timeout=0.2, depth=2, on_result=lambda ok, m: results.append((ok, m))
+        )
+        feeder.start()
+        try:
+            start = time.monotonic()
+            accepted = [feeder.submit(i) for i in (1, 2, 3, 4)]
+            submit_time = time.monotonic() - start
+
+            # Room appears while the feeder is waiting with the first message
+            assert target.get(timeout=1.0) == 0
+            assert target.get(timeout=1.0) == 1
+        finally:
+            feeder.stop()
+            feeder.join(timeout=2.0)
+
+        assert submit_time < 0.1
+        # One message in flight plus depth queued; the rest are refused
+        assert accepted.count(False) >= 1
+        assert results[0] == (True, 1)
+
+
+class TestLag:
+    """Test cases for the lag metric and consumer-side coalescing."""
+
+    def test_duration_and_queue_lag(self):
+        message = {"samples": np.zeros(1024, dtype=np.complex64), "sample_rate": 1.024e6}
+        q = _full_queue(message, message, message)
+
+        assert message_duration_ms(message) == pytest.approx(1.0)
+        assert message_duration_ms({"audio": np.zeros(441)}) == pytest.approx(10.0)
+        assert queue_lag_ms(q, message_duration_ms(message)) == pytest.approx(3.0)
+
+    def test_coalesce_latest_returns_newest(self):
+        q = _full_queue(2, 3)
+
+        assert coalesce_latest(q, 1) == (3, [1, 2])
+        assert coalesce_latest(q, 4) == (4, [])
+
+
+class TestAudioBroadcasterPolicy:
+    """Test cases for the live-audio drop_oldest subscription."""
+
+    def test_playback_stays_current(self):
+        input_queue = queue.Queue()
+        broadcaster = AudioBroadcaster(input_queue)
+        playback = broadcaster.subscribe("playback", maxsize=2, policy=POLICY_DROP_OLDEST)
+        for i in range(5):
+            input_queue.put({"audio": np.full(441, i, dtype=np.float32)})
+        broadcaster.start()
+        input_queue.join()
+        broadcaster.stop()
+
+        chunks = [int(message["audio"][0]) for message in _drain(playback)]
+        stats = broadcaster.get_stats()["subscribers"]["playback"]
+
+        assert chunks == [3, 4]
+        assert stats["dropped"] == 3
+        assert stats["policy"] == POLICY_DROP_OLDEST
+
+    def test_block_policy_is_rejected(self):
+        broadcaster = AudioBroadcaster(queue.Queue())
+
+        with pytest.raises(ValueError):
+            broadcaster.subscribe("recorder", policy=POLICY_BLOCK)
+        with pytest.raises(ValueError):
+            broadcaster.subscribe_existing_queue("recorder", queue.Queue(), policy=POLICY_BLOCK)
+        assert broadcaster.subscribers == {}
+
+
+class TestIQBroadcasterPolicy:
+    """Test cases for per-subscriber policies in the IQ broadcaster."""
+
+    def test_policies_are_applied_per_subscriber(self):
+        """A slow drop_oldest subscriber keeps the newest block, drop_newest the oldest."""
+        source = queue.Queue()
+        broadcaster = IQBroadcaster(source, "test-sdr")
+        oldest = broadcaster.subscribe(
+            "demod:s:vfo1", maxsize=1, enrich_vfo_states=False, policy=POLICY_DROP_OLDEST
+        )
+        newest = broadcaster.subscribe("fft:s", maxsize=1, enrich_vfo_states=False)
+        for index in range(3):
+            source.put(
+                {
+                    "samples": np.zeros(100, dtype=np.complex64),
+                    "sample_rate": 100e3,
+                    "sample_index": index * 100,
+                }
+            )
+        broadcaster.start()
+        try:
+            # Subscribers are served in order, so the last one accounting for all three
+            # blocks means the broadcaster is done
+            last = broadcaster.subscribers["fft:s"]
+            deadline = time.monotonic() + 2.0
+            while last["delivered"] + last["dropped"] < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            broadcaster.stop()
+            broadcaster.join(timeout=2.0)
+
+        assert oldest.get_nowait()["sample_index"] == 200
+        assert newest.get_nowait()["sample_index"] == 0
+        info = broadcaster.subscribers["demod:s:vfo1"]
+        assert info["dropped"] == 2
+        assert info["dropped_samples"] == 200
+        assert info["message_ms"] == pytest.approx(1.0)
+
+    def test_blocked_subscriber_does_not_delay_others(self):
+        """A stalled block subscriber holds up neither other subscribers nor subscribe()."""
+        source = queue.Queue()
+        broadcaster = IQBroadcaster(source, "test-sdr")
+        stalled = broadcaster.subscribe(
+            "recorder:s",
+            maxsize=1,
+            enrich_vfo_states=False,
+            policy=POLICY_BLOCK,
+            block_timeout=2.0,
+        )
+        live = broadcaster.subscribe("fft:s", maxsize=10, enrich_vfo_states=False)
+        for index in range(5):
+            source.put(
+                {
+                    "samples": np.zeros(100, dtype=np.complex64),
+                    "sample_rate": 100e3,
+                    "sample_index": index * 100,
+                }
+            )
+        broadcaster.start()
+        try:
+            start = time.monotonic()
+            received = [live.get(timeout=1.0)["sample_index"] for _ in range(5)]
+            broadcaster.subscribe("fft:t", maxsize=1, enrich_vfo_states=False)
+            elapsed = time.monotonic() - start
+        finally:
+            broadcaster.stop()
+            broadcaster.join(timeout=2.0)
+
+        assert received == [0, 100, 200, 300, 400]
+        assert elapsed < 1.0
+        assert stalled.get_nowait()["sample_index"] == 0
@@ -0,0 +1,183 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the shared FFT channelizer (pipeline/streaming/channelizer.py).
+"""
+
+import queue
+
+import numpy as np
+
+from pipeline.streaming.channelizer import FFTChannelizer, IQChannelizer
+
+SAMPLE_RATE = 2.048e6
+CENTER_FREQ = 100e6
+
+
+def make_channel(key, offset, bandwidth=12_500, min_sample_rate=48e3):
+    return {
+        "key": key,
+        "center_freq": CENTER_FREQ + offset,
+        "bandwidth": bandwidth,
+        "min_sample_rate": min_sample_rate,
+    }
+
+
+def tone(freq_offset, num_samples, start=0):
+    n = np.arange(start, start + num_samples)
+    return np.exp(2j * np.pi * freq_offset * n / SAMPLE_RATE).astype(np.complex64)
+
+
+def dominant_frequency(samples, sample_rate):
+    spectrum = np.fft.fftshift(np.abs(np.fft.fft(samples)))
+    freqs = np.fft.fftshift(np.fft.fftfreq(len(samples), 1.0 / sample_rate))
+    return freqs[np.argmax(spectrum)]
+
+
+class TestFFTChannelizer:
+    """Test cases for the overlap-save filterbank."""
+
+    def test_tone_at_vfo_offset_comes_out_at_baseband(self):
+        """A tone 1 kHz above the VFO lands at +1 kHz in the decimated channel."""
+        channelizer = FFTChannelizer()
+        channel = make_channel("vfo1", 300_123.0)
+        samples = tone(300_123.0 + 1_000.0, 65536)
+
+        result = channelizer.process(samples, SAMPLE_RATE, CENTER_FREQ, [channel])["vfo1"]
+
+        assert result["sample_rate"] == SAMPLE_RATE / 32
+        assert result["center_freq"] == CENTER_FREQ + 300_123.0
+        assert abs(dominant_frequency(result["samples"], result["sample_rate"]) - 1_000.0) < 100
+        assert abs(np.mean(np.abs(result["samples"][200:])) - 1.0) < 0.05
+
+    def test_output_is_continuous_across_blocks(self):
+        """Splitting the input into odd-sized blocks gives the same stream as one block."""
+        offset = -412_345.0
+        samples = tone(offset + 500.0, 90000)
+
+        whole = FFTChannelizer().process(
+            samples, SAMPLE_RATE, CENTER_FREQ, [make_channel("c", offset)]
+        )["c"]["samples"]
+
+        split = FFTChannelizer()
+        channel = make_channel("c", offset)
+        pieces = []
+        for start in range(0, len(samples), 7001):
+            output = split.process(
+                samples[start : start + 7001], SAMPLE_RATE, CENTER_FREQ, [channel]
+            )
+            if "c" in output:
+                pieces.append(output["c"]["samples"])
+        joined = np.concatenate(pieces)
+
+        count = min(len(whole), len(joined))
+        np.testing.assert_allclose(joined[:count], whole[:count], atol=1e-3)
+
+    def test_gap_in_input_restarts_filterbank(self):
+        """A sample_index jump restarts the filterbank at the new index."""
+        channelizer = FFTChannelizer()
+        channel = make_channel("c", 0.0)
+        channelizer.process(tone(0, 32768), SAMPLE_RATE, CENTER_FREQ, [channel], sample_index=0)
+
+        result = channelizer.process(
+            tone(0, 32768), SAMPLE_RATE, CENTER_FREQ, [channel], sample_index=100_000
+        )["c"]
+
+        assert channelizer.gaps == 1
+        assert result["sample_index"] == 100_000 // 32
+
+    def test_decimation_change_is_flagged(self):
+        """A channel whose decimation changes marks the index change as a discontinuity."""
+        channelizer = FFTChannelizer()
+        narrow = make_channel("c", 0.0)
+        wide = make_channel("c", 0.0, min_sample_rate=200e3)
+
+        first = channelizer.process(tone(0, 32768), SAMPLE_RATE, CENTER_FREQ, [narrow])["c"]
+        same = channelizer.process(tone(0, 32768), SAMPLE_RATE, CENTER_FREQ, [narrow])["c"]
+        changed = channelizer.process(tone(0, 32768), SAMPLE_RATE, CENTER_FREQ, [wide])["c"]
+
+        assert "discontinuity" not in first and "discontinuity" not in same
+        assert changed["discontinuity"] is True
+        assert changed["sample_rate"] > same["sample_rate"]
+
+    def test_out_of_band_channel_is_skipped(self):
+        """A VFO outside the SDR bandwidth produces no output."""
+        channelizer = FFTChannelizer()
+        channel = make_channel("far", 5e6)
+
+        outputs = channelizer.process(tone(0, 16384), SAMPLE_RATE, CENTER_FREQ, [channel])
+
+        assert outputs == {}
+
+    def test_decimation_respects_minimum_rate(self):
+        """The channel rate never drops below the requested minimum."""
+        channelizer = FFTChannelizer()
+
+        assert SAMPLE_RATE / channelizer.get_decimation(SAMPLE_RATE, 12_500, 200e3) >= 200e3
+        assert SAMPLE_RATE / channelizer.get_decimation(SAMPLE_RATE, 100_000, 48e3) >= 250e3
+
+
+class FakeBroadcaster:
+    def __init__(self):
+        self.subscribed = {}
+
+    def subscribe(self, key, maxsize=10, enrich_vfo_states=True):
+        self.subscribed[key] = queue.Queue(maxsize=maxsize)
+        return self.subscribed[key]
+
+    def unsubscribe(self, key):
+        self.subscribed.pop(key, None)
+
+
+class TestIQChannelizer:
+    """Test cases for channel subscriptions."""
+
+    def test_source_subscription_follows_subscribers(self):
+        """The channelizer only taps the broadcaster while it has subscribers."""
+        broadcaster = FakeBroadcaster()
+        channelizer = IQChannelizer(broadcaster, "sdr-test")
+
+        first = channelizer.add_subscriber("demod:s1:vfo1", "s1", 1)
+        second = channelizer.add_subscriber("demod:s1:vfo1:ui", "s1", 1)
+        assert "channelizer:sdr-test" in broadcaster.subscribed
+        assert first is not second
+
+        channelizer.remove_subscriber("demod:s1:vfo1")
+        assert "channelizer:sdr-test" in broadcaster.subscribed
+        channelizer.remove_subscriber("demod:s1:vfo1:ui")
+        assert broadcaster.subscribed == {}
+
+    def test_process_subscribers_read_channel_from_shared_ring(self):
+        """Process subscribers get descriptors into one ring per channel, threads the block."""
+        channelizer = IQChannelizer(FakeBroadcaster(), "sdr-test")
+        ring_queue = channelizer.add_subscriber("demod:s1:vfo1", "s1", 1, for_process=True)
+        thread_queue = channelizer.add_subscriber("demod:s1:vfo1:ui", "s1", 1)
+
+        samples = tone(1_000, 256)
+        message = {"samples": samples, "sample_rate": 256e3, "vfo_states": {1: {"active": True}}}
+        with channelizer.lock:
+            channelizer._deliver_channel(("s1", 1), message, ["demod:s1:vfo1", "demod:s1:vfo1:ui"])
+
+        hydrated = ring_queue.get(timeout=1.0)
+        np.testing.assert_array_equal(hydrated["samples"], samples)
+        assert hydrated["vfo_states"] == {1: {"active": True}}
+        assert thread_queue.get_nowait() is message
+        ring_queue.close()
+
+        channelizer.remove_subscriber("demod:s1:vfo1")
+        with channelizer.lock:
+            channelizer._release_rings()
+        assert channelizer.channel_rings == {}
@@ -0,0 +1,101 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the streaming FIR decimators (pipeline/streaming/decimator.py).
+"""
+
+import numpy as np
+import pytest
+from scipy import signal
+
+from pipeline.streaming.decimator import (
+    DecimatorChain,
+    PolyphaseDecimator,
+    design_decimation_stages,
+    split_decimation,
+)
+
+RATE = 2.048e6
+
+
+def noise(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(count) + 1j * rng.standard_normal(count)).astype(np.complex64)
+
+
+def tone_power_db(freq, decimation, passband):
+    n = np.arange(200000)
+    tone = np.exp(2j * np.pi * freq / RATE * n).astype(np.complex64)
+    output = DecimatorChain(RATE, decimation, passband).process(tone)
+    return 10 * np.log10(np.mean(np.abs(output[len(output) // 2 :]) ** 2))
+
+
+class TestDecimator:
+    """Test cases for stage splitting, streaming and filtering."""
+
+    @pytest.mark.parametrize(
+        "ratio, stages", [(1, []), (2, [2]), (10, [5, 2]), (42, [7, 6]), (64, [8, 8]), (13, [13])]
+    )
+    def test_split_decimation(self, ratio, stages):
+        assert split_decimation(ratio) == stages
+        assert int(np.prod(stages)) == ratio
+
+    def test_matches_filter_then_downsample(self):
+        taps = signal.firwin(31, 0.1).astype(np.float32)
+        samples = noise(10007)
+        output = PolyphaseDecimator(taps, 5).process(samples)
+
+        history = np.full(30, samples[0])
+        expected = signal.lfilter(taps, 1, np.concatenate((history, samples)))[30:][::5]
+        np.testing.assert_allclose(output, expected, atol=1e-5)
+
+    def test_block_split_does_not_change_output(self):
+        samples = noise(50000, seed=1)
+        expected = DecimatorChain(RATE, 42, 10e3).process(samples)
+
+        chain = DecimatorChain(RATE, 42, 10e3)
+        parts = []
+        start = 0
+        for length in (1, 5, 41, 43, 1000, 8191, 40719):
+            parts.append(chain.process(samples[start : start + length]))
+            start += length
+        assert start == len(samples)
+        np.testing.assert_allclose(np.concatenate(parts), expected, atol=1e-3)
+
+    def test_rows_match_separate_streams(self):
+        """A 2-D block decimates each row as if it were its own stream."""
+        rows = np.stack([noise(20000, seed=seed) for seed in (2, 3, 4)])
+        expected = [DecimatorChain(RATE, 10, 50e3).process(row) for row in rows]
+
+        chain = DecimatorChain(RATE, 10, 50e3)
+        output = np.concatenate(
+            [chain.process(rows[:, :7777]), chain.process(rows[:, 7777:])], axis=-1
+        )
+        assert output.shape == (3, len(expected[0]))
+        for row, reference in zip(output, expected):
+            np.testing.assert_allclose(row, reference, atol=1e-3)
+
+    def test_passband_kept_and_aliases_rejected(self):
+        # 2.048 MHz / 40 = 51.2 kHz output
+        assert abs(tone_power_db(5e3, 40, 10e3)) < 0.5
+        # Would alias to 1.2 kHz without the filter
+        assert tone_power_db(52.4e3, 40, 10e3) < -55
+        assert tone_power_db(300e3, 40, 10e3) < -55
+
+    def test_designs_are_cached(self):
+        first = design_decimation_stages(RATE, 40, 10e3)
+        assert design_decimation_stages(RATE, 40, 10e3) is first
+        assert DecimatorChain(RATE, 40, 10e3).stages[0].taps is first[0][0]
@@ -0,0 +1,122 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for packed integer IQ messages (pipeline/streaming/iqformat.py).
+"""
+
+import json
+import queue
+import time
+
+import numpy as np
+import pytest
+
+from demodulators.iqrecorder import IQRecorder
+from pipeline.streaming.iqformat import (
+    IQ_FORMAT_CI16,
+    IQ_FORMAT_CU8,
+    as_complex_message,
+    block_offset,
+    get_iq_samples,
+    num_iq_samples,
+    pack_iq,
+    packed_fields,
+    unpack_iq,
+)
+from pipeline.streaming.sampleindex import SampleGapDetector
+
+
+def cu8_message(raw, index=0):
+    return {
+        "samples": raw,
+        "center_freq": 100e6,
+        "sample_rate": 1e6,
+        "timestamp": time.time(),
+        "sample_index": index,
+        **packed_fields(IQ_FORMAT_CU8, block_offset(raw)),
+    }
+
+
+class TestConversion:
+    """Test cases for packing and unpacking."""
+
+    @pytest.mark.parametrize("iq_format", [IQ_FORMAT_CU8, IQ_FORMAT_CI16])
+    def test_round_trip(self, iq_format):
+        """Quantized samples unpack to within one step of the original."""
+        rng = np.random.default_rng(1)
+        samples = (rng.uniform(-0.9, 0.9, 256) + 1j * rng.uniform(-0.9, 0.9, 256)).astype(
+            np.complex64
+        )
+
+        raw = pack_iq(samples, iq_format)
+        restored = unpack_iq(raw, iq_format)
+
+        assert raw.size == 2 * samples.size
+        assert restored.dtype == np.complex64
+        step = 1.0 / 127.5 if iq_format == IQ_FORMAT_CU8 else 1.0 / 32768.0
+        assert np.max(np.abs(restored - samples)) <= step
+
+    def test_block_offset_removes_dc(self):
+        """Unpacking against the block mean yields zero-mean samples."""
+        raw = np.array([130, 120, 134, 124, 132, 122, 128, 126], dtype=np.uint8)
+        message = cu8_message(raw)
+
+        samples = get_iq_samples(message)
+
+        assert np.abs(np.mean(samples)) < 1e-6
+        assert num_iq_samples(message) == 4
+
+
+class TestMessages:
+    """Test cases for consumers of packed messages."""
+
+    def test_complex_copy_and_gap_detection(self):
+        """Packed messages convert on demand and count complex samples."""
+        message = cu8_message(np.full(200, 128, dtype=np.uint8), index=0)
+        detector = SampleGapDetector()
+
+        converted = as_complex_message(message)
+        detector.check(message)
+
+        assert converted["samples"].dtype == np.complex64
+        assert "iq_format" not in converted
+        assert "iq_format" in message
+        assert detector.check(cu8_message(np.zeros(200, dtype=np.uint8), index=150)) == 50
+
+    def test_recorder_writes_native_cu8(self, tmp_path):
+        """The recorder stores cu8 blocks byte for byte and labels the datatype."""
+        raw = np.arange(2000, dtype=np.uint16).astype(np.uint8)
+        iq_queue = queue.Queue()
+        iq_queue.put(cu8_message(raw))
+        recording_path = tmp_path / "recording"
+        recorder = IQRecorder(iq_queue, None, "session", str(recording_path))
+
+        recorder.start()
+        deadline = time.time() + 5.0
+        while recorder.stats["samples_written"] < 1000 and time.time() < deadline:
+            time.sleep(0.01)
+        recorder.stop()
+
+        with open(f"{recording_path}.sigmf-meta") as f:
+            metadata = json.load(f)
+        assert metadata["global"]["core:datatype"] == "cu8"
+        assert metadata["global"]["gs:dc_offset_corrected"] is False
+        assert metadata["global"]["gs:iq_offset"] == pytest.approx(block_offset(raw), abs=1e-3)
+        assert "without DC offset correction" in metadata["annotations"][0]["core:comment"]
+        assert recorder.stats["bytes_written"] == 2000
+        np.testing.assert_array_equal(
+            np.fromfile(f"{recording_path}.sigmf-data", dtype=np.uint8), raw
+        )
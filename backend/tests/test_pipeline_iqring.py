@@ -0,0 +1,187 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the shared-memory IQ ring transport (pipeline/streaming/iqring.py).
+"""
+
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+import pytest
+
+from pipeline.streaming.iqbroadcaster import TRANSPORT_SHM, IQBroadcaster
+from pipeline.streaming.iqring import IQRingReader, IQSharedRing, SharedRingQueue
+
+
+@pytest.fixture
+def ring():
+    ring = IQSharedRing(slot_samples=64, num_slots=4)
+    yield ring
+    ring.close()
+
+
+def _block(n, offset=0):
+    return (np.arange(n) + offset).astype(np.complex64)
+
+
+def _read_one_block(ring_queue, results):
+    """Subscriber process body: read one block and report it."""
+    try:
+        results.put(ring_queue.get(timeout=5.0)["samples"])
+    except queue.Empty:
+        results.put(None)
+    finally:
+        ring_queue.close()
+
+
+class TestIQSharedRing:
+    """Test cases for writing and reading the ring."""
+
+    def test_roundtrip(self, ring):
+        """Samples written to the ring are read back unchanged."""
+        descriptor = ring.write(_block(48))
+        reader = IQRingReader()
+
+        samples = reader.read(descriptor)
+
+        assert descriptor["shm_length"] == 48
+        np.testing.assert_array_equal(samples, _block(48))
+        assert reader.blocks_read == 1
+        reader.detach()
+
+    def test_rejects_oversized_block(self, ring):
+        """A block larger than a slot is rejected."""
+        with pytest.raises(ValueError):
+            ring.write(_block(65))
+
+    def test_overrun_detected(self, ring):
+        """A descriptor whose slot was reused is reported as an overrun."""
+        stale = ring.write(_block(8))
+        for i in range(ring.num_slots):
+            ring.write(_block(8, offset=i + 1))
+        reader = IQRingReader()
+
+        assert reader.read(stale) is None
+        assert reader.overruns == 1
+        reader.detach()
+
+    def test_missed_blocks_counted(self, ring):
+        """Gaps in the sequence numbers seen by a reader are counted as missed."""
+        reader = IQRingReader()
+        first = ring.write(_block(8))
+        ring.write(_block(8))
+        ring.write(_block(8))
+        last = ring.write(_block(8))
+
+        reader.read(first)
+        reader.read(last)
+
+        assert reader.missed == 2
+        reader.detach()
+
+
+class TestSharedRingQueue:
+    """Test cases for the queue-like subscriber handle."""
+
+    def test_get_hydrates_message(self, ring):
+        """Descriptor messages are returned with samples and without shm fields."""
+        descriptor_queue = queue.Queue()
+        message = {"center_freq": 100e6, "sample_rate": 1e6}
+        message.update(ring.write(_block(16)))
+        descriptor_queue.put(message)
+        ring_queue = SharedRingQueue(descriptor_queue)
+
+        result = ring_queue.get(timeout=0.1)
+
+        assert result["center_freq"] == 100e6
+        assert "shm_name" not in result
+        np.testing.assert_array_equal(result["samples"], _block(16))
+        ring_queue.close()
+
+    def test_get_skips_overrun_then_times_out(self, ring):
+        """An overrun descriptor is skipped and raises Empty when nothing else is queued."""
+        descriptor_queue = queue.Queue()
+        descriptor_queue.put(ring.write(_block(8)))
+        for _ in range(ring.num_slots):
+            ring.write(_block(8))
+        ring_queue = SharedRingQueue(descriptor_queue)
+
+        with pytest.raises(queue.Empty):
+            ring_queue.get(timeout=0.05)
+        assert ring_queue.get_reader_stats()["overruns"] == 1
+        ring_queue.close()
+
+
+class TestIQBroadcasterSharedTransport:
+    """Test cases for the broadcaster's shared-memory subscription mode."""
+
+    def test_shm_subscriber_receives_samples(self):
+        """Blocks broadcast to a shm subscriber arrive intact and are counted as delivered."""
+        source = queue.Queue()
+        broadcaster = IQBroadcaster(source, "test-sdr")
+        ring_queue = broadcaster.subscribe(
+            "decoder:session-1:vfo1", maxsize=4, for_process=True, transport=TRANSPORT_SHM
+        )
+        broadcaster.start()
+        try:
+            source.put({"samples": _block(32), "center_freq": 1.0, "sample_rate": 2.0})
+            result = ring_queue.get(timeout=2.0)
+        finally:
+            broadcaster.stop()
+            broadcaster.join(timeout=2.0)
+            ring_queue.close()
+
+        np.testing.assert_array_equal(result["samples"], _block(32))
+        assert "vfo_states" in result
+        assert broadcaster.subscribers["decoder:session-1:vfo1"]["delivered"] == 1
+        assert broadcaster.iq_ring is None
+
+    def test_ring_survives_subscriber_exit(self):
+        """A subscriber process exiting does not unlink the ring for the next subscriber."""
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        source = queue.Queue()
+        broadcaster = IQBroadcaster(source, "test-sdr")
+        broadcaster.start()
+        received = []
+        try:
+            for offset, key in enumerate(("decoder:session-1:vfo1", "decoder:session-2:vfo1")):
+                ring_queue = broadcaster.subscribe(
+                    key, maxsize=4, for_process=True, transport=TRANSPORT_SHM
+                )
+                worker = context.Process(target=_read_one_block, args=(ring_queue, results))
+                worker.start()
+                source.put({"samples": _block(32, offset), "center_freq": 1.0, "sample_rate": 2.0})
+                received.append(results.get(timeout=10.0))
+                worker.join(timeout=5.0)
+                broadcaster.unsubscribe(key)
+                # A tracker owned by the exited subscriber would unlink the ring about now
+                time.sleep(0.5)
+        finally:
+            broadcaster.stop()
+            broadcaster.join(timeout=2.0)
+
+        assert received[0] is not None and received[1] is not None
+        np.testing.assert_array_equal(received[0], _block(32, 0))
+        np.testing.assert_array_equal(received[1], _block(32, 1))
+
+    def test_shm_requires_process_subscriber(self):
+        """The shared-memory transport is rejected for thread subscribers."""
+        broadcaster = IQBroadcaster(queue.Queue(), "test-sdr")
+        with pytest.raises(ValueError):
+            broadcaster.subscribe("decoder:session-1", transport=TRANSPORT_SHM)
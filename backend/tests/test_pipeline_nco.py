@@ -0,0 +1,104 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the phase-continuous NCO (pipeline/streaming/nco.py).
+"""
+
+import numpy as np
+
+from pipeline.streaming.nco import NCO, NCOBank
+
+RATE = 1.0e6
+
+
+def tone(freq, count, start=0):
+    n = np.arange(start, start + count, dtype=np.float64)
+    return np.exp(2j * np.pi * freq / RATE * n).astype(np.complex64)
+
+
+class TestNCO:
+    """Test cases for frequency translation across blocks."""
+
+    def test_moves_offset_tone_to_dc(self):
+        nco = NCO()
+        output = nco.mix(tone(125e3, 4096), 125e3, RATE)
+        assert output.dtype == np.complex64
+        np.testing.assert_allclose(output, np.ones(4096), atol=1e-4)
+
+    def test_blocks_match_one_long_block(self):
+        """Phase carries over block boundaries, including odd block lengths."""
+        signal = tone(-37e3, 10000) * np.complex64(0.5 - 0.2j)
+        expected = NCO().mix(signal, 11111.0, RATE)
+
+        nco = NCO()
+        parts = []
+        for start, end in ((0, 1000), (1000, 2000), (2000, 2777), (2777, 10000)):
+            parts.append(nco.mix(signal[start:end], 11111.0, RATE))
+        np.testing.assert_allclose(np.concatenate(parts), expected, atol=1e-4)
+
+    def test_offset_change_is_phase_continuous(self):
+        """After a retune the output continues from the previous block's end phase."""
+        nco = NCO()
+        ones = np.ones(1000, dtype=np.complex64)
+        first = nco.mix(ones, 1000.0, RATE)
+        second = nco.mix(ones, 2000.0, RATE)
+
+        expected_start = first[-1] * np.exp(-2j * np.pi * 1000.0 / RATE)
+        assert abs(second[0] - expected_start) < 1e-4
+        np.testing.assert_allclose(
+            np.diff(np.angle(second[:10])), -2 * np.pi * 2000.0 / RATE, atol=1e-5
+        )
+
+    def test_rotators_cached_per_length(self):
+        nco = NCO(max_cached_lengths=2)
+        block = np.ones(512, dtype=np.complex64)
+        nco.mix(block, 1000.0, RATE)
+        rotator = nco._rotators[512]
+        nco.mix(block, 1000.0, RATE)
+        assert nco._rotators[512] is rotator
+
+        nco.mix(block[:100], 1000.0, RATE)
+        nco.mix(block[:200], 1000.0, RATE)
+        assert list(nco._rotators) == [100, 200]
+
+        nco.mix(block, 1500.0, RATE)
+        assert list(nco._rotators) == [512]
+
+    def test_zero_offset_passthrough(self):
+        block = np.ones(16, dtype=np.complex64)
+        assert NCO().mix(block, 0, RATE) is block
+
+
+class TestNCOBank:
+    """Test cases for translating one block to several offsets at once."""
+
+    def test_rows_match_separate_ncos(self):
+        signal = tone(-37e3, 6000) + tone(80e3, 6000)
+        offsets = [-37e3, 80e3, 12345.0]
+        ncos = [NCO() for _ in offsets]
+        bank = NCOBank()
+        for start, end in ((0, 1000), (1000, 3333), (3333, 6000)):
+            output = bank.mix(signal[start:end], offsets, RATE)
+            assert output.shape == (3, end - start)
+            for row, nco, offset in zip(output, ncos, offsets):
+                np.testing.assert_allclose(row, nco.mix(signal[start:end], offset, RATE), atol=1e-4)
+
+    def test_row_count_change_restarts_phases(self):
+        bank = NCOBank()
+        block = np.ones(100, dtype=np.complex64)
+        bank.mix(block, [1000.0, 2000.0], RATE)
+        output = bank.mix(block, [1000.0, 2000.0, 3000.0], RATE)
+        np.testing.assert_allclose(output[:, 0], np.ones(3), atol=1e-6)
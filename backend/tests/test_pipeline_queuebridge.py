@@ -0,0 +1,123 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the process queue to asyncio bridge (pipeline/orchestration/queuebridge.py).
+"""
+
+import asyncio
+import queue
+import threading
+
+from pipeline.orchestration.queuebridge import QueueBridge
+
+
+async def run_until(bridge, condition, timeout=2.0):
+    """Run the bridge until condition() holds, then stop it."""
+    task = asyncio.create_task(bridge.run())
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition() and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+    bridge.stop()
+    await asyncio.wait_for(task, timeout)
+
+
+class TestQueueBridge:
+    """Test cases for batching, dispatch and shutdown."""
+
+    async def test_dispatches_in_order_by_type(self):
+        source = queue.Queue()
+        for i in range(10):
+            source.put({"type": "a" if i % 2 else "b", "n": i})
+        source.put({"type": "unknown"})
+
+        seen = []
+
+        async def handle_a(message):
+            await asyncio.sleep(0)
+            seen.append(("a", message["n"]))
+
+        bridge = QueueBridge(source, name="test", poll_timeout=0.05)
+        bridge.register("a", handle_a)
+        bridge.register(["b"], lambda message: seen.append(("b", message["n"])))
+
+        await run_until(bridge, lambda: bridge.stats["unhandled"] == 1)
+
+        assert [n for _, n in seen] == list(range(10))
+        assert all(kind == ("a" if n % 2 else "b") for kind, n in seen)
+        stats = bridge.get_stats()
+        assert stats["messages"] == 11
+        assert stats["by_type"] == {"a": 5, "b": 5, "unknown": 1}
+
+    async def test_burst_is_batched(self):
+        source = queue.Queue()
+        for i in range(100):
+            source.put({"type": "x"})
+        handled = []
+
+        bridge = QueueBridge(source, name="test", max_batch=32, poll_timeout=0.05)
+        bridge.register("x", handled.append)
+        await run_until(bridge, lambda: len(handled) == 100)
+
+        stats = bridge.get_stats()
+        assert stats["batches"] == 4
+        assert stats["max_batch_size"] == 32
+
+    async def test_handler_errors_do_not_stop_the_bridge(self):
+        source = queue.Queue()
+        source.put({"type": "bad"})
+        source.put({"type": "good"})
+        handled = []
+
+        def bad(message):
+            raise RuntimeError("boom")
+
+        bridge = QueueBridge(source, name="test", poll_timeout=0.05)
+        bridge.register("bad", bad)
+        bridge.register("good", handled.append)
+        await run_until(bridge, lambda: handled)
+
+        assert bridge.stats["handler_errors"] == 1
+        assert len(handled) == 1
+
+    async def test_stop_from_handler_and_keep_running(self):
+        source = queue.Queue()
+        source.put({"type": "terminated"})
+        source.put({"type": "after"})
+        after = []
+
+        bridge = QueueBridge(source, name="test", max_batch=8, poll_timeout=0.05)
+        bridge.register("terminated", lambda message: bridge.stop())
+        bridge.register("after", after.append)
+        await asyncio.wait_for(bridge.run(), 2.0)
+        assert after == [] and bridge.stopped
+
+        alive = threading.Event()
+        alive.set()
+        bridge = QueueBridge(
+            queue.Queue(), name="test", keep_running=alive.is_set, poll_timeout=0.05
+        )
+        task = asyncio.create_task(bridge.run())
+        await asyncio.sleep(0.1)
+        alive.clear()
+        await asyncio.wait_for(task, 2.0)
+
+    async def test_discard_pending(self):
+        source = queue.Queue()
+        for _ in range(5):
+            source.put({"type": "x"})
+        bridge = QueueBridge(source, name="test")
+        assert bridge.discard_pending() == 5
+        assert source.empty()
@@ -0,0 +1,105 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the streaming rational resampler (pipeline/streaming/resampler.py).
+"""
+
+import numpy as np
+import pytest
+
+from pipeline.streaming.resampler import RationalResampler, resample_ratio
+
+
+def noise(count, seed=0):
+    return np.random.default_rng(seed).standard_normal(count).astype(np.float32)
+
+
+class TestResampler:
+    """Test cases for ratios, output counts, streaming and filtering."""
+
+    @pytest.mark.parametrize(
+        "input_rate, output_rate, ratio",
+        [(48000, 44100, (147, 160)), (204800, 44100, (441, 2048)), (44100, 16000, (160, 441))],
+    )
+    def test_resample_ratio(self, input_rate, output_rate, ratio):
+        assert resample_ratio(input_rate, output_rate) == ratio
+
+    def test_output_count_does_not_drift(self):
+        resampler = RationalResampler(204800, 44100)
+        produced = 0
+        for _ in range(100):
+            # 1/100 s blocks; per-block rounding would lose a fraction each time
+            produced += len(resampler.process(noise(2048)))
+        assert produced == 44100
+
+    def test_block_split_does_not_change_output(self):
+        samples = noise(30000, seed=1)
+        expected = RationalResampler(48000, 44100).process(samples)
+
+        resampler = RationalResampler(48000, 44100)
+        parts = []
+        start = 0
+        for length in (1, 7, 159, 161, 4096, 25576):
+            parts.append(resampler.process(samples[start : start + length]))
+            start += length
+        assert start == len(samples)
+        np.testing.assert_allclose(np.concatenate(parts), expected, atol=1e-5)
+
+    def test_tone_keeps_frequency_and_level(self):
+        input_rate, output_rate, freq = 48000, 44100, 1000.0
+        n = np.arange(input_rate)
+        tone = np.sin(2 * np.pi * freq / input_rate * n).astype(np.float32)
+        output = RationalResampler(input_rate, output_rate).process(tone)[1000:]
+
+        spectrum = np.abs(np.fft.rfft(output * np.hanning(len(output))))
+        peak = np.argmax(spectrum) * output_rate / len(output)
+        assert abs(peak - freq) < 2.0
+        assert abs(np.sqrt(2 * np.mean(output**2)) - 1.0) < 0.02
+
+    def test_rows_match_separate_streams(self):
+        rows = np.stack([noise(9600, seed=seed) for seed in (5, 6)])
+        expected = [RationalResampler(48000, 44100).process(row) for row in rows]
+
+        resampler = RationalResampler(48000, 44100)
+        output = np.concatenate(
+            [resampler.process(rows[:, :4001]), resampler.process(rows[:, 4001:])], axis=-1
+        )
+        assert output.shape == (2, len(expected[0]))
+        for row, reference in zip(output, expected):
+            np.testing.assert_allclose(row, reference, atol=1e-5)
+
+    def test_same_rate_passes_through(self):
+        samples = noise(100)
+        assert RationalResampler(44100, 44100).process(samples) is samples
+
+    def test_reset_restarts_counts(self):
+        resampler = RationalResampler(48000, 44100)
+        first = resampler.process(noise(480))
+        resampler.reset()
+        np.testing.assert_array_equal(resampler.process(noise(480)), first)
+
+    def test_skip_keeps_output_count(self):
+        samples = noise(4800)
+        expected = RationalResampler(48000, 44100).process(samples)
+
+        resampler = RationalResampler(48000, 44100)
+        head = resampler.process(samples[:1000])
+        skipped = resampler.skip(2001)
+        tail = resampler.process(samples[3001:])
+        assert len(head) + skipped + len(tail) == len(expected)
+
+    def test_skip_same_rate(self):
+        assert RationalResampler(44100, 44100).skip(123) == 123
@@ -0,0 +1,120 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+
+import numpy as np
+
+from pipeline.streaming.ringbuffer import SampleRingBuffer, SampleWindow
+
+
+class TestSampleRingBuffer:
+    def test_fifo_across_wrap(self):
+        ring = SampleRingBuffer(10, dtype=np.float32)
+        ring.write(np.arange(7))
+        np.testing.assert_array_equal(ring.read(5), np.arange(5))
+        ring.write(np.arange(7, 15))
+        assert ring.available == 10
+        np.testing.assert_array_equal(ring.read(), np.arange(5, 15))
+        assert ring.available == 0
+
+    def test_overrun_drops_oldest(self):
+        ring = SampleRingBuffer(8, dtype=np.complex64)
+        assert ring.write(np.arange(6)) == 0
+        assert ring.write(np.arange(6, 12)) == 4
+        np.testing.assert_array_equal(ring.read(), np.arange(4, 12))
+        assert ring.dropped == 4
+
+    def test_write_larger_than_capacity_keeps_newest(self):
+        ring = SampleRingBuffer(4, dtype=np.float32)
+        ring.write([0.0])
+        assert ring.write(np.arange(10)) == 7
+        np.testing.assert_array_equal(ring.read(), np.arange(6, 10))
+        assert ring.total_written == 11
+
+    def test_read_into_waits_for_writer(self):
+        ring = SampleRingBuffer(16, dtype=np.float32)
+        out = np.zeros(8, dtype=np.float32)
+        writer = threading.Timer(0.05, ring.write, args=(np.ones(3),))
+        writer.start()
+        assert ring.read_into(out, timeout=2.0) == 3
+        writer.join()
+        np.testing.assert_array_equal(out[:3], 1.0)
+
+    def test_read_into_without_timeout_returns_at_once(self):
+        ring = SampleRingBuffer(4)
+        assert ring.read_into(np.zeros(4, dtype=np.complex64)) == 0
+
+    def test_wait_empty_and_clear(self):
+        ring = SampleRingBuffer(4)
+        ring.write(np.ones(3))
+        assert not ring.wait_empty(0.01)
+        ring.clear()
+        assert ring.wait_empty(0.01)
+
+    def test_close_wakes_reader(self):
+        ring = SampleRingBuffer(4)
+        closer = threading.Timer(0.05, ring.close)
+        closer.start()
+        assert ring.read_into(np.zeros(4, dtype=np.complex64), timeout=5.0) == 0
+        closer.join()
+        assert ring.closed
+
+
+class TestSampleWindow:
+    def test_append_matches_concatenate(self):
+        rng = np.random.default_rng(0)
+        window = SampleWindow(1000, dtype=np.float32, initial_capacity=16)
+        expected = np.array([], dtype=np.float32)
+        for _ in range(50):
+            chunk = rng.standard_normal(rng.integers(1, 40)).astype(np.float32)
+            window.append(chunk)
+            expected = np.concatenate([expected, chunk])
+            if len(expected) > 300:
+                window.consume(100)
+                expected = expected[100:]
+        np.testing.assert_array_equal(window.data, expected)
+
+    def test_full_window_drops_oldest(self):
+        window = SampleWindow(10, dtype=np.float32)
+        assert window.append(np.arange(8)) == 0
+        assert window.append(np.arange(8, 14)) == 4
+        np.testing.assert_array_equal(window.data, np.arange(4, 14))
+        assert window.start_index == 4
+        assert window.append(np.arange(14, 40)) == 26
+        np.testing.assert_array_equal(window.data, np.arange(30, 40))
+        assert window.start_index == 30
+        assert window.dropped == 30
+
+    def test_take_batch_keeps_overlap(self):
+        window = SampleWindow(100, dtype=np.complex64, overlap=3)
+        window.append(np.arange(10))
+        start, batch = window.take_batch()
+        assert start == 0
+        np.testing.assert_array_equal(batch, np.arange(10))
+        window.append(np.arange(10, 15))
+        start, batch = window.take_batch()
+        assert start == 7
+        np.testing.assert_array_equal(batch, np.arange(7, 15))
+        assert window.end_index == 15
+
+    def test_keep_last_and_clear(self):
+        window = SampleWindow(20)
+        window.append(np.arange(12))
+        window.keep_last(5)
+        np.testing.assert_array_equal(window.data, np.arange(7, 12))
+        window.clear()
+        assert len(window) == 0
+        assert window.start_index == 12
@@ -0,0 +1,125 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for sample-indexed IQ messages (pipeline/streaming/sampleindex.py) and gap handling.
+"""
+
+import json
+import queue
+import time
+
+import numpy as np
+
+from demodulators.iqrecorder import IQRecorder
+from pipeline.streaming.sampleindex import SampleClock, SampleGapDetector
+
+
+def iq_block(index, num_samples=1000, center_freq=100e6, sample_rate=1e6):
+    return {
+        "samples": np.ones(num_samples, dtype=np.complex64),
+        "center_freq": center_freq,
+        "sample_rate": sample_rate,
+        "timestamp": time.time(),
+        "sample_index": index,
+    }
+
+
+class TestSampleClock:
+    """Test cases for producer-side indexing."""
+
+    def test_indices_advance_by_block_size(self):
+        """Consecutive blocks get contiguous indices, skipped samples leave a hole."""
+        clock = SampleClock()
+
+        assert clock.stamp(100, 1e6)["sample_index"] == 0
+        assert clock.stamp(100, 1e6)["sample_index"] == 100
+        clock.skip(50)
+        assert clock.stamp(100, 1e6)["sample_index"] == 250
+
+    def test_hardware_time_jump_is_counted_as_lost_samples(self):
+        """A hardware timestamp later than expected advances the index over the overflow."""
+        clock = SampleClock()
+        clock.stamp(1000, 1e6, hw_time_ns=0)
+
+        stamp = clock.stamp(1000, 1e6, hw_time_ns=1_500_000)
+
+        assert stamp["sample_index"] == 1500
+        assert stamp["hw_timestamp_ns"] == 1_500_000
+        assert clock.hardware_samples_lost == 500
+
+
+class TestSampleGapDetector:
+    """Test cases for consumer-side gap detection."""
+
+    def test_reports_missing_samples(self):
+        """A jump in sample_index is reported once, in samples."""
+        detector = SampleGapDetector()
+
+        assert detector.check(iq_block(0)) == 0
+        assert detector.check(iq_block(1000)) == 0
+        assert detector.check(iq_block(5000)) == 3000
+        assert detector.gaps == 1
+        assert detector.samples_lost == 3000
+
+    def test_producer_restart_resynchronizes(self):
+        """An index going backwards is not reported as a gap."""
+        detector = SampleGapDetector()
+        detector.check(iq_block(10_000))
+
+        assert detector.check(iq_block(0)) == 0
+        assert detector.check(iq_block(1000)) == 0
+
+    def test_discontinuity_resynchronizes(self):
+        """A message marked as a discontinuity starts a new index without a gap."""
+        detector = SampleGapDetector()
+        detector.check(iq_block(0))
+
+        assert detector.check(dict(iq_block(8000), discontinuity=True)) == 0
+        assert detector.check(iq_block(9000)) == 0
+        assert detector.gaps == 0
+
+    def test_messages_without_index_are_ignored(self):
+        """Messages from producers that do not index blocks never report gaps."""
+        detector = SampleGapDetector()
+
+        assert detector.check({"samples": np.zeros(10)}) == 0
+        assert detector.gaps == 0
+
+
+class TestIQRecorderGaps:
+    """Test cases for SigMF gap annotations in the IQ recorder."""
+
+    def test_gap_is_annotated_and_reanchored(self, tmp_path):
+        """A dropped block yields a gap annotation and a capture with the global index."""
+        iq_queue = queue.Queue()
+        for index in (0, 1000, 3000):
+            iq_queue.put(iq_block(index))
+        recording_path = tmp_path / "recording"
+        recorder = IQRecorder(iq_queue, None, "session", str(recording_path))
+
+        recorder.start()
+        deadline = time.time() + 5.0
+        while recorder.stats["iq_chunks_in"] < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        recorder.stop()
+
+        with open(f"{recording_path}.sigmf-meta") as f:
+            metadata = json.load(f)
+        gap = metadata["annotations"][-1]
+        assert gap["core:sample_start"] == 2000
+        assert gap["gs:samples_missing"] == 1000
+        assert metadata["captures"][-1]["core:global_index"] == 3000
+        assert recorder.stats["samples_written"] == 3000
@@ -0,0 +1,52 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+from pipeline.streaming.squelch import SquelchGate
+
+
+class TestSquelchGate:
+    def test_opens_above_threshold_plus_hysteresis(self):
+        gate = SquelchGate(hysteresis_db=3.0, hold_time=0.25)
+        assert not gate.update(-82.0, -80.0, 0.1)
+        assert gate.update(-76.0, -80.0, 0.1)
+
+    def test_holds_through_short_dip(self):
+        gate = SquelchGate(hysteresis_db=3.0, hold_time=0.25)
+        gate.update(-70.0, -80.0, 0.1)
+        assert gate.update(-90.0, -80.0, 0.1)
+        assert gate.update(-90.0, -80.0, 0.1)
+        assert gate.update(-70.0, -80.0, 0.1)
+        # The hold was refilled by the strong block
+        assert gate.update(-90.0, -80.0, 0.2)
+
+    def test_closes_after_hold_expires(self):
+        gate = SquelchGate(hysteresis_db=3.0, hold_time=0.25)
+        gate.update(-70.0, -80.0, 0.1)
+        assert gate.update(-90.0, -80.0, 0.2)
+        assert not gate.update(-90.0, -80.0, 0.1)
+        # Inside the hysteresis band a closed gate stays closed
+        assert not gate.update(-79.0, -80.0, 0.1)
+
+    def test_stays_open_inside_hysteresis_band(self):
+        gate = SquelchGate(hysteresis_db=3.0, hold_time=0.25)
+        gate.update(-70.0, -80.0, 0.1)
+        for _ in range(10):
+            assert gate.update(-81.0, -80.0, 0.1)
+
+    def test_reset_closes(self):
+        gate = SquelchGate()
+        gate.update(0.0, -80.0, 0.1)
+        gate.reset()
+        assert not gate.is_open
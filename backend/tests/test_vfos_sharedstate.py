@@ -0,0 +1,132 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the versioned VFO-state side channel (vfos/sharedstate.py and VFOManager).
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from vfos.sharedstate import VFOStateChannel, VFOStateReader
+from vfos.state import VFOManager
+
+
+def _read_session_states(channel_name, version, session_id, results):
+    """Reader process body: report the session's VFO states."""
+    reader = VFOStateReader()
+    try:
+        results.put(reader.get_session_states(channel_name, version, session_id))
+    except FileNotFoundError:
+        results.put(None)
+    finally:
+        reader.detach()
+
+
+@pytest.fixture
+def channel():
+    channel = VFOStateChannel(capacity=4096)
+    yield channel
+    channel.close()
+
+
+class TestVFOStateChannel:
+    """Test cases for publishing and reading snapshots."""
+
+    def test_reader_sees_published_snapshot(self, channel):
+        """A published snapshot is returned for the matching session."""
+        channel.publish(3, {"session-a": {1: {"center_freq": 145_800_000}}})
+        reader = VFOStateReader()
+
+        states = reader.get_session_states(channel.name, 3, "session-a")
+
+        assert states[1]["center_freq"] == 145_800_000
+        assert reader.get_session_states(channel.name, 3, "unknown") == {}
+        reader.detach()
+
+    def test_reader_only_reloads_on_new_version(self, channel):
+        """Messages with an already-seen version do not touch shared memory again."""
+        channel.publish(1, {"s": {1: {"bandwidth": 1}}})
+        reader = VFOStateReader()
+        reader.get_session_states(channel.name, 1, "s")
+        reader.get_session_states(channel.name, 1, "s")
+        assert reader.reloads == 1
+
+        channel.publish(2, {"s": {1: {"bandwidth": 2}}})
+        states = reader.get_session_states(channel.name, 2, "s")
+
+        assert reader.reloads == 2
+        assert states[1]["bandwidth"] == 2
+        reader.detach()
+
+    def test_oversized_snapshot_is_rejected(self, channel):
+        """A snapshot larger than the channel keeps the previous one published."""
+        channel.publish(1, {"s": {}})
+
+        assert channel.publish(2, {"s": {1: {"blob": "x" * 8192}}}) is False
+        assert channel.version == 1
+
+
+class TestVFOManagerVersioning:
+    """Test cases for VFOManager's versioned snapshots."""
+
+    def test_update_bumps_version_and_refreshes_snapshot(self):
+        """Changing a VFO bumps the version and rebuilds the cached dicts."""
+        manager = VFOManager()
+        version, states = manager.get_vfo_states_snapshot("versioning-session")
+        assert manager.get_vfo_states_snapshot("versioning-session")[1] is states
+
+        manager.update_vfo_state("versioning-session", 1, center_freq=437_000_000)
+        new_version, new_states = manager.get_vfo_states_snapshot("versioning-session")
+
+        assert new_version > version
+        assert new_states[1]["center_freq"] == 437_000_000
+
+    def test_shared_channel_follows_updates(self):
+        """Updates are published to the shared channel once it exists."""
+        manager = VFOManager()
+        channel = manager.get_shared_channel()
+        reader = VFOStateReader()
+
+        manager.update_vfo_state("channel-session", 2, bandwidth=25_000)
+        states = reader.get_session_states(channel.name, manager.get_version(), "channel-session")
+
+        assert states[2]["bandwidth"] == 25_000
+        reader.detach()
+
+    def test_channel_survives_reader_process_exit(self):
+        """A reader process exiting does not unlink the channel for the next reader."""
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        manager = VFOManager()
+        channel = manager.get_shared_channel()
+        manager.update_vfo_state("process-session", 1, center_freq=145_800_000)
+
+        received = []
+        for _ in range(2):
+            worker = context.Process(
+                target=_read_session_states,
+                args=(channel.name, manager.get_version(), "process-session", results),
+            )
+            worker.start()
+            received.append(results.get(timeout=10.0))
+            worker.join(timeout=5.0)
+            # A tracker owned by the exited reader would unlink the channel about now
+            time.sleep(0.5)
+
+        assert received[0] is not None and received[1] is not None
+        assert received[1][1]["center_freq"] == 145_800_000
@@ -0,0 +1,137 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the rtl_tcp client's background reader (workers/rtlsdrtcpclient.py).
+"""
+
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from workers.rtlsdrtcpclient import RtlSdrTcpClient
+
+
+class FakeRtlTcpServer:
+    """Minimal rtl_tcp server sending a dongle header followed by byte payloads.
+
+    Each part after the first is sent once the test releases next_part.
+    """
+
+    def __init__(self, *parts: bytes):
+        self.parts = parts
+        self.next_part = threading.Semaphore(0)
+        self.sent = threading.Event()
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        conn, _ = self.listener.accept()
+        with conn:
+            conn.sendall(struct.pack("!4sII", b"RTL0", 5, 29))
+            for i, part in enumerate(self.parts):
+                if i:
+                    self.next_part.acquire()
+                conn.sendall(part)
+            self.sent.set()
+            # Keep the connection open until the client goes away
+            try:
+                while conn.recv(64):
+                    pass
+            except OSError:
+                pass
+
+    def close(self):
+        self.listener.close()
+
+
+@pytest.fixture
+def small_client():
+    """Client with a tiny ring so tests can wrap and overrun it."""
+    clients = []
+
+    def make(*parts):
+        server = FakeRtlTcpServer(*parts)
+        client = RtlSdrTcpClient("127.0.0.1", server.port)
+        client.READ_CHUNK_SIZE = 64
+        client.RING_SIZE = 1024
+        client.connect()
+        clients.append((client, server))
+        return client, server
+
+    yield make
+    for client, server in clients:
+        client.close()
+        server.close()
+
+
+class TestBackgroundReader:
+    """Test cases for ring-buffered reads."""
+
+    def test_reads_wrap_around_the_ring(self, small_client):
+        """Consecutive reads return the stream in order across ring wrap-arounds."""
+        payload = np.arange(3000, dtype=np.uint16).astype(np.uint8).tobytes()
+        client, server = small_client(*(payload[i : i + 600] for i in range(0, 3000, 600)))
+
+        received = b""
+        for _ in range(5):
+            received += client.read_bytes(300).tobytes()
+            received += client.read_bytes(300).tobytes()
+            server.next_part.release()
+
+        assert received == payload
+        assert client.get_reader_stats()["overruns"] == 0
+
+    def test_lookup_table_conversion(self, small_client):
+        """read_samples maps each byte to (b - 127.5) / 127.5 as interleaved I/Q."""
+        payload = bytes([0, 255, 127, 128])
+        client, _ = small_client(payload)
+
+        samples = client.read_samples(2)
+
+        expected = np.array([-1.0 + 1.0j, -0.5 / 127.5 + 0.5j / 127.5], dtype=np.complex64)
+        np.testing.assert_allclose(samples, expected, atol=1e-6)
+
+    def test_overrun_drops_oldest_bytes(self, small_client):
+        """A consumer that falls a ring behind loses the oldest bytes, counted in pairs."""
+        payload = np.arange(4096, dtype=np.uint16).astype(np.uint8).tobytes()
+        client, server = small_client(payload)
+        client.read_bytes(2)
+        server.sent.wait(timeout=2.0)
+        deadline = time.monotonic() + 2.0
+        while (
+            client.get_reader_stats()["bytes_received"] < len(payload)
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+
+        stats = client.get_reader_stats()
+        tail = b""
+        while len(tail) < stats["bytes_buffered"]:
+            tail += client.read_bytes(min(512, stats["bytes_buffered"] - len(tail))).tobytes()
+
+        assert stats["overruns"] > 0
+        assert stats["bytes_dropped"] % 2 == 0
+        assert stats["samples_dropped"] == stats["bytes_dropped"] // 2
+        assert tail == payload[-len(tail) :]
+        assert 2 + stats["bytes_dropped"] + len(tail) == len(payload)
@@ -0,0 +1,144 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the SDR worker sample buffer pool (workers/samplebufferpool.py).
+"""
+
+import multiprocessing
+import pickle
+import queue
+
+import numpy as np
+import pytest
+
+from workers.samplebufferpool import (
+    SampleBufferPool,
+    put_shared_nowait,
+    remove_dc_offset_into,
+)
+
+
+class TestSampleBufferPool:
+    """Test cases for buffer reuse and reference counting."""
+
+    def test_buffer_reused_after_release(self):
+        """A released buffer is handed out again for the next read."""
+        pool = SampleBufferPool(num_buffers=2)
+        first = pool.acquire(1024)
+        data = first.data
+        first.release()
+
+        second = pool.acquire(512)
+
+        assert second.data is data
+        assert len(second.samples) == 512
+        assert pool.get_stats()["reused"] == 1
+
+    def test_buffer_held_until_all_consumers_serialized(self):
+        """A shared buffer only returns to the pool after every handoff is pickled."""
+        pool = SampleBufferPool(num_buffers=2)
+        block = pool.acquire(16)
+        block.samples[:] = np.arange(16)
+        fft_token = block.share()
+        demod_token = block.share()
+        block.release()
+
+        fft_copy = pickle.loads(pickle.dumps(fft_token))
+        assert pool.get_stats()["free"] == 0
+
+        demod_copy = pickle.loads(pickle.dumps(demod_token))
+        assert pool.get_stats()["free"] == 1
+
+        assert isinstance(fft_copy, np.ndarray)
+        np.testing.assert_array_equal(demod_copy, np.arange(16))
+        assert fft_copy.flags.writeable
+
+    def test_exhausted_pool_falls_back_to_unpooled_buffer(self):
+        """When all buffers are in flight a temporary buffer is returned."""
+        pool = SampleBufferPool(num_buffers=1)
+        held = pool.acquire(8)
+
+        extra = pool.acquire(8)
+        extra.release()
+
+        assert extra.data is not held.data
+        assert pool.get_stats()["exhausted"] == 1
+        assert pool.get_stats()["free"] == 0
+
+    def test_grown_block_size_replaces_small_buffer(self):
+        """A block larger than the free buffers gets a newly allocated buffer."""
+        pool = SampleBufferPool(num_buffers=1)
+        pool.acquire(8).release()
+
+        block = pool.acquire(64)
+
+        assert block.capacity == 64
+        assert pool.get_stats()["exhausted"] == 0
+
+
+class TestPutSharedNowait:
+    """Test cases for queue handoff of pooled samples."""
+
+    def test_full_queue_releases_reference(self):
+        """A failed put does not leak the handoff reference."""
+        pool = SampleBufferPool(num_buffers=1)
+        block = pool.acquire(8)
+        full_queue = queue.Queue(maxsize=1)
+        full_queue.put(None)
+
+        with pytest.raises(queue.Full):
+            put_shared_nowait(full_queue, {}, block)
+        block.release()
+
+        assert pool.get_stats()["free"] == 1
+
+    def test_multiprocessing_queue_delivers_plain_array(self):
+        """Consumers of a multiprocessing queue receive an ordinary numpy array."""
+        pool = SampleBufferPool(num_buffers=1)
+        block = pool.acquire(32)
+        block.samples[:] = np.arange(32)
+        mp_queue = multiprocessing.Queue(maxsize=1)
+
+        put_shared_nowait(mp_queue, {"center_freq": 1.0}, block)
+        block.release()
+        message = mp_queue.get(timeout=2.0)
+
+        np.testing.assert_array_equal(message["samples"], np.arange(32))
+        assert message["samples"].dtype == np.complex64
+        assert pool.get_stats()["free"] == 1
+
+
+class TestRemoveDcOffsetInto:
+    """Test cases for DC offset removal into a destination buffer."""
+
+    def test_converts_and_removes_mean(self):
+        """complex128 input is written DC-free into a complex64 buffer."""
+        samples = np.full(8, 0.5 + 0.25j, dtype=np.complex128) + np.arange(8)
+        out = np.empty(8, dtype=np.complex64)
+
+        remove_dc_offset_into(samples, out=out)
+
+        assert abs(np.mean(out)) < 1e-6
+        assert out.dtype == np.complex64
+
+    def test_non_finite_mean_is_not_subtracted(self):
+        """Overflowed input is copied through unchanged."""
+        samples = np.array([np.inf, 1, 2, 3], dtype=np.complex64)
+        out = np.empty(4, dtype=np.complex64)
+
+        remove_dc_offset_into(samples, out=out)
+
+        np.testing.assert_array_equal(out, samples)
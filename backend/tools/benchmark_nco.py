@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark frequency translation with the shared NCO against per-block np.exp.
+
+Reports the CPU time needed to translate one second of IQ at 1 MS/s (ms per MS/s)
+for a range of block sizes, the same way a demodulator sees them.
+
+Usage:
+    python tools/benchmark_nco.py
+    python tools/benchmark_nco.py --blocks 4096 65536 262144 --seconds 2
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.streaming.nco import NCO  # noqa: E402
+
+SAMPLE_RATE = 2.048e6
+OFFSET_FREQ = 123456.0
+
+
+def translate_per_block(samples, offset_freq, sample_rate):
+    """Previous implementation: fresh time axis and full np.exp for every block."""
+    t = np.arange(len(samples)) / sample_rate
+    shift = np.exp(-2j * np.pi * offset_freq * t)
+    return samples * shift
+
+
+def measure(translate, block, total_samples):
+    """CPU milliseconds per million samples."""
+    blocks = max(1, total_samples // len(block))
+    translate(block)  # Warm-up (fills the NCO rotator cache)
+    started = time.process_time()
+    for _ in range(blocks):
+        translate(block)
+    elapsed = time.process_time() - started
+    return 1000.0 * elapsed / (blocks * len(block) / 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--blocks", type=int, nargs="+", default=[4096, 16384, 65536, 262144])
+    parser.add_argument("--seconds", type=float, default=1.0, help="Signal seconds per run")
+    args = parser.parse_args()
+
+    total_samples = int(args.seconds * SAMPLE_RATE)
+    rng = np.random.default_rng(0)
+
+    print(f"{'block':>8}  {'np.exp ms/MS':>13}  {'NCO ms/MS':>10}  {'speedup':>8}")
+    for size in args.blocks:
+        block = (rng.standard_normal(size) + 1j * rng.standard_normal(size)).astype(np.complex64)
+        nco = NCO()
+
+        legacy = measure(
+            lambda b: translate_per_block(b, OFFSET_FREQ, SAMPLE_RATE), block, total_samples
+        )
+        cached = measure(lambda b: nco.mix(b, OFFSET_FREQ, SAMPLE_RATE), block, total_samples)
+        print(f"{size:>8}  {legacy:>13.2f}  {cached:>10.2f}  {legacy / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,9 @@
 
 import asyncio
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+from pipeline.orchestration.queuebridge import QueueBridge
 from tracker.runner import queue_from_tracker
 from vfos.updates import handle_vfo_updates_for_tracking
 
@@ -27,38 +28,45 @@ logger = logging.getLogger(__name__)
 # Global storage for tracker stats (accessed by performance monitor)
 tracker_stats: Dict[str, Any] = {}
 
+# Bridge draining the tracker queue (queue-depth metrics for the performance monitor)
+tracker_bridge: Optional[QueueBridge] = None
+
 
 async def handle_tracker_messages(sockio):
     """
-    Continuously checks for messages from the tracker process.
+    Continuously handles messages from the tracker process.
 
-    Processes messages from the tracker queue and emits them as Socket.IO events.
-    Also handles VFO updates for SDR tracking when satellite-tracking events are received.
+    Messages are drained from the tracker queue by a QueueBridge reader thread and
+    emitted as Socket.IO events as they arrive. Also handles VFO updates for SDR
+    tracking when satellite-tracking events are received.
 
     Args:
         sockio: Socket.IO server instance for emitting events
     """
-    while True:
-        try:
-            if queue_from_tracker is not None and not queue_from_tracker.empty():
-                message = queue_from_tracker.get_nowait()
-                msg_type = message.get("type")
-                event = message.get("event")
-                data = message.get("data", {})
+    global tracker_bridge
+
+    def handle_stats(message):
+        tracker_id = message.get("tracker_id", "satellite_tracker")
+        tracker_stats[tracker_id] = message.get("stats", {})
 
-                # Handle stats messages
-                if msg_type == "stats":
-                    global tracker_stats
-                    tracker_id = message.get("tracker_id", "satellite_tracker")
-                    tracker_stats[tracker_id] = message.get("stats", {})
-                elif event:
-                    await sockio.emit(event, data)
+    async def handle_event(message):
+        event = message.get("event")
+        data = message.get("data", {})
+        if not event:
+            return
 
-                    # Handle VFO updates for SDR tracking
-                    if event == "satellite-tracking" and data.get("rig_data"):
-                        await handle_vfo_updates_for_tracking(sockio, data)
+        await sockio.emit(event, data)
 
-            await asyncio.sleep(0.1)
+        # Handle VFO updates for SDR tracking
+        if event == "satellite-tracking" and data.get("rig_data"):
+            await handle_vfo_updates_for_tracking(sockio, data)
+
+    while True:
+        tracker_bridge = QueueBridge(queue_from_tracker, name="tracker")
+        tracker_bridge.register("stats", handle_stats)
+        tracker_bridge.set_default_handler(handle_event)
+        try:
+            await tracker_bridge.run()
         except Exception as e:  # pragma: no cover - best effort
             logger.error(f"Error handling tracker messages: {e}")
-            await asyncio.sleep(1)
+        await asyncio.sleep(1)
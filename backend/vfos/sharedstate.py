@@ -0,0 +1,193 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Versioned VFO-state side channel in shared memory.
+
+VFOManager publishes a snapshot of all session VFO states here whenever a VFO
+changes. IQ messages only carry the snapshot version; decoder processes keep the
+last snapshot they read and only touch shared memory again when the version in
+an IQ message differs from theirs.
+
+Layout: a header of int64 [seq, version, payload length] followed by the pickled
+{session_id: {vfo_number: vfo_state_dict}} payload. seq is odd while the writer
+is updating the segment, so readers can detect and retry torn reads.
+"""
+
+import logging
+import pickle
+import uuid
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger("vfo-shared-state")
+
+# Header: [seq, version, payload length]
+HEADER_FIELDS = 3
+HEADER_BYTES = HEADER_FIELDS * 8
+
+# Room for the pickled snapshot (a few hundred bytes per VFO)
+DEFAULT_CAPACITY = 1024 * 1024
+
+# Attempts to get a consistent read while the writer is publishing
+MAX_READ_ATTEMPTS = 5
+
+
+class VFOStateChannel:
+    """
+    Writer side of the VFO-state side channel (main process).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, name_prefix: str = "gs-vfo"):
+        """
+        Create the shared-memory segment.
+
+        Args:
+            capacity: Maximum size of the pickled snapshot in bytes
+            name_prefix: Prefix for the shared-memory segment name
+        """
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(
+            name=f"{name_prefix}-{uuid.uuid4().hex[:12]}",
+            create=True,
+            size=HEADER_BYTES + capacity,
+        )
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.header[:] = 0
+        self.version = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def publish(self, version: int, snapshot: Dict[str, Dict[int, Dict[str, Any]]]) -> bool:
+        """
+        Write a new snapshot.
+
+        Args:
+            version: Snapshot version (monotonically increasing)
+            snapshot: All session VFO states as plain dicts
+
+        Returns:
+            True if published, False if the snapshot does not fit
+        """
+        payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.capacity:
+            logger.error(
+                f"VFO state snapshot ({len(payload)} bytes) exceeds shared channel capacity "
+                f"({self.capacity} bytes); consumers keep the previous snapshot"
+            )
+            return False
+
+        header = self.header
+        header[0] += 1  # odd: write in progress
+        self.shm.buf[HEADER_BYTES : HEADER_BYTES + len(payload)] = payload
+        header[2] = len(payload)
+        header[1] = version
+        header[0] += 1  # even: consistent
+        self.version = version
+        return True
+
+    def close(self):
+        """
+        Release and unlink the shared-memory segment.
+        """
+        self.header = None
+        try:
+            self.shm.close()
+        except Exception:
+            pass
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class VFOStateReader:
+    """
+    Reader side of the VFO-state side channel (decoder processes).
+
+    Caches the last snapshot and only re-reads shared memory when asked for a
+    version it has not seen.
+    """
+
+    def __init__(self):
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.header: Optional[np.ndarray] = None
+        self.version: Optional[int] = None
+        self.snapshot: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.reloads = 0
+
+    def _attach(self, name: str):
+        self.detach()
+        # Registers the segment with this process's resource tracker; the reader must
+        # run in a process forked after the writer's tracker started, so both share it
+        self.shm = shared_memory.SharedMemory(name=name, create=False)
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.version = None
+
+    def get_session_states(
+        self, channel_name: str, version: int, session_id: str
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Return the VFO states of a session for the given snapshot version.
+
+        Args:
+            channel_name: Shared-memory name of the channel (from the IQ message)
+            version: Snapshot version carried by the IQ message
+            session_id: Session whose VFO states are wanted
+
+        Returns:
+            Dict of {vfo_number: vfo_state_dict}; empty if the session is unknown
+        """
+        if self.shm is None or self.shm.name != channel_name:
+            self._attach(channel_name)
+        # The channel may already hold a newer snapshot than the message refers to
+        if self.version is None or version > self.version:
+            self._reload()
+        return self.snapshot.get(session_id, {})
+
+    def _reload(self):
+        assert self.header is not None and self.shm is not None
+        header = self.header
+        for _ in range(MAX_READ_ATTEMPTS):
+            seq = int(header[0])
+            if seq % 2:
+                continue
+            version = int(header[1])
+            length = int(header[2])
+            payload = bytes(self.shm.buf[HEADER_BYTES : HEADER_BYTES + length])
+            if int(header[0]) != seq:
+                continue
+            self.snapshot = pickle.loads(payload) if length else {}
+            self.version = version
+            self.reloads += 1
+            return
+        # Writer kept publishing; keep the previous snapshot and retry on the next message
+        logger.debug("Could not get a consistent VFO state snapshot, keeping previous one")
+
+    def detach(self):
+        """
+        Release the mapping of the current channel, if any.
+        """
+        self.header = None
+        if self.shm is not None:
+            try:
+                self.shm.close()
+            except Exception:
+                pass
+            self.shm = None
@@ -1,6 +1,10 @@
+import atexit
 import logging
+import threading
 from dataclasses import asdict, dataclass
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from vfos.sharedstate import VFOStateChannel
 
 # Configure logging for the worker process
 logger = logging.getLogger("vfo-state")
@@ -42,6 +46,11 @@ class VFOManager:
         if cls._instance is None:
             cls._instance = super(VFOManager, cls).__new__(cls)
             cls._instance._session_vfo_states = {}
+            # Bumped on every VFO change; IQ consumers only re-read state when it moves
+            cls._instance._version = 1
+            cls._instance._snapshot_cache = {}
+            cls._instance._version_lock = threading.RLock()
+            cls._instance._shared_channel = None
         return cls._instance
 
     def _ensure_session_vfos(self, session_id: str) -> None:
@@ -52,6 +61,73 @@ class VFOManager:
             # Initialize VFOs with default values for this session
             for i in range(vfo_limit):
                 self._session_vfo_states[session_id][i + 1] = VFOState(vfo_number=i + 1)
+            self._bump_version()
+
+    def _bump_version(self) -> None:
+        """Record a VFO change and publish the new snapshot to the shared channel."""
+        with self._version_lock:
+            self._version += 1
+            self._snapshot_cache = {}
+            if self._shared_channel is not None:
+                self._publish_snapshot()
+
+    def _publish_snapshot(self) -> None:
+        snapshot = {
+            session_id: {vfo_id: asdict(vfo_state) for vfo_id, vfo_state in session_vfos.items()}
+            for session_id, session_vfos in list(self._session_vfo_states.items())
+        }
+        self._shared_channel.publish(self._version, snapshot)
+
+    def get_version(self) -> int:
+        """Returns the current VFO state version (increases on every change)."""
+        return self._version
+
+    def get_vfo_states_snapshot(self, session_id: str) -> Tuple[int, Dict[int, Dict[str, Any]]]:
+        """
+        Returns the version and plain-dict VFO states of a session.
+
+        The dicts are built once per version and shared between callers, so they
+        must be treated as read-only.
+        """
+        with self._version_lock:
+            self._ensure_session_vfos(session_id)
+            cached = self._snapshot_cache.get(session_id)
+            if cached is None:
+                cached = {
+                    vfo_id: asdict(vfo_state)
+                    for vfo_id, vfo_state in self._session_vfo_states[session_id].items()
+                }
+                self._snapshot_cache[session_id] = cached
+            return self._version, cached
+
+    def get_shared_channel(self) -> VFOStateChannel:
+        """
+        Returns the shared-memory VFO state channel, creating it on first use.
+
+        Process consumers read VFO state from this channel instead of receiving it
+        with every IQ message.
+        """
+        with self._version_lock:
+            if self._shared_channel is None:
+                self._shared_channel = VFOStateChannel()
+                atexit.register(self._shared_channel.close)
+                self._publish_snapshot()
+                logger.info(f"Created shared VFO state channel {self._shared_channel.name}")
+            return self._shared_channel
+
+    def load_session_states(self, session_id: str, states: Dict[int, Dict[str, Any]]) -> None:
+        """
+        Replace a session's VFO states with a snapshot from the main process.
+
+        Used in demodulator worker processes, which receive the states with each
+        IQ block. The snapshot is not published: a forked worker still holds the
+        parent's shared channel and must not write to it.
+        """
+        with self._version_lock:
+            self._session_vfo_states[session_id] = {
+                int(vfo_id): VFOState(**state) for vfo_id, state in states.items()
+            }
+            self._snapshot_cache = {}
 
     def get_all_session_ids(self) -> List[str]:
         """Returns a list of all session IDs currently in the VFOManager."""
@@ -91,6 +167,7 @@ class VFOManager:
             # deselect all VFOs for this session
             for _vfo_id in session_vfos:
                 session_vfos[_vfo_id].selected = False
+            self._bump_version()
             return
 
         if vfo_id not in session_vfos:
@@ -157,6 +234,8 @@ class VFOManager:
         if parameters_enabled is not None:
             vfo_state.parameters_enabled = parameters_enabled
 
+        self._bump_version()
+
         # logger.info(f"vfo states for session {session_id}: {session_vfos}")
 
     def get_all_vfo_states(self, session_id: str) -> Dict[int, VFOState]:
@@ -316,6 +395,7 @@ class VFOManager:
 
         if session_id in self._session_vfo_states:
             del self._session_vfo_states[session_id]
+            self._bump_version()
             logger.debug(f"Cleaned up internal VFOs for observation {observation_id}")
             return True
 
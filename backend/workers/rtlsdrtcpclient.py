@@ -2,8 +2,9 @@ import errno
 import logging
 import socket
 import struct
+import threading
 import time
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import numpy as np
 
@@ -13,6 +14,11 @@ class RtlSdrTcpClient:
     A client for interacting with an RTL-SDR device via an rtl_tcp server.
 
     Mimics some basic functionality of the pyrtlsdr library for remote devices.
+
+    rtl_tcp streams continuously, so a background thread drains the socket into a
+    ring buffer with recv_into() while the caller is busy with DSP. If the caller
+    falls more than a ring behind, the oldest bytes are dropped and counted as an
+    overrun (see get_reader_stats()).
     """
 
     # RTL_TCP command codes (based on common rtl_tcp implementations)
@@ -38,7 +44,11 @@ class RtlSdrTcpClient:
     DEFAULT_PORT: int = 1234
     CONNECT_TIMEOUT: float = 5.0  # Seconds
     READ_TIMEOUT: float = 10.0  # Seconds for sample reads
-    READ_CHUNK_SIZE: int = 16384  # Bytes to read per recv call
+    READ_CHUNK_SIZE: int = 65536  # Bytes to read per recv call
+    RING_SIZE: int = 1 << 23  # Receive ring (8 MiB, ~1.7 s at 2.4 MS/s)
+
+    # Byte -> float lookup table: (b - 127.5) / 127.5
+    _LUT = ((np.arange(256, dtype=np.float32) - 127.5) / 127.5).astype(np.float32)
 
     def __init__(self, hostname: str, port: int = DEFAULT_PORT, verbose: bool = False):
         """
@@ -75,6 +85,23 @@ class RtlSdrTcpClient:
         self._offset_tuning_enabled: Optional[bool] = None
         self._bias_tee_enabled: Optional[bool] = None
 
+        # Background reader state; _write_total/_read_total are running byte counts
+        # into the ring and are guarded by _ring_cond
+        self._ring: Optional[np.ndarray] = None
+        self._ring_cond = threading.Condition()
+        self._write_total: int = 0
+        self._read_total: int = 0
+        self._reader_thread: Optional[threading.Thread] = None
+        self._reader_running: bool = False
+        self._reader_error: Optional[BaseException] = None
+        self._bytes_received: int = 0
+        self._overruns: int = 0
+        self._bytes_dropped: int = 0
+
+        # Reusable output buffers (the arrays returned by read_bytes/read_samples)
+        self._byte_buffer = np.empty(0, dtype=np.uint8)
+        self._sample_buffer = np.empty(0, dtype=np.complex64)
+
     def connect(self) -> bool:
         """
         Connect to the rtl_tcp server and retrieve dongle information.
@@ -436,100 +463,196 @@ class RtlSdrTcpClient:
             num_samples: The number of complex (I/Q) samples to read.
 
         Returns:
-            A numpy array of complex64 samples.
+            A numpy array of complex64 samples. The array is reused by the next
+            call, copy it if it must outlive that.
 
         Raises:
             ConnectionError: If not connected or reading fails.
             IOError: If a socket error occurs during reading.
             TimeoutError: If reading takes longer than READ_TIMEOUT.
         """
-        self._ensure_connected()
-        if self._sock is None:
-            raise ConnectionError("Socket is unexpectedly None after connection check.")
+        # 2 bytes (I and Q) per complex sample
+        iq_uint8 = self.read_bytes(num_samples * 2)
 
-        bytes_to_read = num_samples * 2  # 2 bytes (I and Q) per complex sample
-        buffer = bytearray()
-        start_time = time.monotonic()
-        original_timeout = self._sock.gettimeout()
+        if len(self._sample_buffer) < num_samples:
+            self._sample_buffer = np.empty(num_samples, dtype=np.complex64)
+        complex_samples = self._sample_buffer[:num_samples]
 
-        self._logger.debug(f"Attempting to read {num_samples} samples ({bytes_to_read} bytes)...")
+        # Interleaved I/Q bytes map straight onto the float32 view of complex64
+        np.take(self._LUT, iq_uint8, out=complex_samples.view(np.float32))
+        return complex_samples
 
-        try:
-            # Set a read timeout for this operation
-            self._sock.settimeout(self.READ_TIMEOUT)
+    def read_bytes(self, num_bytes: int = 32768) -> np.ndarray:
+        """
+        Reads raw interleaved unsigned 8-bit I/Q bytes from the SDR (like pyrtlsdr's read_bytes).
 
-            while len(buffer) < bytes_to_read:
-                # Check overall timeout
-                elapsed_time = time.monotonic() - start_time
-                if elapsed_time > self.READ_TIMEOUT:
-                    raise TimeoutError(
-                        f"Read timed out after {elapsed_time:.2f}s waiting for samples ({len(buffer)}/{bytes_to_read} bytes received)."
-                    )
+        Args:
+            num_bytes: The number of bytes to read (two per complex sample).
 
-                remaining_bytes = bytes_to_read - len(buffer)
-                chunk_size = min(self.READ_CHUNK_SIZE, remaining_bytes)
+        Returns:
+            A numpy array of uint8 values as sent by rtl_tcp. The array is reused
+            by the next call, copy it if it must outlive that.
 
-                try:
-                    data = self._sock.recv(chunk_size)
-                    if not data:
-                        # Server closed the connection
-                        raise ConnectionError("Connection closed by server while reading samples.")
-                    buffer.extend(data)
-                    # Reset start time slightly if data received to allow continuous streams
-                    # Or keep original start_time for a strict overall timeout
-                    # start_time = time.monotonic() # Uncomment to reset timeout on activity
-
-                except socket.timeout:
-                    # recv timed out, but overall timeout might not be hit yet.
-                    # Log it but continue the loop to check overall timeout.
-                    self._logger.debug(
-                        f"Socket recv timed out waiting for chunk, elapsed {elapsed_time:.2f}s."
+        Raises:
+            ConnectionError: If not connected or reading fails.
+            IOError: If a socket error occurs during reading.
+            TimeoutError: If reading takes longer than READ_TIMEOUT.
+            ValueError: If more than half the receive ring is requested.
+        """
+        self._ensure_connected()
+        self._ensure_reader()
+        if num_bytes > self.RING_SIZE // 2:
+            raise ValueError(f"Cannot read {num_bytes} bytes at once (ring is {self.RING_SIZE}).")
+
+        if len(self._byte_buffer) < num_bytes:
+            self._byte_buffer = np.empty(num_bytes, dtype=np.uint8)
+        out = self._byte_buffer[:num_bytes]
+
+        deadline = time.monotonic() + self.READ_TIMEOUT
+        with self._ring_cond:
+            while self._write_total - self._read_total < num_bytes and self._reader_error is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    buffered = self._write_total - self._read_total
+                    raise TimeoutError(
+                        f"Read timed out after {self.READ_TIMEOUT:.2f}s waiting for samples ({buffered}/{num_bytes} bytes received)."
                     )
-                    continue  # Let the outer loop check the main timeout
-
-                except (OSError, IOError) as e:
-                    self._logger.error(f"Socket error during sample read: {e}")
-                    self.close()  # Assume the connection is broken
-                    raise IOError(f"Socket error while reading samples: {e}") from e
+                self._ring_cond.wait(remaining)
 
-            # If we exit the loop, we should have enough bytes
-            if len(buffer) < bytes_to_read:
-                # This case should ideally be caught by a timeout or connection errors, but handle defensively.
-                raise IOError(
-                    f"Insufficient data received: got {len(buffer)}, expected {bytes_to_read}."
-                )
-
-            self._logger.debug(f"Successfully read {len(buffer)} bytes.")
+            # Bytes buffered before a connection error are still served
+            error = None
+            if self._write_total - self._read_total >= num_bytes:
+                self._copy_from_ring(out)
+            else:
+                error = self._reader_error
 
-            # Convert bytes to samples
-            # rtl_tcp sends unsigned 8-bit integers (0-255)
-            iq_uint8 = np.frombuffer(buffer, dtype=np.uint8)
+        if error is not None:
+            self._logger.error(f"Socket error during sample read: {error}")
+            self.close()  # Assume the connection is broken
+            if isinstance(error, ConnectionError):
+                raise error
+            raise IOError(f"Socket error while reading samples: {error}") from error
+
+        return out
+
+    def _copy_from_ring(self, out: np.ndarray) -> None:
+        """Copy the oldest len(out) buffered bytes out of the ring (caller holds _ring_cond)."""
+        ring = self._ring
+        start = self._read_total % len(ring)
+        first = min(len(out), len(ring) - start)
+        out[:first] = ring[start : start + first]
+        if first < len(out):
+            out[first:] = ring[: len(out) - first]
+        self._read_total += len(out)
+
+    def _ensure_reader(self) -> None:
+        """Start the background socket reader for the current connection if needed."""
+        if self._reader_thread is not None and self._reader_thread.is_alive():
+            return
+        if self._sock is None:
+            raise ConnectionError("Socket is unexpectedly None after connection check.")
 
-            # Convert to float32 and normalize to [-1.0, 1.0]
-            # Subtract 127.5 to center around 0, divide by 127.5 to scale
-            iq_float = (iq_uint8.astype(np.float32) - 127.5) / 127.5
+        if self._ring is None:
+            self._ring = np.empty(self.RING_SIZE, dtype=np.uint8)
+        with self._ring_cond:
+            self._write_total = 0
+            self._read_total = 0
+            self._reader_error = None
+            self._reader_running = True
+
+        self._reader_thread = threading.Thread(
+            target=self._reader_loop,
+            args=(self._sock,),
+            daemon=True,
+            name="Ground Station - RtlSdrTcpReader",
+        )
+        self._reader_thread.start()
+
+    def _reader_loop(self, sock: socket.socket) -> None:
+        """Drain the socket into the ring until closed."""
+        ring = self._ring
+        ring_view = memoryview(ring)
+        ring_size = len(ring)
+        self._logger.debug("Background reader started")
+
+        while self._reader_running:
+            with self._ring_cond:
+                free = ring_size - (self._write_total - self._read_total)
+                if free < self.READ_CHUNK_SIZE:
+                    # Consumer is a full ring behind: drop the oldest chunk (an even
+                    # number of bytes, so I/Q stay paired) rather than stall the socket
+                    dropped = self.READ_CHUNK_SIZE - free
+                    dropped += dropped & 1
+                    self._read_total += dropped
+                    self._overruns += 1
+                    self._bytes_dropped += dropped
+                    free += dropped
+                write_pos = self._write_total % ring_size
+            chunk = min(free, ring_size - write_pos, self.READ_CHUNK_SIZE)
 
-            # De-interleave I and Q samples and combine into complex numbers
-            complex_samples = iq_float[0::2] + 1j * iq_float[1::2]
+            try:
+                received = sock.recv_into(ring_view[write_pos : write_pos + chunk], chunk)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if self._reader_running:
+                    self._set_reader_error(e)
+                break
 
-            return complex_samples.astype(np.complex64)  # Use standard complex64
+            if received == 0:
+                self._set_reader_error(
+                    ConnectionError("Connection closed by server while reading samples.")
+                )
+                break
+
+            with self._ring_cond:
+                self._write_total += received
+                self._bytes_received += received
+                self._ring_cond.notify_all()
+
+        self._logger.debug("Background reader stopped")
+
+    def _set_reader_error(self, error: BaseException) -> None:
+        with self._ring_cond:
+            self._reader_error = error
+            self._reader_running = False
+            self._ring_cond.notify_all()
+
+    def _stop_reader(self) -> None:
+        """Stop the background reader (the socket must be shut down to unblock it)."""
+        with self._ring_cond:
+            self._reader_running = False
+            self._ring_cond.notify_all()
+        thread = self._reader_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        self._reader_thread = None
+
+    def get_reader_stats(self) -> Dict[str, Any]:
+        """
+        Background reader statistics.
 
-        finally:
-            # Always restore the original socket timeout
-            if self._sock and self._connected:  # Check if socket still exists and connected
-                try:
-                    self._sock.settimeout(original_timeout)
-                except OSError as e:
-                    # Ignore error if socket was closed during read (e.g., by close() in except block)
-                    if e.errno != errno.EBADF:
-                        self._logger.warning(f"Could not restore original socket timeout: {e}")
+        Returns:
+            Dict with bytes_received, bytes_buffered, overruns, bytes_dropped and
+            samples_dropped (totals since the client was created)
+        """
+        with self._ring_cond:
+            return {
+                "bytes_received": self._bytes_received,
+                "bytes_buffered": self._write_total - self._read_total,
+                "overruns": self._overruns,
+                "bytes_dropped": self._bytes_dropped,
+                "samples_dropped": self._bytes_dropped // 2,
+            }
 
     def close(self) -> None:
         """Closes the connection to the rtl_tcp server."""
         if self._sock:
             self._logger.info("Closing connection...")
-            # Mark as disconnected immediately
+            # Mark as disconnected immediately; the background reader exits quietly
+            # once the socket is shut down
             self._connected = False
+            self._reader_running = False
             # Clear state on close
             self._center_freq = None
             self._sample_rate = None
@@ -556,6 +679,7 @@ class RtlSdrTcpClient:
                 except Exception as e:
                     self._logger.warning(f"Error closing socket: {e}")
 
+        self._stop_reader()
         self._sock = None
         # Ensure connected is False even if sock was None
         self._connected = False
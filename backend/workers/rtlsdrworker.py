@@ -35,7 +35,19 @@ warnings.filterwarnings(
 )
 import rtlsdr  # noqa: E402 - import after warning filter by design
 
+from pipeline.streaming.iqformat import (  # noqa: E402 - follows filtered import
+    IQ_FORMAT_CF32,
+    IQ_FORMAT_CU8,
+    block_offset,
+    packed_fields,
+)
+from pipeline.streaming.sampleindex import SampleClock  # noqa: E402 - follows filtered import
 from workers.rtlsdrtcpclient import RtlSdrTcpClient  # noqa: E402 - follows filtered import
+from workers.samplebufferpool import (  # noqa: E402 - follows filtered import
+    SampleBufferPool,
+    put_shared_nowait,
+    remove_dc_offset_into,
+)
 
 # Configure logging for the worker process
 logger = logging.getLogger("rtlsdr-worker")
@@ -82,10 +94,18 @@ def rtlsdr_worker_process(
 
         # FFT averaging configuration (passed to IQ consumers)
         fft_averaging = config.get("fft_averaging", 6)
+        fft_averaging_mode = config.get("fft_averaging_mode", "block")
 
         # FFT overlap (passed to IQ consumers)
         fft_overlap = config.get("fft_overlap", True)
 
+        # IQ sample format: cu8 passes the dongle's bytes on as read (4x smaller messages,
+        # consumers convert when they need floats); cf32 converts here. Fixed per run.
+        iq_format = config.get("iq_format", IQ_FORMAT_CU8)
+        if iq_format not in (IQ_FORMAT_CU8, IQ_FORMAT_CF32):
+            logger.warning(f"Unsupported RTL-SDR IQ format {iq_format}, using {IQ_FORMAT_CU8}")
+            iq_format = IQ_FORMAT_CU8
+
         # Track whether we have IQ consumers
         has_iq_consumers = iq_queue_fft is not None or iq_queue_demod is not None
 
@@ -131,6 +151,7 @@ def rtlsdr_worker_process(
             "iq_chunks_out": 0,
             "read_errors": 0,
             "queue_drops": 0,
+            "samples_overrun": 0,
             "last_activity": None,
             "errors": 0,
             "cpu_percent": 0.0,
@@ -145,6 +166,13 @@ def rtlsdr_worker_process(
         last_cpu_check = time.time()
         cpu_check_interval = 0.5
 
+        # Reusable sample buffers, handed to the IQ queues without copying
+        sample_pool = SampleBufferPool(
+            dtype=np.uint8 if iq_format == IQ_FORMAT_CU8 else np.complex64
+        )
+        # Sample index of each block, so consumers can detect dropped blocks
+        sample_clock = SampleClock()
+
         # Main processing loop
         while not stop_event.is_set():
             # Update CPU and memory usage periodically
@@ -210,6 +238,11 @@ def rtlsdr_worker_process(
                             fft_averaging = new_config["fft_averaging"]
                             logger.info(f"Updated FFT averaging: {fft_averaging}")
 
+                    if "fft_averaging_mode" in new_config:
+                        if old_config.get("fft_averaging_mode") != new_config["fft_averaging_mode"]:
+                            fft_averaging_mode = new_config["fft_averaging_mode"]
+                            logger.info(f"Updated FFT averaging mode: {fft_averaging_mode}")
+
                     if "bias_t" in new_config:
                         if old_config.get("bias_t", None) != new_config["bias_t"]:
                             sdr.set_bias_tee(new_config["bias_t"])
@@ -252,15 +285,40 @@ def rtlsdr_worker_process(
                         }
                     )
 
+            sample_block = None
             try:
 
                 # Read samples
-                samples = sdr.read_samples(num_samples)
-                stats["samples_read"] += len(samples)
+                if iq_format == IQ_FORMAT_CU8:
+                    raw_bytes = np.frombuffer(sdr.read_bytes(num_samples * 2), dtype=np.uint8)
+                    block_samples = len(raw_bytes) // 2
+
+                    # Keep the interleaved bytes; the block mean becomes the zero level,
+                    # so consumers remove the DC offset when they unpack
+                    sample_block = sample_pool.acquire(2 * block_samples)
+                    np.copyto(sample_block.samples, raw_bytes[: 2 * block_samples])
+                    format_fields = packed_fields(IQ_FORMAT_CU8, block_offset(sample_block.samples))
+                else:
+                    raw_samples = sdr.read_samples(num_samples)
+                    block_samples = len(raw_samples)
+
+                    # Remove DC offset while converting into a pooled complex64 buffer
+                    sample_block = sample_pool.acquire(block_samples)
+                    remove_dc_offset_into(raw_samples, out=sample_block.samples)
+                    format_fields = {}
+
+                stats["samples_read"] += block_samples
                 stats["last_activity"] = time.time()
 
-                # Remove DC offset
-                samples = remove_dc_offset(samples)
+                # Samples lost to rtl_tcp receive overruns precede this block
+                if isinstance(sdr, RtlSdrTcpClient):
+                    overrun = sdr.get_reader_stats()["samples_dropped"] - stats["samples_overrun"]
+                    if overrun > 0:
+                        stats["samples_overrun"] += overrun
+                        sample_clock.skip(overrun)
+
+                # Index the block even if no queue takes it (no hardware timestamps on RTL-SDR)
+                block_stamp = sample_clock.stamp(block_samples, sdr.sample_rate)
 
                 # Broadcast IQ samples to consumers (FFT processor and demodulators)
                 if has_iq_consumers:
@@ -272,18 +330,20 @@ def rtlsdr_worker_process(
                         try:
                             if not iq_queue_fft.full():
                                 iq_message = {
-                                    "samples": samples,
                                     "center_freq": sdr.center_freq,
                                     "sample_rate": sdr.sample_rate,
                                     "timestamp": timestamp,
+                                    **block_stamp,
+                                    **format_fields,
                                     "config": {
                                         "fft_size": fft_size,
                                         "fft_window": fft_window,
                                         "fft_averaging": fft_averaging,
+                                        "fft_averaging_mode": fft_averaging_mode,
                                         "fft_overlap": fft_overlap,
                                     },
                                 }
-                                iq_queue_fft.put_nowait(iq_message)
+                                put_shared_nowait(iq_queue_fft, iq_message, sample_block)
                                 stats["iq_chunks_out"] += 1
                             else:
                                 stats["queue_drops"] += 1
@@ -295,12 +355,13 @@ def rtlsdr_worker_process(
                         try:
                             if not iq_queue_demod.full():
                                 demod_message = {
-                                    "samples": samples,
                                     "center_freq": sdr.center_freq,
                                     "sample_rate": sdr.sample_rate,
                                     "timestamp": timestamp,
+                                    **block_stamp,
+                                    **format_fields,
                                 }
-                                iq_queue_demod.put_nowait(demod_message)
+                                put_shared_nowait(iq_queue_demod, demod_message, sample_block)
                                 stats["iq_chunks_out"] += 1
                             else:
                                 stats["queue_drops"] += 1
@@ -327,6 +388,11 @@ def rtlsdr_worker_process(
                 # Pause before retrying
                 time.sleep(1)
 
+            finally:
+                # Drop the acquisition loop's reference; queued handoffs keep their own
+                if sample_block is not None:
+                    sample_block.release()
+
     except ConnectionRefusedError as e:
         error_msg = f"Connection refused to RTL-SDR TCP server at {hostname}:{port}: {str(e)}"
         logger.error(error_msg)
@@ -422,17 +488,3 @@ def calculate_samples_per_scan(sample_rate, fft_size):
     num_samples = min(num_samples, 1048576)
 
     return num_samples
-
-
-def remove_dc_offset(samples):
-    """
-    Remove DC offset by subtracting the mean
-    """
-    # Calculate the mean of the complex samples
-    mean_i = np.mean(np.real(samples))
-    mean_q = np.mean(np.imag(samples))
-
-    # Subtract the mean
-    samples_no_dc = samples - (mean_i + 1j * mean_q)
-
-    return samples_no_dc
@@ -0,0 +1,243 @@
+# Copyright (c) 2025 Efstratios Goudelis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Reference-counted sample buffer pool shared by the SDR worker processes.
+
+The acquisition loop reads into a preallocated buffer from the pool and hands the
+same buffer to both the FFT and the demodulation queue. multiprocessing.Queue
+serializes messages lazily in its feeder thread, so a buffer can only be reused
+once every queue has pickled it. Each handoff holds a reference that is dropped
+right after the samples have been serialized; the buffer returns to the pool when
+the last reference (including the acquisition loop's own) is released.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("sample-buffer-pool")
+
+
+class SampleBuffer:
+    """
+    A pooled complex64 buffer with a reference count.
+
+    The holder that acquired the buffer owns one reference and must call
+    release() when it is done with it.
+    """
+
+    __slots__ = ("pool", "data", "samples", "refcount")
+
+    def __init__(self, pool: Optional["SampleBufferPool"], data: np.ndarray):
+        self.pool = pool
+        self.data = data
+        self.samples = data
+        self.refcount = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data)
+
+    def share(self) -> "SharedSamples":
+        """
+        Take an extra reference for a consumer and return the handoff token.
+
+        Returns:
+            Token to place in the outgoing message instead of a copied array
+        """
+        if self.pool is not None:
+            self.pool._retain(self)
+        return SharedSamples(self)
+
+    def release(self):
+        """
+        Drop one reference; the buffer goes back to the pool at zero.
+        """
+        if self.pool is not None:
+            self.pool._release(self)
+
+
+class SharedSamples:
+    """
+    Handoff token for a pooled buffer placed in a queue message.
+
+    When the queue's feeder thread pickles the message, the token serializes as
+    a plain numpy array (consumers never see this class) and releases its
+    reference on the buffer as soon as the sample bytes have been captured.
+    """
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer: SampleBuffer):
+        self._buffer: Optional[SampleBuffer] = buffer
+
+    def __reduce__(self):
+        buffer = self._buffer
+        if buffer is None:
+            raise RuntimeError("Pooled samples were released before being serialized")
+        try:
+            # Protocol-2 style reduction embeds a bytes copy of the data, so the
+            # buffer is free to be reused once this returns
+            return buffer.samples.__reduce__()
+        finally:
+            self.release()
+
+    def release(self):
+        """
+        Drop this token's reference (idempotent).
+        """
+        buffer = self._buffer
+        if buffer is not None:
+            self._buffer = None
+            buffer.release()
+
+
+class SampleBufferPool:
+    """
+    Preallocated pool of complex64 sample buffers for one worker process.
+
+    Buffers are reused across reads as long as the requested block size fits.
+    When every buffer is still referenced by a queue that has not serialized it
+    yet, the pool hands out a temporary unpooled buffer instead of blocking the
+    acquisition loop.
+    """
+
+    def __init__(self, num_buffers: int = 8, dtype=np.complex64):
+        """
+        Initialize the pool.
+
+        Args:
+            num_buffers: Maximum number of pooled buffers. The default covers the
+                         FFT and demod queues (3 messages each) plus the block
+                         being filled.
+            dtype: Sample dtype of the buffers
+        """
+        self.num_buffers = num_buffers
+        self.dtype = dtype
+        self.free: List[SampleBuffer] = []
+        self.allocated = 0
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "acquired": 0,
+            "reused": 0,
+            "allocated": 0,
+            "exhausted": 0,
+        }
+
+    def acquire(self, num_samples: int) -> SampleBuffer:
+        """
+        Get a buffer holding at least num_samples samples.
+
+        Args:
+            num_samples: Number of samples the caller will write
+
+        Returns:
+            SampleBuffer with one reference owned by the caller; its samples
+            attribute is a view of exactly num_samples samples
+        """
+        with self.lock:
+            self.stats["acquired"] += 1
+            buffer = None
+            while self.free:
+                candidate = self.free.pop()
+                if candidate.capacity >= num_samples:
+                    buffer = candidate
+                    self.stats["reused"] += 1
+                    break
+                # Block size grew (sample rate / FFT size change); drop the small buffer
+                self.allocated -= 1
+
+            if buffer is None:
+                if self.allocated < self.num_buffers:
+                    buffer = SampleBuffer(self, np.empty(num_samples, dtype=self.dtype))
+                    self.allocated += 1
+                    self.stats["allocated"] += 1
+                else:
+                    # Every pooled buffer is still in flight - fall back to a one-off buffer
+                    self.stats["exhausted"] += 1
+                    buffer = SampleBuffer(None, np.empty(num_samples, dtype=self.dtype))
+
+            buffer.samples = buffer.data[:num_samples]
+            buffer.refcount = 1
+            return buffer
+
+    def _retain(self, buffer: SampleBuffer):
+        with self.lock:
+            buffer.refcount += 1
+
+    def _release(self, buffer: SampleBuffer):
+        with self.lock:
+            if buffer.refcount <= 0:
+                logger.warning("Sample buffer released more times than it was retained")
+                return
+            buffer.refcount -= 1
+            if buffer.refcount == 0:
+                self.free.append(buffer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = self.stats.copy()
+            stats["free"] = len(self.free)
+            stats["in_use"] = self.allocated - len(self.free)
+            return stats
+
+
+def put_shared_nowait(target_queue, message: Dict[str, Any], buffer: SampleBuffer):
+    """
+    Put a message carrying pooled samples on a queue without copying them.
+
+    Args:
+        target_queue: multiprocessing.Queue to put the message on
+        message: Message dict; its "samples" entry is set to the handoff token
+        buffer: Pooled buffer holding the samples
+
+    Raises:
+        queue.Full: If the queue is full (the reference is released first)
+    """
+    token = buffer.share()
+    message["samples"] = token
+    try:
+        target_queue.put_nowait(message)
+    except BaseException:
+        token.release()
+        raise
+
+
+def remove_dc_offset_into(samples: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Subtract the DC offset (mean) of samples, writing the result into out.
+
+    out may be samples itself for an in-place correction. Non-finite means
+    (e.g. overflowed input) are not subtracted.
+
+    Args:
+        samples: Input complex samples
+        out: Output array of the same length
+
+    Returns:
+        out
+    """
+    with np.errstate(invalid="ignore", over="ignore"):
+        mean = np.mean(samples)
+    if not np.isfinite(mean):
+        logger.warning(f"Invalid mean value detected ({mean}), skipping DC offset removal")
+        if out is not samples:
+            out[:] = samples
+        return out
+    np.subtract(samples, mean.astype(out.dtype), out=out)
+    return out
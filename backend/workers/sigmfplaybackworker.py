@@ -24,6 +24,13 @@ from typing import Any, Dict
 import numpy as np
 import psutil
 
+from pipeline.streaming.sampleindex import SampleClock
+from workers.samplebufferpool import (
+    SampleBufferPool,
+    put_shared_nowait,
+    remove_dc_offset_into,
+)
+
 # Configure logging for the worker process
 logger = logging.getLogger("sigmf-playback")
 SUPPORTED_DATATYPES = {"cf32_le", "ci16_le", "ci16", "ci8", "ci8_le", "cu8", "cu8_le"}
@@ -71,6 +78,7 @@ def sigmf_playback_worker_process(
         fft_size = config.get("fft_size", 16384)
         fft_window = config.get("fft_window", "hanning")
         fft_averaging = config.get("fft_averaging", 6)
+        fft_averaging_mode = config.get("fft_averaging_mode", "block")
         fft_overlap = config.get("fft_overlap", False)
         loop_playback = config.get("loop_playback", True)  # Loop by default
 
@@ -196,6 +204,11 @@ def sigmf_playback_worker_process(
         last_cpu_check = time.time()
         cpu_check_interval = 0.5
 
+        # Reusable sample buffers, handed to the IQ queues without copying
+        sample_pool = SampleBufferPool()
+        # Sample index of each block (keeps increasing across loops of the recording)
+        sample_clock = SampleClock()
+
         logger.info("Starting SigMF playback loop")
 
         # Main playback loop
@@ -249,6 +262,11 @@ def sigmf_playback_worker_process(
                             fft_averaging = new_config["fft_averaging"]
                             logger.info(f"Updated FFT averaging: {fft_averaging}")
 
+                    if "fft_averaging_mode" in new_config:
+                        if old_config.get("fft_averaging_mode") != new_config["fft_averaging_mode"]:
+                            fft_averaging_mode = new_config["fft_averaging_mode"]
+                            logger.info(f"Updated FFT averaging mode: {fft_averaging_mode}")
+
                     if "fft_overlap" in new_config:
                         if old_config.get("fft_overlap", True) != new_config["fft_overlap"]:
                             fft_overlap = new_config["fft_overlap"]
@@ -264,6 +282,7 @@ def sigmf_playback_worker_process(
             except Exception as e:
                 logger.error(f"Error processing configuration: {str(e)}")
 
+            sample_block = None
             try:
                 # Read samples from file
                 bytes_to_read = num_samples * bytes_per_sample
@@ -304,8 +323,10 @@ def sigmf_playback_worker_process(
                             f"Moved to capture segment {idx}: freq={current_freq/1e6:.3f} MHz"
                         )
 
-                # Remove DC offset
-                samples = remove_dc_offset(samples)
+                # Remove DC offset while copying into a pooled buffer
+                sample_block = sample_pool.acquire(samples_read)
+                remove_dc_offset_into(samples, out=sample_block.samples)
+                block_stamp = sample_clock.stamp(samples_read, sample_rate)
 
                 # Stream IQ data to consumers
                 if has_iq_consumers:
@@ -336,14 +357,15 @@ def sigmf_playback_worker_process(
                             try:
                                 if not iq_queue_fft.full():
                                     iq_message = {
-                                        "samples": samples.copy(),
                                         "center_freq": current_freq,
                                         "sample_rate": sample_rate,
                                         "timestamp": timestamp,
+                                        **block_stamp,
                                         "config": {
                                             "fft_size": fft_size,
                                             "fft_window": fft_window,
                                             "fft_averaging": fft_averaging,
+                                            "fft_averaging_mode": fft_averaging_mode,
                                             "fft_overlap": fft_overlap,
                                         },
                                     }
@@ -360,7 +382,7 @@ def sigmf_playback_worker_process(
                                         total_recording_duration_seconds
                                     )
 
-                                    iq_queue_fft.put_nowait(iq_message)
+                                    put_shared_nowait(iq_queue_fft, iq_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -372,10 +394,10 @@ def sigmf_playback_worker_process(
                             try:
                                 if not iq_queue_demod.full():
                                     demod_message = {
-                                        "samples": samples.copy(),
                                         "center_freq": current_freq,
                                         "sample_rate": sample_rate,
                                         "timestamp": timestamp,
+                                        **block_stamp,
                                     }
                                     # Add playback timing info (only for playback mode)
                                     if recording_datetime is not None:
@@ -390,7 +412,7 @@ def sigmf_playback_worker_process(
                                         total_recording_duration_seconds
                                     )
 
-                                    iq_queue_demod.put_nowait(demod_message)
+                                    put_shared_nowait(iq_queue_demod, demod_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -425,6 +447,11 @@ def sigmf_playback_worker_process(
                 # Pause before retrying
                 time.sleep(1)
 
+            finally:
+                # Drop the playback loop's reference; queued handoffs keep their own
+                if sample_block is not None:
+                    sample_block.release()
+
     except Exception as e:
         error_msg = f"Error in SigMF playback worker process: {str(e)}"
         logger.error(error_msg)
@@ -533,24 +560,3 @@ def parse_iq_samples(data: bytes, datatype: str) -> np.ndarray:
 
     logger.warning("Unsupported datatype %s, falling back to cf32_le", datatype)
     return np.frombuffer(data, dtype=np.complex64)
-
-
-def remove_dc_offset(samples):
-    """
-    Remove DC offset by subtracting the mean
-    """
-    # Calculate the mean of the complex samples
-    mean_i = np.mean(np.real(samples))
-    mean_q = np.mean(np.imag(samples))
-
-    # Check for invalid values (inf/nan from overflow)
-    if not np.isfinite(mean_i) or not np.isfinite(mean_q):
-        logger.warning(
-            f"Invalid mean values detected (mean_i={mean_i}, mean_q={mean_q}), skipping DC offset removal"
-        )
-        return samples
-
-    # Subtract the mean
-    samples_no_dc = samples - (mean_i + 1j * mean_q)
-
-    return samples_no_dc
@@ -21,7 +21,14 @@ from typing import Any, Dict, List
 import numpy as np
 import psutil
 import SoapySDR
-from SoapySDR import SOAPY_SDR_CF32, SOAPY_SDR_RX
+from SoapySDR import SOAPY_SDR_CF32, SOAPY_SDR_HAS_TIME, SOAPY_SDR_RX
+
+from pipeline.streaming.sampleindex import SampleClock
+from workers.samplebufferpool import (
+    SampleBufferPool,
+    put_shared_nowait,
+    remove_dc_offset_into,
+)
 
 # Configure logging for the worker process
 logger = logging.getLogger("soapysdr-local")
@@ -71,6 +78,7 @@ def soapysdr_local_worker_process(
 
         # FFT averaging configuration (passed to IQ consumers)
         fft_averaging = config.get("fft_averaging", 6)
+        fft_averaging_mode = config.get("fft_averaging_mode", "block")
 
         # FFT overlap (passed to IQ consumers)
         fft_overlap = config.get("fft_overlap", False)
@@ -229,6 +237,11 @@ def soapysdr_local_worker_process(
         last_cpu_check = time.time()
         cpu_check_interval = 0.5
 
+        # Reusable sample buffers, handed to the IQ queues without copying
+        sample_pool = SampleBufferPool()
+        # Sample index of each block, so consumers can detect dropped blocks
+        sample_clock = SampleClock()
+
         # Main processing loop
         while not stop_event.is_set():
             # Update CPU and memory usage periodically
@@ -318,6 +331,11 @@ def soapysdr_local_worker_process(
                             # FFT averaging is now handled by FFT processor
                             logger.info(f"Updated FFT averaging: {fft_averaging}")
 
+                    if "fft_averaging_mode" in new_config:
+                        if old_config.get("fft_averaging_mode") != new_config["fft_averaging_mode"]:
+                            fft_averaging_mode = new_config["fft_averaging_mode"]
+                            logger.info(f"Updated FFT averaging mode: {fft_averaging_mode}")
+
                     if "fft_overlap" in new_config:
                         if old_config.get("fft_overlap", True) != new_config["fft_overlap"]:
                             fft_overlap = new_config["fft_overlap"]
@@ -391,12 +409,15 @@ def soapysdr_local_worker_process(
                         }
                     )
 
+            sample_block = None
             try:
-                # Create a buffer for the samples - read directly the number of samples we need
-                samples_buffer = np.zeros(num_samples, dtype=np.complex64)
+                # Take a pooled buffer for the samples - read directly the number of samples we need
+                sample_block = sample_pool.acquire(num_samples)
+                samples_buffer = sample_block.samples
 
                 # Track how many samples we've accumulated so far
                 buffer_position = 0
+                block_time_ns = None
                 max_attempts = 10  # Limit the number of attempts to prevent infinite loops
                 attempts = 0
 
@@ -417,6 +438,10 @@ def soapysdr_local_worker_process(
                     )
 
                     if sr.ret > 0:
+                        # Hardware time of the block's first sample, if the driver provides it
+                        if buffer_position == 0 and sr.flags & SOAPY_SDR_HAS_TIME:
+                            block_time_ns = sr.timeNs
+
                         # We got samples - add to our position
                         samples_read = sr.ret
                         buffer_position += samples_read
@@ -468,14 +493,18 @@ def soapysdr_local_worker_process(
                     logger.warning(
                         f"Could not get enough samples after {attempts} attempts: {buffer_position}/{num_samples}"
                     )
+                    sample_clock.skip(buffer_position)
                     time.sleep(0.1)
                     continue
 
                 # We have enough samples to process - no need to slice since we filled the buffer exactly
                 samples = samples_buffer
 
-                # Remove DC offset spike
-                samples = remove_dc_offset(samples)
+                # Remove DC offset spike (in place, the buffer is ours until handed off)
+                remove_dc_offset_into(samples, out=samples)
+
+                # Index the block even if no queue takes it, so drops show up as gaps
+                block_stamp = sample_clock.stamp(num_samples, actual_sample_rate, block_time_ns)
 
                 # Stream IQ data to consumers (FFT processor, demodulators, etc.)
                 # Broadcast to both queues so FFT and demodulation can work independently
@@ -489,18 +518,19 @@ def soapysdr_local_worker_process(
                             try:
                                 if not iq_queue_fft.full():
                                     iq_message = {
-                                        "samples": samples.copy(),
                                         "center_freq": actual_freq,
                                         "sample_rate": actual_sample_rate,
                                         "timestamp": timestamp,
+                                        **block_stamp,
                                         "config": {
                                             "fft_size": fft_size,
                                             "fft_window": fft_window,
                                             "fft_averaging": fft_averaging,
+                                            "fft_averaging_mode": fft_averaging_mode,
                                             "fft_overlap": fft_overlap,
                                         },
                                     }
-                                    iq_queue_fft.put_nowait(iq_message)
+                                    put_shared_nowait(iq_queue_fft, iq_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -511,14 +541,14 @@ def soapysdr_local_worker_process(
                         if iq_queue_demod is not None:
                             try:
                                 if not iq_queue_demod.full():
-                                    # Make a copy for demod queue
+                                    # Same pooled buffer, released once both queues serialized it
                                     demod_message = {
-                                        "samples": samples.copy(),
                                         "center_freq": actual_freq,
                                         "sample_rate": actual_sample_rate,
                                         "timestamp": timestamp,
+                                        **block_stamp,
                                     }
-                                    iq_queue_demod.put_nowait(demod_message)
+                                    put_shared_nowait(iq_queue_demod, demod_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -546,6 +576,11 @@ def soapysdr_local_worker_process(
                 # Pause before retrying
                 time.sleep(1)
 
+            finally:
+                # Drop the acquisition loop's reference; queued handoffs keep their own
+                if sample_block is not None:
+                    sample_block.release()
+
     except Exception as e:
         error_msg = f"Error in SoapySDR worker process: {str(e)}"
         logger.error(error_msg)
@@ -614,20 +649,6 @@ def calculate_samples_per_scan(sample_rate, fft_size):
     return num_samples
 
 
-def remove_dc_offset(samples):
-    """
-    Remove DC offset by subtracting the mean
-    """
-    # Calculate the mean of the complex samples
-    mean_i = np.mean(np.real(samples))
-    mean_q = np.mean(np.imag(samples))
-
-    # Subtract the mean
-    samples_no_dc = samples - (mean_i + 1j * mean_q)
-
-    return samples_no_dc
-
-
 def get_supported_sample_rates(sdr, channel=0):
     """
     Retrieve the supported sample rates from the SoapySDR device.
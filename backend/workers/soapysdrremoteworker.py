@@ -21,7 +21,10 @@ from typing import Any, Dict, List
 import numpy as np
 import psutil
 import SoapySDR
-from SoapySDR import SOAPY_SDR_CF32, SOAPY_SDR_RX
+from SoapySDR import SOAPY_SDR_CF32, SOAPY_SDR_HAS_TIME, SOAPY_SDR_RX
+
+from pipeline.streaming.sampleindex import SampleClock
+from workers.samplebufferpool import SampleBufferPool, put_shared_nowait
 
 # Configure logging for the worker process
 logger = logging.getLogger("soapysdr-remote")
@@ -79,6 +82,7 @@ def soapysdr_remote_worker_process(
 
         # FFT averaging configuration (passed to IQ consumers)
         fft_averaging = config.get("fft_averaging", 6)
+        fft_averaging_mode = config.get("fft_averaging_mode", "block")
 
         # FFT overlap (passed to IQ consumers)
         fft_overlap = config.get("fft_overlap", False)
@@ -257,6 +261,12 @@ def soapysdr_remote_worker_process(
 
         frame_counter = 0
 
+        # Reusable sample buffers, handed to the IQ queues without copying
+        sample_pool = SampleBufferPool()
+        # Sample index of each block, so consumers can detect dropped blocks
+        sample_clock = SampleClock()
+        buffer = None
+
         # Main processing loop
         while not stop_event.is_set():
             # Update CPU and memory usage periodically
@@ -350,6 +360,11 @@ def soapysdr_remote_worker_process(
                             # FFT averaging is now handled by FFT processor
                             logger.info(f"Updated FFT averaging: {fft_averaging}")
 
+                    if "fft_averaging_mode" in new_config:
+                        if old_config.get("fft_averaging_mode") != new_config["fft_averaging_mode"]:
+                            fft_averaging_mode = new_config["fft_averaging_mode"]
+                            logger.info(f"Updated FFT averaging mode: {fft_averaging_mode}")
+
                     if "fft_overlap" in new_config:
                         if old_config.get("fft_overlap", True) != new_config["fft_overlap"]:
                             fft_overlap = new_config["fft_overlap"]
@@ -423,6 +438,7 @@ def soapysdr_remote_worker_process(
                         }
                     )
 
+            sample_block = None
             try:
                 # Use larger read size for better throughput at high sample rates
                 # Read at least 8192 samples per call, or MTU if larger
@@ -433,12 +449,17 @@ def soapysdr_remote_worker_process(
                     read_size = 8192
                 logger.debug(f"Using read_size of {read_size} samples (MTU: {mtu})")
 
-                # Create a buffer for the individual reads
-                buffer = np.zeros(read_size, dtype=np.complex64)
+                # Buffer for the individual reads, reused while the read size stays the same
+                if buffer is None or len(buffer) != read_size:
+                    buffer = np.zeros(read_size, dtype=np.complex64)
 
-                # Create an accumulation buffer for collecting enough samples
-                samples_buffer = np.zeros(num_samples, dtype=np.complex64)
+                # Pooled accumulation buffer for collecting enough samples
+                sample_block = sample_pool.acquire(num_samples)
+                samples_buffer = sample_block.samples
                 buffer_position = 0
+                block_time_ns = None
+                # Samples read past the end of the block are discarded
+                samples_discarded = 0
 
                 # Add frame counter for debugging
                 frame_counter += 1
@@ -456,6 +477,10 @@ def soapysdr_remote_worker_process(
                         samples_read = sr.ret
                         logger.debug(f"Read {samples_read}/{read_size} samples")
 
+                        # Hardware time of the block's first sample, if the driver provides it
+                        if buffer_position == 0 and sr.flags & SOAPY_SDR_HAS_TIME:
+                            block_time_ns = sr.timeNs
+
                         # Track samples read
                         stats["samples_read"] += samples_read
                         stats["last_activity"] = time.time()
@@ -469,6 +494,7 @@ def soapysdr_remote_worker_process(
                             :samples_to_add
                         ]
                         buffer_position += samples_to_add
+                        samples_discarded += samples_read - samples_to_add
 
                         # Log progress
                         logger.debug(f"Accumulated {buffer_position}/{num_samples} samples")
@@ -492,6 +518,7 @@ def soapysdr_remote_worker_process(
                             samples_buffer.fill(0)
 
                             # Reset to skip this frame
+                            sample_clock.skip(buffer_position)
                             buffer_position = 0
                             break
 
@@ -533,6 +560,7 @@ def soapysdr_remote_worker_process(
                         samples_buffer.fill(0)
 
                         # Reset to skip this frame
+                        sample_clock.skip(buffer_position)
                         buffer_position = 0
                         break
 
@@ -541,26 +569,32 @@ def soapysdr_remote_worker_process(
                     logger.warning(
                         f"Not enough samples accumulated: {buffer_position}/{num_samples}"
                     )
+                    sample_clock.skip(buffer_position)
                     time.sleep(0.005)
                     continue
 
-                # We have enough samples to process
-                samples = samples_buffer[:buffer_position]
+                # We have enough samples to process; the pooled buffer is exactly full
+
+                # Index the block even if no queue takes it, so drops show up as gaps
+                block_stamp = sample_clock.stamp(num_samples, actual_sample_rate, block_time_ns)
+                sample_clock.skip(samples_discarded)
 
                 # Stream IQ data to consumers (FFT processor, demodulators, etc.)
                 # Broadcast to both queues so FFT and demodulation can work independently
                 if has_iq_consumers:
                     try:
                         # Prepare IQ message with metadata
+                        # Samples are attached from the pooled buffer when queued
                         iq_message = {
-                            "samples": samples.copy(),  # Copy to prevent data races
                             "center_freq": actual_freq,
                             "sample_rate": actual_sample_rate,
                             "timestamp": time.time(),
+                            **block_stamp,
                             "config": {
                                 "fft_size": fft_size,
                                 "fft_window": fft_window,
                                 "fft_averaging": fft_averaging,
+                                "fft_averaging_mode": fft_averaging_mode,
                                 "fft_overlap": fft_overlap,
                             },
                         }
@@ -570,14 +604,14 @@ def soapysdr_remote_worker_process(
                         if iq_queue_demod is not None:
                             try:
                                 if not iq_queue_demod.full():
-                                    # Make a copy for demod queue
+                                    # Same pooled buffer, released once both queues serialized it
                                     demod_message = {
-                                        "samples": samples.copy(),
                                         "center_freq": actual_freq,
                                         "sample_rate": actual_sample_rate,
                                         "timestamp": time.time(),
+                                        **block_stamp,
                                     }
-                                    iq_queue_demod.put_nowait(demod_message)
+                                    put_shared_nowait(iq_queue_demod, demod_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -588,7 +622,7 @@ def soapysdr_remote_worker_process(
                         if iq_queue_fft is not None:
                             try:
                                 if not iq_queue_fft.full():
-                                    iq_queue_fft.put_nowait(iq_message)
+                                    put_shared_nowait(iq_queue_fft, iq_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -616,6 +650,11 @@ def soapysdr_remote_worker_process(
                 # Pause before retrying
                 time.sleep(1)
 
+            finally:
+                # Drop the acquisition loop's reference; queued handoffs keep their own
+                if sample_block is not None:
+                    sample_block.release()
+
     except ConnectionRefusedError as e:
         hostname = config.get("host", "unknown")
         port = config.get("port", "unknown")
@@ -9,6 +9,9 @@ from typing import Any, Dict
 import numpy as np
 import psutil
 
+from pipeline.streaming.sampleindex import SampleClock
+from workers.samplebufferpool import SampleBufferPool, put_shared_nowait
+
 # Configure logging for the worker process
 logger = logging.getLogger("uhd-worker")
 
@@ -79,6 +82,7 @@ def uhd_worker_process(
 
         # FFT averaging configuration (passed to IQ consumers)
         fft_averaging = config.get("fft_averaging", 8)
+        fft_averaging_mode = config.get("fft_averaging_mode", "block")
 
         # FFT overlap (passed to IQ consumers)
         fft_overlap = config.get("fft_overlap", False)
@@ -229,6 +233,11 @@ def uhd_worker_process(
         last_cpu_check = time.time()
         cpu_check_interval = 0.5
 
+        # Reusable sample buffers, handed to the IQ queues without copying
+        sample_pool = SampleBufferPool()
+        # Sample index of each block, so consumers can detect dropped blocks
+        sample_clock = SampleClock()
+
         # Main processing loop
         while not stop_event.is_set():
             # Update CPU and memory usage periodically
@@ -416,6 +425,11 @@ def uhd_worker_process(
                             # FFT averaging is now handled by FFT processor
                             logger.info(f"Updated FFT averaging: {fft_averaging}")
 
+                    if "fft_averaging_mode" in new_config:
+                        if old_config.get("fft_averaging_mode") != new_config["fft_averaging_mode"]:
+                            fft_averaging_mode = new_config["fft_averaging_mode"]
+                            logger.info(f"Updated FFT averaging mode: {fft_averaging_mode}")
+
                     if "fft_overlap" in new_config:
                         if old_config.get("fft_overlap", True) != new_config["fft_overlap"]:
                             fft_overlap = new_config["fft_overlap"]
@@ -444,10 +458,15 @@ def uhd_worker_process(
                         }
                     )
 
+            sample_block = None
             try:
-                # Accumulate samples until we have a full chunk
-                samples_buffer = np.zeros(num_samples, dtype=np.complex64)
+                # Accumulate samples into a pooled buffer until we have a full chunk
+                sample_block = sample_pool.acquire(num_samples)
+                samples_buffer = sample_block.samples
                 buffer_position = 0
+                block_time_ns = None
+                # Received samples that never make it into a block (short packets, tail)
+                samples_discarded = 0
 
                 while buffer_position < num_samples and not stop_event.is_set():
                     metadata = uhd.types.RXMetadata()
@@ -459,12 +478,20 @@ def uhd_worker_process(
                             logger.warning("Receiver overflow - skipping frame")
                             continue
                         logger.warning(f"Receiver error: {metadata.strerror()} - skipping frame")
+                        sample_clock.skip(buffer_position)
                         buffer_position = 0
                         break
 
                     if num_rx_samples < 256:
+                        samples_discarded += num_rx_samples
                         continue
 
+                    # Hardware time of the block's first sample
+                    if buffer_position == 0 and metadata.has_time_spec:
+                        block_time_ns = int(
+                            metadata.time_spec.get_full_secs()
+                        ) * 1_000_000_000 + int(round(metadata.time_spec.get_frac_secs() * 1e9))
+
                     samples_remaining = num_samples - buffer_position
                     samples_to_add = min(num_rx_samples, samples_remaining)
 
@@ -472,6 +499,7 @@ def uhd_worker_process(
                         recv_buffer[0][:samples_to_add]
                     )
                     buffer_position += samples_to_add
+                    samples_discarded += num_rx_samples - samples_to_add
 
                     stats["samples_read"] += samples_to_add
                     stats["last_activity"] = time.time()
@@ -480,11 +508,16 @@ def uhd_worker_process(
                     logger.warning(
                         f"Not enough samples accumulated: {buffer_position}/{num_samples}"
                     )
+                    sample_clock.skip(buffer_position + samples_discarded)
                     time.sleep(0.005)
                     continue
 
                 samples = samples_buffer[:buffer_position]
 
+                # Index the block even if no queue takes it, so drops show up as gaps
+                block_stamp = sample_clock.stamp(len(samples), actual_rate, block_time_ns)
+                sample_clock.skip(samples_discarded)
+
                 # Stream IQ data to consumers (FFT processor, demodulators, etc.)
                 # Broadcast to both queues so FFT and demodulation can work independently
                 if has_iq_consumers:
@@ -497,18 +530,19 @@ def uhd_worker_process(
                             try:
                                 if not iq_queue_fft.full():
                                     iq_message = {
-                                        "samples": samples.copy(),
                                         "center_freq": actual_freq,
                                         "sample_rate": actual_rate,
                                         "timestamp": timestamp,
+                                        **block_stamp,
                                         "config": {
                                             "fft_size": fft_size,
                                             "fft_window": fft_window,
                                             "fft_averaging": fft_averaging,
+                                            "fft_averaging_mode": fft_averaging_mode,
                                             "fft_overlap": fft_overlap,
                                         },
                                     }
-                                    iq_queue_fft.put_nowait(iq_message)
+                                    put_shared_nowait(iq_queue_fft, iq_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -519,14 +553,14 @@ def uhd_worker_process(
                         if iq_queue_demod is not None:
                             try:
                                 if not iq_queue_demod.full():
-                                    # Make a copy for demod queue
+                                    # Same pooled buffer, released once both queues serialized it
                                     demod_message = {
-                                        "samples": samples.copy(),
                                         "center_freq": actual_freq,
                                         "sample_rate": actual_rate,
                                         "timestamp": timestamp,
+                                        **block_stamp,
                                     }
-                                    iq_queue_demod.put_nowait(demod_message)
+                                    put_shared_nowait(iq_queue_demod, demod_message, sample_block)
                                     stats["iq_chunks_out"] += 1
                                 else:
                                     stats["queue_drops"] += 1
@@ -554,6 +588,11 @@ def uhd_worker_process(
                 # Short pause before retrying
                 time.sleep(0.1)  # Reduced from 1 second
 
+            finally:
+                # Drop the acquisition loop's reference; queued handoffs keep their own
+                if sample_block is not None:
+                    sample_block.release()
+
     except Exception as e:
         error_msg = f"Error in UHD worker process: {str(e)}"
         logger.error(error_msg)